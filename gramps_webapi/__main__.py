@@ -294,8 +294,14 @@ def progress_callback_count_factory(app) -> ProgressCallback:
 
 
 @search.command("index-full")
+@click.option(
+    "--workers",
+    type=int,
+    default=None,
+    help="Number of worker processes (default: SEARCH_INDEX_WORKERS config option).",
+)
 @click.pass_context
-def index_full(ctx):
+def index_full(ctx, workers):
     """Perform a full reindex."""
     app = ctx.obj["app"]
     app.logger.info("Rebuilding search index ...")
@@ -313,7 +319,12 @@ def index_full(ctx):
 
     t0 = time.time()
     try:
-        indexer.reindex_full(db, progress_cb=progress_callback_count_factory(app))
+        indexer.reindex_full(
+            db,
+            progress_cb=progress_callback_count_factory(app),
+            workers=workers or app.config["SEARCH_INDEX_WORKERS"],
+            dbmgr=db_manager,
+        )
     except Exception as e:
         app.logger.exception("Error during indexing")
         raise click.ClickException(f"Indexing failed: {e}")
@@ -323,8 +334,13 @@ def index_full(ctx):
 
 
 @search.command("index-incremental")
+@click.option(
+    "--full-diff",
+    is_flag=True,
+    help="Compare all objects to the index instead of only the ones changed since the last reindex.",
+)
 @click.pass_context
-def index_incremental(ctx):
+def index_incremental(ctx, full_diff):
     """Perform an incremental reindex."""
     app = ctx.obj["app"]
     db_manager = ctx.obj["db_manager"]
@@ -339,7 +355,7 @@ def index_incremental(ctx):
 
     try:
         indexer.reindex_incremental(
-            db, progress_cb=progress_callback_count_factory(app)
+            db, progress_cb=progress_callback_count_factory(app), full_diff=full_diff
         )
     except Exception as e:
         app.logger.exception("Error during indexing")
@@ -28,7 +28,7 @@ from webargs import fields, validate
 from ..const import API_PREFIX
 from .auth import jwt_required
 from .blueprint import api_blueprint
-from .cache import thumbnail_cache_decorator, tile_cache_decorator
+from .cache import thumbnail_cache_decorator
 from .media import get_media_handler
 from .resources.access_tokens import UserAccessTokenResource
 from .resources.anniversaries import AnniversariesIcsResource
@@ -82,6 +82,7 @@ from .resources.merge import (
     MergeSourceResource,
 )
 from .resources.metadata import MetadataResearcherResource, MetadataResource
+from .resources.metrics import MetricsResource
 from .resources.name_formats import NameFormatsResource
 from .resources.name_groups import NameGroupsResource
 from .resources.notes import NoteResource, NotesResource
@@ -164,7 +165,7 @@ from .resources.user import (
     UsersResource,
     UserTriggerResetPasswordResource,
 )
-from .resources.verify import VerifyResource
+from .resources.verify import VerifyResource, VerifyResultsResource
 from .resources.ydna import PersonYDnaResource
 from .util import abort_with_message, get_db_handle, get_tree_from_jwt, parser, use_args
 
@@ -652,6 +653,12 @@ register_endpt(SearchIndexResource, "/search/index/", "search_index", tags=["Sea
 register_endpt(
     VerifyResource, "/trees/<string:tree_id>/verify", "verify", tags=["Trees"]
 )
+register_endpt(
+    VerifyResultsResource,
+    "/trees/<string:tree_id>/verify/<string:result_id>",
+    "verify_results",
+    tags=["Trees"],
+)
 
 # Chat
 register_endpt(ChatResource, "/chat/", "chat", tags=["Chat"])
@@ -660,6 +667,9 @@ register_endpt(ChatResource, "/chat/", "chat", tags=["Chat"])
 register_endpt(ConfigsResource, "/config/", "configs", tags=["Config"])
 register_endpt(ConfigResource, "/config/<string:key>/", "config", tags=["Config"])
 
+# Metrics
+register_endpt(MetricsResource, "/metrics/", "metrics", tags=["Config"])
+
 # Tasks
 register_endpt(TaskListResource, "/tasks/", "tasks", tags=["Tasks"])
 register_endpt(TaskResource, "/tasks/<string:task_id>", "task", tags=["Tasks"])
@@ -714,7 +724,6 @@ register_endpt(
     },
     location="query",
 )
-@tile_cache_decorator
 def get_media_map_tile(args, handle: str, z: int, x: int, y: int):
     """Get a map tile for a georeferenced media image."""
     if z > 28:
@@ -6,7 +6,7 @@ import hashlib
 import json
 import os
 
-from typing import Collection
+from typing import Any, Collection, Iterable
 
 from flask import current_app, g, request
 from flask_caching import Cache
@@ -21,6 +21,7 @@ from gramps_webapi.api.util import (
 )
 from gramps_webapi.auth import get_all_user_details
 from gramps_webapi.auth.const import PERM_VIEW_PRIVATE
+from gramps_webapi.cache_versions import get_version_key
 from gramps_webapi.const import TREE_MULTI
 
 thumbnail_cache = Cache()
@@ -29,6 +30,10 @@ persistent_cache = Cache()
 
 USER_DICT_CACHE_TIMEOUT = 60
 
+# values of the `stream` query argument that enable streaming, as accepted
+# by marshmallow's Boolean field
+STREAM_TRUTHY = {"1", "true", "t", "on", "yes", "y"}
+
 
 def get_db_last_change_timestamp(tree_id: str) -> int | float | None:
     """Get the last change timestamp of the database.
@@ -46,16 +51,27 @@ def get_db_last_change_timestamp(tree_id: str) -> int | float | None:
         return None
 
 
+def hash_args(query_args: Iterable[tuple[str, str]]) -> str:
+    """Hash query arguments for use in cache keys."""
+    args_as_sorted_tuple = tuple(sorted(query_args))
+    args_as_bytes = str(args_as_sorted_tuple).encode()
+    arg_hash = hashlib.md5(args_as_bytes)
+    return str(arg_hash.hexdigest())
+
+
 def _hash_request_args() -> str:
     """Hash the request arguments for use in cache keys."""
     # Exclude jwt (auth token) and checksum (frontend cache-busting hint;
     # the authoritative checksum is read from the DB in make_cache_key_thumbnails).
     excluded = {"jwt", "checksum"}
-    query_args = list((k, v) for (k, v) in request.args.items(multi=True) if k not in excluded)
-    args_as_sorted_tuple = tuple(sorted(query_args))
-    args_as_bytes = str(args_as_sorted_tuple).encode()
-    arg_hash = hashlib.md5(args_as_bytes)
-    return str(arg_hash.hexdigest())
+    return hash_args(
+        (k, v) for (k, v) in request.args.items(multi=True) if k not in excluded
+    )
+
+
+def thumbnail_cache_key(checksum: str, path: str, arg_hash: str, dirname: str) -> str:
+    """Make the cache key of a thumbnail of a media file."""
+    return checksum + path + arg_hash + dirname + ":avif"
 
 
 def make_cache_key_thumbnails(*args, **kwargs):
@@ -70,32 +86,71 @@ def make_cache_key_thumbnails(*args, **kwargs):
 
     dbmgr = get_db_manager(tree)
 
-    cache_key = checksum + request.path + arg_hash + dbmgr.dirname + ":avif"
+    return thumbnail_cache_key(checksum, request.path, arg_hash, dbmgr.dirname)
 
-    return cache_key
+
+def get_cache_dependencies(resource: Any) -> Collection[str] | None:
+    """Get the object classes a cached response of a resource depends on.
+
+    Resources declare them in a `cache_dependencies` attribute, which can
+    also be a property depending on the request. None means that the
+    response may depend on objects of any class.
+    """
+    return getattr(resource, "cache_dependencies", None)
 
 
 def make_cache_key_request(*args, **kwargs):
-    """Make a cache key for a base request."""
+    """Make a cache key for a base request.
+
+    The first positional argument is the resource whose view is cached.
+    The key contains the versions of the object classes the response
+    depends on, so it changes when one of them is changed.
+    """
     # hash query args except jwt
     arg_hash = _hash_request_args()
 
     # the request result will depend on whether the user can view private records
     # this will be "1" if the user can view private records, "0" otherwise
-    permission_hash = str(int(has_permissions({PERM_VIEW_PRIVATE})))
+    can_view_private = has_permissions({PERM_VIEW_PRIVATE})
+    permission_hash = str(int(can_view_private))
+
+    if can_view_private:
+        class_names = get_cache_dependencies(args[0]) if args else None
+    else:
+        # the private proxy strips references to private objects of any class
+        class_names = None
 
     tree_id = get_tree_from_jwt_or_fail()
-    db_timestamp = get_db_last_change_timestamp(tree_id)
-    if db_timestamp is None:
+    dbmgr = get_db_manager(tree_id)
+    version_key = get_version_key(dbmgr.path, class_names)
+    if version_key is None:
         raise ValueError("Database last change timestamp is None")
 
-    cache_key = tree_id + str(db_timestamp) + request.path + arg_hash + permission_hash
+    cache_key = tree_id + version_key + request.path + arg_hash + permission_hash
 
     return cache_key
 
 
+def get_request_etag(resource: Any = None) -> str | None:
+    """Get an ETag for a request that does not depend on the response body.
+
+    The ETag is derived from the same inputs as the request cache key, i.e.
+    the versions of the object classes `resource` depends on, the path, the
+    query arguments, and the user's permission to view private records.
+    Returns None if the versions are unknown.
+    """
+    try:
+        cache_key = make_cache_key_request(resource)
+    except ValueError:
+        return None
+    return hashlib.sha256(cache_key.encode("utf-8")).hexdigest()
+
+
 def skip_cache_condition_request(*args, **kwargs) -> bool:
     """Condition to skip caching for a request."""
+    # streamed responses cannot be stored in the cache
+    if request.args.get("stream", "").lower() in STREAM_TRUTHY:
+        return True
     # skip caching if the user is not authorized to view private records
     tree_id = get_tree_from_jwt_or_fail()
     db_timestamp = get_db_last_change_timestamp(tree_id)
@@ -153,46 +208,6 @@ def get_user_dict(user_ids: Collection[str] = ()) -> dict[str, dict]:
     return user_dict
 
 
-def make_cache_key_tiles(*args, **kwargs):
-    """Make a cache key for map tiles."""
-    # max_zoom is a query arg that changes the response, so include it in the key.
-    # jwt and checksum are excluded by _hash_request_args as usual.
-    arg_hash = _hash_request_args()
-
-    tree = get_tree_from_jwt()
-    obj = g.cached_media
-    checksum = obj.checksum
-
-    # Include a hash of map:bounds so that updating the attribute (without
-    # changing the file) correctly invalidates cached tiles.
-    bounds_value = ""
-    for attr in obj.attribute_list:
-        if str(attr.get_type()) == "map:bounds":
-            bounds_value = attr.get_value()
-            break
-    bounds_hash = hashlib.md5(bounds_value.encode()).hexdigest()
-
-    dbmgr = get_db_manager(tree)
-    # affects the Cache-Control header, so must be part of the key
-    is_versioned = "versioned" if "checksum" in request.args else "unversioned"
-    # z/x/y are encoded in request.path
-    cache_key = (
-        checksum
-        + request.path
-        + arg_hash
-        + bounds_hash
-        + dbmgr.dirname
-        + is_versioned
-        + ":tile"
-    )
-    return cache_key
-
-
-tile_cache_decorator = thumbnail_cache.cached(
-    make_cache_key=make_cache_key_tiles, unless=skip_cache_missing_media
-)
-
-
 def _native_max_zoom_cache_key(checksum: str, bounds: list) -> str:
     """Make a cache key for the native max zoom of a georeferenced media file."""
     bounds_hash = hashlib.md5(json.dumps(bounds).encode()).hexdigest()
@@ -207,3 +222,26 @@ def get_cached_native_max_zoom(checksum: str, bounds: list) -> int | None:
 def set_cached_native_max_zoom(checksum: str, bounds: list, native_max_zoom: int) -> None:
     """Cache the native max zoom for a georeferenced media file."""
     persistent_cache.set(_native_max_zoom_cache_key(checksum, bounds), native_max_zoom)
+
+
+def _map_tile_cache_key(checksum: str, bounds: list, z: int, x: int, y: int) -> str:
+    """Make a cache key for a pre-rendered map tile of a georeferenced media file."""
+    bounds_hash = hashlib.md5(json.dumps(bounds).encode()).hexdigest()
+    return f"{checksum}:{bounds_hash}:{z}/{x}/{y}:map_tile"
+
+
+def get_cached_map_tile(checksum: str, bounds: list, z: int, x: int, y: int) -> bytes | None:
+    """Get a pre-rendered map tile as PNG data, if cached."""
+    return thumbnail_cache.get(_map_tile_cache_key(checksum, bounds, z, x, y))
+
+
+def has_cached_map_tile(checksum: str, bounds: list, z: int, x: int, y: int) -> bool:
+    """Check whether a pre-rendered map tile is cached."""
+    return thumbnail_cache.has(_map_tile_cache_key(checksum, bounds, z, x, y))
+
+
+def set_cached_map_tile(
+    checksum: str, bounds: list, z: int, x: int, y: int, data: bytes
+) -> None:
+    """Cache a pre-rendered map tile as PNG data."""
+    thumbnail_cache.set(_map_tile_cache_key(checksum, bounds, z, x, y), data)
@@ -0,0 +1,207 @@
+#
+# Gramps Web API - A RESTful API for the Gramps genealogy program
+#
+# Copyright (C) 2026      Gramps Web contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Index of event dates and types for selecting events without loading them."""
+
+from __future__ import annotations
+
+from bisect import bisect_left, insort
+from typing import NamedTuple, Optional
+
+from gramps.gen.db.base import DbReadBase
+from gramps.gen.lib import Date, EventType
+from gramps.gen.lib.date import gregorian
+from gramps.gen.lib.json_utils import data_to_object
+
+from ..metrics import register_metrics
+from .tree_index import TreeIndexCache
+
+# days by which an incomplete date, e.g. a year only, can extend its sort value
+INCOMPLETE_DATE_DAYS = 366
+
+# changed events up to which the anniversary order is updated in place
+MAX_ANNIVERSARY_UPDATES = 1000
+
+
+class EventEntry(NamedTuple):
+    """Indexed properties of an event."""
+
+    change: int
+    sortval: int
+    # type as string and as XML string
+    type: str
+    type_xml: str
+    # the date is not a single regular day, i.e. it can match dates
+    # far from its sort value
+    fuzzy: bool
+    valid: bool
+    # Gregorian date components
+    year: int
+    month: int
+    day: int
+
+
+# key of an event in the anniversary order: (month, day, year, handle)
+AnniversaryKey = tuple[int, int, int, str]
+
+
+def get_anniversary_date(
+    year: int, month: int, day: int
+) -> Optional[tuple[int, int, int]]:
+    """Get the (year, month, day) of the first anniversary of a Gregorian date.
+
+    Returns None if the month or day is unknown.
+    """
+    if month < 1 or day < 1:
+        return None
+    if year < 1:
+        year = 1970
+    if year > 9999:
+        year = 9999
+    return year, month, day
+
+
+def _get_event_entry(
+    data, type_names: dict[tuple[int, str], tuple[str, str]]
+) -> EventEntry:
+    """Return the index entry of an event from its raw data."""
+    event_type = data["type"]
+    type_key = (event_type["value"], event_type["string"])
+    if type_key not in type_names:
+        type_obj = EventType(type_key)
+        type_names[type_key] = (str(type_obj), type_obj.xml_str())
+    type_name, type_xml = type_names[type_key]
+    if data["date"] is None:
+        return EventEntry(data["change"], 0, type_name, type_xml, True, False, 0, 0, 0)
+    date = data_to_object(data["date"])
+    gdate = gregorian(date)
+    return EventEntry(
+        data["change"],
+        date.sortval,
+        type_name,
+        type_xml,
+        date.sortval == 0
+        or date.modifier != Date.MOD_NONE
+        or date.quality != Date.QUAL_NONE,
+        date.is_valid(),
+        gdate.get_year(),
+        gdate.get_month(),
+        gdate.get_day(),
+    )
+
+
+def _get_anniversary_key(handle: str, entry: EventEntry) -> Optional[AnniversaryKey]:
+    """Return the key of an event in the anniversary order, or None."""
+    if not entry.valid:
+        return None
+    anniversary = get_anniversary_date(entry.year, entry.month, entry.day)
+    if anniversary is None:
+        return None
+    year, month, day = anniversary
+    return month, day, year, handle
+
+
+class EventIndex:
+    """Dates and types of all events of a tree.
+
+    Allows selecting events by type and date before loading them. Events
+    with a known month and day are also kept in the order of their
+    anniversaries, i.e. sorted by month, day, year, and handle.
+    """
+
+    def __init__(
+        self,
+        entries: dict[str, EventEntry],
+        anniversaries: Optional[list[AnniversaryKey]] = None,
+    ) -> None:
+        """Initialize self."""
+        self.entries = entries
+        self._anniversaries = anniversaries
+
+    def get(self, handle: str) -> Optional[EventEntry]:
+        """Return the entry of an event, or None."""
+        return self.entries.get(handle)
+
+    def anniversaries(self) -> list[AnniversaryKey]:
+        """Return the keys of events with a known month and day in order."""
+        if self._anniversaries is None:
+            keys = (
+                _get_anniversary_key(handle, entry)
+                for handle, entry in self.entries.items()
+            )
+            self._anniversaries = sorted(key for key in keys if key is not None)
+        return self._anniversaries
+
+    def updated(self, changes: dict[str, Optional[EventEntry]]) -> EventIndex:
+        """Return an index with changed events; None marks a deleted event.
+
+        The anniversary order is updated in place if it was computed and
+        only few events changed, otherwise it is computed when needed.
+        """
+        entries = dict(self.entries)
+        anniversaries = None
+        if self._anniversaries is not None and len(changes) <= MAX_ANNIVERSARY_UPDATES:
+            anniversaries = list(self._anniversaries)
+        for handle, entry in changes.items():
+            old_entry = entries.pop(handle, None)
+            if entry is not None:
+                entries[handle] = entry
+            if anniversaries is None:
+                continue
+            old_key = old_entry and _get_anniversary_key(handle, old_entry)
+            if old_key is not None:
+                index = bisect_left(anniversaries, old_key)
+                if index < len(anniversaries) and anniversaries[index] == old_key:
+                    del anniversaries[index]
+            new_key = entry and _get_anniversary_key(handle, entry)
+            if new_key is not None:
+                insort(anniversaries, new_key)
+        return EventIndex(entries, anniversaries)
+
+
+class EventIndexCache(TreeIndexCache[EventIndex]):
+    """Per-process event indexes of all trees, kept up to date on changes.
+
+    The indexes include private events also behind proxies.
+    """
+
+    class_name = "Event"
+
+    def __init__(self) -> None:
+        """Initialize self."""
+        super().__init__()
+        # names of the event types by value and custom string
+        self._type_names: dict[tuple[int, str], tuple[str, str]] = {}
+
+    def _get_entry(self, data) -> EventEntry:
+        """Return the index entry of an event."""
+        return _get_event_entry(data, self._type_names)
+
+    def _create(self, entries: dict[str, EventEntry]) -> EventIndex:
+        """Return the index of all events."""
+        return EventIndex(entries)
+
+
+event_index_cache = EventIndexCache()
+register_metrics("event_index", event_index_cache.stats)
+
+
+def get_event_index(db_handle: DbReadBase) -> Optional[EventIndex]:
+    """Return the up-to-date event index of a database, or None."""
+    return event_index_cache.get(db_handle)
@@ -0,0 +1,311 @@
+#
+# Gramps Web API - A RESTful API for the Gramps genealogy program
+#
+# Copyright (C) 2026      Gramps Web contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Index of parent, child, and partner links for relationship queries."""
+
+from __future__ import annotations
+
+import copy
+from array import array
+from itertools import accumulate
+from typing import Collection, Iterable, Optional, Sequence
+
+from gramps.gen.db.base import DbReadBase
+
+from ..metrics import register_metrics
+from .tree_index import TreeIndexCache
+
+# father, mother, and children of a family
+FamilyLinks = tuple[Optional[str], Optional[str], tuple[str, ...]]
+
+
+def _get_family_links(data) -> FamilyLinks:
+    """Return the links of a family from its raw data."""
+    return (
+        data["father_handle"] or None,
+        data["mother_handle"] or None,
+        tuple(child_ref["ref"] for child_ref in data["child_ref_list"]),
+    )
+
+
+def _make_csr(size: int, sources: list[int], targets: list[int]) -> tuple[array, array]:
+    """Return the offsets and targets of edges in compressed sparse rows."""
+    counts = [0] * (size + 1)
+    for source in sources:
+        counts[source + 1] += 1
+    order = sorted(range(len(sources)), key=sources.__getitem__)
+    return array("l", accumulate(counts)), array("l", map(targets.__getitem__, order))
+
+
+def _family_edges(
+    links: Optional[FamilyLinks],
+) -> tuple[set[str], set[str]]:
+    """Return the parents and the children of a family."""
+    if links is None:
+        return set(), set()
+    father, mother, children = links
+    return {parent for parent in (father, mother) if parent}, set(children)
+
+
+class FamilyGraph:
+    """Adjacency index of people and families.
+
+    People and families are nodes with integer ids. Upward edges lead from
+    a person to the families it is a child in and from a family to its
+    parents, downward edges the other way round. Edges are stored as
+    compressed sparse rows of integer arrays, so walking up many generations
+    does not load any objects.
+
+    The links of every family are kept with its change timestamp. Changed
+    families are applied as overrides of the rows of the affected nodes,
+    until so many rows are overridden that the arrays are rebuilt.
+    """
+
+    # fraction of nodes with overridden rows that triggers a rebuild
+    MAX_OVERRIDDEN = 0.05
+
+    def __init__(self, families: dict[str, tuple[int, FamilyLinks]]) -> None:
+        """Initialize self from change timestamps and links of all families."""
+        self.entries = families
+        # families first, then people
+        self.ids: dict[str, int] = {handle: i for i, handle in enumerate(families)}
+        add = self.ids.setdefault
+        sources: list[int] = []
+        targets: list[int] = []
+        for family_id, (_, (father, mother, children)) in enumerate(families.values()):
+            for parent in (father, mother):
+                if parent:
+                    sources.append(family_id)
+                    targets.append(add(parent, len(self.ids)))
+            for child in children:
+                sources.append(add(child, len(self.ids)))
+                targets.append(family_id)
+        self.handles = list(self.ids)
+        self.is_family = array("b", bytes(len(self.handles)))
+        self.is_family[: len(families)] = array("b", [1]) * len(families)
+        size = len(self.handles)
+        self.up_offsets, self.up_targets = _make_csr(size, sources, targets)
+        self.down_offsets, self.down_targets = _make_csr(size, targets, sources)
+        self.up_overrides: dict[int, tuple[int, ...]] = {}
+        self.down_overrides: dict[int, tuple[int, ...]] = {}
+
+    def _node(self, handle: str, is_family: bool) -> int:
+        """Return the id of a node, adding it if needed."""
+        node = self.ids.get(handle)
+        if node is None:
+            node = len(self.handles)
+            self.ids[handle] = node
+            self.handles.append(handle)
+            self.is_family.append(is_family)
+            self.up_overrides[node] = ()
+            self.down_overrides[node] = ()
+        return node
+
+    def _up(self, node: int) -> Sequence[int]:
+        """Return the targets of the upward edges of a node."""
+        if node in self.up_overrides:
+            return self.up_overrides[node]
+        return self.up_targets[self.up_offsets[node] : self.up_offsets[node + 1]]
+
+    def _down(self, node: int) -> Sequence[int]:
+        """Return the targets of the downward edges of a node."""
+        if node in self.down_overrides:
+            return self.down_overrides[node]
+        return self.down_targets[self.down_offsets[node] : self.down_offsets[node + 1]]
+
+    def updated(
+        self, changes: dict[str, Optional[tuple[int, FamilyLinks]]]
+    ) -> FamilyGraph:
+        """Return a graph with changed families; None marks a deleted family.
+
+        The graph itself is not modified, as it may be in use by other
+        threads.
+        """
+        families = dict(self.entries)
+        for handle, family in changes.items():
+            if family is None:
+                families.pop(handle, None)
+            else:
+                families[handle] = family
+        overridden = len(self.up_overrides) + len(self.down_overrides)
+        if overridden + 4 * len(changes) > self.MAX_OVERRIDDEN * len(self.handles):
+            return FamilyGraph(families)
+        graph = copy.copy(self)
+        graph.entries = families
+        graph.ids = dict(self.ids)
+        graph.handles = list(self.handles)
+        graph.is_family = array("b", self.is_family)
+        graph.up_overrides = dict(self.up_overrides)
+        graph.down_overrides = dict(self.down_overrides)
+        for handle, family in changes.items():
+            old_links = self.entries.get(handle)
+            graph._apply(
+                handle,
+                _family_edges(old_links[1] if old_links else None),
+                _family_edges(family[1] if family else None),
+            )
+        return graph
+
+    def _apply(
+        self,
+        handle: str,
+        old_edges: tuple[set[str], set[str]],
+        new_edges: tuple[set[str], set[str]],
+    ) -> None:
+        """Replace the edges of a family."""
+        family = self._node(handle, True)
+        (old_parents, old_children), (new_parents, new_children) = (
+            old_edges,
+            new_edges,
+        )
+        self.up_overrides[family] = tuple(
+            self._node(parent, False) for parent in new_parents
+        )
+        self.down_overrides[family] = tuple(
+            self._node(child, False) for child in new_children
+        )
+        for parent in old_parents ^ new_parents:
+            node = self._node(parent, False)
+            rows = [row for row in self._down(node) if row != family]
+            if parent in new_parents:
+                rows.append(family)
+            self.down_overrides[node] = tuple(rows)
+        for child in old_children ^ new_children:
+            node = self._node(child, False)
+            rows = [row for row in self._up(node) if row != family]
+            if child in new_children:
+                rows.append(family)
+            self.up_overrides[node] = tuple(rows)
+
+    def with_partners(self, handles: Iterable[str]) -> set[int]:
+        """Return the ids of people and their families and partners."""
+        nodes = set()
+        for handle in handles:
+            node = self.ids.get(handle)
+            if node is None:
+                continue
+            nodes.add(node)
+            for family in self._down(node):
+                if self.is_family[family]:
+                    nodes.add(family)
+                    nodes.update(self._up(family))
+        return nodes
+
+    def ancestors(self, nodes: Collection[int], generations: int) -> set[int]:
+        """Return the nodes and the ids of their ancestors and parent families."""
+        seen = set(nodes)
+        frontier = list(nodes)
+        # each generation is a step to a family and a step to its parents
+        for _ in range(2 * generations):
+            next_frontier = []
+            for node in frontier:
+                for parent in self._up(node):
+                    if parent not in seen:
+                        seen.add(parent)
+                        next_frontier.append(parent)
+            if not next_frontier:
+                break
+            frontier = next_frontier
+        return seen
+
+    def have_common_ancestor(
+        self, nodes1: Collection[int], nodes2: Collection[int], generations: int
+    ) -> bool:
+        """Whether two groups of nodes share an ancestor within some generations.
+
+        Searches upwards from both groups at the same time, always expanding
+        the smaller frontier, and stops as soon as the searches meet.
+        """
+        seen = [set(nodes1), set(nodes2)]
+        if seen[0] & seen[1]:
+            return True
+        frontiers = [list(nodes1), list(nodes2)]
+        steps = [0, 0]
+        while True:
+            open_sides = [
+                side
+                for side in (0, 1)
+                if frontiers[side] and steps[side] < 2 * generations
+            ]
+            if not open_sides:
+                return False
+            side = min(open_sides, key=lambda side: len(frontiers[side]))
+            other = seen[1 - side]
+            next_frontier = []
+            for node in frontiers[side]:
+                for parent in self._up(node):
+                    if parent in other:
+                        return True
+                    if parent not in seen[side]:
+                        seen[side].add(parent)
+                        next_frontier.append(parent)
+            frontiers[side] = next_frontier
+            steps[side] += 1
+
+    def split_handles(self, nodes: Iterable[int]) -> tuple[list[str], list[str]]:
+        """Return the handles of the people and of the families among nodes."""
+        people, families = [], []
+        for node in nodes:
+            if self.is_family[node]:
+                families.append(self.handles[node])
+            else:
+                people.append(self.handles[node])
+        return people, families
+
+
+class FamilyGraphIndex(TreeIndexCache[FamilyGraph]):
+    """Per-process family graphs of all trees, kept up to date on changes.
+
+    The graphs include private people and families also behind proxies.
+    """
+
+    class_name = "Family"
+
+    def _get_entry(self, data) -> tuple[int, FamilyLinks]:
+        """Return the change timestamp and links of a family."""
+        return data["change"], _get_family_links(data)
+
+    def _create(self, entries: dict[str, tuple[int, FamilyLinks]]) -> FamilyGraph:
+        """Return the graph of all families."""
+        return FamilyGraph(entries)
+
+
+family_graph_index = FamilyGraphIndex()
+register_metrics("family_graph", family_graph_index.stats)
+
+
+def get_family_graph(db_handle: DbReadBase) -> Optional[FamilyGraph]:
+    """Return the up-to-date family graph of a database, or None."""
+    return family_graph_index.get(db_handle)
+
+
+def may_be_related(
+    db_handle: DbReadBase, handle1: str, handle2: str, generations: int
+) -> bool:
+    """Whether two people may be related within some generations.
+
+    People are considered related if they, or their partners, share an
+    ancestor. Returns True if the family graph index is not available.
+    """
+    graph = get_family_graph(db_handle)
+    if graph is None:
+        return True
+    return graph.have_common_ancestor(
+        graph.with_partners([handle1]), graph.with_partners([handle2]), generations
+    )
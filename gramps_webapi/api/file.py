@@ -36,20 +36,26 @@ from werkzeug.datastructures import FileStorage
 from gramps_webapi.const import MIME_AVIF, MIME_PNG
 
 from ..types import FilenameOrPath
-from .cache import get_cached_native_max_zoom, set_cached_native_max_zoom
+from .cache import (
+    get_cached_map_tile,
+    get_cached_native_max_zoom,
+    set_cached_map_tile,
+    set_cached_native_max_zoom,
+)
 from .image import (
     LocalFileThumbnailHandler,
     abort_on_image_errors,
     detect_faces,
     get_map_tile,
     get_native_max_zoom,
+    map_tile_overlaps,
     open_image,
     transparent_png_tile,
 )
 from .util import abort_with_message
 
 
-def _get_map_bounds(media) -> list | None:
+def get_map_bounds(media) -> list | None:
     """Return [[lat_min, lon_min], [lat_max, lon_max]] from the map:bounds attribute, or None."""
     for attr in media.attribute_list:
         if str(attr.get_type()) == "map:bounds":
@@ -121,6 +127,27 @@ class FileHandler:
         """Send a map tile for a georeferenced image."""
         raise NotImplementedError
 
+    def _send_prerendered_map_tile(self, bounds: list, z: int, x: int, y: int):
+        """Send a map tile without decoding the image, or return None.
+
+        Tiles outside the image are transparent, and the others are sent if
+        they were pre-rendered into the cache.
+        """
+        if not map_tile_overlaps(bounds, z, x, y):
+            return send_file(transparent_png_tile(), mimetype=MIME_PNG)
+        data = get_cached_map_tile(self.checksum, bounds, z, x, y)
+        if data is None:
+            return None
+        return send_file(BytesIO(data), mimetype=MIME_PNG)
+
+    def _send_rendered_map_tile(
+        self, buffer: BinaryIO, bounds: list, z: int, x: int, y: int
+    ):
+        """Send a map tile rendered on demand, caching it like pre-rendered ones."""
+        data = buffer.read()
+        set_cached_map_tile(self.checksum, bounds, z, x, y, data)
+        return send_file(BytesIO(data), mimetype=MIME_PNG)
+
     def _abort_if_too_large(self) -> None:
         """Abort with 404 if the file is missing, or 413 if it is too large."""
         max_bytes = current_app.config.get("MAX_THUMBNAIL_FILE_BYTES")
@@ -245,6 +272,8 @@ class LocalFileHandler(FileHandler):
                 mimetype=self.mime,
                 as_attachment=download,
                 download_name=filename,
+                # used for conditional and resumed (If-Range) requests
+                etag=etag or True,
             )
         )
         if etag:
@@ -296,13 +325,17 @@ class LocalFileHandler(FileHandler):
             self._check_path()
         except ValueError:
             abort_with_message(403, "File access not allowed")
-        self._abort_if_too_large()
-        bounds = _get_map_bounds(self.media)
+        bounds = get_map_bounds(self.media)
         if bounds is None:
             abort_with_message(404, "No map bounds for media object")
         native_max_zoom = get_cached_native_max_zoom(self.checksum, bounds)
-        if native_max_zoom is not None and z > native_max_zoom:
-            abort_with_message(404, "Zoom level exceeds native resolution of source image")
+        if native_max_zoom is not None:
+            if z > native_max_zoom:
+                abort_with_message(404, "Zoom level exceeds native resolution of source image")
+            response = self._send_prerendered_map_tile(bounds, z, x, y)
+            if response is not None:
+                return response
+        self._abort_if_too_large()
         with abort_on_image_errors(), Image.open(self.path_abs) as img:
             if native_max_zoom is None:
                 native_max_zoom = get_native_max_zoom(img.width, img.height, bounds)
@@ -310,7 +343,7 @@ class LocalFileHandler(FileHandler):
             if z > native_max_zoom:
                 abort_with_message(404, "Zoom level exceeds native resolution of source image")
             buffer = get_map_tile(img, bounds, z, x, y)
-        return send_file(buffer, mimetype=MIME_PNG)
+        return self._send_rendered_map_tile(buffer, bounds, z, x, y)
 
 
 def upload_file_local(
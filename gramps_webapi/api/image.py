@@ -27,9 +27,9 @@ import tempfile
 from contextlib import contextmanager
 from importlib.resources import as_file, files
 from pathlib import Path
-from typing import BinaryIO, Callable, Iterator, Union
+from typing import BinaryIO, Callable, Iterator, Optional, Union
 
-from PIL import Image, ImageOps, UnidentifiedImageError
+from PIL import Image, ImageOps, TiffImagePlugin, UnidentifiedImageError
 from PIL.Image import DecompressionBombError
 from PIL.Image import Image as ImageType
 
@@ -38,6 +38,13 @@ from gramps_webapi.types import FilenameOrPath
 
 from .util import abort_with_message
 
+# highest JPEG 2000 resolution level reduction to try; encoders default to
+# five decomposition levels
+JPEG2000_MAX_REDUCE = 5
+
+# TIFF tag marking reduced-resolution subfiles
+NEW_SUBFILE_TYPE = 254
+
 
 @contextmanager
 def abort_on_image_errors() -> Iterator[None]:
@@ -56,14 +63,70 @@ def abort_on_image_errors() -> Iterator[None]:
         abort_with_message(422, "Image file is corrupt or truncated")
 
 
-def open_image(fp: Union[BinaryIO, FilenameOrPath]) -> ImageType:
-    """Open an image, decoding it eagerly so that corrupt data fails here."""
+def open_image(
+    fp: Union[BinaryIO, FilenameOrPath], size: Optional[int] = None
+) -> ImageType:
+    """Open an image, decoding it eagerly so that corrupt data fails here.
+
+    If `size` is given, the image may be decoded at a reduced resolution, as
+    long as both sides are at least `size` pixels long.
+    """
     with abort_on_image_errors():
         image = Image.open(fp)
+        if size:
+            try:
+                _load_reduced(image, size)
+                return image
+            except OSError:
+                # not every file supports every reduction, decode it fully
+                if hasattr(fp, "seek"):
+                    fp.seek(0)
+                image = Image.open(fp)
         image.load()
         return image
 
 
+def _load_reduced(image: ImageType, size: int) -> None:
+    """Decode an opened image at the lowest resolution of at least `size`.
+
+    Uses the scaled decoding of JPEG, the resolution levels of JPEG 2000,
+    and reduced-resolution subfiles of TIFF. Other formats are decoded at
+    full resolution.
+    """
+    if image.format == "JPEG":
+        image.draft(image.mode, (size, size))
+    elif image.format == "JPEG2000":
+        factor = 0
+        while factor < JPEG2000_MAX_REDUCE and min(image.size) >> (factor + 1) >= size:
+            factor += 1
+        image.reduce = factor  # type: ignore[method-assign, assignment]
+    elif isinstance(image, TiffImagePlugin.TiffImageFile) and image.n_frames > 1:
+        best_frame, best_width = 0, image.width
+        for frame in range(1, image.n_frames):
+            image.seek(frame)
+            # NewSubfileType flags the frame as a reduced version of the image
+            if not image.tag_v2.get(NEW_SUBFILE_TYPE, 0) & 1:
+                continue
+            if min(image.size) >= size and image.width < best_width:
+                best_frame, best_width = frame, image.width
+        image.seek(best_frame)
+    image.load()
+
+
+def thumbnail_decode_size(
+    size: int, x1: int = 0, y1: int = 0, x2: int = 100, y2: int = 100
+) -> Optional[int]:
+    """Return the size an image must be decoded at for a thumbnail.
+
+    The arguments `x1`, `y1`, `x2`, `y2` are the coordinates of the cropped
+    region in percent. Returns None if the full resolution is needed.
+    """
+    extent = min(x2 - x1, y2 - y1)
+    if extent <= 0:
+        return None
+    return math.ceil(size * 100 / extent)
+
+
 def image_thumbnail(image: ImageType, size: int, square: bool = False) -> ImageType:
     """Return a thumbnail of `size` (longest side) for the image.
 
@@ -135,7 +198,7 @@ class ThumbnailHandler:
     # supported MIME types that are not images
     MIME_NO_IMAGE = [MIME_PDF]
 
-    def __init__(self, stream: BinaryIO, mime_type: str) -> None:
+    def __init__(self, stream: Optional[BinaryIO], mime_type: str) -> None:
         """Initialize self given a binary stream and MIME type."""
         self.stream = stream
         self.mime_type = mime_type
@@ -153,14 +216,23 @@ class ThumbnailHandler:
             self.is_image = False
             self.is_video = False
 
-    def get_image(self) -> ImageType:
-        """Get a Pillow Image instance."""
+    def get_image(self, size: Optional[int] = None) -> ImageType:
+        """Get a Pillow Image instance.
+
+        If `size` is given, images may be decoded at a reduced resolution, as
+        long as both sides are at least `size` pixels long.
+        """
         with abort_on_image_errors():
             if self.mime_type == MIME_PDF:
                 return self._get_image_pdf()
             if self.is_video:
                 return self._get_image_video()
-            return open_image(self.stream)
+            return open_image(self._get_source(), size=size)
+
+    def _get_source(self) -> Union[BinaryIO, FilenameOrPath]:
+        """Get the file object or path images are opened from."""
+        assert self.stream is not None  # for type checker
+        return self.stream
 
     def get_cropped(
         self,
@@ -216,6 +288,7 @@ class ThumbnailHandler:
 
         The first argument of the callable f must be the file path.
         """
+        assert self.stream is not None  # for type checker
         fh, temp_filename = tempfile.mkstemp()
         try:
             with open(temp_filename, "wb") as f:
@@ -255,7 +328,7 @@ class ThumbnailHandler:
 
         If `square` is true, the image is cropped to a centered square.
         """
-        img = self.get_image()
+        img = self.get_image(size=thumbnail_decode_size(size))
         img = image_thumbnail(image=img, size=size, square=square)
         return save_image_buffer(img, fmt=fmt)
 
@@ -276,7 +349,7 @@ class ThumbnailHandler:
 
         If `square` is true, the image is cropped to a centered square.
         """
-        img = self.get_image()
+        img = self.get_image(size=thumbnail_decode_size(size, x1, y1, x2, y2))
         img = crop_image(img, x1, y1, x2, y2)
         img = image_thumbnail(image=img, size=size, square=square)
         return save_image_buffer(img, fmt=fmt)
@@ -286,14 +359,23 @@ class LocalFileThumbnailHandler(ThumbnailHandler):
     """Thumbnail handler for local files."""
 
     def __init__(self, path: FilenameOrPath, mime_type: str) -> None:
-        """Initialize self given a path and MIME type."""
+        """Initialize self given a path and MIME type.
+
+        The file is opened by path rather than read into memory, so that
+        images are only read as far as needed for decoding.
+        """
         self.path = Path(path)
-        try:
-            with open(self.path, "rb") as f:
-                stream = io.BytesIO(f.read())
-        except FileNotFoundError:
+        if not self.path.is_file():
             abort_with_message(404, "Media file not found")
-        super().__init__(stream=stream, mime_type=mime_type)
+        super().__init__(stream=None, mime_type=mime_type)
+
+    def _get_source(self) -> FilenameOrPath:
+        """Get the path images are opened from."""
+        return self.path
+
+    def _apply_to_path(self, func: Callable, *args, **kwargs):
+        """Apply a function to the file path."""
+        return func(str(self.path), *args, **kwargs)
 
 
 def _tile_bounds_lonlat(z: int, x: int, y: int) -> tuple:
@@ -306,14 +388,20 @@ def _tile_bounds_lonlat(z: int, x: int, y: int) -> tuple:
     return lon_min, lat_min, lon_max, lat_max
 
 
-def _lat_to_tile_pixel_y(lat: float, z: int, y_tile: int, tile_size: int = 256) -> float:
+def _lat_to_tile_pixel_y(
+    lat: float, z: int, y_tile: int, tile_size: int = 256
+) -> float:
     """Convert latitude to pixel y within a slippy map tile (Web Mercator)."""
     lat_rad = math.radians(lat)
-    y_merc = (1.0 - math.log(math.tan(lat_rad) + 1.0 / math.cos(lat_rad)) / math.pi) / 2.0
+    y_merc = (
+        1.0 - math.log(math.tan(lat_rad) + 1.0 / math.cos(lat_rad)) / math.pi
+    ) / 2.0
     return y_merc * (2**z) * tile_size - y_tile * tile_size
 
 
-def get_native_max_zoom(img_width: int, img_height: int, bounds: list, tile_size: int = 256) -> int:
+def get_native_max_zoom(
+    img_width: int, img_height: int, bounds: list, tile_size: int = 256
+) -> int:
     """Return the highest zoom level at which the image is at or above native resolution.
 
     bounds: [[lat_min, lon_min], [lat_max, lon_max]]
@@ -349,7 +437,9 @@ def get_native_max_zoom(img_width: int, img_height: int, bounds: list, tile_size
 
 def transparent_png_tile(tile_size: int = 256) -> BinaryIO:
     """Return a buffer containing a fully transparent RGBA PNG tile."""
-    return save_image_buffer(Image.new("RGBA", (tile_size, tile_size), (0, 0, 0, 0)), fmt="PNG")
+    return save_image_buffer(
+        Image.new("RGBA", (tile_size, tile_size), (0, 0, 0, 0)), fmt="PNG"
+    )
 
 
 def get_map_tile(
@@ -373,7 +463,9 @@ def get_map_tile(
     img_lat_max, img_lon_max = bounds[1]
     img_width, img_height = image.size
 
-    tile_lon_min, tile_lat_min, tile_lon_max, tile_lat_max = _tile_bounds_lonlat(z, x, y)
+    tile_lon_min, tile_lat_min, tile_lon_max, tile_lat_max = _tile_bounds_lonlat(
+        z, x, y
+    )
 
     ov_lon_min = max(img_lon_min, tile_lon_min)
     ov_lon_max = min(img_lon_max, tile_lon_max)
@@ -417,6 +509,127 @@ def get_map_tile(
     return save_image_buffer(tile_img, fmt="PNG")
 
 
+def map_tile_overlaps(bounds: list, z: int, x: int, y: int) -> bool:
+    """Return whether an XYZ slippy map tile overlaps a georeferenced image.
+
+    bounds: [[lat_min, lon_min], [lat_max, lon_max]]
+    """
+    img_lat_min, img_lon_min = bounds[0]
+    img_lat_max, img_lon_max = bounds[1]
+    tile_lon_min, tile_lat_min, tile_lon_max, tile_lat_max = _tile_bounds_lonlat(
+        z, x, y
+    )
+    overlaps_lon = max(img_lon_min, tile_lon_min) < min(img_lon_max, tile_lon_max)
+    overlaps_lat = max(img_lat_min, tile_lat_min) < min(img_lat_max, tile_lat_max)
+    return overlaps_lon and overlaps_lat
+
+
+def get_map_tile_range(bounds: list, z: int) -> tuple | None:
+    """Return (x_min, y_min, x_max, y_max) of the tiles overlapping an image at zoom z.
+
+    bounds: [[lat_min, lon_min], [lat_max, lon_max]]
+    Returns None if the image lies outside the Web Mercator world.
+    """
+    world_lon_min, world_lat_min, world_lon_max, world_lat_max = _tile_bounds_lonlat(
+        0, 0, 0
+    )
+    lon_min = max(bounds[0][1], world_lon_min)
+    lon_max = min(bounds[1][1], world_lon_max)
+    lat_min = max(bounds[0][0], world_lat_min)
+    lat_max = min(bounds[1][0], world_lat_max)
+    if lon_min >= lon_max or lat_min >= lat_max:
+        return None
+    n = 2**z
+    x_min = math.floor((lon_min + 180.0) / 360.0 * n)
+    x_max = math.ceil((lon_max + 180.0) / 360.0 * n) - 1
+    # with a tile size of 1, pixel coordinates are tile coordinates
+    y_min = math.floor(_lat_to_tile_pixel_y(lat_max, z, 0, tile_size=1))
+    y_max = math.ceil(_lat_to_tile_pixel_y(lat_min, z, 0, tile_size=1)) - 1
+    return (
+        min(max(x_min, 0), n - 1),
+        min(max(y_min, 0), n - 1),
+        min(max(x_max, 0), n - 1),
+        min(max(y_max, 0), n - 1),
+    )
+
+
+def get_map_tile_pyramid(
+    image: ImageType,
+    bounds: list,
+    max_zoom: int,
+    tile_size: int = 256,
+) -> Iterator[tuple[int, int, int, ImageType]]:
+    """Yield (z, x, y, tile) for all map tiles of a georeferenced image up to max_zoom.
+
+    bounds: [[lat_min, lon_min], [lat_max, lon_max]]
+    Renders the tiles of `get_map_tile`, but transposes the image only once
+    and resamples each row of tiles with a single resize, since the Mercator
+    distortion only varies from row to row. Tiles that do not overlap the
+    image are skipped.
+    """
+    image = ImageOps.exif_transpose(image)
+    assert image is not None
+    if image.mode not in ("RGB", "RGBA", "L", "LA"):
+        # modes that cannot be resampled directly
+        image = image.convert("RGBA")
+
+    img_lat_min, img_lon_min = bounds[0]
+    img_lat_max, img_lon_max = bounds[1]
+    img_width, img_height = image.size
+    lon_span = img_lon_max - img_lon_min
+    lat_span = img_lat_max - img_lat_min
+    if lon_span <= 0 or lat_span <= 0:
+        return
+
+    for z in range(max_zoom + 1):
+        tile_range = get_map_tile_range(bounds, z)
+        if tile_range is None:
+            return
+        x_min, y_min, x_max, y_max = tile_range
+        row_lon_min = _tile_bounds_lonlat(z, x_min, 0)[0]
+        row_lon_max = _tile_bounds_lonlat(z, x_max, 0)[2]
+        tile_lon_span = 360.0 / 2**z
+
+        # Source and destination columns are the same for all rows
+        ov_lon_min = max(img_lon_min, row_lon_min)
+        ov_lon_max = min(img_lon_max, row_lon_max)
+        src_x1 = (ov_lon_min - img_lon_min) / lon_span * img_width
+        src_x2 = (ov_lon_max - img_lon_min) / lon_span * img_width
+        dst_x1 = round((ov_lon_min - row_lon_min) / tile_lon_span * tile_size)
+        dst_x2 = round((ov_lon_max - row_lon_min) / tile_lon_span * tile_size)
+
+        for y in range(y_min, y_max + 1):
+            _, tile_lat_min, _, tile_lat_max = _tile_bounds_lonlat(z, 0, y)
+            ov_lat_min = max(img_lat_min, tile_lat_min)
+            ov_lat_max = min(img_lat_max, tile_lat_max)
+            if ov_lat_min >= ov_lat_max:
+                continue
+            src_y1 = (img_lat_max - ov_lat_max) / lat_span * img_height
+            src_y2 = (img_lat_max - ov_lat_min) / lat_span * img_height
+            dst_y1 = round(_lat_to_tile_pixel_y(ov_lat_max, z, y, tile_size))
+            dst_y2 = round(_lat_to_tile_pixel_y(ov_lat_min, z, y, tile_size))
+
+            row_img = Image.new(
+                "RGBA", ((x_max - x_min + 1) * tile_size, tile_size), (0, 0, 0, 0)
+            )
+            # an overlap of less than half a pixel leaves the tiles transparent
+            if dst_x2 > dst_x1 and dst_y2 > dst_y1:
+                band = image.resize(
+                    (dst_x2 - dst_x1, dst_y2 - dst_y1),
+                    Image.Resampling.LANCZOS,
+                    box=(src_x1, src_y1, src_x2, src_y2),
+                    reducing_gap=3.0,
+                )
+                if band.mode != "RGBA":
+                    band = band.convert("RGBA")
+                row_img.paste(band, (dst_x1, dst_y1), band)
+            for x in range(x_min, x_max + 1):
+                if not map_tile_overlaps(bounds, z, x, y):
+                    continue
+                left = (x - x_min) * tile_size
+                yield z, x, y, row_img.crop((left, 0, left + tile_size, tile_size))
+
+
 def detect_faces(stream: BinaryIO) -> list[tuple[float, float, float, float]]:
     """Detect faces in an image (stream) using YuNet."""
     # Read the image from the input stream
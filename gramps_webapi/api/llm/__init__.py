@@ -28,7 +28,7 @@ from pydantic_ai.usage import UsageLimits
 
 from ..util import abort_with_message, get_logger
 from .agent import create_agent
-from .deps import AgentDeps
+from .deps import AgentDeps, DbSession
 
 
 def sanitize_answer(answer: str) -> str:
@@ -139,12 +139,15 @@ def answer_with_agent(
         system_prompt_override=system_prompt_override,
     )
 
+    # the tools of the run share one open database
+    db_session = DbSession(tree=tree, view_private=include_private, user_id=user_id)
     deps = AgentDeps(
         tree=tree,
         include_private=include_private,
         max_context_length=max_context_length,
         user_id=user_id,
         progress_callback=progress_callback,
+        db_session=db_session,
     )
 
     message_history: list[ModelRequest | ModelResponse] = []
@@ -210,3 +213,5 @@ def answer_with_agent(
     except Exception:
         logger.exception("Unexpected error in agent")
         abort_with_message(500, "Unexpected error.")
+    finally:
+        db_session.close()
@@ -19,8 +19,82 @@
 
 """Dependencies for Pydantic AI agent."""
 
+from __future__ import annotations
+
+import threading
 from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
+from typing import TypeVar
+
+from flask import Flask, current_app
+from gramps.gen.db.base import DbReadBase
+
+from ..util import close_db, get_db_outside_request
+
+T = TypeVar("T")
+
+
+class DbSession:
+    """Read-only database shared by all tool calls of an agent run.
+
+    Pydantic AI runs synchronous tools in changing worker threads, but a
+    SQLite connection may only be used by the thread that opened it. All
+    database work of the run is therefore done by one dedicated thread,
+    which opens the tree on first use and keeps it open until `close`.
+    """
+
+    def __init__(self, tree: str, view_private: bool, user_id: str) -> None:
+        """Initialize self."""
+        self.tree = tree
+        self.view_private = view_private
+        self.user_id = user_id
+        self._lock = threading.Lock()
+        self._app: Flask | None = None
+        self._executor: ThreadPoolExecutor | None = None
+        self._db_handle: DbReadBase | None = None
+
+    def run(self, func: Callable[[DbReadBase], T]) -> T:
+        """Call a function with the open database in the session's thread."""
+        with self._lock:
+            if self._executor is None:
+                self._app = current_app._get_current_object()  # type: ignore
+                self._executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="llm-db"
+                )
+            executor = self._executor
+        return executor.submit(self._call, func).result()
+
+    def _call(self, func: Callable[[DbReadBase], T]) -> T:
+        """Call a function with the open database, opening it if needed."""
+        assert self._app is not None
+        with self._app.app_context():
+            if self._db_handle is None:
+                self._db_handle = get_db_outside_request(
+                    tree=self.tree,
+                    view_private=self.view_private,
+                    readonly=True,
+                    user_id=self.user_id,
+                    pooled=False,
+                )
+            return func(self._db_handle)
+
+    def _close_db(self) -> None:
+        """Close the database if it was opened."""
+        if self._db_handle is not None:
+            db_handle, self._db_handle = self._db_handle, None
+            close_db(db_handle)
+
+    def close(self) -> None:
+        """Close the database and stop the session's thread."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is None:
+            return
+        try:
+            executor.submit(self._close_db).result()
+        finally:
+            executor.shutdown()
 
 
 @dataclass
@@ -32,3 +106,5 @@ class AgentDeps:
     max_context_length: int
     user_id: str
     progress_callback: Callable[[str, str], None] | None = field(default=None)
+    # if not set, every tool call opens the database itself
+    db_session: DbSession | None = field(default=None)
@@ -22,10 +22,12 @@
 from __future__ import annotations
 
 import json
+from collections.abc import Callable
 from datetime import datetime
 from functools import wraps
-from typing import Any
+from typing import Any, TypeVar
 
+from gramps.gen.db.base import DbReadBase
 from pydantic_ai import RunContext
 
 from ..resources.filters import apply_filter
@@ -33,9 +35,11 @@ from ..resources.util import get_one_relationship
 from ..search import get_search_indexer, get_semantic_search_indexer
 from ..search.indexer import SearchIndexerBase
 from ..search.text import obj_strings_from_object
-from ..util import get_db_outside_request, get_logger
+from ..util import close_db, get_db_outside_request, get_logger
 from .deps import AgentDeps
 
+T = TypeVar("T")
+
 
 def _build_date_expression(before: str, after: str) -> str:
     """Build a date string from before/after parameters.
@@ -92,6 +96,50 @@ def _get_relationship_prefix(db_handle, anchor_person, result_person, logger) ->
     return ""
 
 
+def _run_with_db(ctx: RunContext[AgentDeps], func: Callable[[DbReadBase], T]) -> T:
+    """Call a function with the read-only database of the agent run.
+
+    Without a database session, the database is opened for this call only.
+    """
+    if ctx.deps.db_session is not None:
+        return ctx.deps.db_session.run(func)
+    # Use get_db_outside_request to avoid Flask's g caching, since Pydantic AI's
+    # run_sync() uses an event loop that can violate SQLite's thread-safety.
+    db_handle = get_db_outside_request(
+        tree=ctx.deps.tree,
+        view_private=ctx.deps.include_private,
+        readonly=True,
+        user_id=ctx.deps.user_id,
+    )
+    try:
+        return func(db_handle)
+    finally:
+        close_db(db_handle)
+
+
+def _get_object_strings(
+    ctx: RunContext[AgentDeps], class_name: str, gramps_id: str
+) -> dict[str, str] | None:
+    """Return the texts of an object by its Gramps ID, or None if there is none."""
+
+    def get_strings(db_handle: DbReadBase) -> dict[str, str] | None:
+        get_method = getattr(db_handle, f"get_{class_name.lower()}_from_gramps_id")
+        obj = get_method(gramps_id)
+        if obj is None:
+            return None
+        return (
+            obj_strings_from_object(
+                db_handle=db_handle,
+                class_name=class_name,
+                obj=obj,
+                semantic=True,
+            )
+            or {}
+        )
+
+    return _run_with_db(ctx, get_strings)
+
+
 def _apply_gramps_filter(
     ctx: RunContext[AgentDeps],
     namespace: str,
@@ -127,18 +175,8 @@ def _apply_gramps_filter(
         Formatted string with matching objects or error message
     """
     logger = get_logger()
-    db_handle = None
-
-    try:
-        # Use get_db_outside_request to avoid Flask's g caching, since Pydantic AI's
-        # run_sync() uses an event loop that can violate SQLite's thread-safety.
-        db_handle = get_db_outside_request(
-            tree=ctx.deps.tree,
-            view_private=ctx.deps.include_private,
-            readonly=True,
-            user_id=ctx.deps.user_id,
-        )
 
+    def filter_objects(db_handle: DbReadBase) -> str:
         filter_dict: dict[str, Any] = {"rules": rules}
         if len(rules) > 1 or logic == "or":
             filter_dict["function"] = logic
@@ -155,7 +193,6 @@ def _apply_gramps_filter(
         )
 
         if not matching_handles:
-            db_handle.close()
             return empty_message
 
         total_matches = len(matching_handles)
@@ -246,7 +283,6 @@ def _apply_gramps_filter(
                 continue
 
         if not context_parts:
-            db_handle.close()
             return f"{empty_message} (or all results are private)."
 
         result = "\n\n".join(context_parts)
@@ -265,16 +301,12 @@ def _apply_gramps_filter(
             len(result),
         )
 
-        db_handle.close()
         return result
 
+    try:
+        return _run_with_db(ctx, filter_objects)
     except Exception as e:  # pylint: disable=broad-except
         logger.error("Error filtering %ss: %s", namespace.lower(), e)
-        if db_handle is not None:
-            try:
-                db_handle.close()
-            except Exception:  # pylint: disable=broad-except
-                pass
         return f"Error filtering {namespace.lower()}s: {str(e)}"
 
 
@@ -652,16 +684,10 @@ def filter_events(
     if participant_id:
         logger = get_logger()
         try:
-            db_handle = get_db_outside_request(
-                tree=ctx.deps.tree,
-                view_private=ctx.deps.include_private,
-                readonly=True,
-                user_id=ctx.deps.user_id,
+            person = _run_with_db(
+                ctx,
+                lambda db_handle: db_handle.get_person_from_gramps_id(participant_id),
             )
-            try:
-                person = db_handle.get_person_from_gramps_id(participant_id)
-            finally:
-                db_handle.close()
             if person is None:
                 return f"No person found with Gramps ID '{participant_id}'."
             participant_handles = [ref.ref for ref in person.get_event_ref_list()]
@@ -704,24 +730,9 @@ def get_person(ctx: RunContext[AgentDeps], gramps_id: str) -> str:
 
     logger = get_logger()
     try:
-        db_handle = get_db_outside_request(
-            tree=ctx.deps.tree,
-            view_private=ctx.deps.include_private,
-            readonly=True,
-            user_id=ctx.deps.user_id,
-        )
-        try:
-            person = db_handle.get_person_from_gramps_id(gramps_id)
-            if person is None:
-                return f"No person found with Gramps ID '{gramps_id}'."
-            obj_dict = obj_strings_from_object(
-                db_handle=db_handle,
-                class_name="Person",
-                obj=person,
-                semantic=True,
-            )
-        finally:
-            db_handle.close()
+        obj_dict = _get_object_strings(ctx, "Person", gramps_id)
+        if obj_dict is None:
+            return f"No person found with Gramps ID '{gramps_id}'."
         if not obj_dict:
             return f"No content available for person '{gramps_id}'."
         content = (
@@ -755,24 +766,9 @@ def get_family(ctx: RunContext[AgentDeps], gramps_id: str) -> str:
 
     logger = get_logger()
     try:
-        db_handle = get_db_outside_request(
-            tree=ctx.deps.tree,
-            view_private=ctx.deps.include_private,
-            readonly=True,
-            user_id=ctx.deps.user_id,
-        )
-        try:
-            family = db_handle.get_family_from_gramps_id(gramps_id)
-            if family is None:
-                return f"No family found with Gramps ID '{gramps_id}'."
-            obj_dict = obj_strings_from_object(
-                db_handle=db_handle,
-                class_name="Family",
-                obj=family,
-                semantic=True,
-            )
-        finally:
-            db_handle.close()
+        obj_dict = _get_object_strings(ctx, "Family", gramps_id)
+        if obj_dict is None:
+            return f"No family found with Gramps ID '{gramps_id}'."
         if not obj_dict:
             return f"No content available for family '{gramps_id}'."
         content = (
@@ -806,24 +802,9 @@ def get_event(ctx: RunContext[AgentDeps], gramps_id: str) -> str:
 
     logger = get_logger()
     try:
-        db_handle = get_db_outside_request(
-            tree=ctx.deps.tree,
-            view_private=ctx.deps.include_private,
-            readonly=True,
-            user_id=ctx.deps.user_id,
-        )
-        try:
-            event = db_handle.get_event_from_gramps_id(gramps_id)
-            if event is None:
-                return f"No event found with Gramps ID '{gramps_id}'."
-            obj_dict = obj_strings_from_object(
-                db_handle=db_handle,
-                class_name="Event",
-                obj=event,
-                semantic=True,
-            )
-        finally:
-            db_handle.close()
+        obj_dict = _get_object_strings(ctx, "Event", gramps_id)
+        if obj_dict is None:
+            return f"No event found with Gramps ID '{gramps_id}'."
         if not obj_dict:
             return f"No content available for event '{gramps_id}'."
         content = (
@@ -857,24 +838,9 @@ def get_place(ctx: RunContext[AgentDeps], gramps_id: str) -> str:
 
     logger = get_logger()
     try:
-        db_handle = get_db_outside_request(
-            tree=ctx.deps.tree,
-            view_private=ctx.deps.include_private,
-            readonly=True,
-            user_id=ctx.deps.user_id,
-        )
-        try:
-            place = db_handle.get_place_from_gramps_id(gramps_id)
-            if place is None:
-                return f"No place found with Gramps ID '{gramps_id}'."
-            obj_dict = obj_strings_from_object(
-                db_handle=db_handle,
-                class_name="Place",
-                obj=place,
-                semantic=True,
-            )
-        finally:
-            db_handle.close()
+        obj_dict = _get_object_strings(ctx, "Place", gramps_id)
+        if obj_dict is None:
+            return f"No place found with Gramps ID '{gramps_id}'."
         if not obj_dict:
             return f"No content available for place '{gramps_id}'."
         content = (
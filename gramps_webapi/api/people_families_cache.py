@@ -20,15 +20,49 @@
 
 """A proxy database class optionally caching people and families."""
 
-from typing import Generator
+from typing import Any, Collection, Generator, Optional
 
+from flask import g
 from gramps.gen.proxy.proxybase import ProxyDbBase
 from gramps.gen.db import DbReadBase
-from gramps.gen.lib import Person, Family
+from gramps.gen.lib import Event, Family, Person, Place
+
+from ..object_cache import ObjectCacheSession, object_cache
+from .family_graph import get_family_graph
+from .util import ModifiedPrivateProxyDb, get_db_handle, get_objects_from_handles
+
+
+def _get_shared_cache(db: DbReadBase) -> Optional[ObjectCacheSession]:
+    """Return the view of the per-process object cache matching a database.
+
+    Objects of the private proxy database are cached separately from the
+    full ones. As private references are removed from them, they are
+    dropped whenever any object of the tree changes. Objects of other
+    proxy databases are not cached.
+    """
+    if isinstance(db, ModifiedPrivateProxyDb):
+        scope, depends_on_all = "private", True
+    elif isinstance(db, ProxyDbBase):
+        return None
+    else:
+        scope, depends_on_all = "full", False
+    basedb = db.basedb if isinstance(db, ProxyDbBase) else db
+    try:
+        tree_dir = basedb.get_save_path()
+    except AttributeError:
+        return None
+    if not tree_dir:
+        return None
+    return object_cache.session(tree_dir, scope, depends_on_all=depends_on_all)
 
 
 class CachePeopleFamiliesProxy(ProxyDbBase):
-    """Proxy database class optionally caching people and families."""
+    """Proxy database class optionally caching people and families.
+
+    People, families, events, and places are also read through the
+    per-process object cache, so they are deserialized only once for
+    all requests until they change.
+    """
 
     def __init__(self, db: DbReadBase) -> None:
         """Initialize the proxy database."""
@@ -36,26 +70,96 @@ class CachePeopleFamiliesProxy(ProxyDbBase):
         self.db: DbReadBase  # for type checker
         self._people_cache: dict[str, Person] = {}
         self._family_cache: dict[str, Family] = {}
+        self._shared = _get_shared_cache(db)
+
+    def _get_object(self, class_name: str, handle: str) -> Any:
+        """Get an object from the shared cache or the database."""
+        if self._shared is not None:
+            obj = self._shared.get(class_name, handle)
+            if obj is not None:
+                return obj
+        obj = self.db.method("get_%s_from_handle", class_name)(handle)
+        if obj is not None and self._shared is not None:
+            self._shared.put(class_name, obj)
+        return obj
 
     def cache_people(self) -> None:
         """Cache all people."""
+        if self._shared is not None and self._shared.is_complete("Person"):
+            return
         self._people_cache = {obj.handle: obj for obj in self.db.iter_people()}
+        if self._shared is not None:
+            self._shared.put_all("Person", self._people_cache.values())
 
     def cache_families(self) -> None:
         """Cache all families."""
+        if self._shared is not None and self._shared.is_complete("Family"):
+            return
         self._family_cache = {obj.handle: obj for obj in self.db.iter_families()}
+        if self._shared is not None:
+            self._shared.put_all("Family", self._family_cache.values())
+
+    def get_objects_from_handles(
+        self, class_name: str, handles: Collection[str]
+    ) -> dict[str, Any]:
+        """Get a dictionary of handles to objects from the cache or the database.
+
+        Objects missing from the shared cache are loaded in bulk.
+        """
+        objects = {}
+        missing = []
+        for handle in handles:
+            obj = None
+            if self._shared is not None:
+                obj = self._shared.get(class_name, handle)
+            if obj is None:
+                missing.append(handle)
+            else:
+                objects[handle] = obj
+        fetched = get_objects_from_handles(self.db, class_name, missing)
+        if self._shared is not None:
+            for obj in fetched.values():
+                self._shared.put(class_name, obj)
+        objects.update(fetched)
+        return objects
+
+    def cache_relatives(self, handles: Collection[str], generations: int) -> None:
+        """Cache the people and families a relationship calculation needs.
+
+        These are the given people, their partners, and the ancestors of all
+        of them up to the given number of generations, with the families
+        linking them. Falls back to caching all people and families if the
+        family graph index is not available.
+        """
+        graph = get_family_graph(self.db)
+        if graph is None:
+            self.cache_people()
+            self.cache_families()
+            return
+        nodes = graph.ancestors(graph.with_partners(handles), generations)
+        people, families = graph.split_handles(nodes)
+        self._people_cache.update(self.get_objects_from_handles("Person", people))
+        self._family_cache.update(self.get_objects_from_handles("Family", families))
 
     def get_person_from_handle(self, handle: str) -> Person:
         """Get a person from the cache or the database."""
         if handle in self._people_cache:
             return self._people_cache[handle]
-        return self.db.get_person_from_handle(handle)
+        return self._get_object("Person", handle)
 
     def get_family_from_handle(self, handle: str) -> Family:
         """Get a family from the cache or the database."""
         if handle in self._family_cache:
             return self._family_cache[handle]
-        return self.db.get_family_from_handle(handle)
+        return self._get_object("Family", handle)
+
+    def get_event_from_handle(self, handle: str) -> Event:
+        """Get an event from the cache or the database."""
+        return self._get_object("Event", handle)
+
+    def get_place_from_handle(self, handle: str) -> Place:
+        """Get a place from the cache or the database."""
+        return self._get_object("Place", handle)
 
     def find_backlink_handles(
         self, handle, include_classes=None
@@ -82,3 +186,23 @@ class CachePeopleFamiliesProxy(ProxyDbBase):
             result_list = list(find_backlink_handles(handle))
         """
         return self.db.find_backlink_handles(handle, include_classes)
+
+
+def get_objects(
+    db_handle: DbReadBase, class_name: str, handles: Collection[str]
+) -> dict[str, Any]:
+    """Get a dictionary of handles to objects, using the cache if available."""
+    if isinstance(db_handle, CachePeopleFamiliesProxy):
+        return db_handle.get_objects_from_handles(class_name, handles)
+    return get_objects_from_handles(db_handle, class_name, list(handles))
+
+
+def get_caching_db_handle() -> CachePeopleFamiliesProxy:
+    """Get the read-only database reading through the object cache.
+
+    The objects returned are shared with other requests and must not
+    be modified.
+    """
+    if "caching_db" not in g:
+        g.caching_db = CachePeopleFamiliesProxy(get_db_handle())
+    return g.caching_db
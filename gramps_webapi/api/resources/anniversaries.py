@@ -11,6 +11,7 @@
 
 """Anniversaries ICS resource."""
 
+import hashlib
 import json
 from datetime import datetime, timezone
 from typing import Optional
@@ -27,16 +28,20 @@ from ...auth import (
     is_tree_disabled,
 )
 from ...auth.const import ACCESS_TOKEN_SCOPE_ANNIVERSARIES_ICS, PERM_VIEW_PRIVATE
+from ...cache_versions import get_version_key
 from ..blueprint import api_blueprint
+from ..event_index import get_anniversary_date, get_event_index
 from ..util import (
     abort_with_message,
     close_db,
+    get_db_manager,
     get_db_outside_request,
+    get_objects_from_handles,
     get_tree_id,
 )
 from . import Resource
 from .filters import apply_filter
-from .util import get_backlinks, get_event_summary_from_object
+from .util import etag_unchanged, get_backlinks, get_event_summary_from_object
 
 
 def _escape_ics_text(value: str) -> str:
@@ -66,16 +71,7 @@ def _get_anniversary_date_components(event: Event) -> Optional[tuple[int, int, i
     if event.date is None or not event.date.is_valid():
         return None
     gdate = gregorian(event.date)
-    month = gdate.get_month()
-    day = gdate.get_day()
-    if month < 1 or day < 1:
-        return None
-    year = gdate.get_year()
-    if year < 1:
-        year = 1970
-    if year > 9999:
-        year = 9999
-    return year, month, day
+    return get_anniversary_date(gdate.get_year(), gdate.get_month(), gdate.get_day())
 
 
 def _is_event_in_anchor_scope(
@@ -183,6 +179,57 @@ def _event_sort_key(event: Event) -> tuple[int, int, int, str]:
     return (month, day, year, event.handle)
 
 
+def _get_anniversary_events(db_handle, allowed_types: set[str]) -> list[Event]:
+    """Get the events with an anniversary in anniversary order.
+
+    Uses the event index to load only events of the requested types with
+    a known month and day. Behind the private proxy, private events are
+    left out.
+    """
+    index = get_event_index(db_handle)
+    if index is None:
+        events = []
+        for event in db_handle.iter_events():
+            if not _event_matches_type(event, allowed_types):
+                continue
+            if _get_anniversary_date_components(event) is None:
+                continue
+            events.append(event)
+        events.sort(key=_event_sort_key)
+        return events
+    handles = []
+    for *_, handle in index.anniversaries():
+        if allowed_types:
+            entry = index.entries[handle]
+            event_values = {
+                entry.type.casefold().strip(),
+                entry.type_xml.casefold().strip(),
+            }
+            if event_values.isdisjoint(allowed_types):
+                continue
+        handles.append(handle)
+    objects = get_objects_from_handles(db_handle, "Event", handles)
+    return [objects[handle] for handle in handles if handle in objects]
+
+
+def _anniversaries_etag(tree_id: str, view_private: bool, args: dict) -> Optional[str]:
+    """Build a cache validator for the anniversaries feed of a tree.
+
+    The feed depends on events, the people and families they belong to,
+    and, for the anchor scope, the family tree, so the validator changes
+    with any object. Returns None if changes of the tree cannot be
+    detected.
+    """
+    version = get_version_key(get_db_manager(tree_id).path)
+    if version is None:
+        return None
+    feed_args = {key: value for key, value in args.items() if key != "token"}
+    state = json.dumps(
+        [tree_id, version, view_private, feed_args], sort_keys=True, default=str
+    )
+    return hashlib.sha256(state.encode()).hexdigest()
+
+
 class AnniversariesIcsQueryArgs(Schema):
     """Query arguments for GET /anniversaries.ics."""
 
@@ -223,8 +270,11 @@ class AnniversariesIcsResource(Resource):
         if is_tree_disabled(tree=tree_id):
             abort_with_message(503, "This tree is temporarily disabled")
 
-        permissions = get_permissions(username=user.name, tree=tree_id)
+        permissions = get_permissions(username=str(user.name), tree=tree_id)
         view_private = PERM_VIEW_PRIVATE in permissions
+        etag = _anniversaries_etag(tree_id, view_private, args)
+        if etag is not None and etag_unchanged(etag):
+            return _ics_response(None, etag)
         db_handle = get_db_outside_request(
             tree=tree_id,
             view_private=view_private,
@@ -232,13 +282,6 @@ class AnniversariesIcsResource(Resource):
             user_id=str(user.id),
         )
         try:
-            iter_event_handles = db_handle.method("iter_event_handles")
-            get_event_from_handle = db_handle.method("get_event_from_handle")
-            if iter_event_handles is None:
-                raise RuntimeError("Method iter_event_handles not found")
-            if get_event_from_handle is None:
-                raise RuntimeError("Method get_event_from_handle not found")
-
             allowed_types = {
                 event_type.casefold().strip()
                 for event_type in args.get("event_types", [])
@@ -256,26 +299,31 @@ class AnniversariesIcsResource(Resource):
                     db_handle, allowed_people
                 )
 
-            events = []
-            for handle in iter_event_handles():
-                event = get_event_from_handle(handle)
-                if event is None:
-                    continue
-                if not _event_matches_type(event, allowed_types):
-                    continue
-                if _get_anniversary_date_components(event) is None:
-                    continue
-                if anchor_gramps_id and not _is_event_in_anchor_scope(
+            events = [
+                event
+                for event in _get_anniversary_events(db_handle, allowed_types)
+                if not anchor_gramps_id
+                or _is_event_in_anchor_scope(
                     db_handle, event, allowed_people, allowed_families
-                ):
-                    continue
-                events.append(event)
-
-            events.sort(key=_event_sort_key)
+                )
+            ]
             payload = _build_ics(events=events, db_handle=db_handle, tree_id=tree_id)
         finally:
             close_db(db_handle)
 
-        response = Response(payload, status=200, mimetype="text/calendar")
-        response.headers["Content-Disposition"] = "inline; filename=anniversaries.ics"
-        return response
+        return _ics_response(payload, etag)
+
+
+def _ics_response(payload: Optional[str], etag: Optional[str]) -> Response:
+    """Build the ICS feed response, or a 304 if payload is None."""
+    response = Response(
+        payload,
+        status=200 if payload is not None else 304,
+        mimetype="text/calendar",
+    )
+    response.headers["Content-Disposition"] = "inline; filename=anniversaries.ics"
+    if etag is not None:
+        response.headers["ETag"] = f'"{etag}"'
+        # let calendar clients cache the feed, but always revalidate it
+        response.headers["Cache-Control"] = "no-cache"
+    return response
@@ -19,7 +19,8 @@
 
 """Base for Gramps object API resources."""
 
-from typing import TypeVar
+import itertools
+from typing import Iterator, TypeVar
 
 import gramps_ql as gql
 import object_ql as oql
@@ -35,18 +36,20 @@ from marshmallow import Schema
 from pyparsing.exceptions import ParseBaseException
 from webargs import fields, validate
 
-from gramps_webapi.types import ResponseReturnValue
+from gramps_webapi.types import Handle, ResponseReturnValue
 
 from ...auth.const import PERM_ADD_OBJ, PERM_DEL_OBJ, PERM_EDIT_OBJ
 from ...const import GRAMPS_OBJECT_PLURAL, NAME_FORMAT_REGEXP
 from ..auth import require_permissions
 from ..blueprint import api_blueprint
-from ..cache import request_cache_decorator
+from ..cache import get_request_etag, request_cache_decorator
+from ..event_index import get_event_index
 from ..tasks import run_task, update_search_indices_from_transaction
 from ..util import (
     check_quota_people,
     get_db_handle,
     get_locale_for_language,
+    get_objects_from_handles,
     get_tree_from_jwt_or_fail,
     gramps_object_from_dict,
     update_usage_people,
@@ -55,7 +58,7 @@ from . import ProtectedResource, Resource
 from .delete import delete_object, remove_deleted_from_search_indices
 from .emit import GrampsJSONEncoder
 from .filters import apply_filter
-from .match import match_dates
+from .match import match_dates, match_dates_indexed
 from .sort import sort_objects
 from .util import (
     abort_with_message,
@@ -74,12 +77,48 @@ from .util import (
 
 T = TypeVar("T", bound=GrampsObject)
 
+# query arguments that don't make a response depend on objects of other classes
+OWN_CLASS_QUERY_ARGS = {
+    "checksum",
+    "estimate_total",
+    "gramps_id",
+    "handles",
+    "jwt",
+    "keys",
+    "locale",
+    "name_format",
+    "page",
+    "pagesize",
+    "precision",
+    "skipkeys",
+    "stream",
+    "strip",
+}
+
+# object classes the default order or the serialization of a class depends on,
+# if other than the class itself; families are sorted by their parents' names
+CLASS_DEPENDENCIES = {
+    "Family": ("Family", "Person"),
+}
+
 
 class GrampsObjectResourceHelper(GrampsJSONEncoder):
     """Gramps object helper class."""
 
     gramps_class_name: str
 
+    @property
+    def cache_dependencies(self) -> tuple[str, ...] | None:
+        """Get the object classes a cached response depends on.
+
+        Plain objects only depend on their own class and the classes in
+        `CLASS_DEPENDENCIES`. Extending, profiling, filtering or sorting them
+        can involve objects of any class.
+        """
+        if set(request.args) - OWN_CLASS_QUERY_ARGS:
+            return None
+        return CLASS_DEPENDENCIES.get(self.gramps_class_name, (self.gramps_class_name,))
+
     def full_object(self, obj: T, args: dict, locale: GrampsLocale = glocale) -> T:
         """Get the full object with extended attributes and backlinks."""
         if args.get("backlinks"):
@@ -363,8 +402,12 @@ class GrampsObjectResource(GrampsObjectResourceHelper, Resource):
             tree=tree,
             user_id=user_id,
         )
+        self._after_update(obj)
         return self.response(200, trans_dict, total_items=len(trans_dict))
 
+    def _after_update(self, obj: GrampsObject) -> None:
+        """Run object type specific tasks after an object has been modified."""
+
 
 class GrampsObjectsQueryArgs(Schema):
     """Query arguments for GET /objects/."""
@@ -547,6 +590,18 @@ class GrampsObjectsQueryArgs(Schema):
             "description": "If true, return only media objects whose file is missing from storage (media endpoint only)."
         },
     )
+    estimate_total = fields.Boolean(
+        load_default=False,
+        metadata={
+            "description": "If true and pagination is active, stop scanning as soon as the requested page is full and return an estimated total count in X-Total-Count. Only affects queries with gql, oql, or dates and without sort."
+        },
+    )
+    stream = fields.Boolean(
+        load_default=False,
+        metadata={
+            "description": "If true, serialize and send the objects one at a time instead of building the whole response in memory. The ETag is derived from the database's last change. X-Total-Count is omitted for queries with gql, oql, or dates. Has no effect in combination with sort or filemissing."
+        },
+    )
     name_format = fields.Str(
         validate=validate.Regexp(NAME_FORMAT_REGEXP),
         metadata={
@@ -585,21 +640,29 @@ class GrampsObjectsResource(GrampsObjectResourceHelper, Resource):
                     pass
             return self.response(200, objects, args, total_items=len(objects))
 
+        if "sort" not in args and not args.get("filemissing"):
+            if args["stream"]:
+                return self._get_stream(args, locale=locale)
+            if args["page"] > 0:
+                return self._get_page(args, locale=locale)
+
         # load all objects to memory
         objects_name = GRAMPS_OBJECT_PLURAL[self.gramps_class_name]
         iter_objects_method = self.db_handle.method("iter_%s", objects_name)
         assert iter_objects_method is not None  # type checker
-        objects = list(iter_objects_method())
-
-        # for all objects except events, repos, and notes, Gramps supports
-        # a database-backed default sort order. Use that if no sort order
-        # requested.
-        query_method = self.db_handle.method("get_%s_handles", self.gramps_class_name)
-        assert query_method is not None  # type checker
-        if self.gramps_class_name in ["Event", "Repository", "Note"]:
-            handles = query_method()
+        handles = self._get_sorted_handles(locale=locale)
+        candidates = None
+        if args["dates"]:
+            candidates = self._get_date_candidates(handles, args["dates"])
+        if candidates is None:
+            objects = list(iter_objects_method())
         else:
-            handles = query_method(sort_handles=True, locale=locale)
+            objects = list(
+                get_objects_from_handles(
+                    self.db_handle, self.gramps_class_name, candidates
+                ).values()
+            )
+
         handle_index = {handle: index for index, handle in enumerate(handles)}
         # sort objects by the sorted handle order
         objects = sorted(
@@ -655,6 +718,175 @@ class GrampsObjectsResource(GrampsObjectResourceHelper, Resource):
             total_items=total_items,
         )
 
+    def _get_sorted_handles(self, locale: GrampsLocale = glocale) -> list[Handle]:
+        """Get all handles in the default sort order."""
+        # for all objects except events, repos, and notes, Gramps supports
+        # a database-backed default sort order. Use that if no sort order
+        # requested.
+        query_method = self.db_handle.method("get_%s_handles", self.gramps_class_name)
+        assert query_method is not None  # type checker
+        if self.gramps_class_name in ["Event", "Repository", "Note"]:
+            return list(query_method())
+        return list(query_method(sort_handles=True, locale=locale))
+
+    def _get_filtered_handles(
+        self, args: dict, locale: GrampsLocale = glocale
+    ) -> list[Handle]:
+        """Get the handles in the default sort order, with filters applied."""
+        handles = self._get_sorted_handles(locale=locale)
+        if "filter" in args or "rules" in args:
+            filtered = set(
+                apply_filter(self.db_handle, args, self.gramps_class_name, handles)
+            )
+            handles = [handle for handle in handles if handle in filtered]
+        if args["dates"]:
+            candidates = self._get_date_candidates(handles, args["dates"])
+            if candidates is not None:
+                handles = candidates
+        return handles
+
+    def _get_date_candidates(
+        self, handles: list[Handle], date_mask: str
+    ) -> list[Handle] | None:
+        """Get the handles of objects that may match a date mask or range.
+
+        Events are preselected using the event index. Returns None if the
+        objects cannot be preselected.
+        """
+        if self.gramps_class_name != "Event":
+            return None
+        index = get_event_index(self.db_handle)
+        if index is None:
+            return None
+        return match_dates_indexed(index, handles, date_mask)
+
+    def _has_dates_condition(self, args: dict) -> bool:
+        """Check if the dates condition needs the loaded object.
+
+        Event date masks are decided by the event index alone.
+        """
+        if not args["dates"]:
+            return False
+        if self.gramps_class_name == "Event" and "-" not in args["dates"]:
+            return get_event_index(self.db_handle) is None
+        return True
+
+    def _has_conditions(self, args: dict) -> bool:
+        """Check if the query has conditions that need the loaded object."""
+        return "gql" in args or "oql" in args or self._has_dates_condition(args)
+
+    def _match_conditions(self, obj: GrampsObject, args: dict) -> bool:
+        """Check if an object matches the gql, oql, and dates conditions."""
+        if "gql" in args and not gql.match(
+            query=args["gql"], obj=obj, db=self.db_handle
+        ):
+            return False
+        if "oql" in args and not oql.match(
+            query=args["oql"], obj=obj, db=self.db_handle
+        ):
+            return False
+        if args["dates"] and not self.match_dates([obj], args["dates"]):
+            return False
+        return True
+
+    def _get_page(
+        self, args: dict, locale: GrampsLocale = glocale
+    ) -> ResponseReturnValue:
+        """Get a single page of objects in the default sort order.
+
+        Only the objects on the requested page are loaded if no per-object
+        condition (gql, oql, dates) is given. Otherwise, objects are loaded
+        one at a time and only the ones on the page are kept.
+        """
+        handles = self._get_filtered_handles(args, locale=locale)
+        offset = (args["page"] - 1) * args["pagesize"]
+        end = offset + args["pagesize"]
+
+        if not self._has_conditions(args):
+            objects = [
+                self.get_object_from_handle(handle) for handle in handles[offset:end]
+            ]
+            return self.response(
+                200,
+                [self.full_object(obj, args, locale=locale) for obj in objects],
+                args,
+                total_items=len(handles),
+            )
+
+        objects = []
+        matched = 0
+        scanned = 0
+        try:
+            for handle in handles:
+                obj = self.get_object_from_handle(handle)
+                scanned += 1
+                if not self._match_conditions(obj, args):
+                    continue
+                if offset <= matched < end:
+                    objects.append(obj)
+                matched += 1
+                if matched >= end and args["estimate_total"]:
+                    break
+        except (ParseBaseException, ValueError, TypeError) as e:
+            abort_with_message(422, str(e))
+
+        if scanned < len(handles):
+            total_items = round(matched / scanned * len(handles))
+        else:
+            total_items = matched
+
+        return self.response(
+            200,
+            [self.full_object(obj, args, locale=locale) for obj in objects],
+            args,
+            total_items=total_items,
+        )
+
+    def _get_stream(
+        self, args: dict, locale: GrampsLocale = glocale
+    ) -> ResponseReturnValue:
+        """Stream objects in the default sort order.
+
+        Objects are loaded, matched, and serialized one at a time. The first
+        object is processed before the response is returned, so that invalid
+        queries still result in an error status.
+        """
+        handles = self._get_filtered_handles(args, locale=locale)
+        has_conditions = self._has_conditions(args)
+        if args["page"] > 0:
+            offset = (args["page"] - 1) * args["pagesize"]
+            end = offset + args["pagesize"]
+        else:
+            offset, end = 0, None
+        objects: Iterator[GrampsObject]
+        if has_conditions:
+            total_items = -1
+            objects = (
+                obj
+                for obj in map(self.get_object_from_handle, handles)
+                if self._match_conditions(obj, args)
+            )
+        else:
+            total_items = len(handles)
+            objects = map(self.get_object_from_handle, handles[offset:end])
+            offset, end = 0, None
+        objects = (
+            self.full_object(obj, args, locale=locale)
+            for obj in itertools.islice(objects, offset, end)
+        )
+        try:
+            first = next(objects, None)
+        except (ParseBaseException, ValueError, TypeError) as e:
+            abort_with_message(422, str(e))
+        payload = itertools.chain([first], objects) if first is not None else []
+        return self.stream_response(
+            200,
+            payload,
+            args,
+            total_items=total_items,
+            etag=get_request_etag(self),
+        )
+
     @api_blueprint.response(201, Schema(many=True))
     def post(self) -> ResponseReturnValue:
         """Post a new object."""
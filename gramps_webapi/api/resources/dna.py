@@ -36,13 +36,13 @@ from marshmallow import Schema
 from webargs import fields, validate
 
 from gramps_webapi.api.dna import parse_raw_dna_match_string
-from gramps_webapi.api.people_families_cache import CachePeopleFamiliesProxy
+from gramps_webapi.api.people_families_cache import get_caching_db_handle
 from gramps_webapi.types import Handle, MatchSegment, ResponseReturnValue
 
 from ...types import Handle
 from ..blueprint import api_blueprint
 from ..cache import request_cache_decorator
-from ..util import get_db_handle, get_locale_for_language
+from ..util import get_locale_for_language
 from . import ProtectedResource
 from .schemas import DnaMatchSchema, DnaSegmentSchema
 from .util import get_person_profile_for_handle
@@ -51,6 +51,9 @@ SIDE_UNKNOWN = "U"
 SIDE_MATERNAL = "M"
 SIDE_PATERNAL = "P"
 
+# generations searched for common ancestors by the Gramps relationship calculator
+RELATIONSHIP_DEPTH = 15
+
 
 class DnaMatchesQueryArgs(Schema):
     """Query arguments for GET /people/<handle>/dna/matches."""
@@ -78,7 +81,7 @@ class PersonDnaMatchesResource(ProtectedResource):
     @request_cache_decorator
     def get(self, args: dict, handle: str):
         """Get the DNA match data."""
-        db_handle = CachePeopleFamiliesProxy(get_db_handle())
+        db_handle = get_caching_db_handle()
 
         try:
             person: Person | None = db_handle.get_person_from_handle(handle)
@@ -88,8 +91,12 @@ class PersonDnaMatchesResource(ProtectedResource):
             abort(404)
             raise AssertionError  # for type checker
 
-        db_handle.cache_people()
-        db_handle.cache_families()
+        match_handles = [
+            association.ref
+            for association in person.get_person_ref_list()
+            if association.get_relation() == "DNA"
+        ]
+        db_handle.cache_relatives([handle] + match_handles, RELATIONSHIP_DEPTH)
 
         locale = get_locale_for_language(args["locale"], default=True)
 
@@ -20,10 +20,11 @@
 """Gramps Json Encoder."""
 
 import hashlib
-from typing import Any, Optional
+from functools import lru_cache
+from typing import Any, Callable, Iterable, Iterator, Optional
 
 import gramps.gen.lib as lib
-from flask import Response, current_app, json
+from flask import Response, current_app, json, stream_with_context
 from gramps.gen.db import DbBookmarks
 from gramps.gen.lib.baseobj import BaseObject
 
@@ -34,6 +35,86 @@ def default(obj: Any):
     return None
 
 
+def _is_null(value: Any) -> bool:
+    """Test for empty value."""
+    if value is None:
+        return True
+    try:
+        return len(value) == 0
+    except TypeError:
+        pass
+    return False
+
+
+def _unmangle(key: str) -> str:
+    """Strip the class name prefix from a mangled private attribute name."""
+    if key.startswith("_"):
+        return key[2 + key.find("__") :]
+    return key
+
+
+def _class_properties(cls: type) -> list[str]:
+    """Get the names of the properties defined directly on a class."""
+    return [key for key, value in cls.__dict__.items() if isinstance(value, property)]
+
+
+@lru_cache(maxsize=256)
+def _get_serializer(
+    cls: type,
+    only_keys: tuple[str, ...],
+    skip_keys: tuple[str, ...],
+    strip_empty_keys: bool,
+) -> Callable[[Any], dict]:
+    """Build a function that extracts and filters the attributes of a class.
+
+    The properties of the class and the output key of every instance
+    attribute name are resolved once per class and key filter, instead of
+    on every object.
+    """
+    only = frozenset(only_keys)
+    skip = frozenset(skip_keys)
+
+    def keep(key: str) -> bool:
+        if only and key not in only:
+            return False
+        if skip and key in skip:
+            return False
+        return True
+
+    properties = [key for key in map(_unmangle, _class_properties(cls)) if keep(key)]
+    # maps instance attribute names to output keys, None if filtered out;
+    # filled lazily as instances can carry additional attributes
+    attribute_keys: dict[str, Optional[str]] = {}
+
+    def serialize(obj: Any) -> dict:
+        data = {}
+        for key in properties:
+            value = getattr(obj, key)
+            if not strip_empty_keys or not _is_null(value):
+                data[key] = value
+        for attribute, value in obj.__dict__.items():
+            try:
+                output_key = attribute_keys[attribute]
+            except KeyError:
+                output_key = _unmangle(attribute)
+                # Values we always filter out, data presented through different endpoint
+                if output_key in ["thumb"] or not keep(output_key):
+                    output_key = None
+                attribute_keys[attribute] = output_key
+            if output_key is None:
+                continue
+            key = output_key
+            if key == "rect" and value is None:
+                value = []
+            if key in ["mother_handle", "father_handle", "famc"] and value is None:
+                value = ""
+            if not strip_empty_keys or not _is_null(value):
+                data[key] = value
+        return data
+
+    return serialize
+
+
 class GrampsJSONEncoder:
     """Customizes Gramps Web API output."""
 
@@ -57,7 +138,65 @@ class GrampsJSONEncoder:
         """Prepare response."""
         if payload is None:
             payload = {}
-        args = args or {}
+        self._set_key_filters(args or {})
+        response_string = json.dumps(
+            self.extract_objects(payload),
+            ensure_ascii=False,
+            sort_keys=True,
+            default=default,
+        )
+        res = Response(
+            status=status,
+            response=response_string,
+            mimetype="application/json",
+        )
+        if not etag:
+            # by default, use the hash of the response as ETag
+            etag = hashlib.sha256(response_string.encode("utf-8")).hexdigest()
+        self._add_headers(res, total_items, etag, cache_control)
+        return res
+
+    def stream_response(
+        self,
+        status: int = 200,
+        payload: Iterable[Any] = (),
+        args: Optional[dict] = None,
+        total_items: int = -1,
+        etag: Optional[str] = None,
+        cache_control: Optional[str] = None,
+    ) -> Response:
+        """Prepare a streamed response for a list payload.
+
+        The items are serialized one at a time while the response is sent,
+        so the full document is never held in memory. Since the headers are
+        sent before the body, the ETag cannot be derived from the response
+        and has to be provided by the caller; without it, none is set.
+        """
+        self._set_key_filters(args or {})
+
+        def generate() -> Iterator[str]:
+            yield "["
+            for i, item in enumerate(payload):
+                if i > 0:
+                    yield ", "
+                yield json.dumps(
+                    self.extract_objects(item),
+                    ensure_ascii=False,
+                    sort_keys=True,
+                    default=default,
+                )
+            yield "]"
+
+        res = Response(
+            stream_with_context(generate()),
+            status=status,
+            mimetype="application/json",
+        )
+        self._add_headers(res, total_items, etag, cache_control)
+        return res
+
+    def _set_key_filters(self, args: dict) -> None:
+        """Set the key filtering options from the query arguments."""
         if "strip" in args:
             self.strip_empty_keys = args["strip"]
         else:
@@ -70,25 +209,20 @@ class GrampsJSONEncoder:
             self.filter_skip_keys = args["skipkeys"]
         else:
             self.filter_skip_keys = []
-        response_string = json.dumps(
-            self.extract_objects(payload),
-            ensure_ascii=False,
-            sort_keys=True,
-            default=default,
-        )
-        res = Response(
-            status=status,
-            response=response_string,
-            mimetype="application/json",
-        )
 
+    def _add_headers(
+        self,
+        res: Response,
+        total_items: int,
+        etag: Optional[str],
+        cache_control: Optional[str],
+    ) -> None:
+        """Add the count, ETag, and cache control headers."""
         if total_items > -1:
             res.headers.add("X-Total-Count", str(total_items))
 
-        if not etag:
-            # by default, use the hash of the response as ETag
-            etag = hashlib.sha256(response_string.encode("utf-8")).hexdigest()
-        res.headers.add("ETag", f'"{etag}"')
+        if etag:
+            res.headers.add("ETag", f'"{etag}"')
 
         if cache_control:
             res.headers.add("Cache-Control", cache_control)
@@ -97,51 +231,22 @@ class GrampsJSONEncoder:
             # but always revalidate with the server
             res.headers.add("Cache-Control", "no-cache")
 
-        return res
-
     def is_null(self, value: Any) -> bool:
         """Test for empty value."""
-        if value is None:
-            return True
-        try:
-            return len(value) == 0
-        except TypeError:
-            pass
-        return False
+        return _is_null(value)
 
     def extract_object(self, obj: Any, apply_filter=True) -> dict:
         """Extract and filter attributes for a Gramps object."""
-        data = {}
-        for key, value in obj.__class__.__dict__.items():
-            if isinstance(value, property):
-                if key.startswith("_"):
-                    key = key[2 + key.find("__") :]
-                if apply_filter:
-                    if self.filter_only_keys and key not in self.filter_only_keys:
-                        continue
-                    if self.filter_skip_keys and key in self.filter_skip_keys:
-                        continue
-                value = getattr(obj, key)
-                if not self.strip_empty_keys or not self.is_null(value):
-                    data[key] = value
-        for key, value in obj.__dict__.items():
-            if key.startswith("_"):
-                key = key[2 + key.find("__") :]
-            # Values we always filter out, data presented through different endpoint
-            if key in ["thumb"]:
-                continue
-            if apply_filter:
-                if self.filter_only_keys and key not in self.filter_only_keys:
-                    continue
-                if self.filter_skip_keys and key in self.filter_skip_keys:
-                    continue
-            if key == "rect" and value is None:
-                value = []
-            if key in ["mother_handle", "father_handle", "famc"] and value is None:
-                value = ""
-            if not self.strip_empty_keys or not self.is_null(value):
-                data[key] = value
-        return data
+        if apply_filter:
+            serializer = _get_serializer(
+                obj.__class__,
+                tuple(self.filter_only_keys),
+                tuple(self.filter_skip_keys),
+                self.strip_empty_keys,
+            )
+        else:
+            serializer = _get_serializer(obj.__class__, (), (), self.strip_empty_keys)
+        return serializer(obj)
 
     def extract_objects(self, obj, level=0):
         """Recursively extract and filter object attributes."""
@@ -33,6 +33,7 @@ from webargs import fields, validate
 
 from ...types import Handle
 from ..blueprint import api_blueprint
+from ..people_families_cache import get_caching_db_handle
 from ..util import abort_with_message, get_db_handle, get_locale_for_language
 from . import ProtectedResource
 from .base import (
@@ -67,7 +68,7 @@ class EventResourceHelper(GrampsObjectResourceHelper):
             if "families" in args["profile"] or "events" in args["profile"]:
                 abort_with_message(422, "profile contains invalid keys")
             obj.profile = get_event_profile_for_object(
-                db_handle,
+                get_caching_db_handle(),
                 obj,
                 args["profile"],
                 locale=locale,
@@ -35,6 +35,8 @@ from . import ProtectedResource
 class MediaFaceDetectionResource(ProtectedResource):
     """Resource for face detection in media files."""
 
+    cache_dependencies = ("Media",)
+
     @request_cache_decorator
     def get(self, handle) -> Response:
         """Get detected face regions."""
@@ -29,6 +29,7 @@ from gramps.gen.utils.grampslocale import GrampsLocale
 
 from ...auth.const import PERM_ADD_OBJ, PERM_EDIT_OBJ
 from ..auth import require_permissions
+from ..people_families_cache import get_caching_db_handle
 from .base import (
     GrampsObjectProtectedResource,
     GrampsObjectResourceHelper,
@@ -55,7 +56,7 @@ class FamilyResourceHelper(GrampsObjectResourceHelper):
         db_handle = self.db_handle
         if "profile" in args:
             obj.profile = get_family_profile_for_object(
-                db_handle,
+                get_caching_db_handle(),
                 obj,
                 args["profile"],
                 locale=locale,
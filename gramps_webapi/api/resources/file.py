@@ -26,6 +26,7 @@ from http import HTTPStatus
 from typing import Dict
 
 from flask import Response, abort, request
+from flask_jwt_extended import get_jwt_identity
 from gramps.gen.db import DbTxn
 from gramps.gen.errors import HandleError
 from gramps.gen.lib import Media
@@ -37,7 +38,13 @@ from ..auth import require_permissions
 from ..blueprint import api_blueprint
 from ..file import process_file
 from ..media import check_quota_media, get_media_handler, update_usage_media
-from ..util import abort_with_message, get_db_handle, get_tree_from_jwt
+from ..tasks import schedule_map_tiles, schedule_thumbnails
+from ..util import (
+    abort_with_message,
+    get_db_handle,
+    get_tree_from_jwt,
+    get_tree_from_jwt_or_fail,
+)
 from . import ProtectedResource
 from .util import transaction_to_json, update_object
 
@@ -108,7 +115,7 @@ class MediaFileResource(ProtectedResource):
         if not mime:
             abort_with_message(HTTPStatus.NOT_ACCEPTABLE, "Media type not recognized")
         checksum, size, f = process_file(request.stream)
-        tree = get_tree_from_jwt()
+        tree = get_tree_from_jwt_or_fail()
         media_handler = get_media_handler(db_handle, tree)
         file_handler = media_handler.get_file_handler(handle, db_handle=db_handle)
         if checksum == obj.checksum:
@@ -124,6 +131,8 @@ class MediaFileResource(ProtectedResource):
             # use existing path
             path = obj.get_path()
             media_handler.upload_file(f, checksum, mime, path=path)
+            schedule_thumbnails(tree=tree, user_id=get_jwt_identity(), handles=[handle])
+            schedule_map_tiles(tree=tree, user_id=get_jwt_identity(), handles=[handle])
             return Response(status=200)
         if args.get("uploadmissing"):
             abort_with_message(
@@ -150,6 +159,8 @@ class MediaFileResource(ProtectedResource):
                 abort_with_message(400, "Error while updating object")
             trans_dict = transaction_to_json(trans)
         update_usage_media()
+        schedule_thumbnails(tree=tree, user_id=get_jwt_identity(), handles=[handle])
+        schedule_map_tiles(tree=tree, user_id=get_jwt_identity(), handles=[handle])
         return Response(
             response=json.dumps(trans_dict), status=200, mimetype="application/json"
         )
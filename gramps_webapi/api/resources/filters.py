@@ -20,9 +20,12 @@
 
 """Gramps filter interface."""
 
+import hashlib
 import inspect
 import json
-from collections import defaultdict
+import os
+import threading
+from collections import OrderedDict, defaultdict
 from collections.abc import Callable
 from typing import Any
 
@@ -30,16 +33,20 @@ import gramps.gen.filters as filters
 from flask import Response, abort, current_app
 from gramps.gen.db.base import DbReadBase
 from gramps.gen.filters import GenericFilter
-from gramps.gen.filters.rules import Rule
+from gramps.gen.filters.rules import MatchesFilterBase, Rule
 from gramps.gen.lib import Media, Person
+from gramps.gen.proxy.proxybase import ProxyDbBase
 from marshmallow import Schema
 from webargs import ValidationError, fields, validate
 
 from ...auth.const import PERM_EDIT_CUSTOM_FILTER
+from ...cache_versions import get_version_key
 from ...const import GRAMPS_NAMESPACES, TREE_MULTI
+from ...metrics import register_metrics
 from ...types import Handle
 from ..blueprint import api_blueprint
-from ..util import abort_with_message
+from ..people_families_cache import CachePeopleFamiliesProxy
+from ..util import ModifiedPrivateProxyDb, abort_with_message
 from ..auth import require_permissions
 from . import ProtectedResource
 from .emit import GrampsJSONEncoder
@@ -82,6 +89,9 @@ class IsReferencedByObjectType(Rule):
 
 MAX_FILTER_DEPTH = 5
 
+# compiled filters kept per process
+MAX_COMPILED_FILTERS = 128
+
 _NAMESPACE_MODULES = {
     "Person": filters.rules.person,
     "Family": filters.rules.family,
@@ -182,7 +192,7 @@ def get_filter_rules(args: dict[str, Any], namespace: str) -> list[dict[str, Any
 def get_custom_filters(args: dict[str, Any], namespace: str) -> list[dict[str, Any]]:
     """Return a list of custom filters for a namespace."""
     filter_list = []
-    filters.reload_custom_filters()
+    compiled_filters.load_custom_filters()
     for filter_class in filters.CustomFilters.get_filters(namespace):
         if (
             "filters" in args
@@ -228,9 +238,14 @@ def _apply_filter_parms(
     db_handle: DbReadBase,
     namespace: str,
     handles: list[Handle],
+    rule_filters: dict[int, GenericFilter],
     depth: int = 0,
 ) -> list[Handle]:
-    """Recursively evaluate a filter spec and return matching handles."""
+    """Recursively evaluate a filter spec and return matching handles.
+
+    `rule_filters` maps the ids of the rule items of the spec to the
+    filters applying them.
+    """
     if depth >= MAX_FILTER_DEPTH:
         abort_with_message(400, "Filter nesting depth exceeded")
 
@@ -241,8 +256,7 @@ def _apply_filter_parms(
 
     for item in filter_parms["rules"]:
         if "name" in item:
-            single = filters.GenericFilterFactory(namespace)()
-            single.add_rule(_build_rule_instance(item, namespace))
+            single = rule_filters[id(item)]
             result_sets.append(set(single.apply(db_handle, id_list=handles)))
         elif item.get("namespace", namespace) != namespace:
             sub_namespace = item["namespace"]
@@ -262,7 +276,12 @@ def _apply_filter_parms(
                     sub_to_parents[sub_handle].append(handle)
             matching_sub = set(
                 _apply_filter_parms(
-                    item, db_handle, sub_namespace, list(sub_to_parents), depth + 1
+                    item,
+                    db_handle,
+                    sub_namespace,
+                    list(sub_to_parents),
+                    rule_filters,
+                    depth + 1,
                 )
             )
             matched: set[Handle] = set()
@@ -271,7 +290,11 @@ def _apply_filter_parms(
             result_sets.append(matched)
         else:
             result_sets.append(
-                set(_apply_filter_parms(item, db_handle, namespace, handles, depth + 1))
+                set(
+                    _apply_filter_parms(
+                        item, db_handle, namespace, handles, rule_filters, depth + 1
+                    )
+                )
             )
 
     if not result_sets:
@@ -305,6 +328,320 @@ def build_filter(filter_parms: dict[str, Any], namespace: str) -> GenericFilter:
     return filter_object
 
 
+def _copy_filter(filter_object: GenericFilter, namespace: str) -> GenericFilter:
+    """Return a copy of a filter with its own rule instances."""
+    filter_copy = filters.GenericFilterFactory(namespace)()
+    filter_copy.set_name(filter_object.get_name())
+    filter_copy.set_logical_op(filter_object.get_logical_op())
+    filter_copy.set_invert(filter_object.get_invert())
+    for rule in filter_object.get_rules():
+        filter_copy.add_rule(
+            rule.__class__(rule.list, use_regex=rule.use_regex, use_case=rule.use_case)
+        )
+    return filter_copy
+
+
+def _uses_other_filters(rule: Rule) -> bool:
+    """Whether a prepared rule applies other filters.
+
+    Such rules prepare the shared rules of the custom filters they refer to,
+    so they must not be kept prepared.
+    """
+    return isinstance(rule, MatchesFilterBase) or any(
+        isinstance(value, (Rule, GenericFilter)) for value in vars(rule).values()
+    )
+
+
+def _get_prepare_state(db_handle: DbReadBase) -> tuple | None:
+    """Return the key of the database state rules are prepared for.
+
+    Rules prepared for the full or the private view of a tree stay valid
+    until any object of the tree changes. Returns None for other proxy
+    databases and if changes cannot be detected.
+    """
+    scope = "full"
+    db = db_handle
+    while isinstance(db, ProxyDbBase):
+        if isinstance(db, ModifiedPrivateProxyDb):
+            scope = "private"
+        elif not isinstance(db, CachePeopleFamiliesProxy):
+            return None
+        db = db.db
+    try:
+        tree_dir = db.get_save_path()
+    except AttributeError:
+        return None
+    if not tree_dir:
+        return None
+    version = get_version_key(tree_dir)
+    if version is None:
+        return None
+    return tree_dir, scope, version
+
+
+class CompiledFilter:
+    """A validated filter with its rule instances, ready to be applied.
+
+    Rules stay prepared between applications to the same state of a
+    database, so expensive preparations, like collecting all ancestors of a
+    person, are done once per version of the tree.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        filter_parms: dict[str, Any] | None = None,
+        generic_filter: GenericFilter | None = None,
+    ) -> None:
+        """Initialize self from a filter spec or a custom filter."""
+        self.namespace = namespace
+        self.filter_parms = filter_parms
+        self.generic_filter = generic_filter
+        self.rule_filters: dict[int, GenericFilter] = {}
+        if filter_parms is not None:
+            self._add_rule_filters(filter_parms, namespace)
+        self._state: tuple | None = None
+        self._held: list[Rule] = []
+
+    def _add_rule_filters(
+        self, filter_parms: dict[str, Any], namespace: str, depth: int = 0
+    ) -> None:
+        """Create the filters applying the rule items of a filter spec."""
+        if depth >= MAX_FILTER_DEPTH:
+            return
+        for item in filter_parms["rules"]:
+            if "name" in item:
+                rule_filter = filters.GenericFilterFactory(namespace)()
+                rule_filter.add_rule(_build_rule_instance(item, namespace))
+                self.rule_filters[id(item)] = rule_filter
+                continue
+            sub_namespace = item.get("namespace", namespace)
+            if (
+                sub_namespace == namespace
+                or (namespace, sub_namespace) in _NAMESPACE_BRIDGES
+            ):
+                self._add_rule_filters(item, sub_namespace, depth + 1)
+
+    def _get_rules(self) -> list[Rule]:
+        """Return all rule instances."""
+        if self.generic_filter is not None:
+            return list(self.generic_filter.get_rules())
+        return [
+            rule
+            for rule_filter in self.rule_filters.values()
+            for rule in rule_filter.get_rules()
+        ]
+
+    def _prepare(self, db_handle: DbReadBase, state: tuple | None) -> list[Rule]:
+        """Prepare the rules for a state of the database.
+
+        Returns the rules that have to be reset after applying the filter.
+        """
+        if state is None or state != self._state:
+            self.release()
+        else:
+            for rule in self._held:
+                # rules keep the database they were prepared with
+                if hasattr(rule, "db"):
+                    rule.db = db_handle
+        held = {id(rule) for rule in self._held}
+        transient: list[Rule] = []
+        try:
+            for rule in self._get_rules():
+                if id(rule) in held:
+                    continue
+                rule.requestprepare(db_handle, None)
+                if state is not None and not _uses_other_filters(rule):
+                    self._held.append(rule)
+                else:
+                    transient.append(rule)
+        except BaseException:
+            for rule in transient:
+                rule.requestreset()
+            self.release()
+            raise
+        self._state = state
+        return transient
+
+    def release(self) -> None:
+        """Reset the rules kept prepared."""
+        for rule in self._held:
+            rule.requestreset()
+        self._held = []
+        self._state = None
+
+    def apply(
+        self, db_handle: DbReadBase, handles: list[Handle] | None
+    ) -> tuple[list[Handle], int]:
+        """Apply the filter.
+
+        Returns the matching handles and the number of rules that were
+        still prepared.
+        """
+        state = _get_prepare_state(db_handle)
+        reused = len(self._held) if state is not None and state == self._state else 0
+        transient = self._prepare(db_handle, state)
+        try:
+            if self.generic_filter is not None:
+                return self.generic_filter.apply(db_handle, id_list=handles), reused
+            if handles is None:
+                query_method = db_handle.method("get_%s_handles", self.namespace)
+                assert (
+                    query_method is not None
+                ), f"No handle query for namespace '{self.namespace}'"
+                handles = list(query_method())
+            assert self.filter_parms is not None
+            matches = _apply_filter_parms(
+                self.filter_parms,
+                db_handle,
+                self.namespace,
+                handles,
+                self.rule_filters,
+            )
+            return matches, reused
+        finally:
+            for rule in transient:
+                rule.requestreset()
+
+
+class CompiledFilterCache:
+    """Per-process LRU cache of compiled filters.
+
+    Custom filters are looked up by name and the modification time of the
+    custom filters file, filter specs by a hash of their JSON. Each compiled
+    filter is used by one request at a time, as rule instances keep state
+    while applied.
+    """
+
+    def __init__(self, max_filters: int = MAX_COMPILED_FILTERS) -> None:
+        """Initialize self."""
+        self.max_filters = max_filters
+        self._lock = threading.Lock()
+        self._filters: OrderedDict[tuple, CompiledFilter] = OrderedDict()
+        self._custom_filters: Any = None
+        self._custom_filters_stamp: tuple[int, int] | None = None
+        self._loads = 0
+        self._compiles = 0
+        self._hits = 0
+        self._reused_rules = 0
+
+    def load_custom_filters(self) -> tuple[int, int] | None:
+        """Load the custom filters if their file changed.
+
+        Returns the modification time and size of the file.
+        """
+        path = os.path.expanduser(filters.CUSTOM_FILTERS)
+        try:
+            stat = os.stat(path)
+            stamp: tuple[int, int] | None = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            stamp = None
+        with self._lock:
+            if (
+                filters.CustomFilters is not None
+                and filters.CustomFilters is self._custom_filters
+                and stamp == self._custom_filters_stamp
+            ):
+                return stamp
+            filters.reload_custom_filters()
+            self._custom_filters = filters.CustomFilters
+            self._custom_filters_stamp = stamp
+            self._loads += 1
+        return stamp
+
+    def _acquire(self, key: tuple) -> CompiledFilter | None:
+        """Take a compiled filter out of the cache."""
+        with self._lock:
+            compiled = self._filters.pop(key, None)
+            if compiled is not None:
+                self._hits += 1
+            return compiled
+
+    def _release(self, key: tuple, compiled: CompiledFilter, reused: int) -> None:
+        """Put a compiled filter back into the cache."""
+        with self._lock:
+            self._reused_rules += reused
+            replaced = self._filters.pop(key, None)
+            self._filters[key] = compiled
+            evicted = [replaced] if replaced is not None else []
+            while len(self._filters) > self.max_filters:
+                evicted.append(self._filters.popitem(last=False)[1])
+        for old in evicted:
+            old.release()
+
+    def apply(
+        self,
+        db_handle: DbReadBase,
+        args: dict[str, Any],
+        namespace: str,
+        handles: list[Handle] | None = None,
+    ) -> list[Handle]:
+        """Apply an existing or dynamically defined filter."""
+        if args.get("filter"):
+            stamp = self.load_custom_filters()
+            key: tuple = (namespace, "filter", args["filter"], stamp)
+        else:
+            digest = hashlib.sha256(args["rules"].encode()).hexdigest()
+            key = (namespace, "rules", digest)
+        compiled = self._acquire(key)
+        if compiled is None:
+            compiled = self._compile(args, namespace)
+            with self._lock:
+                self._compiles += 1
+        reused = 0
+        try:
+            matches, reused = compiled.apply(db_handle, handles)
+        except BaseException:
+            # rules may be left in an undefined state by the failed application
+            compiled.release()
+            raise
+        finally:
+            self._release(key, compiled, reused)
+        return matches
+
+    def _compile(self, args: dict[str, Any], namespace: str) -> CompiledFilter:
+        """Compile a custom filter or a filter spec."""
+        if args.get("filter"):
+            for filter_class in filters.CustomFilters.get_filters(namespace):
+                if args["filter"] == filter_class.get_name():
+                    return CompiledFilter(
+                        namespace,
+                        generic_filter=_copy_filter(filter_class, namespace),
+                    )
+            abort(404)
+
+        try:
+            filter_parms = FilterSchema().load(json.loads(args["rules"]))
+        except json.JSONDecodeError:
+            abort_with_message(400, "Error decoding JSON")
+        except ValidationError:
+            abort_with_message(422, "Filter does not adhere to schema")
+        return CompiledFilter(namespace, filter_parms=filter_parms)
+
+    def clear(self) -> None:
+        """Remove all compiled filters."""
+        with self._lock:
+            compiled_filters = list(self._filters.values())
+            self._filters.clear()
+        for compiled in compiled_filters:
+            compiled.release()
+
+    def stats(self) -> dict[str, int]:
+        """Return the cache counters."""
+        with self._lock:
+            return {
+                "custom_filter_loads": self._loads,
+                "compiles": self._compiles,
+                "hits": self._hits,
+                "reused_rules": self._reused_rules,
+                "filters": len(self._filters),
+            }
+
+
+compiled_filters = CompiledFilterCache()
+register_metrics("compiled_filters", compiled_filters.stats)
+
+
 def apply_filter(
     db_handle: DbReadBase,
     args: dict[str, Any],
@@ -312,25 +649,7 @@ def apply_filter(
     handles: list[Handle] | None = None,
 ) -> list[Handle]:
     """Apply an existing or dynamically defined filter."""
-    filters.reload_custom_filters()
-    if args.get("filter"):
-        for filter_class in filters.CustomFilters.get_filters(namespace):
-            if args["filter"] == filter_class.get_name():
-                return filter_class.apply(db_handle, id_list=handles)
-        abort(404)
-
-    try:
-        filter_parms = FilterSchema().load(json.loads(args["rules"]))
-    except json.JSONDecodeError:
-        abort_with_message(400, "Error decoding JSON")
-    except ValidationError:
-        abort_with_message(422, "Filter does not adhere to schema")
-
-    if handles is None:
-        query_method = db_handle.method("get_%s_handles", namespace)
-        assert query_method is not None, f"No handle query for namespace '{namespace}'"
-        handles = list(query_method())
-    return _apply_filter_parms(filter_parms, db_handle, namespace, handles)
+    return compiled_filters.apply(db_handle, args, namespace, handles)
 
 
 class RuleSchema(Schema):
@@ -20,12 +20,15 @@
 
 """Matching utilities."""
 
-from typing import List
+from typing import List, Optional, Sequence, Tuple
 
 from gramps.gen.lib import Date
 from gramps.gen.lib.date import gregorian
 from gramps.gen.lib.primaryobj import BasicPrimaryObject as GrampsObject
 
+from ...types import Handle
+from ..event_index import INCOMPLETE_DATE_DAYS, EventEntry, EventIndex
+
 
 def match_date(date: Date, mask: str) -> bool:
     """Check if date matches mask."""
@@ -42,6 +45,18 @@ def match_date(date: Date, mask: str) -> bool:
     return False
 
 
+def match_date_indexed(entry: EventEntry, mask: str) -> bool:
+    """Check if the date of an indexed event matches mask."""
+    if not entry.valid:
+        return False
+    year_mask, month_mask, day_mask = mask.split("/")
+    return (
+        (year_mask == "*" or entry.year == int(year_mask))
+        and (month_mask == "*" or entry.month == int(month_mask))
+        and (day_mask == "*" or entry.day == int(day_mask))
+    )
+
+
 def match_date_range(date: Date, start_date: Date, end_date: Date) -> bool:
     """Check if date falls in given range."""
     if start_date:
@@ -53,6 +68,50 @@ def match_date_range(date: Date, start_date: Date, end_date: Date) -> bool:
     return True
 
 
+def match_date_range_indexed(
+    entry: EventEntry, start_date: Optional[Date], end_date: Optional[Date]
+) -> Optional[bool]:
+    """Check if the date of an indexed event falls in given range.
+
+    Returns None if the event has to be loaded to decide, i.e. if its date
+    is not a single regular day or is close to one of the range limits.
+    """
+    if not start_date and not end_date:
+        return True
+    if entry.fuzzy:
+        return None
+    in_range: Optional[bool] = True
+    if start_date:
+        start = start_date.get_sort_value()
+        if entry.sortval < start - INCOMPLETE_DATE_DAYS:
+            return False
+        if entry.sortval < start + INCOMPLETE_DATE_DAYS:
+            in_range = None
+    if end_date:
+        end = end_date.get_sort_value()
+        if entry.sortval > end + INCOMPLETE_DATE_DAYS:
+            return False
+        if entry.sortval > end - INCOMPLETE_DATE_DAYS:
+            in_range = None
+    return in_range
+
+
+def parse_date_range(date_mask: str) -> Tuple[Optional[Date], Optional[Date]]:
+    """Parse a date range into start and end date, which can be None."""
+    start, end = date_mask.split("-")
+    if "/" in start:
+        year, month, day = start.split("/")
+        start_date = Date((int(year), int(month), int(day)))
+    else:
+        start_date = None
+    if "/" in end:
+        year, month, day = end.split("/")
+        end_date = Date((int(year), int(month), int(day)))
+    else:
+        end_date = None
+    return start_date, end_date
+
+
 def match_dates(
     objects: List[GrampsObject],
     date_mask: str,
@@ -61,17 +120,7 @@ def match_dates(
     check_range = False
     if "-" in date_mask:
         check_range = True
-        start, end = date_mask.split("-")
-        if "/" in start:
-            year, month, day = start.split("/")
-            start_date = Date((int(year), int(month), int(day)))
-        else:
-            start_date = None
-        if "/" in end:
-            year, month, day = end.split("/")
-            end_date = Date((int(year), int(month), int(day)))
-        else:
-            end_date = None
+        start_date, end_date = parse_date_range(date_mask)
 
     result = []
     for obj in objects:
@@ -84,3 +133,29 @@ def match_dates(
                 if match_date(date, date_mask):
                     result.append(obj)
     return result
+
+
+def match_dates_indexed(
+    index: EventIndex, handles: Sequence[Handle], date_mask: str
+) -> List[Handle]:
+    """Preselect events based on a date mask or range using the event index.
+
+    The result is exact for a date mask. For a date range, it also contains
+    events that have to be loaded to decide. Handles of events missing from
+    the index are kept.
+    """
+    if "-" in date_mask:
+        start_date, end_date = parse_date_range(date_mask)
+    result = []
+    for handle in handles:
+        entry = index.get(handle)
+        if entry is None:
+            result.append(handle)
+        elif not entry.valid:
+            continue
+        elif "-" in date_mask:
+            if match_date_range_indexed(entry, start_date, end_date) is not False:
+                result.append(handle)
+        elif match_date_indexed(entry, date_mask):
+            result.append(handle)
+    return result
@@ -25,6 +25,7 @@ from http import HTTPStatus
 from typing import Dict
 
 from flask import Response, abort, request
+from flask_jwt_extended import get_jwt_identity
 from gramps.gen.const import GRAMPS_LOCALE as glocale
 from gramps.gen.db import DbTxn
 from gramps.gen.lib import Media
@@ -32,9 +33,10 @@ from gramps.gen.utils.grampslocale import GrampsLocale
 
 from ...auth.const import PERM_ADD_OBJ
 from ..auth import require_permissions
-from ..file import process_file
+from ..file import get_map_bounds, process_file
 from ..media import check_quota_media, get_media_handler, update_usage_media
-from ..util import abort_with_message, get_tree_from_jwt
+from ..tasks import schedule_map_tiles, schedule_thumbnails
+from ..util import abort_with_message, get_tree_from_jwt_or_fail
 from .base import (
     GrampsObjectProtectedResource,
     GrampsObjectResourceHelper,
@@ -70,6 +72,15 @@ class MediaObjectResourceHelper(GrampsObjectResourceHelper):
 class MediaObjectResource(GrampsObjectProtectedResource, MediaObjectResourceHelper):
     """Media object resource."""
 
+    def _after_update(self, obj: Media) -> None:
+        """Schedule new map tiles if the modified media object has map bounds."""
+        if get_map_bounds(obj) is not None:
+            schedule_map_tiles(
+                tree=get_tree_from_jwt_or_fail(),
+                user_id=get_jwt_identity(),
+                handles=[obj.handle],
+            )
+
 
 class MediaObjectsResource(GrampsObjectsProtectedResource, MediaObjectResourceHelper):
     """Media objects resource."""
@@ -82,7 +93,7 @@ class MediaObjectsResource(GrampsObjectsProtectedResource, MediaObjectResourceHe
             abort_with_message(HTTPStatus.NOT_ACCEPTABLE, "Media type not recognized")
         checksum, size, f = process_file(request.stream)
         check_quota_media(to_add=size)
-        tree = get_tree_from_jwt()
+        tree = get_tree_from_jwt_or_fail()
         media_handler = get_media_handler(self.db_handle, tree)
         media_handler.upload_file(f, checksum, mime)
         path = media_handler.get_default_filename(checksum, mime)
@@ -98,4 +109,5 @@ class MediaObjectsResource(GrampsObjectsProtectedResource, MediaObjectResourceHe
                 abort_with_message(400, "Error while adding object")
             trans_dict = transaction_to_json(trans)
         update_usage_media()
+        schedule_thumbnails(tree=tree, user_id=get_jwt_identity(), handles=[obj.handle])
         return self.response(201, trans_dict, total_items=len(trans_dict))
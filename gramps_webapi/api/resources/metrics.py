@@ -0,0 +1,40 @@
+#
+# Gramps Web API - A RESTful API for the Gramps genealogy program
+#
+# Copyright (C) 2026      Gramps Web contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Performance metrics resource."""
+
+from flask import jsonify
+
+from ...auth.const import PERM_VIEW_SETTINGS
+from ...metrics import get_metrics
+from ..auth import require_permissions
+from . import ProtectedResource
+
+
+class MetricsResource(ProtectedResource):
+    """Resource for the performance counters of the serving process."""
+
+    def get(self):
+        """Get the performance counters.
+
+        The counters are per process, so with several workers consecutive
+        requests can return different values.
+        """
+        require_permissions([PERM_VIEW_SETTINGS])
+        return jsonify(get_metrics()), 200
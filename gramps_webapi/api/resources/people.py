@@ -26,6 +26,7 @@ from gramps.gen.const import GRAMPS_LOCALE as glocale
 from gramps.gen.lib import Person
 from gramps.gen.utils.grampslocale import GrampsLocale
 
+from ..people_families_cache import get_caching_db_handle
 from .base import (
     GrampsObjectProtectedResource,
     GrampsObjectResourceHelper,
@@ -51,7 +52,7 @@ class PersonResourceHelper(GrampsObjectResourceHelper):
         db_handle = self.db_handle
         if "profile" in args:
             obj.profile = get_person_profile_for_object(
-                db_handle,
+                get_caching_db_handle(),
                 obj,
                 args["profile"],
                 locale=locale,
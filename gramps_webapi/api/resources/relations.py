@@ -28,12 +28,12 @@ from gramps.gen.relationship import get_relationship_calculator
 from marshmallow import Schema
 from webargs import fields, validate
 
-from gramps_webapi.api.people_families_cache import CachePeopleFamiliesProxy
+from gramps_webapi.api.people_families_cache import get_caching_db_handle
 
 from ...types import Handle
 from ..cache import request_cache_decorator
 from ..blueprint import api_blueprint
-from ..util import abort_with_message, get_db_handle, get_locale_for_language
+from ..util import abort_with_message, get_locale_for_language
 from . import ProtectedResource
 from .emit import GrampsJSONEncoder
 from .schemas import RelationshipItemSchema, RelationshipSchema
@@ -62,12 +62,14 @@ class RelationQueryArgs(Schema):
 class RelationResource(ProtectedResource, GrampsJSONEncoder):
     """Relation resource."""
 
+    cache_dependencies = ("Person", "Family")
+
     @api_blueprint.response(200, RelationshipSchema())
     @api_blueprint.arguments(RelationQueryArgs, location="query")
     @request_cache_decorator
     def get(self, args: Dict, handle1: Handle, handle2: Handle) -> Response:
         """Get the most direct relationship between two people."""
-        db_handle = CachePeopleFamiliesProxy(get_db_handle())
+        db_handle = get_caching_db_handle()
         try:
             person1 = db_handle.get_person_from_handle(handle1)
         except HandleError:
@@ -77,8 +79,7 @@ class RelationResource(ProtectedResource, GrampsJSONEncoder):
         except HandleError:
             abort_with_message(404, f"Person {handle2} not found")
 
-        db_handle.cache_people()
-        db_handle.cache_families()
+        db_handle.cache_relatives([handle1, handle2], args["depth"])
 
         locale = get_locale_for_language(args["locale"], default=True)
         data = get_one_relationship(
@@ -101,12 +102,14 @@ class RelationResource(ProtectedResource, GrampsJSONEncoder):
 class RelationsResource(ProtectedResource, GrampsJSONEncoder):
     """Relations resource."""
 
+    cache_dependencies = ("Person", "Family")
+
     @api_blueprint.response(200, RelationshipItemSchema(many=True))
     @api_blueprint.arguments(RelationQueryArgs, location="query")
     @request_cache_decorator
     def get(self, args: Dict, handle1: Handle, handle2: Handle) -> Response:
         """Get all possible relationships between two people."""
-        db_handle = CachePeopleFamiliesProxy(get_db_handle())
+        db_handle = get_caching_db_handle()
 
         try:
             person1 = db_handle.get_person_from_handle(handle1)
@@ -118,8 +121,7 @@ class RelationsResource(ProtectedResource, GrampsJSONEncoder):
         except HandleError:
             abort_with_message(404, f"Person {handle2} not found")
 
-        db_handle.cache_people()
-        db_handle.cache_families()
+        db_handle.cache_relatives([handle1, handle2], args["depth"])
 
         locale = get_locale_for_language(args["locale"], default=True)
         calc = get_relationship_calculator(reinit=True, clocale=locale)
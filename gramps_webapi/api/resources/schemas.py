@@ -2729,3 +2729,20 @@ class VerifyResultSchema(_Base):
     severity = fields.Str(
         metadata={"description": "Severity level: 'error' or 'warning'."},
     )
+
+
+class VerifyResultsQueryArgs(Schema):
+    """Query parameters for the stored results of a data verification."""
+
+    page = fields.Integer(
+        load_default=0,
+        validate=validate.Range(min=1),
+        metadata={
+            "description": "Page number of the result subset to return. If omitted, all results are returned."
+        },
+    )
+    pagesize = fields.Integer(
+        load_default=20,
+        validate=validate.Range(min=1),
+        metadata={"description": "Number of items per page when pagination is active."},
+    )
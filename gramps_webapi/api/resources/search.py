@@ -22,13 +22,13 @@
 from __future__ import annotations
 
 import re
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
 from flask import Response
 from flask_jwt_extended import get_jwt_identity
 from gramps.gen.db.base import DbReadBase
-from gramps.gen.errors import HandleError
 from gramps.gen.lib.primaryobj import BasicPrimaryObject as GrampsObject
+from gramps.gen.proxy.cache import CacheProxyDb
 from gramps.gen.utils.grampslocale import GrampsLocale
 from marshmallow import Schema
 from webargs import fields, validate
@@ -55,6 +55,7 @@ from ..tasks import (
 from ..util import (
     get_db_handle,
     get_locale_for_language,
+    get_objects_from_handles,
     get_tree_from_jwt_or_fail,
 )
 from . import ProtectedResource
@@ -157,57 +158,80 @@ class SearchResource(GrampsJSONEncoder, ProtectedResource):
         """Get the database instance."""
         return get_db_handle()
 
-    def get_object_from_handle(
-        self, handle: str, class_name: str, args: Dict, locale: GrampsLocale
-    ) -> GrampsObject:
-        """Get the object given a Gramps handle."""
-        query_method = self.db_handle.method("get_%s_from_handle", class_name)
-        assert query_method is not None  # type checker
-        obj = query_method(handle)
-        if obj is None:
-            raise HandleError(f"Object not found for handle {handle}")
-        if "profile" in args:
-            if class_name == "person":
-                obj.profile = get_person_profile_for_object(
-                    self.db_handle,
-                    obj,
-                    args["profile"],
-                    locale=locale,
-                    name_format=args.get("name_format"),
-                    precision=args.get("precision", 3),
-                )
-            elif class_name == "family":
-                obj.profile = get_family_profile_for_object(
-                    self.db_handle,
-                    obj,
-                    args["profile"],
-                    locale=locale,
-                    name_format=args.get("name_format"),
-                    precision=args.get("precision", 3),
-                )
-            elif class_name == "event":
-                obj.profile = get_event_profile_for_object(
-                    self.db_handle,
-                    obj,
-                    args["profile"],
-                    locale=locale,
-                    name_format=args.get("name_format"),
-                    precision=args.get("precision", 3),
-                )
-            elif class_name == "citation":
-                obj.profile = get_citation_profile_for_object(
-                    self.db_handle, obj, args["profile"], locale=locale
-                )
-            elif class_name == "place":
-                obj.profile = get_place_profile_for_object(
-                    self.db_handle, obj, locale=locale
-                )
-            elif class_name == "media":
-                obj.profile = get_media_profile_for_object(
-                    self.db_handle, obj, args["profile"], locale=locale
-                )
+    def add_profile(
+        self,
+        db_handle: DbReadBase,
+        obj: GrampsObject,
+        class_name: str,
+        args: Dict,
+        locale: GrampsLocale,
+    ) -> None:
+        """Add the profile to an object."""
+        if class_name == "person":
+            obj.profile = get_person_profile_for_object(
+                db_handle,
+                obj,
+                args["profile"],
+                locale=locale,
+                name_format=args.get("name_format"),
+                precision=args.get("precision", 3),
+            )
+        elif class_name == "family":
+            obj.profile = get_family_profile_for_object(
+                db_handle,
+                obj,
+                args["profile"],
+                locale=locale,
+                name_format=args.get("name_format"),
+                precision=args.get("precision", 3),
+            )
+        elif class_name == "event":
+            obj.profile = get_event_profile_for_object(
+                db_handle,
+                obj,
+                args["profile"],
+                locale=locale,
+                name_format=args.get("name_format"),
+                precision=args.get("precision", 3),
+            )
+        elif class_name == "citation":
+            obj.profile = get_citation_profile_for_object(
+                db_handle, obj, args["profile"], locale=locale
+            )
+        elif class_name == "place":
+            obj.profile = get_place_profile_for_object(db_handle, obj, locale=locale)
+        elif class_name == "media":
+            obj.profile = get_media_profile_for_object(
+                db_handle, obj, args["profile"], locale=locale
+            )
+
+    def add_objects_to_hits(
+        self, hits: List[Dict], args: Dict, locale: GrampsLocale
+    ) -> List[Dict]:
+        """Add the objects to the hits and drop hits without object.
 
-        return obj
+        The objects of each type are fetched at once. The profiles share
+        a cache of the people, families, events, and places they refer to.
+        """
+        db_handle = self.db_handle
+        handles_by_type: Dict[str, List[str]] = {}
+        for hit in hits:
+            handles_by_type.setdefault(hit["object_type"], []).append(hit["handle"])
+        objects = {
+            class_name: get_objects_from_handles(db_handle, class_name, handles)
+            for class_name, handles in handles_by_type.items()
+        }
+        profile_db = CacheProxyDb(db_handle) if "profile" in args else None
+        hits_with_object = []
+        for hit in hits:
+            obj = objects[hit["object_type"]].get(hit["handle"])
+            if obj is None:
+                continue
+            if profile_db is not None:
+                self.add_profile(profile_db, obj, hit["object_type"], args, locale)
+            hit["object"] = obj
+            hits_with_object.append(hit)
+        return hits_with_object
 
     @api_blueprint.response(200, SearchResultSchema(many=True))
     @api_blueprint.arguments(SearchQueryArgs, location="query")
@@ -251,18 +275,7 @@ class SearchResource(GrampsJSONEncoder, ProtectedResource):
         )
         if hits:
             locale = get_locale_for_language(args["locale"], default=True)
-            for hit in hits:
-                try:
-                    hit["object"] = self.get_object_from_handle(
-                        handle=hit["handle"],
-                        class_name=hit["object_type"],
-                        args=args,
-                        locale=locale,
-                    )
-                except HandleError:
-                    pass
-            # filter out hits without object (i.e. if handle failed)
-            hits = [hit for hit in hits if "object" in hit]
+            hits = self.add_objects_to_hits(hits, args=args, locale=locale)
         return self.response(200, payload=hits or [], args=args, total_items=total)
 
 
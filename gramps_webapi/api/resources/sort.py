@@ -22,7 +22,7 @@
 
 """Sorting support."""
 
-from typing import List
+from typing import Any, Iterable, List, Sequence
 
 from flask import abort
 from gramps.gen.const import GRAMPS_LOCALE as glocale
@@ -33,9 +33,15 @@ from gramps.gen.lib.primaryobj import BasicPrimaryObject as GrampsObject
 from gramps.gen.soundex import soundex
 from gramps.gen.utils.db import get_birth_or_fallback, get_death_or_fallback
 
+from ..people_families_cache import get_objects
+
 
 class Sort:
-    """Class for extracting sort keys."""
+    """Class for extracting sort keys.
+
+    Objects the keys depend on can be fetched in bulk beforehand, see
+    `prefetch`; other objects are read from the database one by one.
+    """
 
     def __init__(self, database, locale=glocale):
         """Initialize sort class."""
@@ -43,6 +49,79 @@ class Sort:
         self.locale = locale
         self.name_display = NameDisplay(xlocale=self.locale)
         self.place_display = PlaceDisplay()
+        self._prefetched: dict[str, dict[str, Any]] = {}
+
+    # Object lookups
+
+    def prefetch(self, class_name: str, handles: Iterable[str]) -> None:
+        """Fetch objects of one class in bulk."""
+        fetched = self._prefetched.setdefault(class_name, {})
+        handles = [handle for handle in set(handles) if handle not in fetched]
+        objects = get_objects(self.database, class_name, handles)
+        for handle in handles:
+            fetched[handle] = objects.get(handle)
+
+    def prefetch_person_events(self, people: Sequence[GrampsObject], birth: bool):
+        """Fetch the birth or death events of people, or their fallbacks."""
+        refs = [
+            person.get_birth_ref() if birth else person.get_death_ref()
+            for person in people
+        ]
+        self.prefetch("Event", [ref.ref for ref in refs if ref])
+        events = self._prefetched["Event"]
+        self.prefetch(
+            "Event",
+            [
+                event_ref.ref
+                for person, ref in zip(people, refs)
+                if not ref or events[ref.ref] is None
+                for event_ref in person.get_primary_event_ref_list()
+            ],
+        )
+
+    def prefetch_family_parents(self, families: Sequence[GrampsObject]):
+        """Fetch the fathers of families, or their mothers if there is none."""
+        self.prefetch(
+            "Person",
+            [
+                family.father_handle
+                for family in families
+                if family.father_handle is not None
+            ],
+        )
+        people = self._prefetched["Person"]
+        self.prefetch(
+            "Person",
+            [
+                family.mother_handle
+                for family in families
+                if family.mother_handle is not None
+                and (
+                    family.father_handle is None or people[family.father_handle] is None
+                )
+            ],
+        )
+
+    def _get_object(self, class_name: str, handle: str):
+        """Get an object from the prefetched ones or the database."""
+        fetched = self._prefetched.get(class_name, {})
+        if handle in fetched:
+            return fetched[handle]
+        query_method = self.database.method("get_%s_from_handle", class_name)
+        return query_method(handle)
+
+    def get_event_from_handle(self, handle: str):
+        """Get an event, as the database used for finding fallback events."""
+        return self._get_object("Event", handle)
+
+    def _get_family_person(self, obj: GrampsObject):
+        """Get the father of a family, or the mother if there is none."""
+        person = None
+        if obj.father_handle is not None:
+            person = self._get_object("Person", obj.father_handle)
+        if person is None and obj.mother_handle is not None:
+            person = self._get_object("Person", obj.mother_handle)
+        return person
 
     # Generic object key methods
 
@@ -88,7 +167,7 @@ class Sort:
 
     def by_person_birthdate_key(self, obj: GrampsObject):
         """Compare by birth date, if equal sorts by name."""
-        birth = get_birth_or_fallback(self.database, obj)
+        birth = get_birth_or_fallback(self, obj)
         if birth:
             date = birth.get_date_object()
         else:
@@ -97,7 +176,7 @@ class Sort:
 
     def by_person_deathdate_key(self, obj: GrampsObject):
         """Compare by death date, if equal sorts by name."""
-        death = get_death_or_fallback(self.database, obj)
+        death = get_death_or_fallback(self, obj)
         if death:
             date = death.get_date_object()
         else:
@@ -110,11 +189,7 @@ class Sort:
 
     def by_family_surname_key(self, obj: GrampsObject):
         """Compare by family surname, if equal uses given and suffix."""
-        person = None
-        if obj.father_handle is not None:
-            person = self.database.get_person_from_handle(obj.father_handle)
-        if person is None and obj.mother_handle is not None:
-            person = self.database.get_person_from_handle(obj.mother_handle)
+        person = self._get_family_person(obj)
         if person is None:
             return self.locale.sort_key("")
         name = person.get_primary_name()
@@ -125,11 +200,7 @@ class Sort:
 
     def by_family_soundex_key(self, obj: GrampsObject):
         """Compare by family soundex."""
-        person = None
-        if obj.father_handle is not None:
-            person = self.database.get_person_from_handle(obj.father_handle)
-        if person is None and obj.mother_handle is not None:
-            person = self.database.get_person_from_handle(obj.mother_handle)
+        person = self._get_family_person(obj)
         if person is None:
             return ""
         return soundex(person.get_primary_name().get_surname())
@@ -213,10 +284,39 @@ class Sort:
         return obj.priority
 
 
+def get_sort_order(columns: Sequence[Sequence], reverse: Sequence[bool]) -> List[int]:
+    """Return the indices of a stable sort by several columns of keys.
+
+    The last column takes precedence, as in consecutive stable sorts by
+    each column.
+    """
+    columns, reverse = columns[::-1], reverse[::-1]
+    if len(set(reverse)) > 1:
+        # descending columns are replaced by negated ranks of their keys
+        columns = [
+            _get_negated_ranks(column) if column_reverse else column
+            for column, column_reverse in zip(columns, reverse)
+        ]
+        reverse = [False]
+    keys = columns[0] if len(columns) == 1 else list(zip(*columns))
+    return sorted(range(len(keys)), key=keys.__getitem__, reverse=reverse[0])
+
+
+def _get_negated_ranks(column: Sequence) -> List[int]:
+    """Return the negated ranks of keys among the distinct keys."""
+    ranks = {key: -rank for rank, key in enumerate(sorted(set(column)))}
+    return [ranks[key] for key in column]
+
+
 def sort_objects(
     db_handle, gramps_class_name: str, objects: List[GrampsObject], args, locale=glocale
 ) -> List[GrampsObject]:
-    """Sort a given set of object handles."""
+    """Sort a given set of object handles.
+
+    The keys are computed once per object, with the objects they depend on
+    fetched in bulk, followed by a single stable sort. The last sort key
+    takes precedence.
+    """
     sort = Sort(db_handle, locale=locale)
     lookup = {
         "gramps_id": sort.by_id_key,
@@ -294,6 +394,7 @@ def sort_objects(
             "priority": sort.by_tag_priority_key,
         }
 
+    sort_keys = []
     for sort_key in args:
         sort_key = sort_key.strip()
         reverse = False
@@ -302,5 +403,24 @@ def sort_objects(
             sort_key = sort_key[1:]
         if sort_key not in lookup:
             abort(422)
-        objects.sort(key=lookup[sort_key], reverse=reverse)
-    return objects
+        sort_keys.append((sort_key, reverse))
+    if not sort_keys or not objects:
+        return objects
+
+    key_names = {sort_key for sort_key, _ in sort_keys}
+    if gramps_class_name == "Person":
+        if "birth" in key_names:
+            sort.prefetch_person_events(objects, birth=True)
+        if "death" in key_names:
+            sort.prefetch_person_events(objects, birth=False)
+    elif gramps_class_name == "Family" and key_names & {"surname", "soundex"}:
+        sort.prefetch_family_parents(objects)
+
+    columns = {
+        sort_key: [lookup[sort_key](obj) for obj in objects] for sort_key in key_names
+    }
+    order = get_sort_order(
+        [columns[sort_key] for sort_key, _ in sort_keys],
+        [reverse for _, reverse in sort_keys],
+    )
+    return [objects[index] for index in order]
@@ -27,6 +27,7 @@ from gramps.gen.db.base import DbReadBase
 from gramps.gen.display.place import PlaceDisplay
 from gramps.gen.errors import HandleError
 from gramps.gen.lib import Date, Event, EventType, Person, Span
+from gramps.gen.proxy.proxybase import ProxyDbBase
 from gramps.gen.relationship import get_relationship_calculator
 from gramps.gen.utils.alive import probably_alive_range
 from gramps.gen.utils.db import (
@@ -41,10 +42,13 @@ from webargs import fields, validate
 
 from ...types import Handle
 from ..blueprint import api_blueprint
-from ..util import get_db_handle, get_locale_for_language
+from ..event_index import EventEntry, EventIndex, get_event_index
+from ..people_families_cache import get_caching_db_handle, get_objects
+from ..util import get_backlink_handles, get_db_handle, get_locale_for_language
 from . import ProtectedResource
 from .emit import GrampsJSONEncoder
 from .filters import apply_filter
+from .match import match_date_range_indexed, parse_date_range
 from .schemas import TimelineEventProfileSchema
 from ...const import NAME_FORMAT_REGEXP
 from .util import (
@@ -96,6 +100,11 @@ EVENT_CATEGORIES = [
 #
 # A timeline may or may not have a anchor person. If it does relationships
 # are calculated with respect to them.
+#
+# Events of people added in bulk are kept as tuples of the following format
+# until they are profiled:
+#
+# (sort value, event handle, Person, role)
 
 
 class Timeline:
@@ -118,6 +127,9 @@ class Timeline:
         """Initialize timeline."""
         self.db_handle = db_handle
         self.timeline: List[Tuple[Event, Person, str, str]] = []
+        self.event_items: List[Tuple[int, str, Person, str]] = []
+        self.loaded_events: Dict[str, Event] = {}
+        self.event_ratings: Dict[str, Tuple[int, int]] = {}
         self.dates = dates
         self.start_date = None
         self.end_date = None
@@ -139,17 +151,7 @@ class Timeline:
         self.name_format = name_format
 
         if dates and "-" in dates:
-            start, end = dates.split("-")
-            if "/" in start:
-                year, month, day = start.split("/")
-                self.start_date = Date((int(year), int(month), int(day)))
-            else:
-                self.start_date = None
-            if "/" in end:
-                year, month, day = end.split("/")
-                self.end_date = Date((int(year), int(month), int(day)))
-            else:
-                self.end_date = None
+            self.start_date, self.end_date = parse_date_range(dates)
 
     def set_start_date(self, date: Union[Date, str]):
         """Set optional timeline start date."""
@@ -260,25 +262,40 @@ class Timeline:
             return True
         return str(event.get_type()) in self.eligible_events
 
-    def add_event(self, event: Tuple[Event, Person, str, str], relative: bool = False):
-        """Add event to timeline if needed."""
+    def is_in_range(self, event: Event) -> bool:
+        """Check if an event is dated within the timeline dates."""
         if self.discard_empty:
-            if event[0].date.sortval == 0:
-                return
+            if event.date.sortval == 0:
+                return False
         if self.end_date:
-            if self.end_date.match(event[0].date, comparison="<"):
-                return
+            if self.end_date.match(event.date, comparison="<"):
+                return False
         if self.start_date:
-            if self.start_date.match(event[0].date, comparison=">"):
-                return
+            if self.start_date.match(event.date, comparison=">"):
+                return False
+        return True
+
+    def is_in_range_indexed(self, entry: EventEntry) -> Optional[bool]:
+        """Check if an indexed event is dated within the timeline dates.
+
+        Returns None if the event has to be loaded to decide.
+        """
+        if self.discard_empty and entry.sortval == 0:
+            return False
+        return match_date_range_indexed(entry, self.start_date, self.end_date)
+
+    def add_event(self, event: Tuple[Event, Person, str, str], relative: bool = False):
+        """Add event to timeline if needed."""
+        if not self.is_in_range(event[0]):
+            return
         for item in self.timeline:
             if item[0].handle == event[0].handle:
                 return
         if self.is_eligible(event[0], relative):
             if self.ratings:
-                count, confidence = get_rating(self.db_handle, event[0])
-                event[0].citations = count
-                event[0].confidence = confidence
+                self.event_ratings[event[0].handle] = get_rating(
+                    self.db_handle, event[0]
+                )
             self.timeline.append(event)
 
     def add_person(
@@ -331,6 +348,140 @@ class Timeline:
             for family in person.family_list:
                 self.add_family(family, anchor=person, events_only=True)
 
+    def add_people(self, handles: List[Handle]):
+        """Add events for people without an anchor person to the timeline.
+
+        Gives the same timeline as calling `add_person` for every handle, but
+        only people referencing events in the timeline dates are loaded, in
+        bulk with their families, and events are selected by their type and
+        date in the event index. Only events whose dates are not precise
+        enough to decide are loaded here, the others when they are profiled.
+        """
+        index = get_event_index(self.db_handle)
+        if index is None or self.anchor_person or self.timeline:
+            for handle in handles:
+                self.add_person(handle)
+            return
+        handles = self._get_people_in_range(index, handles)
+        people = get_objects(self.db_handle, "Person", handles)
+        family_handles = list(
+            dict.fromkeys(
+                family_handle
+                for person in people.values()
+                for family_handle in person.family_list
+            )
+        )
+        families = get_objects(self.db_handle, "Family", family_handles)
+        seen = {item[1] for item in self.event_items}
+        # events with their sort value, or None if they have to be loaded
+        candidates: List[Tuple[Optional[int], str, Person, str]] = []
+        for handle in handles:
+            if handle not in people:
+                raise HandleError(f"Handle {handle} not found")
+            person = people[handle]
+            event_refs = list(person.event_ref_list)
+            for family_handle in person.family_list:
+                if family_handle not in families:
+                    raise HandleError(f"Handle {family_handle} not found")
+                event_refs += families[family_handle].event_ref_list
+            for event_ref in event_refs:
+                if event_ref.ref in seen:
+                    continue
+                seen.add(event_ref.ref)
+                sortval = None
+                entry = index.get(event_ref.ref)
+                if entry is not None:
+                    if self.event_filters and entry.type not in self.eligible_events:
+                        continue
+                    in_range = self.is_in_range_indexed(entry)
+                    if in_range is False:
+                        continue
+                    if in_range:
+                        sortval = entry.sortval
+                role = event_ref.get_role().xml_str()
+                candidates.append((sortval, event_ref.ref, person, role))
+
+        undecided = [handle for sortval, handle, _, _ in candidates if sortval is None]
+        events = get_objects(self.db_handle, "Event", undecided)
+        for sortval, event_handle, person, role in candidates:
+            if sortval is None:
+                if event_handle not in events:
+                    raise HandleError(f"Handle {event_handle} not found")
+                event = events[event_handle]
+                if not self.is_in_range(event) or not self.is_eligible(event, False):
+                    continue
+                self.loaded_events[event_handle] = event
+                sortval = event.get_date_object().get_sort_value()
+            self.event_items.append((sortval, event_handle, person, role))
+
+    def _get_people_in_range(
+        self, index: EventIndex, handles: List[Handle]
+    ) -> List[Handle]:
+        """Return the people who can have events in the timeline, in order.
+
+        With a date range or event filter, these are the people referencing
+        an event, directly or through a family they are a partner in, that
+        the event index does not exclude. The references are looked up
+        without loading the people.
+        """
+        handles = list(handles)
+        if self.start_date is None and self.end_date is None and not self.event_filters:
+            return handles
+        event_handles = [
+            handle
+            for handle, entry in index.entries.items()
+            if (not self.event_filters or entry.type in self.eligible_events)
+            and self.is_in_range_indexed(entry) is not False
+        ]
+        backlinks = get_backlink_handles(
+            self.db_handle, event_handles, ["Person", "Family"]
+        )
+        selected = {
+            handle for class_name, handle in backlinks if class_name == "Person"
+        }
+        family_handles = [
+            handle for class_name, handle in backlinks if class_name == "Family"
+        ]
+        for family in get_objects(self.db_handle, "Family", family_handles).values():
+            selected.update([family.father_handle, family.mother_handle])
+        if any(handle not in selected for handle in handles):
+            basedb = (
+                self.db_handle.basedb
+                if isinstance(self.db_handle, ProxyDbBase)
+                else self.db_handle
+            )
+            existing = set(basedb.get_person_handles())
+            for handle in handles:
+                if handle not in existing:
+                    raise HandleError(f"Handle {handle} not found")
+        return [handle for handle in handles if handle in selected]
+
+    def load_event_items(
+        self, items: List[Tuple[int, str, Person, str]]
+    ) -> List[Tuple[Event, Person, str, str]]:
+        """Load the events of people added in bulk as timeline items."""
+        missing = [
+            handle for _, handle, _, _ in items if handle not in self.loaded_events
+        ]
+        self.loaded_events.update(get_objects(self.db_handle, "Event", missing))
+        timeline = []
+        for _, handle, person, role in items:
+            if handle not in self.loaded_events:
+                raise HandleError(f"Handle {handle} not found")
+            event = self.loaded_events[handle]
+            if person.handle not in self.birth_dates:
+                birth = get_birth_or_fallback(self.db_handle, person)
+                if birth:
+                    self.birth_dates.update({person.handle: birth.date})
+            if self.ratings and handle not in self.event_ratings:
+                self.event_ratings[handle] = get_rating(self.db_handle, event)
+            timeline.append((event, person, "self", role))
+        return timeline
+
+    def count(self) -> int:
+        """Return the number of events in the timeline."""
+        return len(self.timeline) + len(self.event_items)
+
     def add_relative(self, handle: Handle, ancestors: int = 1, offspring: int = 1):
         """Add events for a relative of the anchor person."""
         person = self.db_handle.get_person_from_handle(handle)
@@ -430,11 +581,20 @@ class Timeline:
     def profile(self, page=0, pagesize=20):
         """Return a profile for the timeline."""
         profiles = []
-        self.timeline.sort(key=lambda x: x[0].get_date_object().get_sort_value())
-        events = self.timeline
-        if page > 0:
-            offset = (page - 1) * pagesize
-            events = events[offset : offset + pagesize]
+        if self.event_items:
+            # people were added in bulk, load only the events of the page
+            self.event_items.sort(key=lambda x: x[0])
+            items = self.event_items
+            if page > 0:
+                offset = (page - 1) * pagesize
+                items = items[offset : offset + pagesize]
+            events = self.load_event_items(items)
+        else:
+            self.timeline.sort(key=lambda x: x[0].get_date_object().get_sort_value())
+            events = self.timeline
+            if page > 0:
+                offset = (page - 1) * pagesize
+                events = events[offset : offset + pagesize]
         for event, person_object, relationship, role in events:
             label = self.locale.translation.sgettext(str(event.type))
             if (
@@ -501,8 +661,9 @@ class Timeline:
             }
             profile["person"]["relationship"] = str(relationship)
             if self.ratings:
-                profile["citations"] = event.citations
-                profile["confidence"] = event.confidence
+                profile["citations"], profile["confidence"] = self.event_ratings[
+                    event.handle
+                ]
             profiles.append(profile)
         return profiles
 
@@ -680,7 +841,7 @@ class PersonTimelineResource(ProtectedResource, GrampsJSONEncoder):
             relative_events = relative_events + args["relative_event_classes"]
         try:
             timeline = Timeline(
-                get_db_handle(),
+                get_caching_db_handle(),
                 dates=args["dates"],
                 events=events,
                 ratings=args["ratings"],
@@ -705,7 +866,7 @@ class PersonTimelineResource(ProtectedResource, GrampsJSONEncoder):
             abort(404)
 
         payload = timeline.profile(page=args["page"], pagesize=args["pagesize"])
-        return self.response(200, payload, args, total_items=len(timeline.timeline))
+        return self.response(200, payload, args, total_items=timeline.count())
 
 
 class FamilyTimelineQueryArgs(Schema):
@@ -804,7 +965,7 @@ class FamilyTimelineResource(ProtectedResource, GrampsJSONEncoder):
         events = prepare_events(args)
         try:
             timeline = Timeline(
-                get_db_handle(),
+                get_caching_db_handle(),
                 dates=args["dates"],
                 events=events,
                 ratings=args["ratings"],
@@ -819,7 +980,7 @@ class FamilyTimelineResource(ProtectedResource, GrampsJSONEncoder):
             abort(404)
 
         payload = timeline.profile(page=args["page"], pagesize=args["pagesize"])
-        return self.response(200, payload, args, total_items=len(timeline.timeline))
+        return self.response(200, payload, args, total_items=timeline.count())
 
 
 class TimelinePeopleQueryArgs(Schema):
@@ -961,7 +1122,7 @@ class TimelinePeopleResource(ProtectedResource, GrampsJSONEncoder):
         events = prepare_events(args)
         try:
             timeline = Timeline(
-                db_handle,
+                get_caching_db_handle(),
                 dates=args["dates"],
                 events=events,
                 ratings=args["ratings"],
@@ -988,15 +1149,14 @@ class TimelinePeopleResource(ProtectedResource, GrampsJSONEncoder):
                 for handle in handles:
                     timeline.add_relative(handle)
             else:
-                for handle in handles:
-                    timeline.add_person(handle)
+                timeline.add_people(handles)
         except ValueError:
             abort(422)
         except HandleError:
             abort(404)
 
         payload = timeline.profile(page=args["page"], pagesize=args["pagesize"])
-        return self.response(200, payload, args, total_items=len(timeline.timeline))
+        return self.response(200, payload, args, total_items=timeline.count())
 
 
 class TimelineFamiliesQueryArgs(Schema):
@@ -1107,7 +1267,7 @@ class TimelineFamiliesResource(ProtectedResource, GrampsJSONEncoder):
         events = prepare_events(args)
         try:
             timeline = Timeline(
-                db_handle,
+                get_caching_db_handle(),
                 dates=args["dates"],
                 events=events,
                 ratings=args["ratings"],
@@ -1133,4 +1293,4 @@ class TimelineFamiliesResource(ProtectedResource, GrampsJSONEncoder):
             abort(404)
 
         payload = timeline.profile(page=args["page"], pagesize=args["pagesize"])
-        return self.response(200, payload, args, total_items=len(timeline.timeline))
+        return self.response(200, payload, args, total_items=timeline.count())
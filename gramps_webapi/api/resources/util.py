@@ -80,6 +80,7 @@ import gramps_gedcom7
 
 from ...const import DISABLED_IMPORTERS, SEX_FEMALE, SEX_MALE, SEX_OTHER, SEX_UNKNOWN
 from ...types import FilenameOrPath, Handle, TransactionJson
+from ..family_graph import may_be_related
 from ..media import get_media_handler
 from ..util import (
     UserTaskProgress,
@@ -1664,8 +1665,9 @@ def get_one_relationship(
     calc = get_relationship_calculator(reinit=True, clocale=locale)
     # the relationship calculation can be slow when depth is set to a large value
     # even when the relationship path is short. To avoid this, we are iterating
-    # trying once with depth = 5
-    if depth > 5:
+    # trying once with depth = 5, unless the family graph shows that the
+    # people are not related that closely
+    if depth > 5 and may_be_related(db_handle, person1.handle, person2.handle, 5):
         calc.set_depth(5)
         rel_string, dist_orig, dist_other = calc.get_one_relationship(
             db_handle, person1, person2, extra_info=True, olocale=locale
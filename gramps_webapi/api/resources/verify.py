@@ -18,7 +18,7 @@
 
 """Data verification API resource."""
 
-from flask import jsonify
+from flask import abort, jsonify
 from flask_jwt_extended import get_jwt_identity
 
 from gramps_webapi.types import ResponseReturnValue
@@ -28,25 +28,36 @@ from ..auth import require_permissions
 from ..blueprint import api_blueprint
 from ..tasks import AsyncResult, make_task_response, run_task, verify_database
 from ..util import abort_with_message, get_tree_from_jwt_or_fail
+from ..verify import get_results
 from . import ProtectedResource
-from .schemas import VerifyQueryArgs
+from .emit import GrampsJSONEncoder
+from .schemas import VerifyQueryArgs, VerifyResultsQueryArgs
 from .trees import validate_tree_id
 
 
+def _get_verify_tree_id(tree_id: str) -> str:
+    """Get the ID of the tree to verify, which must be the user's tree."""
+    require_permissions([PERM_VIEW_PRIVATE])
+    user_tree_id = get_tree_from_jwt_or_fail()
+    if tree_id == "-":
+        return user_tree_id
+    validate_tree_id(tree_id)
+    if tree_id != user_tree_id:
+        abort_with_message(403, "Not allowed to verify other trees")
+    return tree_id
+
+
 class VerifyResource(ProtectedResource):
     """Data verification resource."""
 
     @api_blueprint.arguments(VerifyQueryArgs, location="query")
     def post(self, args, tree_id: str) -> ResponseReturnValue:
-        """Run genealogical data verification checks against the database."""
-        require_permissions([PERM_VIEW_PRIVATE])
-        user_tree_id = get_tree_from_jwt_or_fail()
-        if tree_id == "-":
-            tree_id = user_tree_id
-        else:
-            validate_tree_id(tree_id)
-            if tree_id != user_tree_id:
-                abort_with_message(403, "Not allowed to verify other trees")
+        """Run genealogical data verification checks against the database.
+
+        The findings are stored; the response contains the ID to retrieve
+        them with and their number.
+        """
+        tree_id = _get_verify_tree_id(tree_id)
         user_id = get_jwt_identity()
         locale = args.pop("locale", None)
         task = run_task(
@@ -59,3 +70,19 @@ class VerifyResource(ProtectedResource):
         if isinstance(task, AsyncResult):
             return make_task_response(task)
         return jsonify(task), 201
+
+
+class VerifyResultsResource(ProtectedResource, GrampsJSONEncoder):
+    """Stored data verification results resource."""
+
+    @api_blueprint.arguments(VerifyResultsQueryArgs, location="query")
+    def get(self, args, tree_id: str, result_id: str) -> ResponseReturnValue:
+        """Get the stored findings of a data verification."""
+        tree_id = _get_verify_tree_id(tree_id)
+        results = get_results(
+            tree_id, result_id, page=args["page"], pagesize=args["pagesize"]
+        )
+        if results is None:
+            abort(404)
+        findings, total = results
+        return self.response(200, findings, total_items=total)
@@ -56,6 +56,8 @@ class PersonYDnaQueryArgs(Schema):
 class PersonYDnaResource(ProtectedResource):
     """Resource for getting Y-DNA data for a person."""
 
+    cache_dependencies = ("Person",)
+
     @api_blueprint.response(200, YDnaResponseSchema())
     @api_blueprint.arguments(PersonYDnaQueryArgs, location="query")
     @request_cache_decorator
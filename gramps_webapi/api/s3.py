@@ -19,17 +19,18 @@
 
 """Object storage (e.g. S3) handling utilities."""
 
-from io import BytesIO
-from typing import BinaryIO, Dict, Optional
+import tempfile
+from typing import BinaryIO, Dict, Iterator, Optional
 
-from flask import current_app, redirect, send_file
+from flask import Response, current_app, redirect, request, send_file
 from gramps.gen.db.base import DbReadBase
-
 from PIL import Image
+from werkzeug.datastructures import ContentRange
+from werkzeug.exceptions import RequestedRangeNotSatisfiable
 
 from ..const import MIME_AVIF, MIME_PNG
 from .cache import get_cached_native_max_zoom, set_cached_native_max_zoom
-from .file import FileHandler, _get_map_bounds
+from .file import FileHandler, get_map_bounds
 from .image import (
     ThumbnailHandler,
     abort_on_image_errors,
@@ -39,6 +40,12 @@ from .image import (
 )
 from .util import abort_with_message
 
+# size of the chunks object storage files are streamed in
+CHUNK_SIZE = 1024 * 1024
+
+# size up to which downloaded files are kept in memory rather than on disk
+SPOOL_MAX_BYTES = 8 * 1024 * 1024
+
 
 def get_client(endpoint_url: Optional[str] = None):
     """Return an S3 client configured for GCS compatibility."""
@@ -104,15 +111,14 @@ class ObjectStorageFileHandler(FileHandler):
             return None
         return response
 
-    def _download_fileobj(self) -> BinaryIO:
-        """Download a binary file object."""
+    def _get_object(self, **kwargs) -> dict:
+        """Get the object, aborting if it cannot be retrieved."""
         from botocore.exceptions import ClientError
 
         try:
-            response = self.client.get_object(
-                Bucket=self.bucket_name, Key=self.object_name
+            return self.client.get_object(
+                Bucket=self.bucket_name, Key=self.object_name, **kwargs
             )
-            return BytesIO(response["Body"].read())
         except ClientError as exc:
             if exc.response["Error"]["Code"] == "NoSuchKey":
                 abort_with_message(404, "Media file not found")
@@ -122,6 +128,22 @@ class ObjectStorageFileHandler(FileHandler):
                 )
             raise  # will never trigger - just to make mypy happy
 
+    def _download_fileobj(self) -> BinaryIO:
+        """Download a binary file object.
+
+        The file is downloaded in chunks and spooled to a temporary file
+        once it exceeds `SPOOL_MAX_BYTES`.
+        """
+        body = self._get_object()["Body"]
+        fileobj = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+        try:
+            for chunk in body.iter_chunks(CHUNK_SIZE):
+                fileobj.write(chunk)
+        finally:
+            body.close()
+        fileobj.seek(0)
+        return fileobj  # type: ignore[return-value]
+
     def get_file_object(self) -> BinaryIO:
         """Return a binary file object."""
         return self._download_fileobj()
@@ -152,12 +174,79 @@ class ObjectStorageFileHandler(FileHandler):
     def send_file(
         self, etag: Optional[str] = None, download: bool = False, filename: str = ""
     ):
-        """Send media file to client."""
+        """Send media file to client.
+
+        Redirects to a presigned URL, unless `MEDIA_S3_PROXY` is enabled, in
+        which case the file is streamed through the API.
+        """
+        if current_app.config.get("MEDIA_S3_PROXY"):
+            return self._send_file_proxied(
+                etag=etag, download=download, filename=filename
+            )
         url = self._get_presigned_url(
             expires_in=self.URL_LIFETIME, download=download, filename=filename
         )
         return redirect(url, 307)
 
+    def _get_content_range(
+        self, file_size: int, etag: Optional[str]
+    ) -> Optional[ContentRange]:
+        """Return the byte range requested by the client, if any.
+
+        Multiple ranges and ranges conditional on a changed file are ignored,
+        so the whole file is sent.
+        """
+        byte_range = request.range
+        if byte_range is None or len(byte_range.ranges) != 1:
+            return None
+        if_range = request.if_range
+        if if_range.date is not None or (if_range.etag and if_range.etag != etag):
+            return None
+        content_range = byte_range.make_content_range(file_size)
+        if content_range is None:
+            raise RequestedRangeNotSatisfiable(length=file_size)
+        return content_range
+
+    def _send_file_proxied(
+        self, etag: Optional[str] = None, download: bool = False, filename: str = ""
+    ) -> Response:
+        """Stream the media file to the client, honoring range requests."""
+        if etag and request.if_none_match.contains(etag):
+            res = Response(status=304)
+            res.headers["ETag"] = etag
+            return res
+        try:
+            file_size = self.get_file_size()
+        except FileNotFoundError:
+            abort_with_message(404, "Media file not found")
+        content_range = self._get_content_range(file_size, etag)
+        if content_range is None:
+            body = self._get_object()["Body"]
+            content_length = file_size
+        else:
+            start, stop = content_range.start, content_range.stop
+            assert start is not None and stop is not None  # for type checker
+            body = self._get_object(Range=f"bytes={start}-{stop - 1}")["Body"]
+            content_length = stop - start
+
+        def generate() -> Iterator[bytes]:
+            try:
+                yield from body.iter_chunks(CHUNK_SIZE)
+            finally:
+                body.close()
+
+        res = Response(generate(), mimetype=self.mime, direct_passthrough=True)
+        res.accept_ranges = "bytes"
+        res.content_length = content_length
+        if content_range is not None:
+            res.status_code = 206
+            res.content_range = content_range
+        if download:
+            res.headers.set("Content-Disposition", "attachment", filename=filename)
+        if etag:
+            res.headers["ETag"] = etag
+        return res
+
     def send_cropped(self, x1: int, y1: int, x2: int, y2: int, square: bool = False):
         """Send cropped image."""
         self._abort_if_too_large()
@@ -190,13 +279,17 @@ class ObjectStorageFileHandler(FileHandler):
         """Send a map tile for a georeferenced image."""
         if max_zoom is not None and z > max_zoom:
             return send_file(transparent_png_tile(), mimetype=MIME_PNG)
-        self._abort_if_too_large()
-        bounds = _get_map_bounds(self.media)
+        bounds = get_map_bounds(self.media)
         if bounds is None:
             abort_with_message(404, "No map bounds for media object")
         native_max_zoom = get_cached_native_max_zoom(self.checksum, bounds)
-        if native_max_zoom is not None and z > native_max_zoom:
-            abort_with_message(404, "Zoom level exceeds native resolution of source image")
+        if native_max_zoom is not None:
+            if z > native_max_zoom:
+                abort_with_message(404, "Zoom level exceeds native resolution of source image")
+            response = self._send_prerendered_map_tile(bounds, z, x, y)
+            if response is not None:
+                return response
+        self._abort_if_too_large()
         fileobj = self._download_fileobj()
         with abort_on_image_errors(), Image.open(fileobj) as img:
             if native_max_zoom is None:
@@ -205,7 +298,7 @@ class ObjectStorageFileHandler(FileHandler):
             if z > native_max_zoom:
                 abort_with_message(404, "Zoom level exceeds native resolution of source image")
             buffer = get_map_tile(img, bounds, z, x, y)
-        return send_file(buffer, mimetype=MIME_PNG)
+        return self._send_rendered_map_tile(buffer, bounds, z, x, y)
 
 
 def upload_file_s3(
@@ -19,14 +19,47 @@
 
 """Full-text search utilities."""
 
+import threading
 import warnings
+from collections import OrderedDict
 from pathlib import Path
+from typing import Tuple
 from urllib.parse import urlparse
 
 from flask import current_app
 
 from .indexer import SearchIndexer, SemanticSearchIndexer, SearchIndexerBase
 
+# Setting up an indexer creates the tables of its collections and, for
+# semantic search, checks the embedding model. Indexers hold no per-request
+# state, so they are created once per process and shared, keeping the most
+# recently used ones. Their collections open a database connection per
+# operation, so evicted indexers need no cleanup.
+MAX_INDEXERS = 32
+_INDEXERS: OrderedDict[Tuple, SearchIndexerBase] = OrderedDict()
+_INDEXERS_LOCK = threading.Lock()
+
+
+def _lookup_indexer(key: Tuple) -> SearchIndexerBase | None:
+    """Return a shared indexer and mark it as recently used.
+
+    Must be called holding the lock.
+    """
+    indexer = _INDEXERS.get(key)
+    if indexer is not None:
+        _INDEXERS.move_to_end(key)
+    return indexer
+
+
+def _store_indexer(key: Tuple, indexer: SearchIndexerBase) -> None:
+    """Share an indexer, evicting the least recently used ones if needed.
+
+    Must be called holding the lock.
+    """
+    _INDEXERS[key] = indexer
+    while len(_INDEXERS) > MAX_INDEXERS:
+        _INDEXERS.popitem(last=False)
+
 
 def _get_search_index_db_url() -> str:
     """Get the search index database URL.
@@ -62,7 +95,14 @@ def _get_search_index_db_url() -> str:
 def get_search_indexer(tree: str) -> SearchIndexer:
     """Get the search indexer for the tree."""
     db_url = _get_search_index_db_url()
-    return SearchIndexer(db_url=db_url, tree=tree)
+    key = ("fts", tree, db_url)
+    with _INDEXERS_LOCK:
+        indexer = _lookup_indexer(key)
+        if indexer is None:
+            indexer = SearchIndexer(db_url=db_url, tree=tree)
+            _store_indexer(key, indexer)
+    assert isinstance(indexer, SearchIndexer)  # type checker
+    return indexer
 
 
 def get_semantic_search_indexer(
@@ -79,10 +119,27 @@ def get_semantic_search_indexer(
     if not embedding_function:
         raise ValueError("VECTOR_EMBEDDING_MODEL option not set")
     model_name = current_app.config.get("VECTOR_EMBEDDING_MODEL") or None
-    return SemanticSearchIndexer(
-        db_url=db_url,
-        tree=tree,
-        embedding_function=embedding_function,
-        model_name=model_name,
-        skip_model_check=skip_model_check,
-    )
+    batch_tokens = current_app.config["VECTOR_EMBEDDING_BATCH_TOKENS"]
+    key = ("semantic", tree, db_url, model_name, embedding_function, batch_tokens)
+    with _INDEXERS_LOCK:
+        if skip_model_check:
+            # a full reindex is about to store this model for the tree, so
+            # indexers of other models must check theirs again
+            for other_key in list(_INDEXERS):
+                if other_key[:2] == ("semantic", tree) and other_key != key:
+                    del _INDEXERS[other_key]
+        indexer = _lookup_indexer(key)
+        if indexer is None:
+            indexer = SemanticSearchIndexer(
+                db_url=db_url,
+                tree=tree,
+                embedding_function=embedding_function,
+                model_name=model_name,
+                skip_model_check=skip_model_check,
+                batch_tokens=batch_tokens,
+            )
+            _store_indexer(key, indexer)
+    assert isinstance(indexer, SemanticSearchIndexer)  # type checker
+    if not skip_model_check:
+        indexer.check_model()
+    return indexer
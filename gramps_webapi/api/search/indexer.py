@@ -21,16 +21,78 @@
 
 from __future__ import annotations
 
-from typing import Any, Callable, Dict, List, Set
+import logging
+import time
+from typing import Any, Callable, Dict, Iterator, List, Set, Tuple
 
 import sifts
+from billiard.pool import ApplyResult
+from gramps.gen.config import config
 from gramps.gen.db.base import DbReadBase
 
 from ...types import ProgressCallback
+from .pipeline import Pipeline, PipelineStage, iter_token_batches
 from .text import iter_obj_strings, obj_strings_from_handle
-from .metadata import get_stored_model_name, set_stored_model_name
+from .metadata import (
+    delete_stored_sync_mark,
+    get_stored_model_name,
+    get_stored_sync_mark,
+    set_stored_model_name,
+    set_stored_sync_mark,
+)
+from ...const import GRAMPS_OBJECT_PLURAL, PRIMARY_GRAMPS_OBJECTS
+from ...dbmanager import WebDbManager
+from ...process_pool import ProcessPool
 from ..util import get_total_number_of_objects, get_object_timestamps
 
+# maximum number of handles per index lookup, to keep the SQL statement bounded
+INDEX_LOOKUP_CHUNK_SIZE = 500
+
+# number of handles a parallel reindex worker processes per shard
+REINDEX_SHARD_SIZE = 500
+
+# default estimated number of tokens embedded at once in a semantic reindex
+EMBEDDING_BATCH_TOKENS = 8192
+
+# number of batches waiting between two stages of a semantic reindex
+EMBEDDING_QUEUE_SIZE = 2
+
+_LOG = logging.getLogger(__name__)
+
+# read-only database opened once by every parallel reindex worker process
+_worker_db: DbReadBase | None = None
+
+
+def _init_reindex_worker(dbdir: str, dbmgr: WebDbManager) -> None:
+    """Open the read-only database of a parallel reindex worker process."""
+    global _worker_db  # pylint: disable=global-statement
+    config.set("database.path", dbdir)
+    _worker_db = dbmgr.get_db(readonly=True).db
+
+
+def _close_reindex_worker(pid: int, exitcode: int) -> None:
+    """Close the database of a parallel reindex worker process on exit."""
+    if _worker_db is not None:
+        _worker_db.close()
+
+
+def _reindex_shard(
+    class_name: str, handles: List[str], semantic: bool
+) -> Tuple[int, List[Dict[str, Any]]]:
+    """Get the object strings for a shard of handles in a worker process.
+
+    Returns the number of processed handles and the object strings.
+    """
+    assert _worker_db is not None, "Reindex worker not initialized"
+    obj_dicts = []
+    for handle in handles:
+        obj_strings = obj_strings_from_handle(
+            _worker_db, class_name, handle, semantic=semantic
+        )
+        if obj_strings is not None:
+            obj_dicts.append(obj_strings)
+    return len(handles), obj_dicts
+
 
 class SearchIndexerBase:
     """Search indexer base class."""
@@ -55,6 +117,7 @@ class SearchIndexerBase:
             raise ValueError("Invalid tree ID")
         self.tree = tree
         self.use_semantic_text = use_semantic_text
+        self._db_url = db_url
         # index for all objects
         self.index = sifts.Collection(
             db_url=db_url or "",
@@ -110,32 +173,68 @@ class SearchIndexerBase:
             "metadata": metadata,
         }
 
-    def _add_objects(self, obj_dicts: List[Dict[str, Any]]):
-        """Add or update an object to the index."""
+    def _add_objects(
+        self,
+        obj_dicts: List[Dict[str, Any]],
+        embeddings: Dict[str, Any] | None = None,
+    ):
+        """Add or update an object to the index.
+
+        `embeddings` optionally maps the texts to their precomputed vectors.
+        """
         data = [
             self._get_object_data(obj_dict, public_only=False) for obj_dict in obj_dicts
         ]
         contents = [dat["contents"] for dat in data]
         ids = [dat["id"] for dat in data]
         metadatas = [dat["metadata"] for dat in data]
-        self.index.add(contents=contents, ids=ids, metadatas=metadatas)
+        self.index.add(
+            contents=contents,
+            ids=ids,
+            metadatas=metadatas,
+            embeddings=self._lookup_embeddings(contents, embeddings),
+        )
         data = [
             self._get_object_data(obj_dict, public_only=True) for obj_dict in obj_dicts
         ]
         contents = [dat["contents"] for dat in data]
         ids = [dat["id"] for dat in data]
         metadatas = [dat["metadata"] for dat in data]
-        self.index_public.add(contents=contents, ids=ids, metadatas=metadatas)
+        self.index_public.add(
+            contents=contents,
+            ids=ids,
+            metadatas=metadatas,
+            embeddings=self._lookup_embeddings(contents, embeddings),
+        )
+
+    @staticmethod
+    def _lookup_embeddings(
+        contents: List[str], embeddings: Dict[str, Any] | None
+    ) -> List[Any] | None:
+        """Get the precomputed vectors of the contents, if any."""
+        if embeddings is None:
+            return None
+        return [embeddings[content] for content in contents]
 
     def reindex_full(
-        self, db_handle: DbReadBase, progress_cb: ProgressCallback | None = None
+        self,
+        db_handle: DbReadBase,
+        progress_cb: ProgressCallback | None = None,
+        workers: int = 1,
+        dbmgr: WebDbManager | None = None,
     ):
-        """Reindex the whole database."""
+        """Reindex the whole database.
+
+        If `workers` is larger than 1 and the database manager `dbmgr` is
+        given, the object strings are generated by that many worker
+        processes, each with its own read-only database.
+        """
         total = get_total_number_of_objects(db_handle)
+        started = time.time()
 
+        self._delete_sync_mark()
         self.index.delete_all()
         self.index_public.delete_all()
-        obj_dicts = []
         if self.use_semantic_text:
             # semantic search indexing is slow and uses lots of memory, so we use
             # a small chunk size: at most 100. If we have less than 1000 objects,
@@ -145,6 +244,32 @@ class SearchIndexerBase:
             # full-text search indexing is fast, so we use a large chunk size:
             # at least 100 (but at most 10%).
             chunk_size = max(100, total // 10)
+        if workers > 1 and dbmgr is not None:
+            self._reindex_full_parallel(
+                db_handle,
+                dbmgr=dbmgr,
+                workers=workers,
+                total=total,
+                chunk_size=chunk_size,
+                progress_cb=progress_cb,
+            )
+        else:
+            self._reindex_full_serial(
+                db_handle, total=total, chunk_size=chunk_size, progress_cb=progress_cb
+            )
+        self._set_sync_mark(started)
+        if progress_cb:
+            progress_cb(current=total - 1, total=total)
+
+    def _reindex_full_serial(
+        self,
+        db_handle: DbReadBase,
+        total: int,
+        chunk_size: int,
+        progress_cb: ProgressCallback | None = None,
+    ):
+        """Add all objects to the empty index in this process."""
+        obj_dicts = []
         prev: int | None = None
         for i, obj_dict in enumerate(
             iter_obj_strings(db_handle, semantic=self.use_semantic_text)
@@ -157,8 +282,110 @@ class SearchIndexerBase:
                 progress_cb(current=i, total=total, prev=prev)
             prev = i
         self._add_objects(obj_dicts)
-        if progress_cb:
-            progress_cb(current=total - 1, total=total)
+
+    def _reindex_full_parallel(
+        self,
+        db_handle: DbReadBase,
+        dbmgr: WebDbManager,
+        workers: int,
+        total: int,
+        chunk_size: int,
+        progress_cb: ProgressCallback | None = None,
+    ):
+        """Add all objects to the empty index using worker processes.
+
+        The handles of every class are split into shards that the workers
+        turn into object strings. At most two shards per worker are in
+        flight, so memory use does not grow with the size of the tree.
+        """
+        obj_dicts: List[Dict[str, Any]] = []
+        current = 0
+        prev: int | None = None
+
+        def collect(result: ApplyResult) -> None:
+            nonlocal obj_dicts, current, prev
+            count, shard_obj_dicts = result.get()
+            obj_dicts += shard_obj_dicts
+            if len(obj_dicts) >= chunk_size:
+                self._add_objects(obj_dicts)
+                obj_dicts = []
+            current += count
+            if progress_cb:
+                progress_cb(current=current, total=total, prev=prev)
+            prev = current
+
+        with ProcessPool(
+            workers,
+            initializer=_init_reindex_worker,
+            initargs=(dbmgr.dbdir, dbmgr),
+            on_exit=_close_reindex_worker,
+        ) as pool:
+            pending: List[ApplyResult] = []
+            for class_name, handles in self._iter_shards(db_handle):
+                pending.append(
+                    pool.submit(
+                        _reindex_shard, class_name, handles, self.use_semantic_text
+                    )
+                )
+                if len(pending) >= 2 * workers:
+                    collect(pending.pop(0))
+            for result in pending:
+                collect(result)
+        self._add_objects(obj_dicts)
+
+    @staticmethod
+    def _iter_shards(db_handle: DbReadBase) -> Iterator[Tuple[str, List[str]]]:
+        """Iterate over class names and shards of their handles."""
+        for class_name in PRIMARY_GRAMPS_OBJECTS:
+            iter_method = db_handle.method("iter_%s_handles", class_name)
+            assert iter_method is not None  # type checker
+            handles = list(iter_method())
+            for start in range(0, len(handles), REINDEX_SHARD_SIZE):
+                yield class_name, handles[start : start + REINDEX_SHARD_SIZE]
+
+    def _get_sync_mark(self) -> Dict[str, Any] | None:
+        """Get the sync mark of the index, if any.
+
+        The sync mark records when the index was last brought in sync with
+        the database.
+        """
+        if not self._db_url:
+            return None
+        return get_stored_sync_mark(self._db_url, self.index.name)
+
+    def _set_sync_mark(self, started: float) -> None:
+        """Store the sync mark after a reindex that started at `started`."""
+        if not self._db_url:
+            return
+        # change timestamps are whole seconds, so objects changed in the same
+        # second as the start of the reindex are checked again next time
+        mark = {"change": int(started)}
+        set_stored_sync_mark(self._db_url, self.index.name, mark)
+
+    def _delete_sync_mark(self) -> None:
+        """Delete the sync mark, forcing the next incremental reindex to diff."""
+        if self._db_url:
+            delete_stored_sync_mark(self._db_url, self.index.name)
+
+    def _get_indexed_timestamps(
+        self, class_name: str, handles: Set[str]
+    ) -> Dict[str, Any]:
+        """Get the indexed change timestamps of those of the handles in the index."""
+        timestamps = {}
+        handle_list = list(handles)
+        for start in range(0, len(handle_list), INDEX_LOOKUP_CHUNK_SIZE):
+            chunk = handle_list[start : start + INDEX_LOOKUP_CHUNK_SIZE]
+            docs = self.index.get(
+                where={"type": {"$eq": class_name.lower()}, "handle": {"$in": chunk}}
+            )["results"]
+            for doc in docs:
+                timestamps[doc["metadata"]["handle"]] = doc["metadata"]["change"]
+        return timestamps
+
+    def _count_indexed(self, class_name: str) -> int:
+        """Get the number of objects of a class in the index."""
+        result = self.index.get(where={"type": {"$eq": class_name.lower()}}, limit=1)
+        return result["total"]
 
     def _get_object_timestamps(self):
         """Get a dictionary with the timestamps of all objects in the index."""
@@ -197,6 +424,39 @@ class SearchIndexerBase:
             updated[class_name] = changed_handles & ix_handles
         return {"deleted": deleted, "updated": updated, "new": new}
 
+    def _get_update_info_since(
+        self, db_handle: DbReadBase, mark: Dict[str, Any]
+    ) -> Dict[str, Dict[str, Set[str]]] | None:
+        """Get a dictionary with info about objects changed since the sync mark.
+
+        Only objects with a change timestamp not older than the mark are
+        looked up in the index. Deletions and additions with an older change
+        timestamp (e.g. imported objects) cannot be detected this way; if
+        the numbers of objects in the database and in the index show that
+        any happened, returns None. Objects added or deleted through
+        transactions are already added to or deleted from the index.
+        """
+        db_timestamps = get_object_timestamps(db_handle, since=mark["change"])
+        deleted: Dict[str, Set[str]] = {}
+        updated = {}
+        new = {}
+        for class_name, timestamps in db_timestamps.items():
+            changed_handles = set(handle for handle, _ in timestamps)
+            ix_timestamps = self._get_indexed_timestamps(class_name, changed_handles)
+            new[class_name] = changed_handles - set(ix_timestamps)
+            # objects updated through a transaction are already up to date
+            updated[class_name] = set(
+                handle
+                for handle, change in timestamps
+                if handle in ix_timestamps and ix_timestamps[handle] != change
+            )
+            deleted[class_name] = set()
+            plural = GRAMPS_OBJECT_PLURAL[class_name]
+            count = db_handle.method("get_number_of_%s", plural)()
+            if count != self._count_indexed(class_name) + len(new[class_name]):
+                return None
+        return {"deleted": deleted, "updated": updated, "new": new}
+
     def delete_object(self, handle: str, class_name: str) -> None:
         """Delete an object from the index."""
         obj_id = self._object_id(handle=handle, class_name=class_name)
@@ -215,10 +475,24 @@ class SearchIndexerBase:
             self._add_objects([obj_dict])
 
     def reindex_incremental(
-        self, db_handle: DbReadBase, progress_cb: ProgressCallback | None = None
+        self,
+        db_handle: DbReadBase,
+        progress_cb: ProgressCallback | None = None,
+        full_diff: bool = False,
     ):
-        """Update the index incrementally."""
-        update_info = self._get_update_info(db_handle)
+        """Update the index incrementally.
+
+        If the index has a sync mark, only objects changed since then are
+        updated. Otherwise, or if `full_diff` is true, all objects in the
+        database are compared to the index.
+        """
+        started = time.time()
+        mark = None if full_diff else self._get_sync_mark()
+        update_info = None
+        if mark is not None:
+            update_info = self._get_update_info_since(db_handle, mark)
+        if update_info is None:
+            update_info = self._get_update_info(db_handle)
         total = sum(
             len(handles)
             for class_dict in update_info.values()
@@ -269,6 +543,7 @@ class SearchIndexerBase:
                     obj_dicts.append(obj_strings)
                 i = progress(i)
             self._add_objects(obj_dicts)
+        self._set_sync_mark(started)
 
     @staticmethod
     def _format_hit(hit, rank, include_content: bool) -> Dict[str, Any]:
@@ -362,19 +637,17 @@ class SemanticSearchIndexer(SearchIndexerBase):
         embedding_function: Callable | None = None,
         model_name: str | None = None,
         skip_model_check: bool = False,
+        batch_tokens: int = EMBEDDING_BATCH_TOKENS,
     ):
-        """Initialize the indexer."""
+        """Initialize the indexer.
+
+        `batch_tokens` is the estimated number of tokens embedded at once
+        during a full reindex.
+        """
         # Check for model mismatch BEFORE opening/creating the sifts collections
         # via super().__init__, so no side effects occur on a stale index.
         if db_url and model_name and not skip_model_check:
-            stored = get_stored_model_name(db_url, tree)
-            if stored is not None and stored != model_name:
-                raise ValueError(
-                    f"Embedding model mismatch for tree '{tree}': "
-                    f"the search index was built with '{stored}' but the "
-                    f"configured model is '{model_name}'. "
-                    "Run a full semantic reindex to rebuild the index with the new model."
-                )
+            self._check_model_name(db_url, tree, model_name)
         super().__init__(
             tree=tree,
             db_url=db_url,
@@ -383,12 +656,122 @@ class SemanticSearchIndexer(SearchIndexerBase):
             use_semantic_text=True,
         )
         self.model_name = model_name
-        self._db_url = db_url
+        self.batch_tokens = batch_tokens
+        self.model_checked = not skip_model_check
+
+    @staticmethod
+    def _check_model_name(db_url: str, tree: str, model_name: str) -> None:
+        """Raise a ValueError if the index was built with a different model."""
+        stored = get_stored_model_name(db_url, tree)
+        if stored is not None and stored != model_name:
+            raise ValueError(
+                f"Embedding model mismatch for tree '{tree}': "
+                f"the search index was built with '{stored}' but the "
+                f"configured model is '{model_name}'. "
+                "Run a full semantic reindex to rebuild the index with the new model."
+            )
+
+    def check_model(self) -> None:
+        """Check that the index was built with the configured model.
+
+        The check is only done once per indexer, unless it was created with
+        `skip_model_check`. Raises a ValueError on a mismatch.
+        """
+        if self.model_checked:
+            return
+        if self._db_url and self.model_name:
+            self._check_model_name(self._db_url, self.tree, self.model_name)
+        self.model_checked = True
 
     def reindex_full(
-        self, db_handle: DbReadBase, progress_cb: ProgressCallback | None = None
+        self,
+        db_handle: DbReadBase,
+        progress_cb: ProgressCallback | None = None,
+        workers: int = 1,
+        dbmgr: WebDbManager | None = None,
     ):
         """Rebuild the semantic index and record the model name."""
-        super().reindex_full(db_handle, progress_cb=progress_cb)
+        super().reindex_full(
+            db_handle, progress_cb=progress_cb, workers=workers, dbmgr=dbmgr
+        )
         if self._db_url and self.model_name:
             set_stored_model_name(self._db_url, self.tree, self.model_name)
+        # the index now matches the configured model
+        self.model_checked = True
+
+    def _reindex_full_serial(
+        self,
+        db_handle: DbReadBase,
+        total: int,
+        chunk_size: int,
+        progress_cb: ProgressCallback | None = None,
+    ):
+        """Add all objects to the empty index in a pipeline.
+
+        The object strings are generated in this process, grouped into
+        batches of at most `batch_tokens` estimated tokens, embedded, and
+        added to the index, each in its own thread. The stages are
+        connected by bounded queues, so the database is read while the
+        previous batch is embedded, and only a few batches are held in
+        memory at any time.
+        """
+
+        def iter_source() -> Iterator[Dict[str, Any]]:
+            prev: int | None = None
+            for i, obj_dict in enumerate(iter_obj_strings(db_handle, semantic=True)):
+                yield obj_dict
+                if progress_cb:
+                    progress_cb(current=i, total=total, prev=prev)
+                prev = i
+
+        def embed(
+            batches: Iterator[List[Dict[str, Any]]],
+        ) -> Iterator[Tuple[List[Dict[str, Any]], Dict[str, Any]]]:
+            for batch in batches:
+                yield batch, self._embed_objects(batch)
+
+        def insert(
+            batches: Iterator[Tuple[List[Dict[str, Any]], Dict[str, Any]]],
+        ) -> Iterator[List[Dict[str, Any]]]:
+            for batch, embeddings in batches:
+                self._add_objects(batch, embeddings=embeddings)
+                yield batch
+
+        pipeline = Pipeline(
+            [
+                PipelineStage(
+                    "batch",
+                    lambda obj_dicts: iter_token_batches(obj_dicts, self.batch_tokens),
+                    size=len,
+                ),
+                PipelineStage("embed", embed, size=lambda item: len(item[0])),
+                PipelineStage("insert", insert, size=len),
+            ],
+            maxsize=EMBEDDING_QUEUE_SIZE,
+        )
+        for stats in pipeline.run(iter_source(), name="generate"):
+            _LOG.info(
+                "Semantic reindex of tree %s, stage %s: %d objects in %.1f s (%.1f/s)",
+                self.tree,
+                stats.name,
+                stats.items,
+                stats.busy,
+                stats.throughput,
+            )
+
+    def _embed_objects(self, obj_dicts: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Embed the texts of the objects for both indexes.
+
+        Returns a map of texts to vectors. Texts that are the same in the
+        private and the public index are only embedded once.
+        """
+        texts = list(
+            dict.fromkeys(
+                text
+                for obj_dict in obj_dicts
+                for text in (obj_dict["string_all"], obj_dict["string_public"])
+            )
+        )
+        embedding_function = self.index.embedding_function
+        assert embedding_function is not None  # type checker
+        return dict(zip(texts, embedding_function(texts)))
@@ -17,26 +17,41 @@
 # along with this program. If not, see <https://www.gnu.org/licenses/>.
 #
 
-"""Semantic search index metadata store.
+"""Search index metadata store.
 
 Tracks which embedding model was used to build each tree's semantic index,
 so that a model change can be detected and users warned before search results
 become silently incorrect.
+
+Also tracks the point up to which each search index is in sync with the
+Gramps database, so that incremental reindexing only needs to look at
+objects changed since then.
 """
 
 from __future__ import annotations
 
-from typing import Optional
+import json
+import threading
+from functools import lru_cache
+from typing import Any, Optional
 
 from sqlalchemy import create_engine, text
 
+# database URLs the sync mark table is known to exist in
+_sync_mark_tables: set[str] = set()
+_sync_mark_tables_lock = threading.Lock()
+
 
 def _is_postgres(db_url: str) -> bool:
     return db_url.startswith("postgresql") or db_url.startswith("postgres")
 
 
+@lru_cache(maxsize=16)
 def _get_engine(db_url: str):
-    """Return a SQLAlchemy engine for the given URL."""
+    """Return a SQLAlchemy engine for the given URL.
+
+    Engines are cached, so their connection pools are reused.
+    """
     return create_engine(db_url)
 
 
@@ -85,3 +100,73 @@ def set_stored_model_name(db_url: str, tree: str, model_name: str) -> None:
             """)
     with engine.begin() as conn:
         conn.execute(upsert_sql, {"tree": tree, "model": model_name})
+
+
+def ensure_sync_mark_table(db_url: str) -> None:
+    """Create the search index sync mark table if it doesn't exist.
+
+    The table is created at most once per database URL and process.
+    """
+    if db_url in _sync_mark_tables:
+        return
+    sql = text("""
+        CREATE TABLE IF NOT EXISTS search_index_sync_mark (
+            collection TEXT PRIMARY KEY,
+            mark TEXT NOT NULL,
+            synced_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """)
+    engine = _get_engine(db_url)
+    with _sync_mark_tables_lock:
+        if db_url in _sync_mark_tables:
+            return
+        with engine.begin() as conn:
+            conn.execute(sql)
+        _sync_mark_tables.add(db_url)
+
+
+def get_stored_sync_mark(db_url: str, collection: str) -> Optional[dict[str, Any]]:
+    """Return the sync mark stored for this collection, or None if not set."""
+    ensure_sync_mark_table(db_url)
+    engine = _get_engine(db_url)
+    with engine.connect() as conn:
+        row = conn.execute(
+            text(
+                "SELECT mark FROM search_index_sync_mark "
+                "WHERE collection = :collection"
+            ),
+            {"collection": collection},
+        ).fetchone()
+    return json.loads(row[0]) if row else None
+
+
+def set_stored_sync_mark(db_url: str, collection: str, mark: dict[str, Any]) -> None:
+    """Persist the sync mark for this collection."""
+    ensure_sync_mark_table(db_url)
+    engine = _get_engine(db_url)
+    if _is_postgres(db_url):
+        upsert_sql = text("""
+            INSERT INTO search_index_sync_mark (collection, mark, synced_at)
+            VALUES (:collection, :mark, CURRENT_TIMESTAMP)
+            ON CONFLICT (collection) DO UPDATE SET
+                mark = EXCLUDED.mark,
+                synced_at = CURRENT_TIMESTAMP
+            """)
+    else:
+        upsert_sql = text("""
+            INSERT OR REPLACE INTO search_index_sync_mark (collection, mark, synced_at)
+            VALUES (:collection, :mark, CURRENT_TIMESTAMP)
+            """)
+    with engine.begin() as conn:
+        conn.execute(upsert_sql, {"collection": collection, "mark": json.dumps(mark)})
+
+
+def delete_stored_sync_mark(db_url: str, collection: str) -> None:
+    """Remove the sync mark for this collection."""
+    ensure_sync_mark_table(db_url)
+    engine = _get_engine(db_url)
+    with engine.begin() as conn:
+        conn.execute(
+            text("DELETE FROM search_index_sync_mark WHERE collection = :collection"),
+            {"collection": collection},
+        )
@@ -0,0 +1,229 @@
+#
+# Gramps Web API - A RESTful API for the Gramps genealogy program
+#
+# Copyright (C) 2026      Gramps Web contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Pipeline of threaded stages connected by bounded queues."""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+# marks the end of the items passed from one stage to the next
+_DONE = object()
+
+# seconds between checks whether another stage has failed
+_POLL_INTERVAL = 0.1
+
+
+class _Aborted(Exception):
+    """Raised in a stage when another stage has failed."""
+
+
+@dataclass
+class StageStats:
+    """Throughput statistics of a pipeline stage."""
+
+    name: str
+    items: int = 0
+    busy: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Return the number of items per second the stage was busy."""
+        if self.busy <= 0:
+            return 0.0
+        return self.items / self.busy
+
+
+@dataclass
+class PipelineStage:
+    """A pipeline stage.
+
+    `func` takes an iterator over the output of the previous stage and
+    yields its own output. `size` returns the number of items an output
+    counts as in the stage's statistics.
+    """
+
+    name: str
+    func: Callable[[Iterator[Any]], Iterable[Any]]
+    size: Callable[[Any], int] = lambda item: 1
+
+
+def estimate_tokens(text: str) -> int:
+    """Roughly estimate the number of tokens of a text.
+
+    Embedding model tokenizers produce about one token per four characters
+    of English text; this avoids loading the model's tokenizer.
+    """
+    return len(text) // 4 + 1
+
+
+def iter_token_batches(
+    obj_dicts: Iterable[Dict[str, Any]], token_budget: int
+) -> Iterator[List[Dict[str, Any]]]:
+    """Group object strings into batches of at most `token_budget` tokens.
+
+    A text shared by the private and the public index is only counted
+    once, since it is only embedded once. An object exceeding the budget
+    on its own forms a batch by itself.
+    """
+    batch: List[Dict[str, Any]] = []
+    tokens = 0
+    for obj_dict in obj_dicts:
+        size = estimate_tokens(obj_dict["string_all"])
+        if obj_dict["string_public"] != obj_dict["string_all"]:
+            size += estimate_tokens(obj_dict["string_public"])
+        if batch and tokens + size > token_budget:
+            yield batch
+            batch = []
+            tokens = 0
+        batch.append(obj_dict)
+        tokens += size
+    if batch:
+        yield batch
+
+
+def _put(outbox: queue.Queue, item: Any, stop: threading.Event) -> float:
+    """Put an item into a queue and return the seconds spent waiting."""
+    start = time.perf_counter()
+    while not stop.is_set():
+        try:
+            outbox.put(item, timeout=_POLL_INTERVAL)
+            return time.perf_counter() - start
+        except queue.Full:
+            pass
+    raise _Aborted
+
+
+def _get(inbox: queue.Queue, stop: threading.Event) -> Tuple[Any, float]:
+    """Get an item from a queue and return it with the seconds spent waiting."""
+    start = time.perf_counter()
+    while not stop.is_set():
+        try:
+            item = inbox.get(timeout=_POLL_INTERVAL)
+            return item, time.perf_counter() - start
+        except queue.Empty:
+            pass
+    raise _Aborted
+
+
+class Pipeline:
+    """Run stages in threads connected by bounded queues.
+
+    The source is iterated in the calling thread, so it may use a database
+    connection bound to that thread. Every stage runs in a thread of its
+    own, and at most `maxsize` outputs wait between two stages, so memory
+    use does not grow with the number of items. The output of the last
+    stage is discarded.
+
+    If a stage raises, the other stages are stopped and the exception is
+    re-raised in the calling thread.
+    """
+
+    def __init__(self, stages: Sequence[PipelineStage], maxsize: int = 2):
+        """Initialize the pipeline."""
+        if not stages:
+            raise ValueError("A pipeline needs at least one stage")
+        self.stages = list(stages)
+        self.maxsize = maxsize
+
+    def run(self, source: Iterable[Any], name: str = "source") -> List[StageStats]:
+        """Feed the items of `source` through all stages.
+
+        Returns the statistics of the source and of every stage.
+        """
+        stop = threading.Event()
+        errors: List[BaseException] = []
+        queues: List[queue.Queue] = [
+            queue.Queue(maxsize=self.maxsize) for _ in self.stages
+        ]
+        stats = [StageStats(name=name)] + [
+            StageStats(name=stage.name) for stage in self.stages
+        ]
+        threads = []
+        for i, stage in enumerate(self.stages):
+            outbox = queues[i + 1] if i + 1 < len(queues) else None
+            thread = threading.Thread(
+                target=self._run_stage,
+                args=(stage, queues[i], outbox, stop, errors, stats[i + 1]),
+                name=f"pipeline-{stage.name}",
+                daemon=True,
+            )
+            thread.start()
+            threads.append(thread)
+
+        waited = 0.0
+        start = time.perf_counter()
+        try:
+            for item in source:
+                stats[0].items += 1
+                waited += _put(queues[0], item, stop)
+            waited += _put(queues[0], _DONE, stop)
+        except _Aborted:
+            pass
+        except BaseException:
+            stop.set()
+            raise
+        finally:
+            stats[0].busy = time.perf_counter() - start - waited
+            for thread in threads:
+                thread.join()
+        if errors:
+            raise errors[0]
+        return stats
+
+    @staticmethod
+    def _run_stage(
+        stage: PipelineStage,
+        inbox: queue.Queue,
+        outbox: queue.Queue | None,
+        stop: threading.Event,
+        errors: List[BaseException],
+        stats: StageStats,
+    ) -> None:
+        """Run a stage until its input is exhausted or the pipeline stops."""
+        waited = 0.0
+
+        def iter_inbox() -> Iterator[Any]:
+            nonlocal waited
+            while True:
+                item, wait = _get(inbox, stop)
+                waited += wait
+                if item is _DONE:
+                    return
+                yield item
+
+        start = time.perf_counter()
+        try:
+            for output in stage.func(iter_inbox()):
+                stats.items += stage.size(output)
+                if outbox is not None:
+                    waited += _put(outbox, output, stop)
+            if outbox is not None:
+                waited += _put(outbox, _DONE, stop)
+        except _Aborted:
+            pass
+        except BaseException as exc:  # pylint: disable=broad-except
+            errors.append(exc)
+            stop.set()
+        finally:
+            stats.busy = time.perf_counter() - start - waited
@@ -45,7 +45,6 @@ from ..auth import user_db
 from ..undodb import migrate as migrate_undodb
 from .check import check_database
 from .emails import email_confirm_email, email_new_user, email_reset_pw
-from ..verify_lib import run_verify
 from .export import prepare_options, run_export
 from .media import get_media_handler
 from .media_importer import MediaImporter
@@ -72,10 +71,12 @@ from .telemetry import (
     telemetry_sent_last_24h,
     update_telemetry_timestamp,
 )
+from .thumbnails import pregenerate_map_tiles, pregenerate_thumbnails
 from .util import (
     check_quota_people,
     close_db,
     get_config,
+    get_db_manager,
     get_db_outside_request,
     get_locale_for_language,
     gramps_object_from_dict,
@@ -83,6 +84,7 @@ from .util import (
     update_usage_people,
     upgrade_gramps_database,
 )
+from .verify import run_verify_to_store
 
 
 def _record_task(task_id: str, task: Task, kwargs: dict) -> None:
@@ -215,7 +217,12 @@ def _search_reindex_full(
         tree=tree, view_private=True, readonly=True, user_id=user_id
     )
     try:
-        indexer.reindex_full(db, progress_cb=progress_cb)
+        indexer.reindex_full(
+            db,
+            progress_cb=progress_cb,
+            workers=current_app.config["SEARCH_INDEX_WORKERS"],
+            dbmgr=get_db_manager(tree),
+        )
     finally:
         close_db(db)
 
@@ -281,9 +288,17 @@ def search_reindex_full_semantic(self, tree: str, user_id: str) -> None:
 
 
 def _search_reindex_incremental(
-    tree: str, user_id: str, semantic: bool, progress_cb: Optional[Callable] = None
+    tree: str,
+    user_id: str,
+    semantic: bool,
+    progress_cb: Optional[Callable] = None,
+    full_diff: bool = False,
 ) -> None:
-    """Run an incremental reindex of the search index."""
+    """Run an incremental reindex of the search index.
+
+    `full_diff` must be set after bulk operations like imports, which can
+    add objects with change timestamps older than the last reindex.
+    """
     if semantic:
         indexer: SearchIndexer | SemanticSearchIndexer = get_semantic_search_indexer(
             tree
@@ -294,7 +309,7 @@ def _search_reindex_incremental(
         tree=tree, view_private=True, readonly=True, user_id=user_id
     )
     try:
-        indexer.reindex_incremental(db, progress_cb=progress_cb)
+        indexer.reindex_incremental(db, progress_cb=progress_cb, full_diff=full_diff)
     finally:
         close_db(db)
 
@@ -376,6 +391,7 @@ def import_file(
         progress_cb=progress_callback_count(
             self, title="Updating full-text search index..."
         ),
+        full_diff=True,
     )
     if current_app.config.get("VECTOR_EMBEDDING_MODEL"):
         _search_reindex_incremental(
@@ -385,7 +401,10 @@ def import_file(
             progress_cb=progress_callback_count(
                 self, title="Updating semantic search index..."
             ),
+            full_diff=True,
         )
+    schedule_thumbnails(tree=tree, user_id=user_id)
+    schedule_map_tiles(tree=tree, user_id=user_id)
 
 
 @shared_task(bind=True)
@@ -441,6 +460,7 @@ def restore_backup(
         progress_cb=progress_callback_count(
             self, title="Updating full-text search index..."
         ),
+        full_diff=True,
     )
     if current_app.config.get("VECTOR_EMBEDDING_MODEL"):
         _search_reindex_incremental(
@@ -450,6 +470,7 @@ def restore_backup(
             progress_cb=progress_callback_count(
                 self, title="Updating semantic search index..."
             ),
+            full_diff=True,
         )
     return summary
 
@@ -558,9 +579,106 @@ def import_media_archive(
         result = importer(progress_cb=progress_callback_count(self))
     finally:
         close_db(db_handle)
+    schedule_thumbnails(tree=tree, user_id=user_id)
+    schedule_map_tiles(tree=tree, user_id=user_id)
     return result
 
 
+def _generate_thumbnails(
+    tree: str,
+    user_id: str,
+    handles: Optional[List[str]] = None,
+    progress_cb: Optional[Callable] = None,
+) -> int:
+    """Render missing thumbnails into the thumbnail cache."""
+    db_handle = get_db_outside_request(
+        tree=tree, view_private=True, readonly=True, user_id=user_id
+    )
+    try:
+        return pregenerate_thumbnails(
+            db_handle,
+            tree=tree,
+            sizes=current_app.config["THUMBNAIL_PREGENERATE_SIZES"],
+            handles=handles,
+            workers=current_app.config["THUMBNAIL_PREGENERATE_WORKERS"],
+            progress_cb=progress_cb,
+        )
+    finally:
+        close_db(db_handle)
+
+
+@shared_task(bind=True)
+def generate_thumbnails(
+    self, tree: str, user_id: str, handles: Optional[List[str]] = None
+) -> int:
+    """Render missing thumbnails of media objects into the thumbnail cache."""
+    return _generate_thumbnails(
+        tree=tree,
+        user_id=user_id,
+        handles=handles,
+        progress_cb=progress_callback_count(self, title="Generating thumbnails..."),
+    )
+
+
+def schedule_thumbnails(
+    tree: str, user_id: str, handles: Optional[List[str]] = None
+) -> None:
+    """Pre-generate thumbnails in the background.
+
+    Does nothing without a task queue, as rendering the thumbnails would
+    block the request instead.
+    """
+    if not current_app.config["CELERY_CONFIG"]:
+        return
+    if not current_app.config["THUMBNAIL_PREGENERATE_SIZES"]:
+        return
+    run_task(generate_thumbnails, tree=tree, user_id=user_id, handles=handles)
+
+
+def _generate_map_tiles(
+    tree: str,
+    user_id: str,
+    handles: Optional[List[str]] = None,
+    progress_cb: Optional[Callable] = None,
+) -> int:
+    """Render missing map tiles of georeferenced media into the thumbnail cache."""
+    db_handle = get_db_outside_request(
+        tree=tree, view_private=True, readonly=True, user_id=user_id
+    )
+    try:
+        return pregenerate_map_tiles(
+            db_handle, tree=tree, handles=handles, progress_cb=progress_cb
+        )
+    finally:
+        close_db(db_handle)
+
+
+@shared_task(bind=True)
+def generate_map_tiles(
+    self, tree: str, user_id: str, handles: Optional[List[str]] = None
+) -> int:
+    """Render missing map tiles of georeferenced media into the thumbnail cache."""
+    return _generate_map_tiles(
+        tree=tree,
+        user_id=user_id,
+        handles=handles,
+        progress_cb=progress_callback_count(self, title="Generating map tiles..."),
+    )
+
+
+def schedule_map_tiles(
+    tree: str, user_id: str, handles: Optional[List[str]] = None
+) -> None:
+    """Pre-render the map tiles of georeferenced media in the background.
+
+    Does nothing without a task queue, as rendering the tiles would block
+    the request instead.
+    """
+    if not current_app.config["CELERY_CONFIG"]:
+        return
+    run_task(generate_map_tiles, tree=tree, user_id=user_id, handles=handles)
+
+
 @shared_task()
 def media_ocr(
     tree: str,
@@ -595,14 +713,19 @@ def check_repair_database(self, tree: str, user_id: str):
         close_db(db_handle)
 
 
-@shared_task()
+@shared_task(bind=True)
 def verify_database(
+    self,
     tree: str,
     user_id: str,
     options: Optional[Dict] = None,
     locale: Optional[str] = None,
 ):
-    """Run genealogical data verification checks against a database."""
+    """Run genealogical data verification checks against a database.
+
+    The findings are stored for paginated retrieval; returns the result ID
+    and the number of findings.
+    """
     translate = None
     if locale:
         gramps_locale = get_locale_for_language(locale, default=True)
@@ -611,7 +734,13 @@ def verify_database(
         tree=tree, view_private=True, readonly=True, user_id=user_id
     )
     try:
-        return run_verify(db_handle, options, translate=translate)
+        return run_verify_to_store(
+            db_handle,
+            tree=tree,
+            options=options,
+            translate=translate,
+            progress_cb=progress_callback_count(self, title="Verifying data..."),
+        )
     finally:
         close_db(db_handle)
 
@@ -656,6 +785,7 @@ def delete_objects(
         progress_cb=progress_callback_count(
             self, title="Updating full-text search index..."
         ),
+        full_diff=True,
     )
     if current_app.config.get("VECTOR_EMBEDDING_MODEL"):
         _search_reindex_incremental(
@@ -665,6 +795,7 @@ def delete_objects(
             progress_cb=progress_callback_count(
                 self, title="Updating semantic search index..."
             ),
+            full_diff=True,
         )
 
 
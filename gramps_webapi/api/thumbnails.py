@@ -0,0 +1,358 @@
+#
+# Gramps Web API - A RESTful API for the Gramps genealogy program
+#
+# Copyright (C) 2026      Gramps Web contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Pre-generation of thumbnails and map tiles into the thumbnail cache."""
+
+from __future__ import annotations
+
+import io
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from billiard.pool import ApplyResult
+from flask import current_app, send_file
+from gramps.gen.db.base import DbReadBase
+from gramps.gen.errors import HandleError
+from gramps.gen.lib import Media
+from PIL import Image
+from werkzeug.exceptions import HTTPException
+
+from ..const import API_PREFIX, MIME_AVIF
+from ..process_pool import ProcessPool
+from .cache import (
+    get_cached_native_max_zoom,
+    has_cached_map_tile,
+    hash_args,
+    set_cached_map_tile,
+    set_cached_native_max_zoom,
+    thumbnail_cache,
+    thumbnail_cache_key,
+)
+from .file import FileHandler, get_map_bounds
+from .image import (
+    ThumbnailHandler,
+    abort_on_image_errors,
+    crop_image,
+    get_map_tile_pyramid,
+    get_map_tile_range,
+    get_native_max_zoom,
+    image_thumbnail,
+    save_image_buffer,
+    thumbnail_decode_size,
+)
+from .media import get_media_handler
+from .util import get_db_manager
+
+# rectangle of a media reference that shows the whole image
+FULL_RECT = (0, 0, 100, 100)
+
+# object classes with media references
+MEDIA_REF_CLASSES = ["Person", "Family", "Event", "Place", "Source", "Citation"]
+
+Rect = Tuple[int, int, int, int]
+
+
+@dataclass(frozen=True)
+class ThumbnailSpec:
+    """A thumbnail of a media file, optionally of a cropped region."""
+
+    size: int
+    square: bool
+    rect: Optional[Rect] = None
+
+    def path(self, handle: str) -> str:
+        """Return the path of the endpoint serving the thumbnail."""
+        if self.rect is None:
+            return f"{API_PREFIX}/media/{handle}/thumbnail/{self.size}"
+        x1, y1, x2, y2 = self.rect
+        return (
+            f"{API_PREFIX}/media/{handle}/cropped/{x1}/{y1}/{x2}/{y2}"
+            f"/thumbnail/{self.size}"
+        )
+
+    def query_args(self) -> List[Tuple[str, str]]:
+        """Return the query arguments the frontend requests the thumbnail with."""
+        return [("square", "true" if self.square else "false")]
+
+
+def has_thumbnailer(mime: str) -> bool:
+    """Whether thumbnails can be made for a MIME type."""
+    return (
+        mime.startswith("image/")
+        or mime.startswith("video/")
+        or mime in ThumbnailHandler.MIME_NO_IMAGE
+    )
+
+
+def get_media_rects(db_handle: DbReadBase, handle: str) -> List[Rect]:
+    """Return the regions of a media object shown by media references."""
+    rects = set()
+    # notes can link to media objects without a media reference
+    for class_name, ref_handle in db_handle.find_backlink_handles(
+        handle, include_classes=MEDIA_REF_CLASSES
+    ):
+        try:
+            obj = db_handle.method("get_%s_from_handle", class_name)(ref_handle)
+        except HandleError:
+            continue
+        for media_ref in obj.get_media_list():
+            if media_ref.ref != handle:
+                continue
+            rect = media_ref.get_rectangle()
+            if not rect or tuple(rect) == FULL_RECT:
+                continue
+            x1, y1, x2, y2 = rect
+            if x1 < x2 and y1 < y2:
+                rects.add((x1, y1, x2, y2))
+    return sorted(rects)
+
+
+def get_thumbnail_specs(
+    db_handle: DbReadBase, handle: str, sizes: Iterable[Sequence]
+) -> List[ThumbnailSpec]:
+    """Return the thumbnails to render for a media object.
+
+    `sizes` are (size, square) pairs. Every size is rendered for the whole
+    image and for each region shown by a media reference.
+    """
+    rects: List[Optional[Rect]] = [None]
+    rects += get_media_rects(db_handle, handle)
+    return [
+        ThumbnailSpec(size=int(size), square=bool(square), rect=rect)
+        for rect in rects
+        for size, square in sizes
+    ]
+
+
+def render_thumbnails(
+    data: bytes, mime: str, specs: List[ThumbnailSpec]
+) -> List[Tuple[ThumbnailSpec, bytes]]:
+    """Render AVIF thumbnails of a media file.
+
+    The file is decoded only once for all thumbnails, at the lowest
+    resolution sufficient for all of them. Returns an empty list if the file
+    cannot be thumbnailed.
+    """
+    decode_sizes = [
+        thumbnail_decode_size(spec.size, *(spec.rect or FULL_RECT)) for spec in specs
+    ]
+    decode_size = None
+    if decode_sizes and None not in decode_sizes:
+        decode_size = max(size for size in decode_sizes if size is not None)
+    try:
+        image = ThumbnailHandler(io.BytesIO(data), mime).get_image(size=decode_size)
+        results = []
+        for spec in specs:
+            img = image
+            if spec.rect is not None:
+                img = crop_image(img, *spec.rect)
+            img = image_thumbnail(image=img, size=spec.size, square=spec.square)
+            results.append((spec, save_image_buffer(img).read()))
+    except HTTPException:
+        # unsupported, corrupt, or a tool for extracting an image is missing
+        return []
+    return results
+
+
+def pregenerate_thumbnails(
+    db_handle: DbReadBase,
+    tree: str,
+    sizes: Iterable[Sequence],
+    handles: Optional[Iterable[str]] = None,
+    workers: int = 1,
+    progress_cb: Optional[Callable] = None,
+) -> int:
+    """Render missing thumbnails of media objects into the thumbnail cache.
+
+    Thumbnails already in the cache are skipped, so an interrupted run
+    continues where it stopped when started again. If `handles` is None,
+    all media objects are processed. If `workers` is larger than 1, the
+    thumbnails are rendered by that many worker processes.
+
+    Returns the number of thumbnails rendered.
+    """
+    if handles is None:
+        handles = db_handle.iter_media_handles()
+    handles = list(handles)
+    total = len(handles)
+    sizes = list(sizes)
+    dirname = get_db_manager(tree).dirname
+    media_handler = get_media_handler(db_handle, tree=tree)
+    max_bytes = current_app.config["MAX_THUMBNAIL_FILE_BYTES"]
+
+    def cache_key(handle: str, checksum: str, spec: ThumbnailSpec) -> str:
+        return thumbnail_cache_key(
+            checksum, spec.path(handle), hash_args(spec.query_args()), dirname
+        )
+
+    def iter_jobs() -> Iterator[Tuple[int, Optional[Media], List[ThumbnailSpec]]]:
+        for i, handle in enumerate(handles):
+            try:
+                media = db_handle.get_media_from_handle(handle)
+            except HandleError:
+                yield i, None, []
+                continue
+            if not has_thumbnailer(media.mime):
+                yield i, None, []
+                continue
+            specs = [
+                spec
+                for spec in get_thumbnail_specs(db_handle, handle, sizes)
+                if not thumbnail_cache.has(cache_key(handle, media.checksum, spec))
+            ]
+            yield i, media, specs
+
+    def read_file(media: Media) -> Optional[bytes]:
+        file_handler = media_handler.get_file_handler(media.handle, db_handle)
+        if not file_handler.file_exists():
+            return None
+        if file_handler.get_file_size() > max_bytes:
+            return None
+        return file_handler.get_file_object().read()
+
+    rendered = 0
+    prev: int | None = None
+
+    def store(
+        i: int, media: Optional[Media], results: List[Tuple[ThumbnailSpec, bytes]]
+    ) -> None:
+        nonlocal rendered, prev
+        if media is not None and results:
+            # the cached value is the response of the thumbnail endpoint
+            with current_app.test_request_context():
+                for spec, data in results:
+                    response = send_file(io.BytesIO(data), mimetype=MIME_AVIF)
+                    thumbnail_cache.set(
+                        cache_key(media.handle, media.checksum, spec), response
+                    )
+            rendered += len(results)
+        if progress_cb:
+            progress_cb(current=i, total=total, prev=prev)
+        prev = i
+
+    if workers <= 1:
+        for i, media, specs in iter_jobs():
+            data = read_file(media) if media and specs else None
+            results = (
+                render_thumbnails(data, media.mime, specs) if media and data else []
+            )
+            store(i, media, results)
+        return rendered
+
+    def collect(i: int, media: Optional[Media], result: Optional[ApplyResult]) -> None:
+        store(i, media, result.get() if result else [])
+
+    with ProcessPool(workers) as pool:
+        pending: List[Tuple[int, Optional[Media], Optional[ApplyResult]]] = []
+        for i, media, specs in iter_jobs():
+            data = read_file(media) if media and specs else None
+            result = None
+            if media and data:
+                result = pool.submit(render_thumbnails, data, media.mime, specs)
+            pending.append((i, media, result))
+            # at most two files per worker are held in memory
+            if len(pending) >= 2 * workers:
+                collect(*pending.pop(0))
+        for job in pending:
+            collect(*job)
+    return rendered
+
+
+def has_map_tile_pyramid(checksum: str, bounds: list) -> bool:
+    """Whether the map tiles of a georeferenced image were pre-rendered.
+
+    The tiles are rendered from the lowest to the highest zoom level, so
+    the last tile of the highest level is checked.
+    """
+    max_zoom = get_cached_native_max_zoom(checksum, bounds)
+    if max_zoom is None:
+        return False
+    tile_range = get_map_tile_range(bounds, max_zoom)
+    if tile_range is None:
+        return True
+    _, _, x_max, y_max = tile_range
+    return has_cached_map_tile(checksum, bounds, max_zoom, x_max, y_max)
+
+
+def render_map_tile_pyramid(
+    file_handler: FileHandler, bounds: list, checksum: str
+) -> int:
+    """Render the map tiles of a georeferenced image into the thumbnail cache.
+
+    All tiles up to the native resolution of the image are rendered from a
+    single decoded copy. Returns the number of tiles rendered.
+    """
+    rendered = 0
+    with abort_on_image_errors(), Image.open(file_handler.get_file_object()) as img:
+        max_zoom = get_native_max_zoom(img.width, img.height, bounds)
+        for z, x, y, tile in get_map_tile_pyramid(img, bounds, max_zoom):
+            data = save_image_buffer(tile, fmt="PNG").read()
+            set_cached_map_tile(checksum, bounds, z, x, y, data)
+            rendered += 1
+    set_cached_native_max_zoom(checksum, bounds, max_zoom)
+    return rendered
+
+
+def pregenerate_map_tiles(
+    db_handle: DbReadBase,
+    tree: str,
+    handles: Optional[Iterable[str]] = None,
+    progress_cb: Optional[Callable] = None,
+) -> int:
+    """Render the map tiles of georeferenced media objects into the cache.
+
+    Media objects without map bounds and images whose tiles were rendered
+    before are skipped. If `handles` is None, all media objects are
+    processed.
+
+    Returns the number of tiles rendered.
+    """
+    if handles is None:
+        handles = db_handle.iter_media_handles()
+    handles = list(handles)
+    total = len(handles)
+    media_handler = get_media_handler(db_handle, tree=tree)
+    max_bytes = current_app.config["MAX_THUMBNAIL_FILE_BYTES"]
+
+    rendered = 0
+    prev: int | None = None
+    for i, handle in enumerate(handles):
+        if progress_cb:
+            progress_cb(current=i, total=total, prev=prev)
+        prev = i
+        try:
+            media = db_handle.get_media_from_handle(handle)
+        except HandleError:
+            continue
+        if not media.mime.startswith("image/"):
+            continue
+        bounds = get_map_bounds(media)
+        if bounds is None or has_map_tile_pyramid(media.checksum, bounds):
+            continue
+        file_handler = media_handler.get_file_handler(handle, db_handle)
+        if not file_handler.file_exists():
+            continue
+        if file_handler.get_file_size() > max_bytes:
+            continue
+        try:
+            rendered += render_map_tile_pyramid(file_handler, bounds, media.checksum)
+        except HTTPException:
+            # corrupt or unsupported image
+            continue
+    return rendered
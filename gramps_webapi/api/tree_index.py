@@ -0,0 +1,163 @@
+#
+# Gramps Web API - A RESTful API for the Gramps genealogy program
+#
+# Copyright (C) 2026      Gramps Web contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Per-process indexes of the objects of all trees, kept up to date on changes."""
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Generic, Mapping, Optional, Protocol, TypeVar
+
+from gramps.gen.db.base import DbReadBase
+from gramps.gen.db.dbconst import CLASS_TO_KEY_MAP
+from gramps.gen.proxy.proxybase import ProxyDbBase
+
+from ..cache_versions import get_version_key
+from .util import iter_object_timestamps
+
+IndexT = TypeVar("IndexT", bound="TreeIndex")
+
+
+class TreeIndex(Protocol):
+    """Index of the objects of one class of a tree.
+
+    The entries map the handles of all objects to tuples starting with
+    their change timestamps.
+    """
+
+    @property
+    def entries(self) -> Mapping[str, tuple]: ...
+
+    def updated(self: IndexT, changes: dict[str, Any]) -> IndexT:
+        """Return an index with changed entries; None marks a deleted object."""
+        ...
+
+
+class TreeIndexCache(Generic[IndexT]):
+    """Per-process indexes of all trees, kept up to date on changes.
+
+    An index is built from the raw data of all objects of `class_name` and
+    updated with the objects changed since, whenever the class version of
+    the tree changes. Subclasses implement `_get_entry` and `_create`.
+    """
+
+    class_name: str
+
+    def __init__(self) -> None:
+        """Initialize self."""
+        self._lock = threading.Lock()
+        # held while building or updating the index of a tree
+        self._tree_locks: dict[str, threading.Lock] = {}
+        self._indexes: dict[str, tuple[str, IndexT]] = {}
+        self._builds = 0
+        self._updates = 0
+        self._hits = 0
+
+    def get(self, db_handle: DbReadBase) -> Optional[IndexT]:
+        """Return the up-to-date index of a database.
+
+        Returns None if changes of the tree cannot be detected. The index
+        includes private objects also behind proxies.
+        """
+        basedb = db_handle.basedb if isinstance(db_handle, ProxyDbBase) else db_handle
+        try:
+            tree_dir = basedb.get_save_path()
+        except AttributeError:
+            return None
+        if not tree_dir:
+            return None
+        version = get_version_key(tree_dir, [self.class_name])
+        if version is None:
+            return None
+        with self._lock:
+            cached = self._indexes.get(tree_dir)
+            if cached is not None and cached[0] == version:
+                self._hits += 1
+                return cached[1]
+            tree_lock = self._tree_locks.setdefault(tree_dir, threading.Lock())
+        # requests for other trees are not blocked while building
+        with tree_lock:
+            with self._lock:
+                cached = self._indexes.get(tree_dir)
+                if cached is not None and cached[0] == version:
+                    self._hits += 1
+                    return cached[1]
+            if cached is None:
+                index = self._build(basedb)
+            else:
+                index = self._update(basedb, cached[1])
+            with self._lock:
+                if cached is None:
+                    self._builds += 1
+                else:
+                    self._updates += 1
+                self._indexes[tree_dir] = (version, index)
+            return index
+
+    def _get_entry(self, data: dict[str, Any]) -> tuple:
+        """Return the entry of an object from its raw data."""
+        raise NotImplementedError
+
+    def _create(self, entries: dict[str, Any]) -> IndexT:
+        """Return an index of the entries of all objects."""
+        raise NotImplementedError
+
+    def _build(self, db_handle: DbReadBase) -> IndexT:
+        """Build the index from the raw data of all objects."""
+        return self._create(
+            {
+                handle: self._get_entry(data)
+                for handle, data in db_handle._iter_raw_data(
+                    CLASS_TO_KEY_MAP[self.class_name]
+                )
+            }
+        )
+
+    def _update(self, db_handle: DbReadBase, index: IndexT) -> IndexT:
+        """Update the index reading only objects changed since it was built."""
+        get_raw_data = db_handle.method("get_raw_%s_data", self.class_name)
+        assert get_raw_data is not None  # for type checker
+        changes: dict[str, Optional[tuple]] = {}
+        handles = set()
+        for handle, change, _ in iter_object_timestamps(db_handle, self.class_name):
+            handles.add(handle)
+            entry = index.entries.get(handle)
+            if entry is not None and entry[0] == change:
+                continue
+            data = get_raw_data(handle)
+            if data is not None:
+                changes[handle] = self._get_entry(data)
+        for handle in index.entries.keys() - handles:
+            changes[handle] = None
+        return index.updated(changes)
+
+    def clear(self) -> None:
+        """Remove all indexes."""
+        with self._lock:
+            self._indexes.clear()
+
+    def stats(self) -> dict[str, int]:
+        """Return the index counters."""
+        with self._lock:
+            return {
+                "builds": self._builds,
+                "updates": self._updates,
+                "hits": self._hits,
+                "indexes": len(self._indexes),
+            }
@@ -22,7 +22,6 @@
 
 from __future__ import annotations
 
-import io
 import json
 import logging
 import os
@@ -31,7 +30,7 @@ import socket
 from email.message import EmailMessage
 from email.utils import formatdate, make_msgid
 from http import HTTPStatus
-from typing import Any, BinaryIO, NoReturn, Optional, Sequence
+from typing import Any, BinaryIO, Iterator, NoReturn, Optional, Sequence
 
 import gramps.gen.lib
 from celery import Task
@@ -53,6 +52,7 @@ from gramps.gen.const import GRAMPS_LOCALE
 from gramps.gen.db.base import DbReadBase
 from gramps.gen.db.dbconst import (
     CITATION_KEY,
+    CLASS_TO_KEY_MAP,
     DBBACKEND,
     EVENT_KEY,
     FAMILY_KEY,
@@ -88,6 +88,7 @@ from werkzeug.security import safe_join
 
 from ..auth import config_get, get_tree, get_tree_usage, set_tree_usage
 from ..auth.const import PERM_VIEW_PRIVATE
+from ..cache_versions import acknowledge_meta_mtime, get_meta_mtime
 from ..const import (
     DB_CONFIG_ALLOWED_KEYS,
     LOCALE_MAP,
@@ -95,6 +96,7 @@ from ..const import (
     TREE_MULTI,
 )
 from ..dbmanager import WebDbManager
+from ..dbpool import db_pool
 from .auth import has_permissions
 
 
@@ -437,7 +439,7 @@ def get_tree_from_jwt_or_fail() -> str:
 
 
 def get_db_outside_request(
-    tree: str, view_private: bool, readonly: bool, user_id: str
+    tree: str, view_private: bool, readonly: bool, user_id: str, pooled: bool = True
 ) -> DbReadBase:
     """Open the database and get the current instance.
 
@@ -446,11 +448,19 @@ def get_db_outside_request(
     If a user is not authorized to view private records,
     returns a proxy DB instance.
 
+    If `readonly` and `pooled` are true, the handle is checked out of the
+    per-process pool of open databases and must be returned with `close_db`.
+    Pooled handles are only reused by the same thread, so handles opened by
+    short-lived threads are better not pooled.
+
     If `readonly` is false, locks the database during the request.
     """
     dbmgr = get_db_manager(tree)
     try:
-        dbstate = dbmgr.get_db(user_id=user_id, readonly=readonly)
+        if readonly and pooled and db_pool.enabled:
+            db = db_pool.acquire(dbmgr, user_id=user_id)
+        else:
+            db = dbmgr.get_db(user_id=user_id, readonly=readonly).db
     except DbUpgradeRequiredError:
         abort_with_message(
             HTTPStatus.INTERNAL_SERVER_ERROR,
@@ -464,17 +474,33 @@ def get_db_outside_request(
             )
         # if we're not authorized to view private records,
         # return a proxy DB instead of the real one
-        return ModifiedPrivateProxyDb(dbstate.db)
-    return dbstate.db
+        return ModifiedPrivateProxyDb(db)
+    return db
 
 
 def close_db(db_handle: DbReadBase) -> None:
-    """Close the connection to the database including the undo log."""
-    db_handle.close()
+    """Close the connection to the database including the undo log.
+
+    Read-only handles checked out of the pool are returned to it instead.
+    """
     if isinstance(db_handle, ProxyDbBase):
-        db_handle.basedb.undodb.close()
+        basedb = db_handle.basedb
     else:
-        db_handle.undodb.close()
+        basedb = db_handle
+    if db_pool.release(basedb):
+        return
+    undodb = basedb.undodb
+    # set if the commits were tracked by the undo database
+    meta_mtime_before = getattr(undodb, "meta_mtime_before_commit", None)
+    tree_dir = basedb.get_save_path()
+    db_handle.close()
+    undodb.close()
+    if meta_mtime_before is not None:
+        # closing a writable database touches its meta data file, but the
+        # request cache versions of the changed classes are already updated
+        acknowledge_meta_mtime(
+            tree_dir, previous=meta_mtime_before, current=get_meta_mtime(tree_dir)
+        )
 
 
 def get_db_handle(readonly: bool = True) -> DbReadBase:
@@ -546,17 +572,21 @@ def get_locale_for_language(
 
 
 def get_buffer_for_file(filename: str, delete=True, not_found=False) -> BinaryIO:
-    """Return binary buffer with file contents."""
+    """Return a binary file object with the file contents.
+
+    The file is not read into memory, so that it can be streamed. If `delete`
+    is true, the file is removed from the file system right away; the open
+    file object stays readable until it is closed.
+    """
     try:
-        with open(filename, "rb") as file_handle:
-            buffer = io.BytesIO(file_handle.read())
+        file_handle = open(filename, "rb")
     except FileNotFoundError:
         if not_found:
             raise FileNotFoundError
         abort_with_message(500, "File not found")
     if delete:
         os.remove(filename)
-    return buffer
+    return file_handle
 
 
 def _resolve_smtp_config(
@@ -803,6 +833,8 @@ def upgrade_gramps_database(tree: str, user_id: str, task: Task | None = None) -
     """Upgrade the Gramps database for a tree."""
     dbmgr = get_db_manager(tree=tree)
     dbmgr.upgrade_if_needed(user_id=user_id, user=UserTaskProgress(task=task))
+    # pooled handles were opened with the old schema
+    db_pool.clear(dbmgr.path)
     dbstate = dbmgr.get_db(user_id=user_id, readonly=True)
     dbstate.db.close()
 
@@ -823,20 +855,224 @@ def get_total_number_of_objects(db_handle: DbReadBase):
     )
 
 
-def get_object_timestamps(db_handle: DbReadBase):
-    """Get a dictionary with change timestamps of all objects in the DB."""
-    d: dict[str, set[tuple[int, float | int]]] = {}
+def _is_sql_backend(db_handle: DbReadBase) -> bool:
+    """Check if the database stores JSON in a single-tree SQLite/PostgreSQL DB."""
+    if not hasattr(db_handle, "dbapi") or not hasattr(db_handle, "serializer"):
+        return False
+    if db_handle.serializer.data_field != "json_data":
+        return False
+    return type(db_handle).__name__ in {"SQLite", "PostgreSQL", "SharedPostgreSQL"}
+
+
+def _iter_object_timestamps_sql(
+    db_handle: DbReadBase, class_name: str, since: float | None
+) -> Iterator[tuple[str, int, bool]]:
+    """Iterate over handle, change, and privacy flag using SQL."""
+    table = class_name.lower()
+    if type(db_handle).__name__ == "SQLite":
+        change = "json_extract(json_data, '$.change')"
+        private = "json_extract(json_data, '$.private')"
+    else:
+        change = "CAST(CAST(json_data AS JSON)->>'change' AS BIGINT)"
+        private = "CAST(json_data AS JSON)->>'private'"
+    conditions = []
+    params: list[Any] = []
+    # shared PostgreSQL stores all trees in the same tables
+    treeid = getattr(db_handle.dbapi, "treeid", None)
+    if treeid is not None:
+        conditions.append("treeid = ?")
+        params.append(treeid)
+    if since is not None:
+        conditions.append(f"{change} >= ?")
+        params.append(since)
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    db_handle.dbapi.execute(
+        f"SELECT handle, {change}, {private} FROM {table}{where}", params
+    )
+    for handle, change_value, private_value in db_handle.dbapi.fetchall():
+        yield handle, int(change_value or 0), private_value in (1, True, "true")
+
+
+def _iter_object_timestamps_proxy(
+    db_handle: DbReadBase, class_name: str
+) -> Iterator[tuple[str, int, bool]]:
+    """Iterate over handle, change, and privacy flag by loading the objects."""
+    iter_method = db_handle.method("iter_%s_handles", class_name)
+    assert iter_method is not None, f"Method iter_{class_name}_handles not found"
+    query_method = db_handle.method("get_%s_from_handle", class_name)
+    for handle in iter_method():
+        obj = query_method(handle)
+        yield handle, obj.change, getattr(obj, "private", False)
+
+
+def iter_object_timestamps(
+    db_handle: DbReadBase, class_name: str, since: float | None = None
+) -> Iterator[tuple[str, int, bool]]:
+    """Iterate over handle, change timestamp, and privacy flag of a class.
+
+    Avoids instantiating the objects: SQLite and PostgreSQL databases are
+    queried directly, other backends are read as raw data. Behind proxies
+    other than the private proxy, the objects are loaded through the proxy.
+
+    If `since` is given, only objects changed at or after that time are
+    included.
+    """
+    skip_private = False
+    if isinstance(db_handle, ModifiedPrivateProxyDb):
+        # the private proxy only hides private primary objects
+        db_handle = db_handle.db
+        skip_private = True
+    if _is_sql_backend(db_handle):
+        rows = _iter_object_timestamps_sql(db_handle, class_name, since)
+    elif isinstance(db_handle, ProxyDbBase):
+        rows = _iter_object_timestamps_proxy(db_handle, class_name)
+    else:
+        obj_key = CLASS_TO_KEY_MAP[class_name]
+        rows = (
+            (handle, data["change"], data.get("private", False))
+            for handle, data in db_handle._iter_raw_data(obj_key)
+        )
+    for handle, change, private in rows:
+        if skip_private and private:
+            continue
+        if since is not None and change < since:
+            continue
+        yield handle, change, private
+
+
+def get_object_timestamps(db_handle: DbReadBase, since: float | None = None):
+    """Get a dictionary with change timestamps of all objects in the DB.
+
+    If `since` is given, only objects changed at or after that time are
+    included.
+    """
+    d: dict[str, set[tuple[str, int]]] = {}
     for class_name in PRIMARY_GRAMPS_OBJECTS:
-        d[class_name] = set()
-        iter_method = db_handle.method("iter_%s_handles", class_name)
-        assert iter_method is not None, f"Method iter_{class_name}_handles not found"
-        for handle in iter_method():
-            query_method = db_handle.method("get_%s_from_handle", class_name)
-            obj = query_method(handle)
-            d[class_name].add((handle, obj.change))
+        d[class_name] = set(
+            (handle, change)
+            for handle, change, _ in iter_object_timestamps(
+                db_handle, class_name, since=since
+            )
+        )
     return d
 
 
+# maximum number of handles per bulk object lookup, to keep the SQL statement bounded
+BULK_LOOKUP_CHUNK_SIZE = 500
+
+# functions removing private data from objects, as used by the private proxy
+_PRIVATE_SANITIZERS = {
+    "Person": sanitize_person,
+    "Family": sanitize_family,
+    "Event": sanitize_event,
+    "Place": sanitize_place,
+    "Citation": sanitize_citation,
+    "Source": sanitize_source,
+    "Repository": sanitize_repository,
+    "Media": _sanitize_media_patched,
+}
+
+
+def _iter_objects_sql(
+    db_handle: DbReadBase, class_name: str, handles: Sequence[str]
+) -> Iterator[tuple[str, Any]]:
+    """Iterate over handles and objects using one SQL query per chunk."""
+    table = class_name.lower()
+    obj_class = getattr(gramps.gen.lib, class_name)
+    serializer = db_handle.serializer
+    # shared PostgreSQL stores all trees in the same tables
+    treeid = getattr(db_handle.dbapi, "treeid", None)
+    for start in range(0, len(handles), BULK_LOOKUP_CHUNK_SIZE):
+        chunk = list(handles[start : start + BULK_LOOKUP_CHUNK_SIZE])
+        where = f"handle IN ({', '.join('?' for _ in chunk)})"
+        params: list[Any] = chunk
+        if treeid is not None:
+            where += " AND treeid = ?"
+            params = chunk + [treeid]
+        db_handle.dbapi.execute(
+            f"SELECT handle, {serializer.data_field} FROM {table} WHERE {where}",
+            params,
+        )
+        for handle, json_data in db_handle.dbapi.fetchall():
+            data = serializer.string_to_data(json_data)
+            yield handle, serializer.data_to_object(data, obj_class)
+
+
+def get_objects_from_handles(
+    db_handle: DbReadBase, class_name: str, handles: Sequence[str]
+) -> dict[str, Any]:
+    """Get a dictionary of handles to objects for handles of one class.
+
+    SQLite and PostgreSQL databases, also behind (nested) private proxies,
+    are queried in bulk; otherwise, the objects are fetched one by one.
+    Handles of missing (or, behind the private proxy, private) objects are
+    left out.
+    """
+    class_name = class_name.capitalize()
+    if not handles:
+        return {}
+    base_db = db_handle
+    sanitize = None
+    # guests get a private proxy around the private proxy of the request
+    while isinstance(base_db, PrivateProxyDb):
+        base_db = base_db.db
+        sanitize = _PRIVATE_SANITIZERS.get(class_name)
+    if not _is_sql_backend(base_db):
+        query_method = db_handle.method("get_%s_from_handle", class_name)
+        assert query_method is not None  # type checker
+        objects = {}
+        for handle in handles:
+            try:
+                obj = query_method(handle)
+            except HandleError:
+                continue
+            if obj is not None:
+                objects[handle] = obj
+        return objects
+    objects = {}
+    for handle, obj in _iter_objects_sql(base_db, class_name, handles):
+        if base_db is not db_handle:
+            if getattr(obj, "private", False):
+                continue
+            if sanitize is not None:
+                obj = sanitize(base_db, obj)
+        objects[handle] = obj
+    return objects
+
+
+def get_backlink_handles(
+    db_handle: DbReadBase, handles: Sequence[str], include_classes: Sequence[str]
+) -> set[tuple[str, str]]:
+    """Get the class names and handles of objects referencing any of the handles.
+
+    The references are looked up in the base database, so behind proxies,
+    private objects are included. SQLite and PostgreSQL databases are
+    queried in bulk; otherwise, the references are looked up one by one.
+    """
+    base_db = db_handle.basedb if isinstance(db_handle, ProxyDbBase) else db_handle
+    backlinks = set()
+    if not _is_sql_backend(base_db):
+        for handle in handles:
+            backlinks.update(base_db.find_backlink_handles(handle, include_classes))
+        return backlinks
+    # shared PostgreSQL stores all trees in the same tables
+    treeid = getattr(base_db.dbapi, "treeid", None)
+    for start in range(0, len(handles), BULK_LOOKUP_CHUNK_SIZE):
+        chunk = list(handles[start : start + BULK_LOOKUP_CHUNK_SIZE])
+        where = f"ref_handle IN ({', '.join('?' for _ in chunk)})"
+        params: list[Any] = chunk
+        if treeid is not None:
+            where += " AND treeid = ?"
+            params = chunk + [treeid]
+        base_db.dbapi.execute(
+            f"SELECT obj_class, obj_handle FROM reference WHERE {where}", params
+        )
+        for obj_class, obj_handle in base_db.dbapi.fetchall():
+            if obj_class in include_classes:
+                backlinks.add((obj_class, obj_handle))
+    return backlinks
+
+
 def get_logger() -> logging.Logger:
     """Get an appropriate logger instance."""
     if has_app_context() and current_app.logger:
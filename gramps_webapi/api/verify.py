@@ -0,0 +1,366 @@
+#
+# Gramps Web API - A RESTful API for the Gramps genealogy program
+#
+# Copyright (C) 2026      Gramps Web contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Data verification runs and their paginated result store.
+
+The untranslated findings of the last verification of a tree are kept
+together with the versions of the tree they belong to. The next
+verification with the same options only re-checks the people and families
+changed since then, according to the undo database, and their immediate
+relatives.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import sqlite3
+import time
+import uuid
+from contextlib import closing
+from functools import partial
+from typing import Any, Callable, Collection, Dict, Iterable, List, Optional, Tuple
+
+from flask import current_app
+from gramps.gen.config import config
+from gramps.gen.db.base import DbReadBase
+from gramps.gen.lib.date import Today
+from gramps.gen.proxy.proxybase import ProxyDbBase
+
+from ..cache_versions import get_version_key
+from ..dbmanager import WebDbManager
+from ..undodb import DbUndoSQLWeb
+from ..verify_lib import (
+    DEFAULT_OPTIONS,
+    VerifyRunner,
+    get_affected_handles,
+    iter_verify,
+    translate_results,
+)
+from .util import get_db_manager
+
+# findings written to the result store at once
+RESULT_BATCH_SIZE = 500
+
+# seconds after which stored results are removed
+RESULT_MAX_AGE = 24 * 3600
+
+RESULT_ID_REGEXP = re.compile(r"^[a-f0-9]{32}$")
+
+# stored results, including those left over by an interrupted run
+RESULT_FILENAME_REGEXP = re.compile(r"^[a-f0-9]{32}\.sqlite(\.tmp)?$")
+
+# file keeping the findings of the last verification of a tree
+STATE_FILENAME = "state.sqlite"
+
+# object classes the findings depend on
+VERIFY_CLASSES = ("Event", "Family", "Person")
+
+# changed objects up to which a verification only re-checks those objects
+MAX_INCREMENTAL_CHANGES = 5000
+
+
+def _open_worker_db(dbdir: str, dbmgr: WebDbManager) -> DbReadBase:
+    """Open the read-only database of a parallel verification worker."""
+    config.set("database.path", dbdir)
+    return dbmgr.get_db(readonly=True).db
+
+
+def _get_result_dir(tree: str) -> str:
+    """Get the directory of the stored results of a tree."""
+    verify_dir = current_app.config.get("VERIFY_DIR")
+    assert verify_dir is not None, "VERIFY_DIR not set"  # mypy
+    return os.path.join(verify_dir, tree)
+
+
+def _get_result_path(tree: str, result_id: str) -> str:
+    """Get the path of stored results."""
+    return os.path.join(_get_result_dir(tree), f"{result_id}.sqlite")
+
+
+def remove_old_results(tree: str) -> None:
+    """Remove the stored results of a tree older than `RESULT_MAX_AGE`."""
+    result_dir = _get_result_dir(tree)
+    if not os.path.isdir(result_dir):
+        return
+    for file_name in os.listdir(result_dir):
+        # the state of the last verification is kept until it is replaced
+        if not RESULT_FILENAME_REGEXP.match(file_name):
+            continue
+        path = os.path.join(result_dir, file_name)
+        try:
+            if os.path.getmtime(path) < time.time() - RESULT_MAX_AGE:
+                os.remove(path)
+        except FileNotFoundError:
+            # removed by a concurrent run
+            continue
+
+
+def store_results(tree: str, results: Iterable[Dict[str, Any]]) -> Tuple[str, int]:
+    """Write findings to a new result store as they are produced.
+
+    The store becomes visible only once all findings are written. Returns
+    the result ID and the number of findings.
+    """
+    result_dir = _get_result_dir(tree)
+    os.makedirs(result_dir, exist_ok=True)
+    result_id = uuid.uuid4().hex
+    path = _get_result_path(tree, result_id)
+    tmp_path = f"{path}.tmp"
+    count = 0
+    try:
+        with closing(sqlite3.connect(tmp_path)) as conn:
+            conn.execute(
+                "CREATE TABLE results (id INTEGER PRIMARY KEY, data TEXT NOT NULL)"
+            )
+            batch: List[Tuple[str]] = []
+            for result in results:
+                batch.append((json.dumps(result, ensure_ascii=False),))
+                if len(batch) >= RESULT_BATCH_SIZE:
+                    conn.executemany("INSERT INTO results (data) VALUES (?)", batch)
+                    count += len(batch)
+                    batch = []
+            conn.executemany("INSERT INTO results (data) VALUES (?)", batch)
+            count += len(batch)
+            conn.commit()
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return result_id, count
+
+
+def get_results(
+    tree: str, result_id: str, page: int = 0, pagesize: int = 20
+) -> Optional[Tuple[List[Dict[str, Any]], int]]:
+    """Get a page of stored findings and their total number.
+
+    If `page` is 0, all findings are returned. Returns None if the results
+    do not exist.
+    """
+    if not RESULT_ID_REGEXP.match(result_id):
+        return None
+    path = _get_result_path(tree, result_id)
+    if not os.path.isfile(path):
+        return None
+    if page > 0:
+        offset, limit = (page - 1) * pagesize, pagesize
+    else:
+        offset, limit = 0, -1
+    with closing(sqlite3.connect(f"file:{path}?mode=ro", uri=True)) as conn:
+        # the IDs are assigned consecutively from 1
+        (total,) = conn.execute("SELECT COUNT(*) FROM results").fetchone()
+        rows = conn.execute(
+            "SELECT data FROM results WHERE id > ? ORDER BY id LIMIT ?",
+            (offset, limit),
+        ).fetchall()
+    return [json.loads(data) for (data,) in rows], total
+
+
+def _get_state_path(tree: str) -> str:
+    """Get the path of the findings of the last verification of a tree."""
+    return os.path.join(_get_result_dir(tree), STATE_FILENAME)
+
+
+def _get_state(db_handle: DbReadBase, options: Optional[Dict]) -> Optional[Dict]:
+    """Get the state of the tree the findings of a verification belong to.
+
+    Returns None if changes of the tree cannot be tracked.
+    """
+    basedb = db_handle.basedb if isinstance(db_handle, ProxyDbBase) else db_handle
+    undodb = getattr(basedb, "undodb", None)
+    if not isinstance(undodb, DbUndoSQLWeb):
+        return None
+    tree_dir = basedb.get_save_path()
+    # the base version changes with changes not recorded in the undo database
+    base = get_version_key(tree_dir, [])
+    version = get_version_key(tree_dir, VERIFY_CLASSES)
+    if base is None or version is None:
+        return None
+    # read after the versions, so that no change in between is missed
+    transaction_id, _ = undodb.get_transactions_state()
+    opts = {**DEFAULT_OPTIONS, **(options or {}), "today": Today().get_sort_value()}
+    return {
+        "base": base,
+        "version": version,
+        "transaction_id": str(transaction_id or 0),
+        "options": json.dumps(opts, sort_keys=True),
+    }
+
+
+def _load_state(tree: str) -> Optional[Tuple[Dict[str, str], List[Dict[str, Any]]]]:
+    """Load the state and findings of the last verification of a tree."""
+    path = _get_state_path(tree)
+    if not os.path.isfile(path):
+        return None
+    with closing(sqlite3.connect(f"file:{path}?mode=ro", uri=True)) as conn:
+        state = dict(conn.execute("SELECT key, value FROM state").fetchall())
+        rows = conn.execute("SELECT data FROM findings ORDER BY id").fetchall()
+    return state, [json.loads(data) for (data,) in rows]
+
+
+def _iter_saving_state(
+    tree: str, state: Dict[str, str], findings: Iterable[Dict[str, Any]]
+) -> Iterable[Dict[str, Any]]:
+    """Pass on untranslated findings while keeping them with their state.
+
+    The kept findings are replaced only once all findings are passed on.
+    """
+    path = _get_state_path(tree)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    try:
+        with closing(sqlite3.connect(tmp_path)) as conn:
+            conn.execute("CREATE TABLE state (key TEXT PRIMARY KEY, value TEXT)")
+            conn.execute(
+                "CREATE TABLE findings (id INTEGER PRIMARY KEY, data TEXT NOT NULL)"
+            )
+            conn.executemany("INSERT INTO state VALUES (?, ?)", state.items())
+            batch: List[Tuple[str]] = []
+            for finding in findings:
+                batch.append((json.dumps(finding, ensure_ascii=False),))
+                if len(batch) >= RESULT_BATCH_SIZE:
+                    conn.executemany("INSERT INTO findings (data) VALUES (?)", batch)
+                    batch = []
+                yield finding
+            conn.executemany("INSERT INTO findings (data) VALUES (?)", batch)
+            conn.commit()
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def merge_findings(
+    old_findings: Iterable[Dict[str, Any]],
+    new_findings: Iterable[Dict[str, Any]],
+    checked: Dict[str, Collection[str]],
+) -> Iterable[Dict[str, Any]]:
+    """Replace the findings of re-checked objects in previous findings.
+
+    `checked` holds the handles of the re-checked objects by object type.
+    Findings of people come before those of families; within each, the
+    previous order is kept and findings of new objects come last.
+    """
+    by_handle: Dict[str, Dict[str, List[Dict[str, Any]]]] = {
+        "Person": {},
+        "Family": {},
+    }
+    for finding in old_findings:
+        by_type = by_handle[finding["object_type"]]
+        by_type.setdefault(finding["object_handle"], []).append(finding)
+    for object_type, handles in checked.items():
+        by_type = by_handle[object_type]
+        for handle in handles:
+            if handle in by_type:
+                by_type[handle] = []
+    for finding in new_findings:
+        by_type = by_handle[finding["object_type"]]
+        by_type.setdefault(finding["object_handle"], []).append(finding)
+    for by_type in by_handle.values():
+        for findings in by_type.values():
+            yield from findings
+
+
+def _get_incremental_findings(
+    db_handle: DbReadBase, tree: str, state: Dict[str, str]
+) -> Optional[Iterable[Dict[str, Any]]]:
+    """Get untranslated findings by re-checking only changed objects.
+
+    Returns None if the whole tree needs to be checked.
+    """
+    previous = _load_state(tree)
+    if previous is None:
+        return None
+    old_state, old_findings = previous
+    if old_state.get("base") != state["base"]:
+        return None
+    if old_state.get("options") != state["options"]:
+        return None
+    if old_state.get("version") == state["version"]:
+        return old_findings
+    basedb = db_handle.basedb if isinstance(db_handle, ProxyDbBase) else db_handle
+    changed = basedb.undodb.get_changed_handles(
+        after_id=int(old_state["transaction_id"])
+    )
+    changed_count = sum(len(changed.get(name, ())) for name in VERIFY_CLASSES)
+    if changed_count > MAX_INCREMENTAL_CHANGES:
+        return None
+    people, families = get_affected_handles(
+        db_handle,
+        person_handles=changed.get("Person", ()),
+        family_handles=changed.get("Family", ()),
+        event_handles=changed.get("Event", ()),
+    )
+    opts = json.loads(state["options"])
+    today = opts.pop("today")
+    runner = VerifyRunner(db_handle)
+    new_findings = runner.check_shard(
+        "Person",
+        [handle for handle in sorted(people) if db_handle.has_person_handle(handle)],
+        opts,
+        today,
+    )
+    new_findings += runner.check_shard(
+        "Family",
+        [handle for handle in sorted(families) if db_handle.has_family_handle(handle)],
+        opts,
+        today,
+    )
+    return merge_findings(
+        old_findings, new_findings, {"Person": people, "Family": families}
+    )
+
+
+def run_verify_to_store(
+    db_handle: DbReadBase,
+    tree: str,
+    options: Optional[Dict] = None,
+    translate: Optional[Callable[[str], str]] = None,
+    progress_cb: Optional[Callable] = None,
+) -> Dict[str, Any]:
+    """Verify a tree and stream the findings into a new result store.
+
+    If the tree was verified before with the same options, only the
+    objects changed since then and their relatives are checked. Otherwise,
+    with `VERIFY_WORKERS` larger than 1, people and families are checked
+    by that many worker processes. Returns the result ID and the number of
+    findings.
+    """
+    remove_old_results(tree)
+    state = _get_state(db_handle, options)
+    results = None
+    if state is not None:
+        results = _get_incremental_findings(db_handle, tree, state)
+    if results is None:
+        dbmgr = get_db_manager(tree)
+        results = iter_verify(
+            db_handle,
+            options,
+            # findings are kept untranslated and translated when stored
+            translate=lambda message: message,
+            workers=current_app.config["VERIFY_WORKERS"],
+            open_db=partial(_open_worker_db, dbmgr.dbdir, dbmgr),
+            progress_cb=progress_cb,
+        )
+    if state is not None:
+        results = _iter_saving_state(tree, state, results)
+    result_id, count = store_results(tree, translate_results(results, translate))
+    return {"id": result_id, "count": count}
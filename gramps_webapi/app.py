@@ -58,6 +58,8 @@ from .auth.oidc import init_oidc
 from .config import DefaultConfig, DefaultConfigJWT
 from .const import API_PREFIX, ENV_CONFIG_FILE, TREE_MULTI, VERSION
 from .dbmanager import WebDbManager
+from .dbpool import db_pool
+from .object_cache import object_cache
 from .sentry import init_sentry
 from .util.celery import create_celery
 
@@ -178,6 +180,9 @@ def create_app(config: Optional[Dict[str, Any]] = None, config_from_env: bool =
     # load JWT default settings
     app.config.from_object(DefaultConfigJWT)
 
+    db_pool.max_idle = app.config["DB_POOL_MAX_IDLE"]
+    object_cache.max_objects = app.config["OBJECT_CACHE_MAX_OBJECTS"]
+
     # instantiate JWT manager
     JWTManager(app)
 
@@ -365,7 +370,10 @@ def create_app(config: Optional[Dict[str, Any]] = None, config_from_env: bool =
 
     @app.teardown_appcontext
     def close_db_connection(exception) -> None:
-        """Close the Gramps database after every request."""
+        """Close the Gramps database after every request.
+
+        Read-only handles are returned to the pool instead.
+        """
         db = g.pop("db", None)
         if db:
             close_db(db)
@@ -0,0 +1,383 @@
+#
+# Gramps Web API - A RESTful API for the Gramps genealogy program
+#
+# Copyright (C) 2026      Gramps Web contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""File system cache backend bounded by size with least recently used eviction.
+
+Use it by setting ``CACHE_TYPE`` to
+``gramps_webapi.cache_backend.LRUFileSystemCache`` and ``CACHE_MAX_BYTES``
+to the maximum total size of the cached values.
+
+Every value is stored in its own file. An SQLite index in the cache
+directory records the size and the last access time of every entry, so
+that the processes sharing the directory agree on the total size and
+evict the least recently used entries without scanning the directory.
+"""
+
+from __future__ import annotations
+
+import logging
+import mmap
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import timedelta
+from typing import Any
+
+from flask_caching.backends.base import BaseCache
+
+from .metrics import register_metrics
+
+_LOG = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# name of the index database in the cache directory
+INDEX_NAME = "index.sqlite"
+
+# suffix of the value files
+VALUE_SUFFIX = ".cache"
+
+# eviction frees space down to this fraction of the maximum size, so that it
+# does not run on every write once the cache is full
+EVICTION_TARGET = 0.9
+
+# seconds within which repeated hits of an entry are not written to the index
+ACCESS_RESOLUTION = 1.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    filename TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    expires REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+CREATE TABLE IF NOT EXISTS totals (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    bytes INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO totals (id, bytes) VALUES (0, 0);
+CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries BEGIN
+    UPDATE totals SET bytes = bytes + new.size WHERE id = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries BEGIN
+    UPDATE totals SET bytes = bytes - old.size WHERE id = 0;
+END;
+"""
+
+
+class LRUFileSystemCache(BaseCache):
+    """File system cache bounded by the total size of its values.
+
+    Expired and least recently used entries are evicted when a write
+    exceeds `max_bytes`. Values are read through a memory map and
+    unpickled directly from it.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        default_timeout: int = 300,
+        mode: int = 0o600,
+        metrics_name: str | None = None,
+        **kwargs: Any,
+    ) -> None:
+        # further options of the Flask-Caching version, like
+        # ignore_delete_many_errors, are handled by the base class
+        super().__init__(default_timeout=default_timeout, **kwargs)
+        self._path = cache_dir
+        self._max_bytes = max_bytes
+        self._mode = mode
+        self._index_path = os.path.join(cache_dir, INDEX_NAME)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        connection = self._connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.executescript(_SCHEMA)
+        if metrics_name is None:
+            metrics_name = os.path.basename(os.path.normpath(cache_dir))
+        register_metrics(metrics_name, self.stats)
+
+    @classmethod
+    def factory(cls, app, config, args, kwargs):
+        """Create the cache from the Flask-Caching configuration."""
+        args.insert(0, config["CACHE_DIR"])
+        kwargs.update(max_bytes=int(config.get("CACHE_MAX_BYTES") or DEFAULT_MAX_BYTES))
+        return cls(*args, **kwargs)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return the index connection of the current process and thread."""
+        pid = os.getpid()
+        if getattr(self._local, "pid", None) != pid:
+            # connections must not be shared with forked worker processes
+            connection = sqlite3.connect(
+                self._index_path, timeout=30, isolation_level=None
+            )
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            self._local.pid = pid
+        return self._local.connection
+
+    def _expires(self, timeout: int | timedelta | None) -> float:
+        timeout = self._normalize_timeout(timeout)
+        if timeout == 0:
+            return 0
+        return time.time() + timeout
+
+    def _file_path(self, filename: str) -> str:
+        return os.path.join(self._path, filename)
+
+    def _remove_files(self, filenames: list[str]) -> None:
+        for filename in filenames:
+            try:
+                os.remove(self._file_path(filename))
+            except FileNotFoundError:
+                pass
+            except OSError:
+                _LOG.warning(
+                    "Exception raised while removing cache file", exc_info=True
+                )
+
+    def _read(self, filename: str) -> Any:
+        """Read a value, or return None if its file cannot be read."""
+        try:
+            with open(self._file_path(filename), "rb") as file_handle:
+                with mmap.mmap(
+                    file_handle.fileno(), 0, access=mmap.ACCESS_READ
+                ) as mapped:
+                    return pickle.loads(mapped)
+        except FileNotFoundError:
+            # evicted by another process in the meantime
+            return None
+        except (OSError, ValueError, EOFError, pickle.UnpicklingError):
+            _LOG.warning("Exception raised while reading cache file", exc_info=True)
+            return None
+
+    def _write(self, value: Any) -> tuple[str, int]:
+        """Write a value to a new file and return its name and size."""
+        filename = uuid.uuid4().hex + VALUE_SUFFIX
+        path = self._file_path(filename)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as file_handle:
+            pickle.dump(value, file_handle, pickle.HIGHEST_PROTOCOL)
+            size = file_handle.tell()
+        os.chmod(tmp_path, self._mode)
+        os.replace(tmp_path, path)
+        return filename, size
+
+    def _store(
+        self, key: str, value: Any, timeout: int | timedelta | None, overwrite: bool
+    ) -> bool:
+        try:
+            filename, size = self._write(value)
+        except (OSError, pickle.PicklingError):
+            _LOG.warning("Exception raised while writing cache file", exc_info=True)
+            return False
+        now = time.time()
+        connection = self._connection()
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            row = connection.execute(
+                "SELECT filename, expires FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and not overwrite and not _is_expired(row[1], now):
+                connection.execute("ROLLBACK")
+                self._remove_files([filename])
+                return False
+            if row is not None:
+                # not INSERT OR REPLACE, which skips the delete trigger
+                connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+            connection.execute(
+                "INSERT INTO entries (key, filename, size, expires, accessed)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, filename, size, self._expires(timeout), now),
+            )
+            evicted = self._evict(connection, now)
+            connection.execute("COMMIT")
+        except sqlite3.Error:
+            _LOG.warning("Exception raised while updating cache index", exc_info=True)
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            self._remove_files([filename])
+            return False
+        if row is not None:
+            evicted.append(row[0])
+        self._remove_files(evicted)
+        return True
+
+    def _evict(self, connection: sqlite3.Connection, now: float) -> list[str]:
+        """Remove expired and least recently used entries from the index.
+
+        Must be called inside a write transaction. Returns the names of the
+        files to remove after committing.
+        """
+        total = _total_bytes(connection)
+        if total <= self._max_bytes:
+            return []
+        expired = connection.execute(
+            "SELECT key, filename FROM entries WHERE expires != 0 AND expires <= ?",
+            (now,),
+        ).fetchall()
+        connection.executemany(
+            "DELETE FROM entries WHERE key = ?", [(key,) for key, _ in expired]
+        )
+        filenames = [filename for _, filename in expired]
+        total = _total_bytes(connection)
+        excess = total - int(self._max_bytes * EVICTION_TARGET)
+        if excess <= 0:
+            return filenames
+        keys = []
+        for key, filename, size in connection.execute(
+            "SELECT key, filename, size FROM entries ORDER BY accessed"
+        ):
+            keys.append((key,))
+            filenames.append(filename)
+            excess -= size
+            if excess <= 0:
+                break
+        connection.executemany("DELETE FROM entries WHERE key = ?", keys)
+        with self._lock:
+            self._evictions += len(keys)
+        return filenames
+
+    def get(self, key: str) -> Any:
+        connection = self._connection()
+        try:
+            row = connection.execute(
+                "SELECT filename, expires, accessed FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.Error:
+            _LOG.warning("Exception raised while reading cache index", exc_info=True)
+            row = None
+        now = time.time()
+        value = None
+        if row is not None and not _is_expired(row[1], now):
+            value = self._read(row[0])
+        if value is None:
+            with self._lock:
+                self._misses += 1
+            return None
+        accessed = row[2]
+        if now - accessed > ACCESS_RESOLUTION:
+            try:
+                connection.execute(
+                    "UPDATE entries SET accessed = ? WHERE key = ?", (now, key)
+                )
+            except sqlite3.Error:
+                _LOG.warning(
+                    "Exception raised while updating cache index", exc_info=True
+                )
+        with self._lock:
+            self._hits += 1
+        return value
+
+    def set(self, key: str, value: Any, timeout: int | timedelta | None = None) -> bool:
+        return self._store(key, value, timeout, overwrite=True)
+
+    def add(self, key: str, value: Any, timeout: int | timedelta | None = None) -> bool:
+        return self._store(key, value, timeout, overwrite=False)
+
+    def delete(self, key: str) -> bool:
+        connection = self._connection()
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            row = connection.execute(
+                "SELECT filename FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+            connection.execute("COMMIT")
+        except sqlite3.Error:
+            _LOG.warning("Exception raised while updating cache index", exc_info=True)
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            return False
+        if row is None:
+            return False
+        self._remove_files([row[0]])
+        return True
+
+    def has(self, key: str) -> bool:
+        try:
+            row = (
+                self._connection()
+                .execute("SELECT expires FROM entries WHERE key = ?", (key,))
+                .fetchone()
+            )
+        except sqlite3.Error:
+            _LOG.warning("Exception raised while reading cache index", exc_info=True)
+            return False
+        return row is not None and not _is_expired(row[0], time.time())
+
+    def clear(self) -> bool:
+        try:
+            self._connection().execute("DELETE FROM entries")
+        except sqlite3.Error:
+            _LOG.warning("Exception raised while updating cache index", exc_info=True)
+            return False
+        # also removes files of entries that never made it into the index
+        self._remove_files(
+            [
+                filename
+                for filename in os.listdir(self._path)
+                if filename.endswith((VALUE_SUFFIX, VALUE_SUFFIX + ".tmp"))
+            ]
+        )
+        return True
+
+    def stats(self) -> dict[str, Any]:
+        """Return the cache counters.
+
+        Hits, misses and evictions are counted per process, the size and
+        number of entries are those of the shared cache directory.
+        """
+        try:
+            connection = self._connection()
+            total = _total_bytes(connection)
+            (items,) = connection.execute("SELECT COUNT(*) FROM entries").fetchone()
+        except sqlite3.Error:
+            total, items = None, None
+        with self._lock:
+            hits, misses, evictions = self._hits, self._misses, self._evictions
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": hits / (hits + misses) if hits + misses else 0.0,
+            "evictions": evictions,
+            "bytes": total,
+            "max_bytes": self._max_bytes,
+            "items": items,
+        }
+
+
+def _is_expired(expires: float, now: float) -> bool:
+    return expires != 0 and expires <= now
+
+
+def _total_bytes(connection: sqlite3.Connection) -> int:
+    (total,) = connection.execute("SELECT bytes FROM totals WHERE id = 0").fetchone()
+    return total
@@ -0,0 +1,131 @@
+#
+# Gramps Web API - A RESTful API for the Gramps genealogy program
+#
+# Copyright (C) 2026      Gramps Web contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Versions of the object classes of a tree, used to key the request cache.
+
+Every object class of a tree has a version token, stored in a small file
+in the tree's directory, so all processes serving the tree see the same
+versions. The files are kept directly in the tree's directory, as Gramps
+only removes files, not subdirectories, when deleting a tree. Commits
+through the undo database replace the tokens of the classes they touched.
+A cached response that only depends on some classes stays valid when
+objects of other classes change.
+
+Changes that bypass the undo database, e.g. batch transactions or edits
+in Gramps Desktop, are detected by the modification time of the tree's
+``meta_data.db``, which Gramps touches when closing a writable database.
+Such a change replaces a base token that is part of every version key.
+"""
+
+from __future__ import annotations
+
+import os
+import uuid
+from typing import Collection, Optional
+
+from gramps.cli.clidbman import META_NAME
+
+from .const import PRIMARY_GRAMPS_OBJECTS
+
+# prefix of the names of the files in the tree's directory holding the tokens
+VERSION_FILE_PREFIX = "cache_version_"
+
+# token that is part of every version key
+_BASE = "_base"
+
+# meta data file modification time that is accounted for by the tokens
+_META_MTIME = "_meta_mtime"
+
+
+def get_meta_mtime(path: str) -> int:
+    """Return the modification time of a tree's meta data file in nanoseconds.
+
+    Gramps touches this file whenever a writable database is closed, so it
+    changes after every write. Returns 0 if the file does not exist.
+    """
+    try:
+        return os.stat(os.path.join(path, META_NAME)).st_mtime_ns
+    except OSError:
+        return 0
+
+
+def _read(tree_dir: str, name: str) -> str:
+    """Read a token, or return an empty string if it was never written."""
+    try:
+        with open(os.path.join(tree_dir, VERSION_FILE_PREFIX + name)) as file_handle:
+            return file_handle.read()
+    except OSError:
+        return ""
+
+
+def _write(tree_dir: str, name: str, value: str) -> None:
+    """Write a token atomically."""
+    filename = VERSION_FILE_PREFIX + name
+    tmp_path = os.path.join(tree_dir, f".{filename}.{uuid.uuid4().hex}")
+    with open(tmp_path, "w") as file_handle:
+        file_handle.write(value)
+    os.replace(tmp_path, os.path.join(tree_dir, filename))
+
+
+def bump_class_versions(tree_dir: str, class_names: Collection[str] | None) -> None:
+    """Replace the version tokens of object classes.
+
+    If `class_names` is None, the base token is replaced, which changes
+    the version keys of all classes.
+    """
+    if class_names is None:
+        _write(tree_dir, _BASE, uuid.uuid4().hex)
+        return
+    for class_name in class_names:
+        _write(tree_dir, class_name, uuid.uuid4().hex)
+
+
+def acknowledge_meta_mtime(tree_dir: str, previous: int, current: int) -> None:
+    """Mark a change of the meta data file as accounted for.
+
+    Called after a writable database whose commits were all tracked is
+    closed. `previous` is the modification time before the database was
+    written to; if it was not accounted for either, another change
+    happened in between, and nothing is acknowledged.
+    """
+    if _read(tree_dir, _META_MTIME) == str(previous):
+        _write(tree_dir, _META_MTIME, str(current))
+
+
+def get_version_key(
+    tree_dir: str, class_names: Collection[str] | None = None
+) -> Optional[str]:
+    """Return a string identifying the versions of object classes.
+
+    If `class_names` is None, the string depends on all classes. Returns
+    None if the tree's meta data file does not exist, in which case
+    changes cannot be detected.
+    """
+    meta_mtime = get_meta_mtime(tree_dir)
+    if not meta_mtime:
+        return None
+    if _read(tree_dir, _META_MTIME) != str(meta_mtime):
+        # the tree was changed without the commits being tracked
+        bump_class_versions(tree_dir, None)
+        _write(tree_dir, _META_MTIME, str(meta_mtime))
+    if class_names is None:
+        class_names = PRIMARY_GRAMPS_OBJECTS
+    tokens = [_read(tree_dir, _BASE)]
+    tokens += [_read(tree_dir, class_name) for class_name in sorted(class_names)]
+    return ":".join(tokens)
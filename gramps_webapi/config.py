@@ -41,6 +41,8 @@ class DefaultConfig(object):
     OPENAPI_SWAGGER_UI_URL = "https://cdn.jsdelivr.net/npm/swagger-ui-dist/"
     SEARCH_INDEX_DIR = "indexdir"  # deprecated!
     SEARCH_INDEX_DB_URI = ""
+    # number of processes generating the text of a full search reindex
+    SEARCH_INDEX_WORKERS = 1
     # verify pooled connections on checkout, as idle ones can be dropped server-side
     SQLALCHEMY_ENGINE_OPTIONS = {"pool_pre_ping": True}
     EMAIL_HOST = "localhost"
@@ -55,15 +57,15 @@ class DefaultConfig(object):
     CORS_EXPOSE_HEADERS = ["X-Total-Count"]
     STATIC_PATH = "static"
     REQUEST_CACHE_CONFIG = {
-        "CACHE_TYPE": "FileSystemCache",
+        "CACHE_TYPE": "gramps_webapi.cache_backend.LRUFileSystemCache",
         "CACHE_DIR": str(Path.cwd() / "request_cache"),
-        "CACHE_THRESHOLD": 1000,
+        "CACHE_MAX_BYTES": 256 * 1024 * 1024,
         "CACHE_DEFAULT_TIMEOUT": 0,
     }
     THUMBNAIL_CACHE_CONFIG = {
-        "CACHE_TYPE": "FileSystemCache",
+        "CACHE_TYPE": "gramps_webapi.cache_backend.LRUFileSystemCache",
         "CACHE_DIR": str(Path.cwd() / "thumbnail_cache"),
-        "CACHE_THRESHOLD": 1000,
+        "CACHE_MAX_BYTES": 1024 * 1024 * 1024,
         "CACHE_DEFAULT_TIMEOUT": 0,
     }
     PERSISTENT_CACHE_CONFIG = {
@@ -77,10 +79,18 @@ class DefaultConfig(object):
     POSTGRES_HOST = "localhost"
     POSTGRES_PORT = "5432"
     IGNORE_DB_LOCK = False
+    # seconds an unused read-only database handle is kept open; 0 disables pooling
+    DB_POOL_MAX_IDLE = 300
+    # deserialized objects shared across requests per process, of about 1 to 4 kB
+    # each; 0 disables caching
+    OBJECT_CACHE_MAX_OBJECTS = 20_000
     TREE_ID = ""
     CELERY_CONFIG: Dict[str, str] = {}
     MEDIA_BASE_DIR = ""
     MEDIA_PREFIX_TREE = False
+    # stream object storage media files through the API instead of redirecting
+    # to presigned URLs, e.g. if clients cannot reach the object storage
+    MEDIA_S3_PROXY = False
     REPORT_DIR = str(Path.cwd() / "report_cache")
     EXPORT_DIR = str(Path.cwd() / "export_cache")
     NEW_DB_BACKEND = "sqlite"
@@ -98,6 +108,8 @@ class DefaultConfig(object):
     VECTOR_EMBEDDING_BASE_URL = None
     # Optional API key for authenticated embedding providers
     VECTOR_EMBEDDING_API_KEY = None
+    # estimated number of tokens embedded at once during a full semantic reindex
+    VECTOR_EMBEDDING_BATCH_TOKENS = 8192
     DISABLE_TELEMETRY = False
     SENTRY_DSN = ""
     SENTRY_ENVIRONMENT = ""
@@ -113,6 +125,15 @@ class DefaultConfig(object):
     OIDC_NAME = "OIDC"
     PILLOW_MAX_IMAGE_PIXELS = MAX_IMAGE_PIXELS
     MAX_THUMBNAIL_FILE_BYTES = 50 * 1024 * 1024  # 50 MB
+    # thumbnails rendered in the background after imports and uploads, as
+    # [size, square] pairs; an empty list disables the pre-generation
+    THUMBNAIL_PREGENERATE_SIZES = [[100, True], [200, True], [400, False]]
+    # number of processes rendering pre-generated thumbnails
+    THUMBNAIL_PREGENERATE_WORKERS = 1
+    # directory of stored verification results, with a subdirectory per tree
+    VERIFY_DIR = str(Path.cwd() / "verify_cache")
+    # number of processes checking people and families in a data verification
+    VERIFY_WORKERS = 1
 
 
 class DefaultConfigJWT(object):
@@ -155,6 +155,14 @@ def get_postgres_credentials(directory, username, password):
     return dbkwargs
 
 
+def activate_name_formats(db) -> None:
+    """Set up the global name displayer with the custom formats of a database."""
+    name_displayer.clear_custom_formats()
+    name_displayer.set_name_format(db.name_formats)
+    fmt_default = config.get("preferences.name-format")
+    name_displayer.set_default_format(fmt_default)
+
+
 class WebDbSessionManager:
     """Session manager derived from `CLIDbLoader` and `CLIManager`."""
 
@@ -280,10 +288,7 @@ class WebDbSessionManager:
         if res.is_empty() and not owner.is_empty() and self.dbstate.db.get_total() == 0:
             self.dbstate.db.set_researcher(owner)
 
-        name_displayer.clear_custom_formats()
-        name_displayer.set_name_format(self.dbstate.db.name_formats)
-        fmt_default = config.get("preferences.name-format")
-        name_displayer.set_default_format(fmt_default)
+        activate_name_formats(self.dbstate.db)
 
         self.dbstate.db.enable_signals()
         self.dbstate.signal_change()
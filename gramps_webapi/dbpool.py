@@ -0,0 +1,265 @@
+#
+# Gramps Web API - A RESTful API for the Gramps genealogy program
+#
+# Copyright (C) 2026      Gramps Web contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Pool of open read-only database handles reused across requests."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from gramps.gen.db.base import DbReadBase
+
+from .cache_versions import get_meta_mtime
+from .dbloader import activate_name_formats
+from .dbmanager import WebDbManager
+from .metrics import register_metrics
+
+LOG = logging.getLogger(__name__)
+
+# seconds after which an unused handle is closed
+DEFAULT_MAX_IDLE = 300
+# idle handles kept per tree, backend and thread
+DEFAULT_MAX_PER_KEY = 2
+# backends whose connections may only be used by the thread that opened them
+THREAD_BOUND_BACKENDS = {"sqlite"}
+
+
+@dataclass
+class _PoolEntry:
+    """An open database handle together with its bookkeeping data."""
+
+    db: DbReadBase
+    key: tuple
+    meta_mtime: int
+    last_used: float = 0.0
+
+
+class DbPool:
+    """Per-process pool of open, read-only Gramps database handles.
+
+    Opening a tree (backend setup, loading metadata, creating the undo
+    manager) is a large fixed cost. Instead of closing read-only handles at
+    the end of a request, they are checked back into the pool and handed out
+    again to the next request for the same tree.
+
+    Handles are keyed by tree directory, backend and database user. SQLite
+    handles are also keyed by thread, since SQLite connections may only be
+    used, and closed, by the thread that created them; a SQLite handle
+    discarded by another thread is closed by its own thread the next time
+    that thread uses the pool. A pooled handle is discarded when the tree's
+    ``meta_data.db`` was touched after it was opened, when it fails a health
+    check, or when it has not been used for ``max_idle`` seconds.
+    """
+
+    def __init__(
+        self,
+        max_idle: float = DEFAULT_MAX_IDLE,
+        max_per_key: int = DEFAULT_MAX_PER_KEY,
+    ) -> None:
+        """Initialize self."""
+        self.max_idle = max_idle
+        self.max_per_key = max_per_key
+        self._lock = threading.Lock()
+        self._idle: dict[tuple, list[_PoolEntry]] = {}
+        self._in_use: dict[int, _PoolEntry] = {}
+        # discarded handles to be closed by the threads owning them
+        self._pending: dict[int, list[_PoolEntry]] = {}
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+        self._health_check_failures = 0
+        self._evictions = 0
+        self._opens = 0
+        self._open_time = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        """Whether handles are pooled at all."""
+        return self.max_idle > 0
+
+    @staticmethod
+    def _make_key(dbmgr: WebDbManager) -> tuple:
+        """Return the pool key for a database manager in the current thread."""
+        if dbmgr._dbid in THREAD_BOUND_BACKENDS:
+            thread = threading.get_ident()
+        else:
+            thread = None
+        return (dbmgr.path, dbmgr._dbid, dbmgr.username, thread)
+
+    @staticmethod
+    def _is_healthy(db: DbReadBase) -> bool:
+        """Check that a pooled handle is still usable."""
+        if not db.is_open():
+            return False
+        dbapi = getattr(db, "dbapi", None)
+        if dbapi is None:
+            return True
+        try:
+            dbapi.execute("SELECT 1")
+            dbapi.fetchone()
+        except Exception:  # pylint: disable=broad-except
+            return False
+        return True
+
+    def _close(self, entry: _PoolEntry) -> None:
+        """Close a pooled database handle including the undo log.
+
+        A handle bound to another running thread is left to that thread. The
+        connection of a handle bound to a finished thread can't be closed by
+        any thread; it is closed when the last reference to it is dropped.
+        """
+        owner = entry.key[-1]
+        owned = owner is None or owner == threading.get_ident()
+        if not owned and any(thread.ident == owner for thread in threading.enumerate()):
+            with self._lock:
+                self._pending.setdefault(owner, []).append(entry)
+            return
+        try:
+            if owned:
+                entry.db.close()
+            entry.db.undodb.close()
+        except Exception as exc:  # pylint: disable=broad-except
+            LOG.warning("Error while closing pooled database: %s", exc)
+
+    def _close_pending(self) -> None:
+        """Close the discarded handles bound to the current thread."""
+        with self._lock:
+            pending = self._pending.pop(threading.get_ident(), [])
+        for entry in pending:
+            self._close(entry)
+
+    def _pop_expired(self, now: float) -> list[_PoolEntry]:
+        """Remove and return all idle entries exceeding the maximum idle time.
+
+        Must be called with the lock held.
+        """
+        expired = []
+        for key in list(self._idle):
+            entries = self._idle[key]
+            keep = [entry for entry in entries if now - entry.last_used < self.max_idle]
+            expired += [entry for entry in entries if entry not in keep]
+            if keep:
+                self._idle[key] = keep
+            else:
+                del self._idle[key]
+        self._evictions += len(expired)
+        return expired
+
+    def acquire(self, dbmgr: WebDbManager, user_id: str = "") -> DbReadBase:
+        """Check out an open read-only database handle, opening one if needed."""
+        self._close_pending()
+        key = self._make_key(dbmgr)
+        meta_mtime = get_meta_mtime(dbmgr.path)
+        entry: _PoolEntry | None = None
+        with self._lock:
+            stale = self._pop_expired(time.monotonic())
+            entries = self._idle.get(key, [])
+            while entries:
+                candidate = entries.pop()
+                if candidate.meta_mtime == meta_mtime:
+                    entry = candidate
+                    break
+                self._invalidations += 1
+                stale.append(candidate)
+        for stale_entry in stale:
+            self._close(stale_entry)
+        if entry is not None and not self._is_healthy(entry.db):
+            with self._lock:
+                self._health_check_failures += 1
+            self._close(entry)
+            entry = None
+        if entry is None:
+            start = time.perf_counter()
+            dbstate = dbmgr.get_db(user_id=user_id, readonly=True)
+            elapsed = time.perf_counter() - start
+            entry = _PoolEntry(db=dbstate.db, key=key, meta_mtime=meta_mtime)
+            with self._lock:
+                self._misses += 1
+                self._opens += 1
+                self._open_time += elapsed
+        else:
+            # the name displayer is global, so it has to be set up again in
+            # case another tree was opened in the meantime
+            activate_name_formats(entry.db)
+            with self._lock:
+                self._hits += 1
+        with self._lock:
+            self._in_use[id(entry.db)] = entry
+        return entry.db
+
+    def release(self, db: DbReadBase) -> bool:
+        """Check a database handle back into the pool.
+
+        Returns False if the handle was not checked out of the pool, in which
+        case the caller is responsible for closing it.
+        """
+        overflow = None
+        with self._lock:
+            entry = self._in_use.pop(id(db), None)
+            if entry is None:
+                return False
+            entry.last_used = time.monotonic()
+            entries = self._idle.setdefault(entry.key, [])
+            if len(entries) < self.max_per_key:
+                entries.append(entry)
+            else:
+                overflow = entry
+                self._evictions += 1
+        if overflow is not None:
+            self._close(overflow)
+        self._close_pending()
+        return True
+
+    def clear(self, path: str | None = None) -> None:
+        """Close all idle handles, or only those of the tree at `path`."""
+        with self._lock:
+            if path is None:
+                keys = list(self._idle)
+            else:
+                keys = [key for key in self._idle if key[0] == path]
+            entries = [entry for key in keys for entry in self._idle.pop(key)]
+        for entry in entries:
+            self._close(entry)
+
+    def stats(self) -> dict[str, Any]:
+        """Return the pool counters."""
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "invalidations": self._invalidations,
+                "health_check_failures": self._health_check_failures,
+                "evictions": self._evictions,
+                "idle": sum(len(entries) for entries in self._idle.values()),
+                "in_use": len(self._in_use),
+                "pending_close": sum(
+                    len(entries) for entries in self._pending.values()
+                ),
+                "opens": self._opens,
+                "open_time_total": self._open_time,
+                "open_time_mean": self._open_time / self._opens if self._opens else 0.0,
+            }
+
+
+db_pool = DbPool()
+register_metrics("db_pool", db_pool.stats)
@@ -0,0 +1,218 @@
+#
+# Gramps Web API - A RESTful API for the Gramps genealogy program
+#
+# Copyright (C) 2026      Gramps Web contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Per-process cache of deserialized Gramps objects shared across requests."""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Collection, Iterable
+
+from .cache_versions import get_version_key
+from .metrics import register_metrics
+
+# object classes kept in the cache
+CACHED_CLASSES = ("Person", "Family", "Event", "Place")
+
+# objects kept per process; deserialized people, families, events and places
+# take about 1 to 4 kB each, so this is roughly 20 to 80 MB
+DEFAULT_MAX_OBJECTS = 20_000
+
+
+class ObjectCacheSession:
+    """View of the object cache for one request.
+
+    Holds the versions of the object classes at the start of the request,
+    so objects read afterwards are only stored if their class did not change
+    in the meantime.
+    """
+
+    def __init__(self, cache: ObjectCache, scope: tuple, versions: dict) -> None:
+        """Initialize self."""
+        self.cache = cache
+        self.scope = scope
+        self.versions = versions
+
+    def get(self, class_name: str, handle: str) -> Any:
+        """Return a cached object, or None."""
+        return self.cache._get((*self.scope, class_name), handle)
+
+    def put(self, class_name: str, obj: Any) -> None:
+        """Store an object."""
+        self.cache._put((*self.scope, class_name), self.versions[class_name], [obj])
+
+    def put_all(self, class_name: str, objects: Collection[Any]) -> None:
+        """Store all objects of a class.
+
+        Nothing is stored if the objects do not fit into the cache.
+        """
+        self.cache._put(
+            (*self.scope, class_name),
+            self.versions[class_name],
+            objects,
+            complete=True,
+        )
+
+    def is_complete(self, class_name: str) -> bool:
+        """Whether all objects of a class are cached."""
+        return self.cache._is_complete((*self.scope, class_name))
+
+
+class ObjectCache:
+    """Per-process LRU cache of deserialized Gramps objects.
+
+    Deserializing objects is a large part of the cost of endpoints that
+    walk the family graph, like relations or timelines, and the same
+    objects are needed by request after request. Objects are cached per
+    tree and scope, e.g. with or without private records, and are bounded
+    by `max_objects` in total. The bound is a number of objects rather than
+    of bytes, since measuring the size of deserialized objects costs about
+    as much as deserializing them.
+
+    Objects of a class are dropped when the class's request cache version
+    changes, i.e. after a commit touching the class in any process. A
+    scope whose objects depend on other classes, e.g. because private
+    references are removed, can be tied to the versions of all classes.
+    """
+
+    def __init__(self, max_objects: int = DEFAULT_MAX_OBJECTS) -> None:
+        """Initialize self."""
+        self.max_objects = max_objects
+        self._lock = threading.Lock()
+        self._objects: OrderedDict[tuple, Any] = OrderedDict()
+        # handles of the cached objects by tree, scope and class
+        self._handles: dict[tuple, set[str]] = {}
+        self._versions: dict[tuple, str] = {}
+        self._complete: set[tuple] = set()
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+        self._evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Whether objects are cached at all."""
+        return self.max_objects > 0
+
+    def session(
+        self, tree_dir: str, scope: str, depends_on_all: bool = False
+    ) -> ObjectCacheSession | None:
+        """Start using the cache for a tree, dropping outdated objects.
+
+        If `depends_on_all` is true, the objects of the scope are dropped
+        whenever objects of any class change. Returns None if the cache is
+        disabled or changes of the tree cannot be detected.
+        """
+        if not self.enabled:
+            return None
+        versions = {}
+        all_version = get_version_key(tree_dir) if depends_on_all else None
+        for class_name in CACHED_CLASSES:
+            if depends_on_all:
+                version = all_version
+            else:
+                version = get_version_key(tree_dir, [class_name])
+            if version is None:
+                return None
+            versions[class_name] = version
+        with self._lock:
+            for class_name, version in versions.items():
+                key = (tree_dir, scope, class_name)
+                old_version = self._versions.get(key)
+                if old_version == version:
+                    continue
+                if old_version is not None:
+                    self._invalidations += 1
+                    self._drop(key)
+                self._versions[key] = version
+        return ObjectCacheSession(self, (tree_dir, scope), versions)
+
+    def _drop(self, key: tuple) -> None:
+        """Remove all objects of a tree, scope and class.
+
+        Must be called with the lock held.
+        """
+        for handle in self._handles.pop(key, ()):
+            del self._objects[(*key, handle)]
+        self._complete.discard(key)
+
+    def _get(self, key: tuple, handle: str) -> Any:
+        """Return a cached object, or None."""
+        with self._lock:
+            obj = self._objects.get((*key, handle))
+            if obj is None:
+                self._misses += 1
+                return None
+            self._objects.move_to_end((*key, handle))
+            self._hits += 1
+            return obj
+
+    def _put(
+        self, key: tuple, version: str, objects: Iterable[Any], complete: bool = False
+    ) -> None:
+        """Store objects read at a class version."""
+        objects = list(objects)
+        if complete and len(objects) > self.max_objects:
+            return
+        with self._lock:
+            if self._versions.get(key) != version:
+                # the class changed since the objects were read
+                return
+            handles = self._handles.setdefault(key, set())
+            for obj in objects:
+                self._objects[(*key, obj.handle)] = obj
+                self._objects.move_to_end((*key, obj.handle))
+                handles.add(obj.handle)
+            if complete:
+                self._complete.add(key)
+            while len(self._objects) > self.max_objects:
+                evicted_key, _ = self._objects.popitem(last=False)
+                self._handles[evicted_key[:-1]].discard(evicted_key[-1])
+                self._complete.discard(evicted_key[:-1])
+                self._evictions += 1
+
+    def _is_complete(self, key: tuple) -> bool:
+        """Whether all objects of a tree, scope and class are cached."""
+        with self._lock:
+            return key in self._complete
+
+    def clear(self) -> None:
+        """Remove all objects."""
+        with self._lock:
+            self._objects.clear()
+            self._handles.clear()
+            self._versions.clear()
+            self._complete.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """Return the cache counters."""
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "invalidations": self._invalidations,
+                "evictions": self._evictions,
+                "objects": len(self._objects),
+                "max_objects": self.max_objects,
+            }
+
+
+object_cache = ObjectCache()
+register_metrics("object_cache", object_cache.stats)
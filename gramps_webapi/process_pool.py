@@ -0,0 +1,76 @@
+#
+# Gramps Web API - A RESTful API for the Gramps genealogy program
+#
+# Copyright (C) 2026      Gramps Web contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Pool of worker processes for long-running background tasks.
+
+Background tasks run in the workers of Celery's prefork pool, which are
+daemonic processes. These cannot start the worker processes of the
+standard library's pools, so the pool uses billiard, Celery's fork of
+multiprocessing, which allows daemonic processes to have children.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Optional
+
+from billiard.pool import ApplyResult, Pool
+
+
+class ProcessPool:
+    """Context manager running functions in a pool of worker processes.
+
+    `initializer` is called with `initargs` in every worker process when it
+    starts, `on_exit` with the process ID and the exit code when it exits.
+    Exit handlers registered with `atexit` or `multiprocessing.util.Finalize`
+    do not run in the worker processes, so resources of a worker must be
+    released in `on_exit`. When the block is left with an exception, pending
+    tasks are cancelled and the worker processes terminated.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        initializer: Optional[Callable[..., None]] = None,
+        initargs: tuple = (),
+        on_exit: Optional[Callable[[int, int], None]] = None,
+    ) -> None:
+        self._pool = Pool(
+            processes=workers,
+            initializer=initializer,
+            initargs=initargs,
+            on_process_exit=on_exit,
+        )
+
+    def submit(self, func: Callable[..., Any], *args: Any) -> ApplyResult:
+        """Call a function in a worker process.
+
+        The result, or the exception raised by the function, is returned by
+        the `get` method of the returned object.
+        """
+        return self._pool.apply_async(func, args)
+
+    def __enter__(self) -> ProcessPool:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self._pool.close()
+        else:
+            self._pool.terminate()
+        self._pool.join()
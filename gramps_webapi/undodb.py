@@ -66,6 +66,8 @@ from sqlalchemy.orm import (
 )
 from sqlalchemy.sql import func
 
+from .cache_versions import bump_class_versions, get_meta_mtime
+
 _ = glocale.translation.gettext
 
 # transactions per change query. Each one contributes a term of three bind
@@ -615,6 +617,35 @@ class DbUndoSQL(DbUndo):
 class DbUndoSQLWeb(DbUndoSQL):
     """SQL-based undo database with additional methods for Web API."""
 
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        # modification time of the tree's meta data file before the first
+        # commit, or None if nothing was committed yet
+        self.meta_mtime_before_commit: int | None = None
+
+    def _after_commit(
+        self, transaction: DbTxn, undo: bool = False, redo: bool = False
+    ) -> None:
+        """Post-transaction commit processing.
+
+        Also replaces the request cache versions of the changed classes.
+        """
+        tree_dir = self.db.get_save_path()
+        if self.meta_mtime_before_commit is None:
+            self.meta_mtime_before_commit = get_meta_mtime(tree_dir)
+        super()._after_commit(transaction, undo=undo, redo=redo)
+        if transaction.batch or undo or redo:
+            # batch transactions don't record their changes, and the changes
+            # of undone or redone transactions have already been cleared
+            class_names = None
+        else:
+            class_names = {
+                KEY_TO_CLASS_MAP[obj_type]
+                for obj_type, _ in transaction
+                if obj_type in KEY_TO_CLASS_MAP
+            }
+        bump_class_versions(tree_dir, class_names)
+
     def _transactions_query(
         self,
         session: Session,
@@ -663,6 +694,27 @@ class DbUndoSQLWeb(DbUndoSQL):
                 func.max(Transaction.id), func.count(Transaction.id)
             ).one()
 
+    def get_changed_handles(self, after_id: int | None = None) -> dict[str, set[str]]:
+        """Get the handles of the objects changed by transactions, by class.
+
+        Only the transactions after `after_id` are considered. Batch
+        transactions, which record no changes, are not reflected.
+        """
+        with self.session_scope() as session:
+            transactions = (
+                self._transactions_query(session, after_id=after_id)
+                .order_by(Transaction.id)
+                .all()
+            )
+            changes = _get_changes(
+                session, transactions, old_data=False, new_data=False
+            )
+        handles: dict[str, set[str]] = defaultdict(set)
+        for transaction_changes in changes.values():
+            for change in transaction_changes:
+                handles[change["obj_class"]].add(change["obj_handle"])
+        return dict(handles)
+
     def get_transactions(
         self,
         page: int = 1,
@@ -34,10 +34,14 @@ Usage::
 
     results = run_verify(db_handle)
     results = run_verify(db_handle, {"oldage": 100, "estimate_age": True})
+
+Large trees can be checked by several worker processes with ``iter_verify``,
+which yields the findings shard by shard instead of collecting them.
 """
 
 import contextvars
 import statistics
+from collections import OrderedDict
 
 from gramps.gen.const import GRAMPS_LOCALE as glocale
 from gramps.gen.lib import (
@@ -50,6 +54,8 @@ from gramps.gen.lib import (
 )
 from gramps.gen.lib.date import Today
 
+from .process_pool import ProcessPool
+
 _tr_var: contextvars.ContextVar = contextvars.ContextVar("verify_tr", default=None)
 
 
@@ -57,6 +63,14 @@ def _(msg: str) -> str:
     tr = _tr_var.get()
     return tr(msg) if tr is not None else glocale.translation.sgettext(msg)
 
+
+def _untranslated(msg: str) -> str:
+    return msg
+
+
+# number of people or families checked at once
+VERIFY_SHARD_SIZE = 1000
+
 # ---------------------------------------------------------------------------
 # Options — mirrors Gramps VerifyOptions without the tool.ToolOptions dependency
 # ---------------------------------------------------------------------------
@@ -362,28 +376,61 @@ class VerifyPerson:
 # ---------------------------------------------------------------------------
 
 
+class _BoundedCache:
+    """Least recently used summary objects, at most ``limit`` of them."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self._items: OrderedDict = OrderedDict()
+
+    def __contains__(self, handle):
+        return handle in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getitem__(self, handle):
+        self._items.move_to_end(handle)
+        return self._items[handle]
+
+    def __setitem__(self, handle, item):
+        self._items[handle] = item
+        self._items.move_to_end(handle)
+        if len(self._items) > self.limit:
+            self._items.popitem(last=False)
+
+
 class VerifyRunner:
-    """Runs all verification rules against a database, returning findings."""
+    """Runs all verification rules against a database, returning findings.
+
+    People and families are checked in shards of ``VERIFY_SHARD_SIZE``.
+    Their summaries are kept in bounded LRU caches, so memory use does not
+    grow with the size of the tree.
+    """
 
     _PERSON_CACHE_LIMIT = 20000
     _FAMILY_CACHE_LIMIT = 10000
 
     def __init__(self, db):
         self.db = db
-        self._person_cache: dict = {}
-        self._family_cache: dict = {}
+        self._person_cache = _BoundedCache(self._PERSON_CACHE_LIMIT)
+        self._family_cache = _BoundedCache(self._FAMILY_CACHE_LIMIT)
 
     def find_person(self, handle):
-        if handle not in self._person_cache:
-            person = self.db.get_person_from_handle(handle)
-            self._person_cache[handle] = VerifyPerson(self.db, person)
-        return self._person_cache[handle]
+        if handle in self._person_cache:
+            return self._person_cache[handle]
+        person = self.db.get_person_from_handle(handle)
+        verify_person = VerifyPerson(self.db, person)
+        self._person_cache[handle] = verify_person
+        return verify_person
 
     def find_family(self, handle):
-        if handle not in self._family_cache:
-            family = self.db.get_family_from_handle(handle)
-            self._family_cache[handle] = VerifyFamily(self.db, family)
-        return self._family_cache[handle]
+        if handle in self._family_cache:
+            return self._family_cache[handle]
+        family = self.db.get_family_from_handle(handle)
+        verify_family = VerifyFamily(self.db, family)
+        self._family_cache[handle] = verify_family
+        return verify_family
 
     def _preload(self):
         if self.db.get_number_of_people() <= self._PERSON_CACHE_LIMIT:
@@ -478,41 +525,131 @@ class VerifyRunner:
         ]
         return [rule.report_itself() for rule in rule_list if rule.broken()]
 
-    def run(self, options=None, *, translate=None):
-        opts = {**DEFAULT_OPTIONS, **(options or {})}
-        tr = translate if translate is not None else glocale.translation.sgettext
-        token = _tr_var.set(tr)
+    def iter_shards(self):
+        """Iterate over ``(class name, handles)`` shards of people and families."""
+        for class_name, handles in (
+            ("Person", list(self.db.iter_person_handles())),
+            ("Family", list(self.db.iter_family_handles())),
+        ):
+            for start in range(0, len(handles), VERIFY_SHARD_SIZE):
+                yield class_name, handles[start : start + VERIFY_SHARD_SIZE]
+
+    def check_shard(self, class_name, handles, opts, today):
+        """Check a shard of people or families.
+
+        Returns the findings with untranslated messages.
+        """
+        token = _tr_var.set(_untranslated)
         try:
-            return self._run(opts)
+            results = []
+            for handle in handles:
+                if class_name == "Person":
+                    verify_person = self.find_person(handle)
+                    if verify_person.get_handle():
+                        results.extend(self._check_person(verify_person, opts, today))
+                else:
+                    verify_family = self.find_family(handle)
+                    if verify_family.get_handle():
+                        results.extend(self._check_family(verify_family, opts))
+            return results
         finally:
             _tr_var.reset(token)
 
-    def _run(self, opts):
+    def iter_results(self, options=None, *, translate=None, progress_cb=None):
+        """Iterate over the findings of all people, then all families."""
+        opts = {**DEFAULT_OPTIONS, **(options or {})}
         self._preload()
         today = Today().get_sort_value()
+        progress = _Progress(self.db, progress_cb)
+        for class_name, handles in self.iter_shards():
+            results = self.check_shard(class_name, handles, opts, today)
+            progress.update(len(handles))
+            yield from translate_results(results, translate)
+
+    def run(self, options=None, *, translate=None):
+        return list(self.iter_results(options, translate=translate))
+
 
-        results = []
-        family_handles = set(self.db.get_family_handles())
+class _Progress:
+    """Reports the number of people and families checked so far."""
 
-        for person in self.db.iter_people():
-            handle = person.get_handle()
-            if handle not in self._person_cache:
-                self._person_cache[handle] = VerifyPerson(self.db, person)
-            verify_person = self._person_cache[handle]
+    def __init__(self, db, progress_cb):
+        self.progress_cb = progress_cb
+        self.total = db.get_number_of_people() + db.get_number_of_families()
+        self.current = 0
+        self.prev = None
 
-            for family_handle in verify_person.get_family_handle_list():
-                if family_handle in family_handles:
-                    verify_family = self.find_family(family_handle)
-                    results.extend(self._check_family(verify_family, opts))
-                    family_handles.remove(family_handle)
+    def update(self, count):
+        self.current += count
+        if self.progress_cb:
+            self.progress_cb(current=self.current, total=self.total, prev=self.prev)
+        self.prev = self.current
 
-            results.extend(self._check_person(verify_person, opts, today))
 
-        for family_handle in family_handles:
-            verify_family = self.find_family(family_handle)
-            results.extend(self._check_family(verify_family, opts))
+def translate_results(results, translate):
+    """Translate the messages of findings checked with ``check_shard``."""
+    tr = translate if translate is not None else glocale.translation.sgettext
+    for result in results:
+        result["message"] = tr(result["message"])
+        yield result
 
-        return results
+
+# runner of a parallel verification worker process, with its own database
+_worker_runner = None
+
+
+def _init_verify_worker(open_db):
+    """Open the read-only database of a parallel verification worker."""
+    global _worker_runner  # pylint: disable=global-statement
+    _worker_runner = VerifyRunner(open_db())
+
+
+def _close_verify_worker(pid, exitcode):
+    """Close the database of a parallel verification worker on exit."""
+    if _worker_runner is not None:
+        _worker_runner.db.close()
+
+
+def _verify_shard(class_name, handles, opts, today):
+    """Check a shard of people or families in a worker process."""
+    assert _worker_runner is not None, "Verify worker not initialized"
+    return _worker_runner.check_shard(class_name, handles, opts, today)
+
+
+def get_affected_handles(db, person_handles=(), family_handles=(), event_handles=()):
+    """Return the people and families whose findings can change with objects.
+
+    Person rules read the person's families and their members, family rules
+    read the spouses and children, so besides the changed people and
+    families their immediate relatives are affected. Changed events affect
+    the people and families referencing them. Returns ``(person handles,
+    family handles)``, which include the handles of deleted objects.
+    """
+    people = set(person_handles)
+    families = set(family_handles)
+    for handle in event_handles:
+        for class_name, ref_handle in db.find_backlink_handles(
+            handle, include_classes=["Person", "Family"]
+        ):
+            if class_name == "Person":
+                people.add(ref_handle)
+            else:
+                families.add(ref_handle)
+    for handle in list(people):
+        if db.has_person_handle(handle):
+            person = db.get_person_from_handle(handle)
+            families.update(person.get_family_handle_list())
+            families.update(person.get_parent_family_handle_list())
+    for handle in list(families):
+        if db.has_family_handle(handle):
+            family = db.get_family_from_handle(handle)
+            people.update(
+                member
+                for member in (family.get_father_handle(), family.get_mother_handle())
+                if member
+            )
+            people.update(child_ref.ref for child_ref in family.get_child_ref_list())
+    return people, families
 
 
 # ---------------------------------------------------------------------------
@@ -1598,6 +1735,54 @@ class FamilyHasEventsInWrongOrder(FamilyRule):
 # ---------------------------------------------------------------------------
 
 
+def iter_verify(
+    db, options=None, *, translate=None, workers=1, open_db=None, progress_cb=None
+):
+    """Run all verification rules against *db*, yielding the findings.
+
+    Takes the same *options* and *translate* as ``run_verify``. If *workers*
+    is larger than 1 and *open_db* is given, the shards of people and
+    families are checked by that many worker processes. *open_db* must be
+    a picklable callable opening the database read-only in a worker. At
+    most two shards per worker are in flight, so memory use does not grow
+    with the size of the tree.
+
+    *progress_cb*, if given, is called with the number of people and
+    families checked and their total after every shard.
+    """
+    if isinstance(options, VerifyOptions):
+        options = options.as_dict()
+    runner = VerifyRunner(db)
+    if workers <= 1 or open_db is None:
+        yield from runner.iter_results(
+            options, translate=translate, progress_cb=progress_cb
+        )
+        return
+
+    opts = {**DEFAULT_OPTIONS, **(options or {})}
+    today = Today().get_sort_value()
+    progress = _Progress(db, progress_cb)
+
+    def collect(handles, result):
+        progress.update(len(handles))
+        return translate_results(result.get(), translate)
+
+    with ProcessPool(
+        workers,
+        initializer=_init_verify_worker,
+        initargs=(open_db,),
+        on_exit=_close_verify_worker,
+    ) as pool:
+        pending = []
+        for class_name, handles in runner.iter_shards():
+            result = pool.submit(_verify_shard, class_name, handles, opts, today)
+            pending.append((handles, result))
+            if len(pending) >= 2 * workers:
+                yield from collect(*pending.pop(0))
+        for handles, result in pending:
+            yield from collect(handles, result)
+
+
 def run_verify(db, options=None, *, translate=None):
     """Run all verification rules against *db* and return a list of findings.
 
@@ -1609,7 +1794,4 @@ def run_verify(db, options=None, *, translate=None):
     Each finding is a dict with keys: message, object_type, object_id,
     object_handle, name, rule_id, rule_params, severity.
     """
-    if isinstance(options, VerifyOptions):
-        options = options.as_dict()
-    runner = VerifyRunner(db)
-    return runner.run(options, translate=translate)
+    return list(iter_verify(db, options, translate=translate))
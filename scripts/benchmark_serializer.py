@@ -0,0 +1,111 @@
+#! /usr/bin/env python3
+
+"""Micro-benchmark of the Gramps object serializer on the example tree.
+
+Compares the per-class cached serializer of `GrampsJSONEncoder.extract_object`
+to the previous reflective implementation by timing requests to
+`/api/people/?extend=all&profile=all`. Run from the repository root:
+
+    python scripts/benchmark_serializer.py
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import Any
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gramps_webapi.api.cache import request_cache  # noqa: E402
+from gramps_webapi.api.resources.emit import GrampsJSONEncoder  # noqa: E402
+from tests.test_endpoints import get_test_client, setUpModule  # noqa: E402
+from tests.test_endpoints.util import fetch_header  # noqa: E402
+
+URL = "/api/people/?extend=all&profile=all"
+
+
+def extract_object_reflective(self, obj: Any, apply_filter=True) -> dict:
+    """Extract and filter attributes for a Gramps object by reflection."""
+    data = {}
+    for key, value in obj.__class__.__dict__.items():
+        if isinstance(value, property):
+            if key.startswith("_"):
+                key = key[2 + key.find("__") :]
+            if apply_filter:
+                if self.filter_only_keys and key not in self.filter_only_keys:
+                    continue
+                if self.filter_skip_keys and key in self.filter_skip_keys:
+                    continue
+            value = getattr(obj, key)
+            if not self.strip_empty_keys or not self.is_null(value):
+                data[key] = value
+    for key, value in obj.__dict__.items():
+        if key.startswith("_"):
+            key = key[2 + key.find("__") :]
+        if key in ["thumb"]:
+            continue
+        if apply_filter:
+            if self.filter_only_keys and key not in self.filter_only_keys:
+                continue
+            if self.filter_skip_keys and key in self.filter_skip_keys:
+                continue
+        if key == "rect" and value is None:
+            value = []
+        if key in ["mother_handle", "father_handle", "famc"] and value is None:
+            value = ""
+        if not self.strip_empty_keys or not self.is_null(value):
+            data[key] = value
+    return data
+
+
+def time_serialization(client, headers: dict, url: str, repeat: int) -> tuple:
+    """Time the serialization step of a request and return it with the body."""
+    timings = []
+    response = GrampsJSONEncoder.response
+
+    def timed_response(self, *args, **kwargs):
+        start = time.perf_counter()
+        res = response(self, *args, **kwargs)
+        timings.append(time.perf_counter() - start)
+        return res
+
+    body = None
+    with patch.object(GrampsJSONEncoder, "response", timed_response):
+        for _ in range(repeat):
+            # clear the request cache so that every run does the full work
+            with client.application.app_context():
+                request_cache.clear()
+            rv = client.get(url, headers=headers)
+            assert rv.status_code == 200, rv.status_code
+            body = rv.data
+    return min(timings), body
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="number of runs")
+    parser.add_argument("--url", default=URL, help="endpoint to request")
+    args = parser.parse_args()
+
+    setUpModule()
+    client = get_test_client()
+    headers = fetch_header(client)
+
+    with patch.object(GrampsJSONEncoder, "extract_object", extract_object_reflective):
+        reflective, body_reflective = time_serialization(
+            client, headers, args.url, args.repeat
+        )
+    cached, body_cached = time_serialization(client, headers, args.url, args.repeat)
+
+    print(f"{args.url}")
+    print(f"  reflective: {reflective * 1000:8.1f} ms")
+    print(f"  cached:     {cached * 1000:8.1f} ms")
+    print(f"  speedup:    {reflective / cached:8.2f}x")
+    print(f"  identical:  {body_reflective == body_cached}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#! /usr/bin/env python3
+
+"""Micro-benchmark of sorting objects by several keys.
+
+Compares sorting by consecutive `list.sort` calls with per-object database
+lookups to `sort_objects`, which computes the keys in one pass with bulk
+lookups followed by a single stable sort. The objects are synthetic people
+and families copied from the example tree, so keys like birth dates and
+family surnames are looked up in the example database. Run from the
+repository root:
+
+    python scripts/benchmark_sort.py
+"""
+
+import argparse
+import copy
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gramps_webapi.api.resources.sort import Sort, sort_objects  # noqa: E402
+from tests import ExampleDbSQLite, tearDownModule  # noqa: E402
+
+SORTS = {
+    "Person": ["birth", "surname,-birth", "-death,name", "gender,soundex,gramps_id"],
+    "Family": ["surname", "-soundex,surname", "type,-surname"],
+}
+
+LEGACY_KEYS = {
+    "Person": {
+        "gramps_id": Sort.by_id_key,
+        "surname": Sort.by_person_surname_key,
+        "name": Sort.by_person_sorted_name_key,
+        "soundex": Sort.by_person_soundex_key,
+        "birth": Sort.by_person_birthdate_key,
+        "death": Sort.by_person_deathdate_key,
+        "gender": Sort.by_person_gender_key,
+    },
+    "Family": {
+        "surname": Sort.by_family_surname_key,
+        "soundex": Sort.by_family_soundex_key,
+        "type": Sort.by_family_type_key,
+    },
+}
+
+
+def sort_objects_legacy(db_handle, gramps_class_name: str, objects: list, args):
+    """Sort objects by one `list.sort` call per key, looking up objects singly."""
+    sort = Sort(db_handle)
+    for sort_key in args:
+        reverse = sort_key.startswith("-")
+        method = LEGACY_KEYS[gramps_class_name][sort_key.lstrip("-")]
+        objects.sort(key=lambda obj: method(sort, obj), reverse=reverse)
+    return objects
+
+
+def make_synthetic(templates: list, count: int, prefix: str) -> list:
+    """Return copies of template objects with new handles and Gramps IDs."""
+    objects = []
+    for index in range(count):
+        obj = copy.copy(templates[index % len(templates)])
+        obj.handle = f"{prefix}{index:08d}"
+        obj.gramps_id = f"{prefix.upper()}{index:06d}"
+        objects.append(obj)
+    return objects
+
+
+def time_sort(func, db_handle, class_name: str, objects: list, args: list, repeat):
+    """Return the fastest time of sorting and the resulting handles."""
+    timings = []
+    result: list = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(db_handle, class_name, list(objects), args)
+        timings.append(time.perf_counter() - start)
+    return min(timings), [obj.handle for obj in result]
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--people", type=int, default=100_000)
+    parser.add_argument("--families", type=int, default=40_000)
+    parser.add_argument("--repeat", type=int, default=3, help="number of runs")
+    args = parser.parse_args()
+
+    dbstate = ExampleDbSQLite(name="benchmark_sort").get_db(force_unlock=True)
+    db_handle = dbstate.db
+    try:
+        objects = {
+            "Person": make_synthetic(list(db_handle.iter_people()), args.people, "p"),
+            "Family": make_synthetic(
+                list(db_handle.iter_families()), args.families, "f"
+            ),
+        }
+        for class_name, sorts in SORTS.items():
+            print(f"{class_name}: {len(objects[class_name])} objects")
+            for sort_args in sorts:
+                keys = sort_args.split(",")
+                legacy, order_legacy = time_sort(
+                    sort_objects_legacy,
+                    db_handle,
+                    class_name,
+                    objects[class_name],
+                    keys,
+                    args.repeat,
+                )
+                single, order_single = time_sort(
+                    sort_objects,
+                    db_handle,
+                    class_name,
+                    objects[class_name],
+                    keys,
+                    args.repeat,
+                )
+                print(f"  sort={sort_args}")
+                print(f"    consecutive: {legacy * 1000:8.1f} ms")
+                print(f"    single pass: {single * 1000:8.1f} ms")
+                print(f"    speedup:     {legacy / single:8.2f}x")
+                print(f"    identical:   {order_legacy == order_single}")
+    finally:
+        dbstate.db.close()
+        tearDownModule()
+
+
+if __name__ == "__main__":
+    main()
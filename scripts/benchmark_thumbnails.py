@@ -0,0 +1,114 @@
+#! /usr/bin/env python3
+
+"""Micro-benchmark of thumbnail generation for large scans.
+
+Compares decoding synthetic large JPEG, JPEG 2000 and pyramidal TIFF scans at
+full resolution to decoding them at the reduced resolution needed for a
+thumbnail. Run from the repository root:
+
+    python scripts/benchmark_thumbnails.py
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, Tuple
+
+from PIL import Image, ImageDraw, TiffImagePlugin
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gramps_webapi.api.image import (  # noqa: E402
+    NEW_SUBFILE_TYPE,
+    LocalFileThumbnailHandler,
+    image_thumbnail,
+    open_image,
+    thumbnail_decode_size,
+)
+
+MIME_TYPES = {"jpg": "image/jpeg", "jp2": "image/jp2", "tif": "image/tiff"}
+
+
+def make_scan(width: int, height: int) -> Image.Image:
+    """Create an image with some structure, so that it does not compress away."""
+    image = Image.effect_noise((width // 8, height // 8), 64).convert("RGB")
+    image = image.resize((width, height))
+    draw = ImageDraw.Draw(image)
+    for x in range(0, width, 97):
+        draw.line([(x, 0), (width - x, height)], fill=(200, 80, 20), width=3)
+    return image
+
+
+def save_scans(image: Image.Image, dirname: str) -> Dict[str, str]:
+    """Save the image in all benchmarked formats and return the paths."""
+    paths = {ext: os.path.join(dirname, f"scan.{ext}") for ext in MIME_TYPES}
+    image.save(paths["jpg"], quality=90)
+    image.save(paths["jp2"], irreversible=True, quality_mode="rates")
+    # pyramidal TIFF as written by scanners and image servers
+    with TiffImagePlugin.AppendingTiffWriter(paths["tif"], True) as tiff:
+        level, subfile_type = image, 0
+        while min(level.size) >= 256:
+            level.save(
+                tiff,
+                format="TIFF",
+                compression="tiff_deflate",
+                tiffinfo={NEW_SUBFILE_TYPE: subfile_type},
+            )
+            tiff.newFrame()
+            level = level.reduce(2)
+            subfile_type = 1
+    return paths
+
+
+def best_time(func: Callable[[], Image.Image], repeat: int) -> Tuple[float, tuple]:
+    """Return the best time of some runs and the size of the decoded image."""
+    timings = []
+    size: tuple = ()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        image = func()
+        timings.append(time.perf_counter() - start)
+        size = image.size
+    return min(timings), size
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3, help="number of runs")
+    parser.add_argument("--width", type=int, default=7200, help="scan width")
+    parser.add_argument("--height", type=int, default=5400, help="scan height")
+    parser.add_argument("--size", type=int, default=200, help="thumbnail size")
+    args = parser.parse_args()
+
+    Image.MAX_IMAGE_PIXELS = None
+    decode_size = thumbnail_decode_size(args.size)
+    with tempfile.TemporaryDirectory() as dirname:
+        paths = save_scans(make_scan(args.width, args.height), dirname)
+        print(f"{args.width}x{args.height} scan, {args.size} px thumbnail")
+        for ext, path in paths.items():
+
+            def full() -> Image.Image:
+                image = open_image(path)
+                return image_thumbnail(image, size=args.size)
+
+            def reduced() -> Image.Image:
+                handler = LocalFileThumbnailHandler(path, MIME_TYPES[ext])
+                image = handler.get_image(size=decode_size)
+                return image_thumbnail(image, size=args.size)
+
+            full_time, full_size = best_time(full, args.repeat)
+            reduced_time, reduced_size = best_time(reduced, args.repeat)
+            decoded_size = open_image(path, size=decode_size).size
+            print(f"  {ext} ({os.path.getsize(path) / 1e6:.1f} MB)")
+            print(f"    full:     {full_time * 1000:8.1f} ms")
+            print(f"    reduced:  {reduced_time * 1000:8.1f} ms")
+            print(f"    speedup:  {full_time / reduced_time:8.2f}x")
+            print(f"    decoded:  {decoded_size[0]}x{decoded_size[1]}")
+            print(f"    same thumbnail size: {full_size == reduced_size}")
+
+
+if __name__ == "__main__":
+    main()
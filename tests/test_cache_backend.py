@@ -0,0 +1,130 @@
+#
+# Gramps Web API - A RESTful API for the Gramps genealogy program
+#
+# Copyright (C) 2026      Gramps Web contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Tests for the size-bounded LRU cache backend."""
+
+import os
+import time
+
+import pytest
+
+import gramps_webapi.cache_backend
+from gramps_webapi.api.cache import request_cache, thumbnail_cache
+from gramps_webapi.app import create_app
+from gramps_webapi.cache_backend import VALUE_SUFFIX, LRUFileSystemCache
+from gramps_webapi.config import DefaultConfig
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    # record every access, so the order of accesses within a test counts
+    monkeypatch.setattr(gramps_webapi.cache_backend, "ACCESS_RESOLUTION", 0)
+    return LRUFileSystemCache(
+        str(tmp_path), max_bytes=10_000, default_timeout=0, metrics_name="test"
+    )
+
+
+def _value_files(path):
+    return [name for name in os.listdir(path) if name.endswith(VALUE_SUFFIX)]
+
+
+def test_set_get(cache):
+    assert cache.get("key") is None
+    assert cache.set("key", {"a": [1, 2]})
+    assert cache.get("key") == {"a": [1, 2]}
+    assert cache.has("key")
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["items"] == 1
+    assert stats["bytes"] > 0
+
+
+def test_overwrite(cache, tmp_path):
+    cache.set("key", b"x" * 100)
+    cache.set("key", b"y" * 200)
+    assert cache.get("key") == b"y" * 200
+    assert len(_value_files(tmp_path)) == 1
+    assert cache.stats()["bytes"] == os.path.getsize(
+        tmp_path / _value_files(tmp_path)[0]
+    )
+
+
+def test_evicts_least_recently_used(cache, tmp_path):
+    for i in range(30):
+        cache.set(f"key{i}", b"x" * 1000)
+        # keep the first entry in use
+        assert cache.get("key0") is not None
+    stats = cache.stats()
+    assert stats["bytes"] <= 10_000
+    assert stats["evictions"] > 0
+    assert len(_value_files(tmp_path)) == stats["items"]
+    assert cache.get("key0") is not None
+    assert cache.get("key1") is None
+    assert cache.get("key29") is not None
+
+
+def test_add(cache):
+    assert cache.add("key", 1)
+    assert not cache.add("key", 2)
+    assert cache.get("key") == 1
+
+
+def test_timeout(cache):
+    cache.set("key", 1, timeout=1)
+    assert cache.get("key") == 1
+    time.sleep(1.1)
+    assert cache.get("key") is None
+    assert not cache.has("key")
+    assert cache.add("key", 2)
+
+
+def test_delete_clear(cache, tmp_path):
+    cache.set("key1", 1)
+    cache.set("key2", 2)
+    assert cache.delete("key1")
+    assert not cache.delete("key1")
+    assert cache.get("key1") is None
+    assert cache.clear()
+    assert cache.get("key2") is None
+    assert _value_files(tmp_path) == []
+    assert cache.stats()["bytes"] == 0
+
+
+def test_shared_directory(cache, tmp_path):
+    other = LRUFileSystemCache(str(tmp_path), max_bytes=10_000, metrics_name="test")
+    cache.set("key", 1)
+    assert other.get("key") == 1
+    other.delete("key")
+    assert cache.get("key") is None
+
+
+def test_default_app_config(tmp_path):
+    config = {"TREE": "test", "SECRET_KEY": "test", "USER_DB_URI": "sqlite://"}
+    for name in ["REQUEST_CACHE_CONFIG", "THUMBNAIL_CACHE_CONFIG"]:
+        config[name] = {
+            **getattr(DefaultConfig, name),
+            "CACHE_DIR": str(tmp_path / name.lower()),
+        }
+    app = create_app(config, config_from_env=False)
+    with app.app_context():
+        for cache in [request_cache, thumbnail_cache]:
+            assert isinstance(cache.cache, LRUFileSystemCache)
+            assert cache.set("key", 1)
+            assert cache.get("key") == 1
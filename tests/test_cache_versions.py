@@ -0,0 +1,152 @@
+#
+# Gramps Web API - A RESTful API for the Gramps genealogy program
+#
+# Copyright (C) 2026      Gramps Web contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Tests for the object class versions of the request cache."""
+
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from gramps.gen.db import DbTxn
+from gramps.gen.db.utils import make_database
+from gramps.gen.lib import Note, Person
+
+from gramps_webapi.cache_versions import (
+    acknowledge_meta_mtime,
+    bump_class_versions,
+    get_meta_mtime,
+    get_version_key,
+)
+from gramps_webapi.undodb import DbUndoSQLWeb
+
+
+def _touch_meta(tree_dir, mtime_ns):
+    path = os.path.join(tree_dir, "meta_data.db")
+    Path(path).touch()
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+class TestCacheVersions(unittest.TestCase):
+    """Test the version keys of object classes."""
+
+    def setUp(self):
+        self.tree_dir = tempfile.mkdtemp()
+        _touch_meta(self.tree_dir, 1_000_000_000)
+
+    def tearDown(self):
+        shutil.rmtree(self.tree_dir)
+
+    def test_no_meta_data(self):
+        os.remove(os.path.join(self.tree_dir, "meta_data.db"))
+        self.assertIsNone(get_version_key(self.tree_dir, ["Person"]))
+
+    def test_stable(self):
+        key = get_version_key(self.tree_dir, ["Person"])
+        self.assertEqual(get_version_key(self.tree_dir, ["Person"]), key)
+
+    def test_bump_class(self):
+        person_key = get_version_key(self.tree_dir, ["Person"])
+        note_key = get_version_key(self.tree_dir, ["Note"])
+        all_key = get_version_key(self.tree_dir)
+        bump_class_versions(self.tree_dir, ["Note"])
+        self.assertEqual(get_version_key(self.tree_dir, ["Person"]), person_key)
+        self.assertNotEqual(get_version_key(self.tree_dir, ["Note"]), note_key)
+        self.assertNotEqual(get_version_key(self.tree_dir), all_key)
+
+    def test_bump_all(self):
+        person_key = get_version_key(self.tree_dir, ["Person"])
+        bump_class_versions(self.tree_dir, None)
+        self.assertNotEqual(get_version_key(self.tree_dir, ["Person"]), person_key)
+
+    def test_untracked_change(self):
+        person_key = get_version_key(self.tree_dir, ["Person"])
+        _touch_meta(self.tree_dir, 2_000_000_000)
+        self.assertNotEqual(get_version_key(self.tree_dir, ["Person"]), person_key)
+
+    def test_acknowledged_change(self):
+        person_key = get_version_key(self.tree_dir, ["Person"])
+        _touch_meta(self.tree_dir, 2_000_000_000)
+        acknowledge_meta_mtime(
+            self.tree_dir, previous=1_000_000_000, current=2_000_000_000
+        )
+        self.assertEqual(get_version_key(self.tree_dir, ["Person"]), person_key)
+
+    def test_acknowledge_after_untracked_change(self):
+        person_key = get_version_key(self.tree_dir, ["Person"])
+        # an untracked change happened before the tracked one
+        _touch_meta(self.tree_dir, 2_000_000_000)
+        _touch_meta(self.tree_dir, 3_000_000_000)
+        acknowledge_meta_mtime(
+            self.tree_dir, previous=2_000_000_000, current=3_000_000_000
+        )
+        self.assertNotEqual(get_version_key(self.tree_dir, ["Person"]), person_key)
+
+    def test_no_subdirectories(self):
+        """Test that the tree directory can be removed the way Gramps does it."""
+        get_version_key(self.tree_dir)
+        bump_class_versions(self.tree_dir, ["Person"])
+        for name in os.listdir(self.tree_dir):
+            self.assertTrue(os.path.isfile(os.path.join(self.tree_dir, name)))
+
+
+class TestUndoDbVersions(unittest.TestCase):
+    """Test that commits replace the versions of the changed classes."""
+
+    def setUp(self):
+        self.dbdir = tempfile.mkdtemp()
+        self.db = make_database("sqlite")
+
+        def create_undo_manager():
+            path = self.db.undolog
+            return DbUndoSQLWeb(grampsdb=self.db, dburl=f"sqlite:///{path}")
+
+        self.db._create_undo_manager = create_undo_manager
+        self.db.load(self.dbdir)
+        _touch_meta(self.dbdir, 1_000_000_000)
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.dbdir)
+
+    def test_commit(self):
+        person_key = get_version_key(self.dbdir, ["Person"])
+        note_key = get_version_key(self.dbdir, ["Note"])
+        with DbTxn("Add note", self.db) as trans:
+            self.db.add_note(Note("note"), trans)
+        self.assertEqual(get_version_key(self.dbdir, ["Person"]), person_key)
+        self.assertNotEqual(get_version_key(self.dbdir, ["Note"]), note_key)
+        self.assertEqual(self.db.undodb.meta_mtime_before_commit, 1_000_000_000)
+
+    def test_batch_commit(self):
+        person_key = get_version_key(self.dbdir, ["Person"])
+        with DbTxn("Add note", self.db, batch=True) as trans:
+            self.db.add_note(Note("note"), trans)
+        self.assertNotEqual(get_version_key(self.dbdir, ["Person"]), person_key)
+
+    def test_undo(self):
+        with DbTxn("Add person", self.db) as trans:
+            self.db.add_person(Person(), trans)
+        note_key = get_version_key(self.dbdir, ["Note"])
+        self.db.undo()
+        self.assertNotEqual(get_version_key(self.dbdir, ["Note"]), note_key)
+
+    def test_meta_mtime(self):
+        self.assertEqual(get_meta_mtime(self.dbdir), 1_000_000_000)
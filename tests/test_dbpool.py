@@ -0,0 +1,180 @@
+#
+# Gramps Web API - A RESTful API for the Gramps genealogy program
+#
+# Copyright (C) 2026      Gramps Web contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Tests for the `gramps_webapi.dbpool` module."""
+
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from gramps.cli.clidbman import CLIDbManager
+from gramps.gen.dbstate import DbState
+
+from gramps_webapi.dbmanager import WebDbManager
+from gramps_webapi.dbpool import DbPool, get_meta_mtime
+
+
+class TestDbPool(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.name = "Test Db Pool"
+        cls.dbman = CLIDbManager(DbState())
+        cls.dbman.create_new_db_cli(cls.name, dbid="sqlite")
+        cls.dbmgr = WebDbManager(cls.name, create_if_missing=False)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.dbman.remove_database(cls.name)
+
+    def setUp(self):
+        self.pool = DbPool(max_idle=60)
+
+    def tearDown(self):
+        self.pool.clear()
+
+    def test_reuse(self):
+        db = self.pool.acquire(self.dbmgr)
+        self.assertTrue(self.pool.release(db))
+        db2 = self.pool.acquire(self.dbmgr)
+        self.assertIs(db, db2)
+        self.assertTrue(db2.is_open())
+        self.pool.release(db2)
+        stats = self.pool.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["idle"], 1)
+        self.assertEqual(stats["in_use"], 0)
+
+    def test_release_unknown(self):
+        dbstate = self.dbmgr.get_db()
+        self.assertFalse(self.pool.release(dbstate.db))
+        dbstate.db.close()
+
+    def test_checked_out_not_shared(self):
+        db = self.pool.acquire(self.dbmgr)
+        db2 = self.pool.acquire(self.dbmgr)
+        self.assertIsNot(db, db2)
+        self.pool.release(db)
+        self.pool.release(db2)
+        self.assertEqual(self.pool.stats()["idle"], 2)
+
+    def test_max_per_key(self):
+        pool = DbPool(max_idle=60, max_per_key=1)
+        db = pool.acquire(self.dbmgr)
+        db2 = pool.acquire(self.dbmgr)
+        pool.release(db)
+        pool.release(db2)
+        self.assertEqual(pool.stats()["idle"], 1)
+        self.assertEqual(pool.stats()["evictions"], 1)
+        self.assertFalse(db2.is_open())
+        pool.clear()
+
+    def test_invalidate_on_meta_change(self):
+        db = self.pool.acquire(self.dbmgr)
+        self.pool.release(db)
+        meta_mtime = get_meta_mtime(self.dbmgr.path)
+        # closing a writable database touches meta_data.db
+        dbstate = self.dbmgr.get_db(readonly=False)
+        dbstate.db.close()
+        dbstate.db.undodb.close()
+        self.assertNotEqual(get_meta_mtime(self.dbmgr.path), meta_mtime)
+        db2 = self.pool.acquire(self.dbmgr)
+        self.assertIsNot(db, db2)
+        self.assertFalse(db.is_open())
+        self.pool.release(db2)
+        self.assertEqual(self.pool.stats()["invalidations"], 1)
+
+    def test_health_check(self):
+        db = self.pool.acquire(self.dbmgr)
+        self.pool.release(db)
+        db.dbapi.close()
+        db2 = self.pool.acquire(self.dbmgr)
+        self.assertIsNot(db, db2)
+        self.pool.release(db2)
+        self.assertEqual(self.pool.stats()["health_check_failures"], 1)
+
+    def test_max_idle(self):
+        pool = DbPool(max_idle=0.01)
+        db = pool.acquire(self.dbmgr)
+        pool.release(db)
+        time.sleep(0.02)
+        db2 = pool.acquire(self.dbmgr)
+        self.assertIsNot(db, db2)
+        self.assertFalse(db.is_open())
+        pool.release(db2)
+        self.assertEqual(pool.stats()["evictions"], 1)
+        pool.clear()
+
+    def test_per_thread(self):
+        db = self.pool.acquire(self.dbmgr)
+        self.pool.release(db)
+        result = {}
+
+        def target():
+            other = self.pool.acquire(self.dbmgr)
+            result["db"] = other
+            other.get_number_of_people()
+            self.pool.release(other)
+
+        thread = threading.Thread(target=target)
+        thread.start()
+        thread.join()
+        self.assertIsNot(result["db"], db)
+        self.assertEqual(self.pool.stats()["misses"], 2)
+
+    def test_close_deferred_to_owning_thread(self):
+        pool = DbPool(max_idle=0.01)
+        with ThreadPoolExecutor(max_workers=1) as executor:
+
+            def acquire_release():
+                db = pool.acquire(self.dbmgr)
+                pool.release(db)
+                return db
+
+            db = executor.submit(acquire_release).result()
+            time.sleep(0.02)
+            # the expired handle of the worker thread is evicted here ...
+            db2 = pool.acquire(self.dbmgr)
+            self.assertTrue(db.is_open())
+            self.assertEqual(pool.stats()["pending_close"], 1)
+            # ... and closed by the worker thread when it next uses the pool
+            executor.submit(acquire_release).result()
+            self.assertFalse(db.is_open())
+            self.assertEqual(pool.stats()["pending_close"], 0)
+            pool.release(db2)
+        pool.clear()
+
+    def test_close_of_finished_thread(self):
+        pool = DbPool(max_idle=0.01)
+        result = {}
+
+        def target():
+            result["db"] = pool.acquire(self.dbmgr)
+            pool.release(result["db"])
+
+        thread = threading.Thread(target=target)
+        thread.start()
+        thread.join()
+        time.sleep(0.02)
+        db2 = pool.acquire(self.dbmgr)
+        self.assertEqual(pool.stats()["evictions"], 1)
+        self.assertEqual(pool.stats()["pending_close"], 0)
+        pool.release(db2)
+        pool.clear()
@@ -76,6 +76,7 @@ def setUpModule():
                 "TESTING": True,
                 "RATELIMIT_ENABLED": False,
                 "MEDIA_BASE_DIR": f"{os.environ['GRAMPS_RESOURCES']}/doc/gramps/example/gramps",
+                "VERIFY_DIR": os.path.join(TEST_GRAMPSHOME, "verify_cache"),
                 "VECTOR_EMBEDDING_MODEL": "paraphrase-albert-small-v2",
                 "LLM_MODEL": "mock-model",
             },
@@ -125,6 +126,7 @@ def setUpModule():
                 "TESTING": True,
                 "RATELIMIT_ENABLED": False,
                 "MEDIA_BASE_DIR": f"{os.environ['GRAMPS_RESOURCES']}/doc/gramps/example/gramps",
+                "VERIFY_DIR": os.path.join(TEST_GRAMPSHOME, "verify_cache"),
                 "TREE": test_db.name,
             },
             config_from_env=False,
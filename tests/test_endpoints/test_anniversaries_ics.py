@@ -89,6 +89,24 @@ class TestAnniversariesIcs(unittest.TestCase):
         self.assertNotIn("\\\\nType: Birth", text)
         self.assertNotIn("Type: Death", text)
 
+    def test_public_feed_etag(self):
+        """Unchanged feed returns 304 for a matching ETag."""
+        _, token = self._create_token(role=ROLE_OWNER)
+        rv = self.client.get(f"{ICS_URL}?token={token}")
+        self.assertEqual(rv.status_code, 200)
+        etag = rv.headers["ETag"]
+        rv = self.client.get(
+            f"{ICS_URL}?token={token}", headers={"If-None-Match": etag}
+        )
+        self.assertEqual(rv.status_code, 304)
+        self.assertEqual(rv.headers["ETag"], etag)
+        rv = self.client.get(
+            f"{ICS_URL}?token={token}&event_types=Birth",
+            headers={"If-None-Match": etag},
+        )
+        self.assertEqual(rv.status_code, 200)
+        self.assertNotEqual(rv.headers["ETag"], etag)
+
     def test_public_feed_generation_depth_validation(self):
         """generation_depth is bounded between 1 and 9."""
         _, token = self._create_token(role=ROLE_OWNER)
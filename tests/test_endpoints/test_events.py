@@ -502,6 +502,18 @@ class TestEvents(unittest.TestCase):
         rv = check_success(self, TEST_URL + "?dates=1855/1/1-1900/12/31")
         self.assertEqual(len(rv), 300)
 
+    def test_get_events_parameter_dates_paged_matches_full_result(self):
+        """Test dates parameter gives the same events with pagination."""
+        for dates in ["*/1/1", "1855/1/1-1900/12/31"]:
+            rv = check_success(self, TEST_URL + "?keys=handle&dates=" + dates)
+            expected = [event["handle"] for event in rv]
+            rv = check_success(
+                self, TEST_URL + "?keys=handle&page=1&pagesize=2000&dates=" + dates
+            )
+            self.assertEqual([event["handle"] for event in rv], expected)
+            rv = check_success(self, TEST_URL + "?keys=handle&sort=date&dates=" + dates)
+            self.assertEqual(sorted(event["handle"] for event in rv), sorted(expected))
+
 
 class TestEventsHandle(unittest.TestCase):
     """Test cases for the /api/events/{handle} endpoint for a specific event."""
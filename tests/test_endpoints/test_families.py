@@ -38,6 +38,7 @@ from .checks import (
     check_success,
     check_totals,
 )
+from .util import fetch_header
 
 TEST_URL = BASE_URL + "/families/"
 
@@ -1206,3 +1207,39 @@ class TestFamiliesHandleTimeline(unittest.TestCase):
         check_invalid_semantics(
             self, TEST_URL + "9OUJQCBOHW9UEK9CNV/timeline?ratings", check="boolean"
         )
+
+
+class TestFamiliesCachedOrder(unittest.TestCase):
+    """Test cases for the cached default order of families."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Test class setup."""
+        cls.client = get_test_client()
+
+    def test_get_families_resorted_after_parent_rename(self):
+        """Test that renaming a father re-sorts the cached family list."""
+        headers = fetch_header(self.client)
+        url = TEST_URL + "?keys=handle,father_handle"
+        rv = self.client.get(url, headers=headers)
+        self.assertEqual(rv.status_code, 200)
+        handles = [family["handle"] for family in rv.json]
+        family = [family for family in rv.json if family["father_handle"]][-1]
+        index = handles.index(family["handle"])
+        person_url = f"{BASE_URL}/people/{family['father_handle']}"
+        rv = self.client.get(person_url, headers=headers)
+        self.assertEqual(rv.status_code, 200)
+        person = rv.json
+        surname = person["primary_name"]["surname_list"][0]["surname"]
+        person["primary_name"]["surname_list"][0]["surname"] = "AAAAA"
+        rv = self.client.put(person_url, json=person, headers=headers)
+        self.assertEqual(rv.status_code, 200)
+        try:
+            rv = self.client.get(url, headers=headers)
+            self.assertEqual(rv.status_code, 200)
+            new_handles = [family["handle"] for family in rv.json]
+            self.assertLess(new_handles.index(family["handle"]), index)
+        finally:
+            person["primary_name"]["surname_list"][0]["surname"] = surname
+            rv = self.client.put(person_url, json=person, headers=headers)
+            self.assertEqual(rv.status_code, 200)
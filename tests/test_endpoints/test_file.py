@@ -24,7 +24,10 @@ from io import BytesIO
 
 from PIL import Image
 
+from gramps_webapi.api.cache import thumbnail_cache
+from gramps_webapi.api.thumbnails import pregenerate_thumbnails
 from gramps_webapi.const import MIME_AVIF
+from gramps_webapi.dbmanager import WebDbManager
 
 from . import BASE_URL, get_test_client
 from .checks import check_requires_token, check_success
@@ -55,6 +58,29 @@ class TestFile(unittest.TestCase):
             )
             assert rv.mimetype == obj["mime"]
 
+    def test_get_file_range(self):
+        """Test range requests for files."""
+        obj = check_success(self, TEST_URL)[0]
+        url = "{}{}/file".format(TEST_URL, obj["handle"])
+        rv = check_success(self, url, full=True)
+        data = rv.data
+        etag = rv.headers["ETag"]
+        headers = fetch_header(self.client)
+        rv = self.client.get(
+            url, headers={**headers, "Range": "bytes=10-19", "If-Range": etag}
+        )
+        assert rv.status_code == 206
+        assert rv.headers["Content-Range"] == f"bytes 10-19/{len(data)}"
+        assert rv.data == data[10:20]
+        # the file changed, so the whole file is sent
+        rv = self.client.get(
+            url, headers={**headers, "Range": "bytes=10-19", "If-Range": "other"}
+        )
+        assert rv.status_code == 200
+        assert rv.data == data
+        rv = self.client.get(url, headers={**headers, "If-None-Match": etag})
+        assert rv.status_code == 304
+
 
 class TestThumbnail(unittest.TestCase):
     """Test cases for the /api/media/{}/thumbnail endpoint."""
@@ -117,7 +143,9 @@ class TestThumbnail(unittest.TestCase):
         """
         header = fetch_header(self.client)
         with self.assertNoLogs("flask_caching", level="ERROR"):
-            rv = self.client.get(f"{TEST_URL}does_not_exist/thumbnail/20", headers=header)
+            rv = self.client.get(
+                f"{TEST_URL}does_not_exist/thumbnail/20", headers=header
+            )
         assert rv.status_code == 404
 
     def test_get_thumbnail_large_requires_token(self):
@@ -150,6 +178,67 @@ class TestThumbnail(unittest.TestCase):
             assert min(full_img.width, full_img.height) == thumb.height
 
 
+class TestThumbnailPregeneration(unittest.TestCase):
+    """Test cases for rendering thumbnails into the cache in advance."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Test class setup."""
+        cls.client = get_test_client()
+
+    def test_pregenerate_thumbnails(self):
+        """Pre-generated thumbnails are served from the cache."""
+        app = self.client.application
+        dbmgr = WebDbManager(name="example_gramps")
+        sizes = [[31, True]]
+        with app.app_context():
+            db = dbmgr.get_db().db
+            try:
+                rendered = pregenerate_thumbnails(db, tree=dbmgr.dirname, sizes=sizes)
+                # thumbnails in the cache are not rendered again
+                again = pregenerate_thumbnails(db, tree=dbmgr.dirname, sizes=sizes)
+            finally:
+                db.close()
+            hits = thumbnail_cache.cache.stats()["hits"]
+        assert rendered >= 7
+        assert again == 0
+        media_objects = check_success(self, TEST_URL)
+        for obj in media_objects:
+            rv = check_success(
+                self,
+                f"{TEST_URL}{obj['handle']}/thumbnail/31?square=true",
+                full=True,
+            )
+            assert rv.mimetype == MIME_AVIF
+            img = Image.open(BytesIO(rv.data))
+            assert img.width == img.height == 31
+        with app.app_context():
+            assert thumbnail_cache.cache.stats()["hits"] == hits + len(media_objects)
+
+    def test_pregenerate_thumbnails_parallel(self):
+        """Thumbnails are pre-generated by worker processes."""
+        app = self.client.application
+        dbmgr = WebDbManager(name="example_gramps")
+        sizes = [[33, False]]
+        with app.app_context():
+            db = dbmgr.get_db().db
+            try:
+                serial = pregenerate_thumbnails(
+                    db, tree=dbmgr.dirname, sizes=[[32, False]]
+                )
+                parallel = pregenerate_thumbnails(
+                    db, tree=dbmgr.dirname, sizes=sizes, workers=2
+                )
+            finally:
+                db.close()
+        assert parallel == serial
+        media_objects = check_success(self, TEST_URL)
+        rv = check_success(
+            self, f"{TEST_URL}{media_objects[0]['handle']}/thumbnail/33", full=True
+        )
+        assert rv.mimetype == MIME_AVIF
+
+
 class TestCropped(unittest.TestCase):
     """Test cases for the /api/media/{}/cropped endpoint."""
 
@@ -320,7 +409,9 @@ class TestMapTile(unittest.TestCase):
         self.assertEqual(rv.status_code, 401)
         # With auth the endpoint must be reachable (404 expected — no map:bounds on this object)
         header = fetch_header(self.client)
-        rv = self.client.get(TEST_URL + "b39fe1cfc1305ac4a21/tile/5/16/11", headers=header)
+        rv = self.client.get(
+            TEST_URL + "b39fe1cfc1305ac4a21/tile/5/16/11", headers=header
+        )
         self.assertNotEqual(rv.status_code, 500)
 
     def test_get_map_tile_unknown_handle(self):
@@ -22,6 +22,7 @@
 
 import uuid
 import unittest
+from unittest.mock import patch
 
 from jsonschema import validate
 from gramps_webapi.const import GRAMPS_NAMESPACES
@@ -856,3 +857,84 @@ class TestCrossNamespaceFilters(unittest.TestCase):
             {"rules": [{"namespace": "Person", "rules": [{"name": "AllPersons"}]}]},
         )
         assert status == 400
+
+
+class TestCompiledFilters(unittest.TestCase):
+    """Test cases for reusing compiled filters."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Test class setup."""
+        cls.client = get_test_client()
+
+    def test_prepared_rules_follow_changes(self):
+        """Test that kept rule preparations are renewed when the tree changes."""
+        from gramps_webapi.api.resources.filters import compiled_filters
+
+        headers = fetch_header(self.client)
+        parent_handle = make_handle()
+        child_handle = make_handle()
+        family_handle = make_handle()
+        url = (
+            '/api/people/?rules={"rules":[{"name":"IsDescendantOf",'
+            '"values":["ICompiled1","0"]}]}'
+        )
+
+        def handles(rv):
+            return {obj["handle"] for obj in rv.json}
+
+        for handle, gramps_id in [
+            (parent_handle, "ICompiled1"),
+            (child_handle, "ICompiled2"),
+        ]:
+            payload = {"_class": "Person", "handle": handle, "gramps_id": gramps_id}
+            rv = self.client.post("/api/people/", json=payload, headers=headers)
+            assert rv.status_code == 201
+
+        stats = compiled_filters.stats()
+        rv = self.client.get(url, headers=headers)
+        assert rv.json == []
+        # other arguments, so the response is not taken from the request cache
+        rv = self.client.get(url + "&keys=handle", headers=headers)
+        assert rv.json == []
+        new_stats = compiled_filters.stats()
+        assert new_stats["hits"] > stats["hits"]
+        assert new_stats["reused_rules"] > stats["reused_rules"]
+
+        # the prepared descendants are renewed after adding a family
+        payload = {
+            "_class": "Family",
+            "handle": family_handle,
+            "father_handle": parent_handle,
+            "child_ref_list": [{"_class": "ChildRef", "ref": child_handle}],
+        }
+        rv = self.client.post("/api/families/", json=payload, headers=headers)
+        assert rv.status_code == 201
+        rv = self.client.get(url, headers=headers)
+        assert handles(rv) == {child_handle}
+
+        # clean up
+        rv = self.client.delete(f"/api/families/{family_handle}", headers=headers)
+        assert rv.status_code == 200
+        for handle in [parent_handle, child_handle]:
+            rv = self.client.delete(f"/api/people/{handle}", headers=headers)
+            assert rv.status_code == 200
+        rv = self.client.get(url, headers=headers)
+        assert rv.json == []
+
+    def test_failed_application_returns_filter(self):
+        """Test that a filter is reset and returned to the cache if applying fails."""
+        from gramps_webapi.api.resources.filters import (
+            CompiledFilter,
+            CompiledFilterCache,
+        )
+
+        cache = CompiledFilterCache()
+        args = {"rules": '{"rules":[{"name":"MatchIdOf","values":["I0044"]}]}'}
+        with patch.object(
+            CompiledFilter, "apply", side_effect=RuntimeError
+        ), patch.object(CompiledFilter, "release") as release:
+            with self.assertRaises(RuntimeError):
+                cache.apply(None, args, "Person")
+        release.assert_called_once()
+        assert cache.stats()["filters"] == 1
@@ -0,0 +1,112 @@
+#
+# Gramps Web API - A RESTful API for the Gramps genealogy program
+#
+# Copyright (C) 2026      Gramps Web contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Tests for the `gramps_webapi.api.resources.metrics` module."""
+
+import os
+import unittest
+from unittest.mock import patch
+
+from gramps.cli.clidbman import CLIDbManager
+from gramps.gen.dbstate import DbState
+
+from gramps_webapi.app import create_app
+from gramps_webapi.auth import add_user, user_db
+from gramps_webapi.auth.const import ROLE_ADMIN, ROLE_OWNER
+from gramps_webapi.const import ENV_CONFIG_FILE, TEST_AUTH_CONFIG
+
+from . import BASE_URL
+
+
+class TestMetrics(unittest.TestCase):
+    """Test cases for the /api/metrics/ endpoint."""
+
+    def setUp(self):
+        self.name = "Test Web API Metrics"
+        self.dbman = CLIDbManager(DbState())
+        dirpath, _name = self.dbman.create_new_db_cli(self.name, dbid="sqlite")
+        tree = os.path.basename(dirpath)
+        with patch.dict("os.environ", {ENV_CONFIG_FILE: TEST_AUTH_CONFIG}):
+            self.app = create_app(
+                config={"TESTING": True, "RATELIMIT_ENABLED": False},
+                config_from_env=False,
+            )
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            user_db.create_all()
+            add_user(
+                name="owner",
+                password="123",
+                email="owner@example.com",
+                role=ROLE_OWNER,
+                tree=tree,
+            )
+            add_user(
+                name="admin",
+                password="123",
+                email="admin@example.com",
+                role=ROLE_ADMIN,
+                tree=tree,
+            )
+        rv = self.client.post(
+            BASE_URL + "/token/", json={"username": "owner", "password": "123"}
+        )
+        self.header_owner = {"Authorization": f"Bearer {rv.json['access_token']}"}
+        rv = self.client.post(
+            BASE_URL + "/token/", json={"username": "admin", "password": "123"}
+        )
+        self.header_admin = {"Authorization": f"Bearer {rv.json['access_token']}"}
+
+    def tearDown(self):
+        self.dbman.remove_database(self.name)
+
+    def test_get_metrics_unauthorized(self):
+        rv = self.client.get(f"{BASE_URL}/metrics/")
+        assert rv.status_code == 401
+        rv = self.client.get(f"{BASE_URL}/metrics/", headers=self.header_owner)
+        assert rv.status_code == 403
+
+    def test_get_metrics_db_pool(self):
+        rv = self.client.get(f"{BASE_URL}/people/", headers=self.header_admin)
+        assert rv.status_code == 200
+        rv = self.client.get(f"{BASE_URL}/people/", headers=self.header_admin)
+        assert rv.status_code == 200
+        rv = self.client.get(f"{BASE_URL}/metrics/", headers=self.header_admin)
+        assert rv.status_code == 200
+        stats = rv.json["db_pool"]
+        assert stats["hits"] >= 1
+        assert stats["misses"] >= 1
+        assert stats["in_use"] == 0
+
+    def test_get_metrics_request_cache(self):
+        # writing to the tree creates the meta data file needed for caching
+        rv = self.client.post(
+            f"{BASE_URL}/people/", json={"_class": "Person"}, headers=self.header_owner
+        )
+        assert rv.status_code == 201
+        rv = self.client.get(f"{BASE_URL}/people/", headers=self.header_admin)
+        assert rv.status_code == 200
+        rv = self.client.get(f"{BASE_URL}/people/", headers=self.header_admin)
+        assert rv.status_code == 200
+        rv = self.client.get(f"{BASE_URL}/metrics/", headers=self.header_admin)
+        assert rv.status_code == 200
+        stats = rv.json["request_cache"]
+        assert stats["hits"] >= 1
+        assert stats["bytes"] > 0
+        assert stats["items"] >= 1
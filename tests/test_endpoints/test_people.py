@@ -419,6 +419,55 @@ class TestPeople(unittest.TestCase):
         )
         assert len(rv) == 20
 
+    def test_get_people_parameter_gql_page(self):
+        """Test paging with a gql query."""
+        query = "?keys=handle&gql=" + quote("(gramps_id ~ I004 or gramps_id ~ I003)")
+        full = check_success(self, TEST_URL + query)
+        rv = check_success(self, TEST_URL + query + "&page=2&pagesize=3", full=True)
+        assert rv.json == full[3:6]
+        assert rv.headers["X-Total-Count"] == "20"
+        rv = check_success(self, TEST_URL + query + "&page=7&pagesize=3", full=True)
+        assert rv.json == full[18:]
+        assert rv.headers["X-Total-Count"] == "20"
+
+    def test_get_people_parameter_gql_page_estimate_total(self):
+        """Test paging with a gql query and estimated total."""
+        query = "?keys=handle&gql=" + quote("(gramps_id ~ I004 or gramps_id ~ I003)")
+        full = check_success(self, TEST_URL + query)
+        rv = check_success(
+            self, TEST_URL + query + "&page=1&pagesize=3&estimate_total=1", full=True
+        )
+        assert rv.json == full[:3]
+        assert int(rv.headers["X-Total-Count"]) >= 3
+
+    def test_get_people_parameter_page_window(self):
+        """Test that a page without conditions matches the full list."""
+        full = check_success(self, TEST_URL + "?keys=handle")
+        rv = check_success(self, TEST_URL + "?keys=handle&page=5&pagesize=7", full=True)
+        assert rv.json == full[28:35]
+        assert rv.headers["X-Total-Count"] == str(len(full))
+
+    def test_get_people_parameter_stream(self):
+        """Test that a streamed response matches the regular one."""
+        full = check_success(self, TEST_URL + "?keys=handle,gramps_id")
+        rv = check_success(self, TEST_URL + "?keys=handle,gramps_id&stream=1", full=True)
+        assert rv.json == full
+        assert rv.headers["X-Total-Count"] == str(len(full))
+        assert "ETag" in rv.headers
+        rv = check_success(
+            self, TEST_URL + "?keys=handle&stream=1&page=3&pagesize=5", full=True
+        )
+        assert rv.json == [{"handle": obj["handle"]} for obj in full[10:15]]
+
+    def test_get_people_parameter_stream_gql(self):
+        """Test streaming with a gql query."""
+        query = "?keys=handle&gql=" + quote("(gramps_id ~ I004 or gramps_id ~ I003)")
+        full = check_success(self, TEST_URL + query)
+        rv = check_success(self, TEST_URL + query + "&stream=1", full=True)
+        assert rv.json == full
+        assert "X-Total-Count" not in rv.headers
+        check_invalid_semantics(self, TEST_URL + "?stream=1&gql=" + quote("(gramps_id"))
+
     def test_get_people_parameter_oql_validate_semantics(self):
         """Test invalid rules syntax."""
         check_invalid_semantics(self, TEST_URL + "?oql=(")
@@ -91,3 +91,48 @@ class TestS3(unittest.TestCase):
         self.assertEqual(res["path"], f"{res['checksum']}.jpg")
         self.assertEqual(res["mime"], "image/jpeg")
         self.assertEqual(res["checksum"], checksum)
+
+    @mock_s3
+    def test_get_file_proxied(self):
+        """Stream a file from object storage with range requests."""
+        boto3.resource("s3", region_name="us-east-1").create_bucket(
+            Bucket="test-bucket"
+        )
+        img, checksum, size = get_image(1)
+        data = img.read()
+        headers = get_headers(self.client, "owner", "owner")
+        rv = self.client.post(
+            "/api/media/", data=data, headers=headers, content_type="image/jpeg"
+        )
+        self.assertEqual(rv.status_code, 201)
+        url = f"/api/media/{rv.json[0]['new']['handle']}/file"
+        rv = self.client.get(url, headers=headers)
+        self.assertEqual(rv.status_code, 307)
+        config = self.client.application.config
+        config["MEDIA_S3_PROXY"] = True
+        try:
+            rv = self.client.get(url, headers=headers)
+            self.assertEqual(rv.status_code, 200)
+            self.assertEqual(rv.data, data)
+            self.assertEqual(rv.headers["ETag"], checksum)
+            self.assertEqual(rv.headers["Accept-Ranges"], "bytes")
+            rv = self.client.get(url, headers={**headers, "Range": "bytes=5-14"})
+            self.assertEqual(rv.status_code, 206)
+            self.assertEqual(rv.headers["Content-Range"], f"bytes 5-14/{size}")
+            self.assertEqual(rv.data, data[5:15])
+            rv = self.client.get(url, headers={**headers, "Range": "bytes=-10"})
+            self.assertEqual(rv.status_code, 206)
+            self.assertEqual(rv.data, data[-10:])
+            rv = self.client.get(
+                url, headers={**headers, "Range": "bytes=5-14", "If-Range": "other"}
+            )
+            self.assertEqual(rv.status_code, 200)
+            self.assertEqual(rv.data, data)
+            rv = self.client.get(
+                url, headers={**headers, "Range": f"bytes={size + 10}-"}
+            )
+            self.assertEqual(rv.status_code, 416)
+            rv = self.client.get(url, headers={**headers, "If-None-Match": checksum})
+            self.assertEqual(rv.status_code, 304)
+        finally:
+            config["MEDIA_S3_PROXY"] = False
@@ -23,9 +23,10 @@
 import shutil
 import tempfile
 import unittest
+from unittest.mock import patch
 from urllib.parse import quote
 
-from gramps_webapi.api.search import SearchIndexer
+from gramps_webapi.api.search import SearchIndexer, get_search_indexer
 from gramps_webapi.auth.const import ROLE_GUEST, ROLE_OWNER
 from gramps_webapi.dbmanager import WebDbManager
 
@@ -82,6 +83,22 @@ class TestSearchEngine(unittest.TestCase):
         total, rv = self.search.search("I0044", page=1, pagesize=10)
         self.assertEqual(len(rv), 1)
 
+    def test_reindexing_parallel(self):
+        """Test if a parallel reindex leads to the same index."""
+        count = self.search.count(include_private=True)
+        total, rv = self.search.search("Lewis von", page=1, pagesize=20)
+        db = self.__class__.dbmgr.get_db().db
+        self.__class__.search.reindex_full(db, workers=2, dbmgr=self.dbmgr)
+        db.close()
+        self.assertEqual(self.search.count(include_private=True), count)
+        total_parallel, rv_parallel = self.search.search(
+            "Lewis von", page=1, pagesize=20
+        )
+        self.assertEqual(total_parallel, total)
+        self.assertEqual(
+            {hit["handle"] for hit in rv_parallel}, {hit["handle"] for hit in rv}
+        )
+
     def test_search_method(self):
         """Test search engine returns an expected result."""
         total, rv = self.search.search("Lewis von", page=1, pagesize=20)
@@ -107,6 +124,56 @@ class TestSearch(unittest.TestCase):
         """Test class setup."""
         cls.client = get_test_client()
 
+    def test_get_search_indexer_is_shared(self):
+        """Test that the indexer of a tree is only set up once per process."""
+        tree = WebDbManager(name="example_gramps", create_if_missing=False).dirname
+        with self.client.application.app_context():
+            indexer = get_search_indexer(tree)
+            self.assertIs(get_search_indexer(tree), indexer)
+
+    def test_reindexing_incremental_after_transactions(self):
+        """Test that changes through the API keep the incremental reindex fast."""
+        headers = fetch_header(self.client)
+        dbmgr = WebDbManager(name="example_gramps", create_if_missing=False)
+
+        def reindex_incremental():
+            with self.client.application.app_context():
+                indexer = get_search_indexer(dbmgr.dirname)
+                db = dbmgr.get_db().db
+                try:
+                    with patch.object(
+                        indexer, "_get_update_info", wraps=indexer._get_update_info
+                    ) as get_update_info:
+                        indexer.reindex_incremental(db)
+                finally:
+                    db.close()
+                get_update_info.assert_not_called()
+                return indexer.search("NSync1", page=1, pagesize=10)[0]
+
+        reindex_incremental()
+        obj = {
+            "_class": "Note",
+            "gramps_id": "NSync1",
+            "text": {"_class": "StyledText", "string": "Incremental sync"},
+        }
+        rv = self.client.post("/api/notes/", json=obj, headers=headers)
+        self.assertEqual(rv.status_code, 201)
+        handle = rv.json[0]["handle"]
+        self.assertEqual(reindex_incremental(), 1)
+        rv = self.client.delete(f"/api/notes/{handle}", headers=headers)
+        self.assertEqual(rv.status_code, 200)
+        self.assertEqual(reindex_incremental(), 0)
+
+    def test_shared_indexers_are_bounded(self):
+        """Test that the least recently used indexers are evicted."""
+        tree = WebDbManager(name="example_gramps", create_if_missing=False).dirname
+        with self.client.application.app_context():
+            indexer = get_search_indexer(tree)
+            with patch("gramps_webapi.api.search.MAX_INDEXERS", 1):
+                other = get_search_indexer(f"{tree}_other")
+                self.assertIsNot(get_search_indexer(tree), indexer)
+            self.assertIsNot(get_search_indexer(f"{tree}_other"), other)
+
     def test_get_search_requires_token(self):
         """Test authorization required."""
         check_requires_token(self, TEST_URL + "?query=microfilm")
@@ -263,6 +263,9 @@ class TestTimelinesPeople(unittest.TestCase):
     def test_get_timelines_people_parameter_handles_missing_content(self):
         """Test missing content response."""
         check_resource_missing(self, TEST_URL + "people/?handles=not_a_real_handle")
+        check_resource_missing(
+            self, TEST_URL + "people/?handles=not_a_real_handle&dates=1900/1/1-"
+        )
 
     def test_get_timelines_people_parameter_handles_validate_semantics(self):
         """Test invalid handles parameter and values."""
@@ -299,6 +302,20 @@ class TestTimelinesPeople(unittest.TestCase):
         rv = check_success(self, TEST_URL + "people/?dates=1855/1/1-1900/12/31")
         self.assertEqual(len(rv), 300)
 
+    def test_get_timelines_people_page_matches_full_timeline(self):
+        """Test pages are slices of the full timeline."""
+        url = TEST_URL + "people/?dates=1855/1/1-1900/12/31"
+        full = check_success(self, url)
+        rv = check_success(self, url + "&page=3&pagesize=10")
+        self.assertEqual(
+            [item["handle"] for item in rv], [item["handle"] for item in full[20:30]]
+        )
+        rv = check_success(self, url + "&page=2&pagesize=10&ratings=1")
+        self.assertEqual(
+            [item["handle"] for item in rv], [item["handle"] for item in full[10:20]]
+        )
+        self.assertIn("confidence", rv[0])
+
 
 class TestTimelinesFamilies(unittest.TestCase):
     """Test cases for the /api/timelines/families endpoint for a group of families."""
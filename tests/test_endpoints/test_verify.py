@@ -18,9 +18,22 @@
 
 """Tests for the /api/verify/ endpoint."""
 
+import os
+import time
 import unittest
+import uuid
+from unittest.mock import patch
 
+from gramps.cli.clidbman import CLIDbManager
+from gramps.gen.dbstate import DbState
+
+from gramps_webapi.api import verify
+from gramps_webapi.app import create_app
+from gramps_webapi.auth import add_user, user_db
 from gramps_webapi.auth.const import ROLE_GUEST, ROLE_MEMBER, ROLE_OWNER
+from gramps_webapi.const import ENV_CONFIG_FILE, TEST_EMPTY_GRAMPS_AUTH_CONFIG
+
+from tests import TEST_GRAMPSHOME
 
 from . import BASE_URL, get_test_client
 from .util import fetch_header
@@ -35,35 +48,65 @@ class TestVerify(unittest.TestCase):
     def setUpClass(cls):
         cls.client = get_test_client()
 
+    def _verify(self, header, query=""):
+        """Run a verification and return all stored findings."""
+        rv = self.client.post(TEST_URL + query, headers=header)
+        self.assertEqual(rv.status_code, 201)
+        rv = self.client.get(f"{TEST_URL}/{rv.json['id']}", headers=header)
+        self.assertEqual(rv.status_code, 200)
+        return rv.json
+
     def test_requires_token(self):
         """Unauthenticated request is rejected."""
         rv = self.client.post(TEST_URL)
         self.assertEqual(rv.status_code, 401)
 
-    def test_returns_list(self):
-        """Response body is a JSON array."""
+    def test_returns_result_id(self):
+        """Response body contains the result ID and the number of findings."""
         header = fetch_header(self.client, role=ROLE_OWNER)
         rv = self.client.post(TEST_URL, headers=header)
         self.assertEqual(rv.status_code, 201)
-        self.assertIsInstance(rv.json, list)
+        self.assertIsInstance(rv.json["id"], str)
+        self.assertIsInstance(rv.json["count"], int)
 
     def test_results_nonempty(self):
         """Example DB produces at least one finding."""
         header = fetch_header(self.client, role=ROLE_OWNER)
+        results = self._verify(header)
+        self.assertIsInstance(results, list)
+        self.assertGreater(len(results), 0)
+
+    def test_results_paginated(self):
+        """Stored findings can be fetched page by page."""
+        header = fetch_header(self.client, role=ROLE_OWNER)
         rv = self.client.post(TEST_URL, headers=header)
-        self.assertEqual(rv.status_code, 201)
-        self.assertIsInstance(rv.json, list)
-        self.assertGreater(len(rv.json), 0)
+        result_id, count = rv.json["id"], rv.json["count"]
+        results = self._verify(header)
+        self.assertEqual(len(results), count)
+        rv = self.client.get(
+            f"{TEST_URL}/{result_id}?page=2&pagesize=3", headers=header
+        )
+        self.assertEqual(rv.status_code, 200)
+        self.assertEqual(rv.headers["X-Total-Count"], str(count))
+        self.assertEqual(rv.json, results[3:6])
+
+    def test_results_not_found(self):
+        """Unknown or malformed result IDs return 404."""
+        header = fetch_header(self.client, role=ROLE_OWNER)
+        rv = self.client.get(f"{TEST_URL}/{'0' * 32}", headers=header)
+        self.assertEqual(rv.status_code, 404)
+        rv = self.client.get(f"{TEST_URL}/..%2Fsecret", headers=header)
+        self.assertEqual(rv.status_code, 404)
 
     def test_result_fields(self):
         """Every item has the required fields with correct types."""
         header = fetch_header(self.client, role=ROLE_OWNER)
-        rv = self.client.post(TEST_URL, headers=header)
+        results = self._verify(header)
         required = {
             "message", "object_type", "object_id", "object_handle",
             "name", "rule_id", "rule_params", "severity",
         }
-        for item in rv.json:
+        for item in results:
             self.assertEqual(set(item.keys()), required)
             self.assertIn(item["severity"], ("error", "warning"))
             self.assertIn(item["object_type"], ("Person", "Family"))
@@ -73,12 +116,10 @@ class TestVerify(unittest.TestCase):
     def test_threshold_param_changes_results(self):
         """Tightening the oldage threshold produces more OldAge findings."""
         header = fetch_header(self.client, role=ROLE_OWNER)
-        rv_strict = self.client.post(TEST_URL + "?oldage=50", headers=header)
-        rv_lenient = self.client.post(TEST_URL + "?oldage=200", headers=header)
-        self.assertEqual(rv_strict.status_code, 201)
-        self.assertEqual(rv_lenient.status_code, 201)
-        strict_old = [r for r in rv_strict.json if r["rule_id"] == 7]
-        lenient_old = [r for r in rv_lenient.json if r["rule_id"] == 7]
+        results_strict = self._verify(header, "?oldage=50")
+        results_lenient = self._verify(header, "?oldage=200")
+        strict_old = [r for r in results_strict if r["rule_id"] == 7]
+        lenient_old = [r for r in results_lenient if r["rule_id"] == 7]
         self.assertGreaterEqual(len(strict_old), len(lenient_old))
 
     def test_invalid_param_rejected(self):
@@ -100,5 +141,156 @@ class TestVerify(unittest.TestCase):
         self.assertEqual(rv.status_code, 201)
 
 
+def _make_person(handle, birth_handle, **kwargs):
+    """Return a man with a birth event."""
+    return {
+        "_class": "Person",
+        "handle": handle,
+        "gender": 1,
+        "event_ref_list": [
+            {
+                "_class": "EventRef",
+                "ref": birth_handle,
+                "role": {"_class": "EventRoleType", "string": "Primary"},
+            }
+        ],
+        "birth_ref_index": 0,
+        **kwargs,
+    }
+
+
+def _make_birth(handle, year):
+    """Return a birth event."""
+    return {
+        "_class": "Event",
+        "handle": handle,
+        "date": {"_class": "Date", "dateval": [1, 1, year, False]},
+        "type": {"_class": "EventType", "string": "Birth"},
+    }
+
+
+class TestVerifyIncremental(unittest.TestCase):
+    """Test re-verifying a tree after changes."""
+
+    def setUp(self):
+        self.name = "Test Web API Verify"
+        self.dbman = CLIDbManager(DbState())
+        dirpath, _ = self.dbman.create_new_db_cli(self.name, dbid="sqlite")
+        self.tree = os.path.basename(dirpath)
+        with patch.dict("os.environ", {ENV_CONFIG_FILE: TEST_EMPTY_GRAMPS_AUTH_CONFIG}):
+            self.app = create_app(
+                config_from_env=False,
+                config={
+                    "TREE": self.name,
+                    "VERIFY_DIR": os.path.join(TEST_GRAMPSHOME, "verify_cache"),
+                },
+            )
+        self.app.config["TESTING"] = True
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            user_db.create_all()
+            add_user(name="owner", password="123", role=ROLE_OWNER, tree=self.tree)
+        rv = self.client.post(
+            "/api/token/", json={"username": "owner", "password": "123"}
+        )
+        self.headers = {"Authorization": f"Bearer {rv.json['access_token']}"}
+
+    def tearDown(self):
+        self.dbman.remove_database(self.name)
+
+    def _verify(self):
+        """Run a verification and return all stored findings."""
+        rv = self.client.post("/api/trees/-/verify", headers=self.headers)
+        self.assertEqual(rv.status_code, 201)
+        rv = self.client.get(
+            f"/api/trees/-/verify/{rv.json['id']}", headers=self.headers
+        )
+        self.assertEqual(rv.status_code, 200)
+        return sorted(
+            rv.json, key=lambda finding: (finding["object_handle"], finding["rule_id"])
+        )
+
+    def test_relatives_rechecked(self):
+        """A changed birth date updates the findings of the parent's family."""
+        father, child, family = (uuid.uuid4().hex for _ in range(3))
+        father_birth, child_birth = uuid.uuid4().hex, uuid.uuid4().hex
+        objects = [
+            _make_birth(father_birth, 1900),
+            _make_birth(child_birth, 1800),
+            _make_person(father, father_birth, family_list=[family]),
+            _make_person(child, child_birth, parent_family_list=[family]),
+            {
+                "_class": "Family",
+                "handle": family,
+                "father_handle": father,
+                "child_ref_list": [{"_class": "ChildRef", "ref": child}],
+            },
+        ]
+        rv = self.client.post("/api/objects/", json=objects, headers=self.headers)
+        self.assertEqual(rv.status_code, 201)
+        findings = self._verify()
+        self.assertIn(family, {finding["object_handle"] for finding in findings})
+        # unchanged tree
+        with patch.object(verify, "iter_verify") as iter_verify:
+            self.assertEqual(self._verify(), findings)
+        iter_verify.assert_not_called()
+        # the father is born before the child
+        rv = self.client.put(
+            f"/api/events/{father_birth}",
+            json=_make_birth(father_birth, 1760),
+            headers=self.headers,
+        )
+        self.assertEqual(rv.status_code, 200)
+        with patch.object(verify, "iter_verify") as iter_verify:
+            findings_incremental = self._verify()
+        iter_verify.assert_not_called()
+        self.assertNotEqual(findings_incremental, findings)
+        with self.app.app_context():
+            os.remove(verify._get_state_path(self.tree))
+        self.assertEqual(findings_incremental, self._verify())
+
+    def test_old_results_removed(self):
+        """Old results are removed, the state of the last verification kept."""
+        birth = uuid.uuid4().hex
+        objects = [_make_birth(birth, 1800), _make_person(uuid.uuid4().hex, birth)]
+        rv = self.client.post("/api/objects/", json=objects, headers=self.headers)
+        self.assertEqual(rv.status_code, 201)
+        rv = self.client.post("/api/trees/-/verify", headers=self.headers)
+        self.assertEqual(rv.status_code, 201)
+        result_id = rv.json["id"]
+        with self.app.app_context():
+            result_dir = verify._get_result_dir(self.tree)
+            old = time.time() - verify.RESULT_MAX_AGE - 60
+            for file_name in os.listdir(result_dir):
+                os.utime(os.path.join(result_dir, file_name), (old, old))
+            with patch.object(verify, "iter_verify") as iter_verify:
+                self._verify()
+            iter_verify.assert_not_called()
+            self.assertFalse(
+                os.path.exists(verify._get_result_path(self.tree, result_id))
+            )
+
+
+class TestMergeFindings(unittest.TestCase):
+    """Test merging re-checked findings into previous findings."""
+
+    def test_merge(self):
+        old = [
+            {"object_type": "Person", "object_handle": "P1", "rule_id": 1},
+            {"object_type": "Person", "object_handle": "P2", "rule_id": 1},
+            {"object_type": "Family", "object_handle": "F1", "rule_id": 2},
+        ]
+        new = [
+            {"object_type": "Person", "object_handle": "P1", "rule_id": 3},
+            {"object_type": "Person", "object_handle": "P3", "rule_id": 1},
+        ]
+        checked = {"Person": ["P1", "P3"], "Family": ["F1"]}
+        merged = verify.merge_findings(old, new, checked)
+        self.assertEqual(
+            [(item["object_handle"], item["rule_id"]) for item in merged],
+            [("P1", 3), ("P2", 1), ("P3", 1)],
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
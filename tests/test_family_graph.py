@@ -0,0 +1,227 @@
+#
+# Gramps Web API - A RESTful API for the Gramps genealogy program
+#
+# Copyright (C) 2026      Gramps Web contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Tests for the family graph index."""
+
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from gramps_webapi.api.family_graph import FamilyGraph, FamilyGraphIndex
+from gramps_webapi.cache_versions import bump_class_versions
+
+# grandparents gf, gm; their children f and aunt; f married to m
+# with children c1, c2; aunt married to u with child cousin;
+# unrelated stranger married to spouse
+FAMILIES = {
+    "F0": (1, ("gf", "gm", ("f", "aunt"))),
+    "F1": (1, ("f", "m", ("c1", "c2"))),
+    "F2": (1, ("u", "aunt", ("cousin",))),
+    "F3": (1, ("stranger", "spouse", ())),
+}
+
+
+class TestFamilyGraph(unittest.TestCase):
+    """Test the family graph."""
+
+    def setUp(self):
+        self.graph = FamilyGraph(FAMILIES)
+
+    def handles(self, nodes, graph=None):
+        people, families = (graph or self.graph).split_handles(nodes)
+        return set(people), set(families)
+
+    def test_ancestors(self):
+        nodes = self.graph.ancestors([self.graph.ids["c1"]], 1)
+        self.assertEqual(self.handles(nodes), ({"c1", "f", "m"}, {"F1"}))
+        nodes = self.graph.ancestors([self.graph.ids["c1"]], 5)
+        self.assertEqual(
+            self.handles(nodes), ({"c1", "f", "m", "gf", "gm"}, {"F0", "F1"})
+        )
+
+    def test_with_partners(self):
+        nodes = self.graph.with_partners(["f", "unknown"])
+        self.assertEqual(self.handles(nodes), ({"f", "m"}, {"F1"}))
+
+    def test_have_common_ancestor(self):
+        graph = self.graph
+        ids = graph.ids
+        self.assertTrue(graph.have_common_ancestor([ids["c1"]], [ids["c2"]], 1))
+        self.assertTrue(graph.have_common_ancestor([ids["c1"]], [ids["f"]], 1))
+        self.assertFalse(graph.have_common_ancestor([ids["c1"]], [ids["cousin"]], 1))
+        self.assertTrue(graph.have_common_ancestor([ids["c1"]], [ids["cousin"]], 2))
+        self.assertFalse(graph.have_common_ancestor([ids["c1"]], [ids["stranger"]], 15))
+
+    def test_partners_related(self):
+        graph = self.graph
+        self.assertTrue(
+            graph.have_common_ancestor(
+                graph.with_partners(["u"]), graph.with_partners(["c1"]), 2
+            )
+        )
+        self.assertFalse(
+            graph.have_common_ancestor(
+                graph.with_partners(["spouse"]), graph.with_partners(["c1"]), 15
+            )
+        )
+
+    def test_csr(self):
+        graph = self.graph
+        self.assertEqual(len(graph.up_offsets), len(graph.handles) + 1)
+        self.assertEqual(len(graph.up_targets), len(graph.down_targets))
+        down = graph._down(graph.ids["F1"])
+        self.assertEqual({graph.handles[node] for node in down}, {"c1", "c2"})
+
+    def test_updated(self):
+        # keep the arrays of the small graph
+        self.graph.MAX_OVERRIDDEN = 10
+        graph = self.graph.updated(
+            {
+                # c2 moved to a new family of the aunt with a new partner
+                "F1": (2, ("f", "m", ("c1",))),
+                "F4": (2, ("aunt", "new", ("c2",))),
+                "F3": None,
+            }
+        )
+        ids = graph.ids
+        self.assertTrue(graph.have_common_ancestor([ids["c2"]], [ids["cousin"]], 1))
+        self.assertFalse(graph.have_common_ancestor([ids["c1"]], [ids["c2"]], 1))
+        self.assertEqual(
+            self.handles(graph.ancestors([ids["c2"]], 1), graph)[0],
+            {"c2", "aunt", "new"},
+        )
+        self.assertEqual(graph._up(ids["F3"]), ())
+        self.assertEqual(
+            self.handles(graph.with_partners(["spouse"]), graph)[0], {"spouse"}
+        )
+        # the original graph is unchanged
+        self.assertTrue(
+            self.graph.have_common_ancestor(
+                [self.graph.ids["c1"]], [self.graph.ids["c2"]], 1
+            )
+        )
+        self.assertNotIn("new", self.graph.ids)
+        self.assertEqual(self.graph.up_overrides, {})
+
+    def test_updated_rebuild(self):
+        # changing most of the graph rebuilds the arrays
+        graph = self.graph.updated({"F1": (2, ("f", "m", ("c1",)))})
+        self.assertEqual(graph.up_overrides, {})
+        self.assertEqual(len(graph.handles), len(graph.up_offsets) - 1)
+
+
+class _TreeDb:
+    """Stand-in for the database of a tree directory."""
+
+    def __init__(self, tree_dir):
+        self.tree_dir = tree_dir
+
+    def get_save_path(self):
+        return self.tree_dir
+
+
+def _family_data(change, father, mother, children):
+    return {
+        "change": change,
+        "father_handle": father,
+        "mother_handle": mother,
+        "child_ref_list": [{"ref": child} for child in children],
+    }
+
+
+class _FamiliesDb(_TreeDb):
+    """Stand-in for the database of a tree with families."""
+
+    def __init__(self, tree_dir, families):
+        super().__init__(tree_dir)
+        self.families = families
+        self.reads = []
+
+    def _iter_raw_data(self, obj_key):
+        return iter(list(self.families.items()))
+
+    def get_raw_family_data(self, handle):
+        self.reads.append(handle)
+        return self.families.get(handle)
+
+    def method(self, fmt, *args):
+        return getattr(self, fmt % tuple(arg.lower() for arg in args), None)
+
+
+class TestFamilyGraphIndex(unittest.TestCase):
+    """Test the per-process index of family graphs."""
+
+    def setUp(self):
+        self.tree_dirs = [tempfile.mkdtemp(), tempfile.mkdtemp()]
+        for tree_dir in self.tree_dirs:
+            Path(os.path.join(tree_dir, "meta_data.db")).touch()
+
+    def tearDown(self):
+        for tree_dir in self.tree_dirs:
+            shutil.rmtree(tree_dir)
+
+    def test_build_does_not_block_other_trees(self):
+        index = FamilyGraphIndex()
+        started = threading.Event()
+        release = threading.Event()
+
+        def build(db_handle):
+            if db_handle.get_save_path() == self.tree_dirs[0]:
+                started.set()
+                release.wait(10)
+            return FamilyGraph(FAMILIES)
+
+        with patch.object(FamilyGraphIndex, "_build", staticmethod(build)):
+            thread = threading.Thread(
+                target=index.get, args=(_TreeDb(self.tree_dirs[0]),)
+            )
+            thread.start()
+            self.assertTrue(started.wait(10))
+            # the graph of the other tree is built while the first one is
+            self.assertIsNotNone(index.get(_TreeDb(self.tree_dirs[1])))
+            self.assertFalse(release.is_set())
+            release.set()
+            thread.join()
+        self.assertEqual(index.stats()["builds"], 2)
+        self.assertIsNotNone(index.get(_TreeDb(self.tree_dirs[0])))
+        self.assertEqual(index.stats()["hits"], 1)
+
+    def test_update_reads_changed_families(self):
+        index = FamilyGraphIndex()
+        db = _FamiliesDb(
+            self.tree_dirs[0],
+            {
+                "F1": _family_data(1, "f", "m", ["c1"]),
+                "F2": _family_data(1, "u", "aunt", []),
+            },
+        )
+        self.assertIsNotNone(index.get(db))
+        db.families["F1"] = _family_data(2, "f", "m", ["c1", "c2"])
+        del db.families["F2"]
+        db.families["F3"] = _family_data(1, "stranger", "", [])
+        bump_class_versions(self.tree_dirs[0], ["Family"])
+        graph = index.get(db)
+        self.assertEqual(sorted(db.reads), ["F1", "F3"])
+        self.assertEqual(set(graph.entries), {"F1", "F3"})
+        self.assertIn("c2", graph.ids)
+        self.assertEqual(index.stats()["updates"], 1)
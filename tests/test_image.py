@@ -23,9 +23,15 @@ import io
 import os
 import pytest
 from gramps_webapi.app import create_app
-from gramps_webapi.api.image import ThumbnailHandler
+from gramps_webapi.api.image import (
+    NEW_SUBFILE_TYPE,
+    LocalFileThumbnailHandler,
+    ThumbnailHandler,
+    open_image,
+    thumbnail_decode_size,
+)
 from gramps_webapi.const import MIME_PDF
-from PIL import Image
+from PIL import Image, TiffImagePlugin
 from werkzeug.exceptions import HTTPException
 
 from .test_endpoints.test_upload import get_image
@@ -136,10 +142,11 @@ def test_abort_if_too_large_returns_413():
     assert exc_info.value.code == 413
 
 
-# fixture for restoring Pillow library default config values
-@pytest.fixture(scope="module", autouse=True)
+# fixture for restoring Pillow library default config values after every test,
+# as creating an app sets PIL.Image.MAX_IMAGE_PIXELS
+@pytest.fixture(autouse=True)
 def setup_and_teardown():
-    # save PIL.Image.MAX_IMAGE_PIXELS and ENV_CONFIG_FILE before tests
+    # save PIL.Image.MAX_IMAGE_PIXELS and ENV_CONFIG_FILE before the test
     saved_max_image_pixels = Image.MAX_IMAGE_PIXELS
     from gramps_webapi.const import ENV_CONFIG_FILE
 
@@ -229,3 +236,68 @@ def test_file_max_pillow_image_pixels_incorrect():
     with pytest.raises(HTTPException) as exc_info:
         fh.get_image()
     assert exc_info.value.code == 413
+
+
+def _make_jpeg(width, height) -> io.BytesIO:
+    buf = io.BytesIO()
+    Image.new("RGB", (width, height), color=(0, 128, 0)).save(buf, format="JPEG")
+    buf.seek(0)
+    return buf
+
+
+def test_open_image_reduced_jpeg():
+    """JPEG images are decoded at a reduced resolution covering the size."""
+    img = open_image(_make_jpeg(4000, 3000), size=200)
+    assert img.width < 4000
+    assert img.height < 3000
+    assert min(img.size) >= 200
+
+
+def test_open_image_reduced_jpeg_small():
+    """Images smaller than the requested size are decoded fully."""
+    img = open_image(_make_jpeg(150, 100), size=200)
+    assert img.size == (150, 100)
+
+
+def test_open_image_reduced_tiff_subfile():
+    """The smallest sufficient reduced-resolution TIFF subfile is decoded."""
+    buf = io.BytesIO()
+    with TiffImagePlugin.AppendingTiffWriter(buf, True) as tiff:
+        for size, subfile_type in [
+            ((2000, 1600), 0),
+            ((1000, 800), 1),
+            ((250, 200), 1),
+        ]:
+            Image.new("RGB", size).save(
+                tiff, format="TIFF", tiffinfo={NEW_SUBFILE_TYPE: subfile_type}
+            )
+            tiff.newFrame()
+    buf.seek(0)
+    assert open_image(buf, size=400).size == (1000, 800)
+    buf.seek(0)
+    assert open_image(buf, size=2000).size == (2000, 1600)
+    buf.seek(0)
+    assert open_image(buf).size == (2000, 1600)
+
+
+def test_thumbnail_decode_size():
+    assert thumbnail_decode_size(200) == 200
+    assert thumbnail_decode_size(200, 0, 0, 50, 100) == 400
+    assert thumbnail_decode_size(200, 10, 10, 40, 40) == 667
+    assert thumbnail_decode_size(200, 50, 0, 50, 100) is None
+
+
+def test_local_file_thumbnail(tmp_path):
+    """Thumbnails of local files are decoded at a reduced resolution."""
+    path = tmp_path / "scan.jpg"
+    path.write_bytes(_make_jpeg(4000, 3000).getvalue())
+    handler = LocalFileThumbnailHandler(path, "image/jpeg")
+    assert min(handler.get_image(size=200).size) < 3000
+    thumbnail = Image.open(handler.get_thumbnail(size=200))
+    assert max(thumbnail.size) == 200
+
+
+def test_local_file_missing_aborts_404(tmp_path):
+    with pytest.raises(HTTPException) as exc_info:
+        LocalFileThumbnailHandler(tmp_path / "missing.jpg", "image/jpeg")
+    assert exc_info.value.code == 404
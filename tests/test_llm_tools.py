@@ -36,8 +36,9 @@ from gramps_webapi.api.llm.tools import (
     get_person,
     get_place,
 )
-from gramps_webapi.api.llm.deps import AgentDeps
+from gramps_webapi.api.llm.deps import AgentDeps, DbSession
 from gramps_webapi.api.search import get_search_indexer
+from gramps_webapi.api.util import get_db_outside_request
 from gramps_webapi.app import create_app
 from gramps_webapi.auth import add_user, user_db
 from gramps_webapi.auth.const import ROLE_OWNER
@@ -1185,5 +1186,41 @@ class TestFilterFamilies(unittest.TestCase):
 
 
 
+class TestDbSession(unittest.TestCase):
+    """Tests for tools sharing the database of an agent run."""
+
+    def _make_ctx(self, db_session=None):
+        ctx = MagicMock()
+        ctx.deps = AgentDeps(
+            tree=TEST_TREE,
+            include_private=True,
+            max_context_length=50000,
+            user_id="test_user",
+            db_session=db_session,
+        )
+        return ctx
+
+    def test_tools_open_database_once(self):
+        session = DbSession(tree=TEST_TREE, view_private=True, user_id="test_user")
+        ctx = self._make_ctx(session)
+        with TEST_APP.app_context():
+            expected_people = filter_people(self._make_ctx(), surname="Garner")
+            expected_events = filter_events(self._make_ctx(), event_type="Birth")
+            with patch(
+                "gramps_webapi.api.llm.deps.get_db_outside_request",
+                wraps=get_db_outside_request,
+            ) as get_db:
+                try:
+                    people = filter_people(ctx, surname="Garner")
+                    events = filter_events(ctx, event_type="Birth")
+                    missing = get_person(ctx, "INVALID_XYZ_999")
+                finally:
+                    session.close()
+        self.assertEqual(people, expected_people)
+        self.assertEqual(events, expected_events)
+        self.assertIn("No person found", missing)
+        get_db.assert_called_once()
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -19,18 +19,29 @@
 
 """Unit tests for map tile generation."""
 
+import os
+import tempfile
 import unittest
+from unittest.mock import Mock, patch
 
-from PIL import Image
+from gramps.gen.lib import Attribute, Media
+from PIL import Image, ImageChops, ImageStat
 
-from gramps_webapi.api.file import _get_map_bounds
+from gramps_webapi.api.cache import has_cached_map_tile
+from gramps_webapi.api.file import LocalFileHandler, get_map_bounds
 from gramps_webapi.api.image import (
     _lat_to_tile_pixel_y,
     _tile_bounds_lonlat,
     get_map_tile,
+    get_map_tile_pyramid,
+    get_map_tile_range,
     get_native_max_zoom,
+    map_tile_overlaps,
     transparent_png_tile,
 )
+from gramps_webapi.app import create_app
+from gramps_webapi.config import DefaultConfig
+from gramps_webapi.const import ENV_CONFIG_FILE
 
 
 class TestTileBoundsLonlat(unittest.TestCase):
@@ -213,7 +224,7 @@ class TestGetNativeMaxZoom(unittest.TestCase):
     def test_out_of_range_latitude_does_not_raise(self):
         """Latitudes outside +/-90 (malformed map:bounds) return 0, not a crash.
 
-        _get_map_bounds() only validates ordering, not range, so this is reachable
+        get_map_bounds() only validates ordering, not range, so this is reachable
         with corrupted attribute data.
         """
         for bounds in (
@@ -250,30 +261,30 @@ class TestGetMapBounds(unittest.TestCase):
 
     def test_valid_bounds(self):
         m = self._media("[[10.0, 20.0], [50.0, 60.0]]")
-        result = _get_map_bounds(m)
+        result = get_map_bounds(m)
         self.assertEqual(result, [[10.0, 20.0], [50.0, 60.0]])
 
     def test_no_attribute_returns_none(self):
-        self.assertIsNone(_get_map_bounds(self._no_bounds_media()))
+        self.assertIsNone(get_map_bounds(self._no_bounds_media()))
 
     def test_invalid_json_returns_none(self):
-        self.assertIsNone(_get_map_bounds(self._media("not json")))
+        self.assertIsNone(get_map_bounds(self._media("not json")))
 
     def test_wrong_shape_returns_none(self):
-        self.assertIsNone(_get_map_bounds(self._media("[1, 2, 3]")))
+        self.assertIsNone(get_map_bounds(self._media("[1, 2, 3]")))
 
     def test_degenerate_lat_returns_none(self):
-        self.assertIsNone(_get_map_bounds(self._media("[[50.0, 20.0], [50.0, 60.0]]")))
+        self.assertIsNone(get_map_bounds(self._media("[[50.0, 20.0], [50.0, 60.0]]")))
 
     def test_degenerate_lon_returns_none(self):
-        self.assertIsNone(_get_map_bounds(self._media("[[10.0, 60.0], [50.0, 60.0]]")))
+        self.assertIsNone(get_map_bounds(self._media("[[10.0, 60.0], [50.0, 60.0]]")))
 
     def test_non_numeric_returns_none(self):
-        self.assertIsNone(_get_map_bounds(self._media('[["a", 20.0], [50.0, 60.0]]')))
+        self.assertIsNone(get_map_bounds(self._media('[["a", 20.0], [50.0, 60.0]]')))
 
     def test_coerces_to_float(self):
         m = self._media("[[10, 20], [50, 60]]")
-        result = _get_map_bounds(m)
+        result = get_map_bounds(m)
         self.assertIsInstance(result[0][0], float)
 
 
@@ -286,3 +297,114 @@ class TestTransparentPngTile(unittest.TestCase):
         self.assertEqual(img.mode, "RGBA")
         self.assertEqual(img.format, "PNG")
         self.assertTrue(all(p[3] == 0 for p in img.getdata()))
+
+
+class TestMapTileRange(unittest.TestCase):
+    def test_world(self):
+        bounds = [[-85.0, -180.0], [85.0, 180.0]]
+        self.assertEqual(get_map_tile_range(bounds, 0), (0, 0, 0, 0))
+        self.assertEqual(get_map_tile_range(bounds, 2), (0, 0, 3, 3))
+
+    def test_quadrant(self):
+        """An image in the NE quadrant only overlaps the NE tiles."""
+        bounds = [[1.0, 1.0], [80.0, 179.0]]
+        self.assertEqual(get_map_tile_range(bounds, 1), (1, 0, 1, 0))
+        self.assertEqual(get_map_tile_range(bounds, 2), (2, 0, 3, 1))
+
+    def test_out_of_range_latitude_is_clamped(self):
+        self.assertEqual(
+            get_map_tile_range([[0.0, 0.0], [95.0, 10.0]], 1), (1, 0, 1, 0)
+        )
+
+    def test_overlaps(self):
+        bounds = [[1.0, 1.0], [80.0, 179.0]]
+        self.assertTrue(map_tile_overlaps(bounds, 1, 1, 0))
+        self.assertFalse(map_tile_overlaps(bounds, 1, 0, 0))
+        self.assertFalse(map_tile_overlaps(bounds, 1, 1, 1))
+
+
+class TestGetMapTilePyramid(unittest.TestCase):
+    BOUNDS = [[52.40, 13.30], [52.60, 13.60]]
+
+    def _image(self):
+        return Image.linear_gradient("L").resize((2000, 1500)).convert("RGB")
+
+    def test_tiles(self):
+        """All overlapping tiles up to the max zoom are rendered once."""
+        img = self._image()
+        max_zoom = get_native_max_zoom(img.width, img.height, self.BOUNDS)
+        pyramid = get_map_tile_pyramid(img, self.BOUNDS, max_zoom)
+        tiles = [(z, x, y) for z, x, y, _ in pyramid]
+        self.assertEqual(len(tiles), len(set(tiles)))
+        for z in range(max_zoom + 1):
+            x_min, y_min, x_max, y_max = get_map_tile_range(self.BOUNDS, z)
+            expected = {
+                (z, x, y)
+                for x in range(x_min, x_max + 1)
+                for y in range(y_min, y_max + 1)
+                if map_tile_overlaps(self.BOUNDS, z, x, y)
+            }
+            self.assertEqual({tile for tile in tiles if tile[0] == z}, expected)
+
+    def test_matches_single_tiles(self):
+        """Pyramid tiles look like tiles rendered one by one."""
+        img = self._image()
+        max_zoom = get_native_max_zoom(img.width, img.height, self.BOUNDS)
+        for z, x, y, tile in get_map_tile_pyramid(img, self.BOUNDS, max_zoom):
+            self.assertEqual(tile.size, (256, 256))
+            self.assertEqual(tile.mode, "RGBA")
+            buffer = get_map_tile(img, self.BOUNDS, z, x, y)
+            buffer.seek(0)
+            single = Image.open(buffer).convert("RGBA")
+            diff = ImageStat.Stat(ImageChops.difference(single, tile)).mean
+            self.assertLess(max(diff), 1.0, (z, x, y))
+
+    def test_outside_world(self):
+        img = self._image()
+        bounds = [[86.0, 0.0], [89.0, 10.0]]
+        self.assertEqual(list(get_map_tile_pyramid(img, bounds, 3)), [])
+
+
+class TestSendMapTile(unittest.TestCase):
+    BOUNDS = [[52.4, 13.3], [52.6, 13.6]]
+
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        path = os.path.join(tmp_dir.name, "map.png")
+        Image.linear_gradient("L").resize((2000, 1500)).save(path)
+        media = Media()
+        media.set_path("map.png")
+        media.set_mime_type("image/png")
+        media.set_checksum("abc")
+        attribute = Attribute()
+        attribute.set_type("map:bounds")
+        attribute.set_value(str(self.BOUNDS))
+        media.add_attribute(attribute)
+        db_handle = Mock()
+        db_handle.get_media_from_handle.return_value = media
+        self.handler = LocalFileHandler("handle", tmp_dir.name, db_handle)
+        config = {"TREE": "test", "SECRET_KEY": "test", "USER_DB_URI": "sqlite://"}
+        for name in ["THUMBNAIL_CACHE_CONFIG", "PERSISTENT_CACHE_CONFIG"]:
+            config[name] = {
+                **getattr(DefaultConfig, name),
+                "CACHE_DIR": os.path.join(tmp_dir.name, name.lower()),
+            }
+        with patch.dict("os.environ"):
+            # the test configuration comes from the arguments only
+            os.environ.pop(ENV_CONFIG_FILE, None)
+            self.app = create_app(config, config_from_env=False)
+
+    def test_tile_rendered_on_demand_is_cached(self):
+        """A tile rendered on demand is served from the pre-rendered tiles."""
+        x, y, _, _ = get_map_tile_range(self.BOUNDS, 10)
+        with self.app.test_request_context():
+            rv = self.handler.send_map_tile(10, x, y)
+            rv.direct_passthrough = False
+            data = rv.get_data()
+            self.assertTrue(has_cached_map_tile("abc", self.BOUNDS, 10, x, y))
+            with patch("gramps_webapi.api.file.Image.open") as image_open:
+                rv = self.handler.send_map_tile(10, x, y)
+            image_open.assert_not_called()
+            rv.direct_passthrough = False
+            self.assertEqual(rv.get_data(), data)
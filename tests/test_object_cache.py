@@ -0,0 +1,145 @@
+#
+# Gramps Web API - A RESTful API for the Gramps genealogy program
+#
+# Copyright (C) 2026      Gramps Web contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Tests for the per-process object cache."""
+
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from gramps.gen.lib import Event, Person
+
+from gramps_webapi.cache_versions import bump_class_versions
+from gramps_webapi.object_cache import ObjectCache
+
+
+def _touch_meta(tree_dir, mtime_ns):
+    path = os.path.join(tree_dir, "meta_data.db")
+    Path(path).touch()
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def _person(handle):
+    person = Person()
+    person.set_handle(handle)
+    return person
+
+
+def _event(handle):
+    event = Event()
+    event.set_handle(handle)
+    return event
+
+
+class TestObjectCache(unittest.TestCase):
+    """Test the object cache."""
+
+    def setUp(self):
+        self.tree_dir = tempfile.mkdtemp()
+        _touch_meta(self.tree_dir, 1_000_000_000)
+        self.cache = ObjectCache(max_objects=3)
+
+    def tearDown(self):
+        shutil.rmtree(self.tree_dir)
+
+    def test_get_put(self):
+        session = self.cache.session(self.tree_dir, "full")
+        self.assertIsNone(session.get("Person", "p1"))
+        person = _person("p1")
+        session.put("Person", person)
+        session = self.cache.session(self.tree_dir, "full")
+        self.assertIs(session.get("Person", "p1"), person)
+        self.assertEqual(self.cache.stats()["hits"], 1)
+        self.assertEqual(self.cache.stats()["misses"], 1)
+
+    def test_scopes(self):
+        self.cache.session(self.tree_dir, "full").put("Person", _person("p1"))
+        session = self.cache.session(self.tree_dir, "private", depends_on_all=True)
+        self.assertIsNone(session.get("Person", "p1"))
+
+    def test_invalidation(self):
+        session = self.cache.session(self.tree_dir, "full")
+        session.put("Person", _person("p1"))
+        event = _event("e1")
+        session.put("Event", event)
+        bump_class_versions(self.tree_dir, ["Person"])
+        session = self.cache.session(self.tree_dir, "full")
+        self.assertIsNone(session.get("Person", "p1"))
+        self.assertIs(session.get("Event", "e1"), event)
+
+    def test_invalidation_depends_on_all(self):
+        session = self.cache.session(self.tree_dir, "private", depends_on_all=True)
+        session.put("Person", _person("p1"))
+        bump_class_versions(self.tree_dir, ["Note"])
+        session = self.cache.session(self.tree_dir, "private", depends_on_all=True)
+        self.assertIsNone(session.get("Person", "p1"))
+
+    def test_stale_put(self):
+        session = self.cache.session(self.tree_dir, "full")
+        bump_class_versions(self.tree_dir, ["Person"])
+        self.cache.session(self.tree_dir, "full")
+        # read before the change, stored after it
+        session.put("Person", _person("p1"))
+        session = self.cache.session(self.tree_dir, "full")
+        self.assertIsNone(session.get("Person", "p1"))
+
+    def test_eviction(self):
+        session = self.cache.session(self.tree_dir, "full")
+        for handle in ["p1", "p2", "p3"]:
+            session.put("Person", _person(handle))
+        session.get("Person", "p1")
+        session.put("Person", _person("p4"))
+        self.assertIsNone(session.get("Person", "p2"))
+        self.assertIsNotNone(session.get("Person", "p1"))
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+
+    def test_invalidation_after_eviction(self):
+        session = self.cache.session(self.tree_dir, "full")
+        for handle in ["p1", "p2", "p3"]:
+            session.put("Person", _person(handle))
+        session.put("Event", _event("e1"))
+        bump_class_versions(self.tree_dir, ["Person"])
+        session = self.cache.session(self.tree_dir, "full")
+        self.assertEqual(self.cache.stats()["objects"], 1)
+        self.assertIsNotNone(session.get("Event", "e1"))
+
+    def test_complete(self):
+        session = self.cache.session(self.tree_dir, "full")
+        session.put_all("Person", [_person("p1"), _person("p2")])
+        self.assertTrue(session.is_complete("Person"))
+        session.put("Event", _event("e1"))
+        session.put("Event", _event("e2"))
+        # evicts a person
+        self.assertFalse(session.is_complete("Person"))
+
+    def test_complete_too_many(self):
+        session = self.cache.session(self.tree_dir, "full")
+        session.put_all("Person", [_person(f"p{i}") for i in range(4)])
+        self.assertFalse(session.is_complete("Person"))
+        self.assertEqual(self.cache.stats()["objects"], 0)
+
+    def test_disabled(self):
+        self.cache.max_objects = 0
+        self.assertIsNone(self.cache.session(self.tree_dir, "full"))
+
+    def test_no_meta_data(self):
+        os.remove(os.path.join(self.tree_dir, "meta_data.db"))
+        self.assertIsNone(self.cache.session(self.tree_dir, "full"))
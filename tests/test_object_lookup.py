@@ -0,0 +1,114 @@
+#
+# Gramps Web API - A RESTful API for the Gramps genealogy program
+#
+# Copyright (C) 2026      Gramps Web contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Tests for the bulk object lookup."""
+
+from unittest.mock import patch
+
+import pytest
+from gramps.cli.clidbman import CLIDbManager
+from gramps.gen.db import DbTxn
+from gramps.gen.db.utils import make_database
+from gramps.gen.dbstate import DbState
+from gramps.gen.lib import Attribute, Person, Tag
+from gramps.gen.proxy import LivingProxyDb
+
+from gramps_webapi.api.util import ModifiedPrivateProxyDb, get_objects_from_handles
+
+
+@pytest.fixture(scope="module")
+def db():
+    """Create a temporary SQLite DB with a private and a public person."""
+    dbman = CLIDbManager(DbState())
+    dirpath, db_name = dbman.create_new_db_cli("_test_object_lookup", dbid="sqlite")
+    db = make_database("sqlite")
+    db.load(dirpath)
+    with DbTxn("setup", db) as trans:
+        private_person = Person()
+        private_person.set_privacy(True)
+        db.add_person(private_person, trans)
+        public_person = Person()
+        private_attribute = Attribute()
+        private_attribute.set_privacy(True)
+        public_person.add_attribute(private_attribute)
+        db.add_person(public_person, trans)
+        tag = Tag()
+        tag.set_name("ToDo")
+        db.add_tag(tag, trans)
+    yield db
+
+    db.close()
+    dbman.remove_database(db_name)
+
+
+def _handles(db):
+    handles = {person.private: person.handle for person in db.iter_people()}
+    return handles[True], handles[False]
+
+
+def test_sql(db):
+    private_handle, public_handle = _handles(db)
+    objects = get_objects_from_handles(
+        db, "person", [private_handle, public_handle, "missing"]
+    )
+    assert set(objects) == {private_handle, public_handle}
+    assert objects[public_handle].handle == public_handle
+    assert len(objects[public_handle].attribute_list) == 1
+
+
+def test_private_proxy(db):
+    private_handle, public_handle = _handles(db)
+    proxy = ModifiedPrivateProxyDb(db)
+    objects = get_objects_from_handles(
+        proxy, "Person", [private_handle, public_handle, "missing"]
+    )
+    assert set(objects) == {public_handle}
+    assert objects[public_handle].attribute_list == []
+
+
+def test_nested_private_proxy(db):
+    private_handle, public_handle = _handles(db)
+    proxy = ModifiedPrivateProxyDb(ModifiedPrivateProxyDb(db))
+    with patch.object(proxy, "get_person_from_handle") as get_person:
+        objects = get_objects_from_handles(
+            proxy, "Person", [private_handle, public_handle, "missing"]
+        )
+    get_person.assert_not_called()
+    assert set(objects) == {public_handle}
+    assert objects[public_handle].attribute_list == []
+
+
+def test_tag_private_proxy(db):
+    tag_handle = db.get_tag_handles()[0]
+    proxy = ModifiedPrivateProxyDb(ModifiedPrivateProxyDb(db))
+    objects = get_objects_from_handles(proxy, "Tag", [tag_handle])
+    assert objects[tag_handle].get_name() == "ToDo"
+
+
+def test_other_proxy(db):
+    private_handle, public_handle = _handles(db)
+    proxy = LivingProxyDb(db, LivingProxyDb.MODE_INCLUDE_ALL)
+    objects = get_objects_from_handles(
+        proxy, "person", [private_handle, public_handle, "missing"]
+    )
+    assert set(objects) == {private_handle, public_handle}
+
+
+def test_empty(db):
+    assert get_objects_from_handles(db, "person", []) == {}
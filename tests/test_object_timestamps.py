@@ -0,0 +1,109 @@
+#
+# Gramps Web API - A RESTful API for the Gramps genealogy program
+#
+# Copyright (C) 2026      Gramps Web contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Tests for the bulk handle/change/private enumerator."""
+
+import pytest
+from gramps.cli.clidbman import CLIDbManager
+from gramps.gen.db import DbTxn
+from gramps.gen.db.utils import make_database
+from gramps.gen.dbstate import DbState
+from gramps.gen.lib import Note, Tag
+from gramps.gen.proxy import LivingProxyDb
+
+from gramps_webapi.api.util import (
+    ModifiedPrivateProxyDb,
+    get_object_timestamps,
+    iter_object_timestamps,
+)
+
+
+@pytest.fixture(scope="module")
+def db():
+    """Create a temporary SQLite DB with a private and a public note and a tag."""
+    dbman = CLIDbManager(DbState())
+    dirpath, db_name = dbman.create_new_db_cli("_test_timestamps", dbid="sqlite")
+    db = make_database("sqlite")
+    db.load(dirpath)
+    with DbTxn("setup", db) as trans:
+        private_note = Note("private note")
+        private_note.set_privacy(True)
+        db.add_note(private_note, trans)
+        db.add_note(Note("public note"), trans)
+        tag = Tag()
+        tag.set_name("tag")
+        db.add_tag(tag, trans)
+    yield db
+
+    db.close()
+    dbman.remove_database(db_name)
+
+
+def _loaded(db, class_name):
+    """Get handle, change, and privacy flag by loading every object."""
+    query_method = db.method("get_%s_from_handle", class_name)
+    result = set()
+    for handle in db.method("iter_%s_handles", class_name)():
+        obj = query_method(handle)
+        result.add((handle, obj.change, getattr(obj, "private", False)))
+    return result
+
+
+@pytest.mark.parametrize("class_name", ["Note", "Tag", "Person"])
+def test_iter_object_timestamps_sql(db, class_name):
+    """The SQL fast path matches the loaded objects."""
+    assert set(iter_object_timestamps(db, class_name)) == _loaded(db, class_name)
+
+
+@pytest.mark.parametrize("class_name", ["Note", "Tag"])
+def test_iter_object_timestamps_raw(db, class_name, monkeypatch):
+    """The raw data fallback matches the loaded objects."""
+    monkeypatch.setattr("gramps_webapi.api.util._is_sql_backend", lambda db: False)
+    assert set(iter_object_timestamps(db, class_name)) == _loaded(db, class_name)
+
+
+def test_iter_object_timestamps_private_proxy(db):
+    """Private objects are skipped behind the private proxy."""
+    proxy = ModifiedPrivateProxyDb(db)
+    rows = set(iter_object_timestamps(proxy, "Note"))
+    assert rows == {row for row in _loaded(db, "Note") if not row[2]}
+    assert len(rows) == 1
+
+
+def test_iter_object_timestamps_other_proxy(db):
+    """Objects are loaded through other proxies."""
+    proxy = LivingProxyDb(db, LivingProxyDb.MODE_EXCLUDE_ALL)
+    assert set(iter_object_timestamps(proxy, "Note")) == _loaded(db, "Note")
+
+
+def test_iter_object_timestamps_since(db):
+    """Only objects changed at or after `since` are included."""
+    rows = set(iter_object_timestamps(db, "Note"))
+    latest = max(change for _, change, _ in rows)
+    assert set(iter_object_timestamps(db, "Note", since=latest)) == {
+        row for row in rows if row[1] >= latest
+    }
+    assert not set(iter_object_timestamps(db, "Note", since=latest + 1))
+
+
+def test_get_object_timestamps(db):
+    """The per-class dictionary has handle and change of every object."""
+    timestamps = get_object_timestamps(db)
+    assert timestamps["Note"] == {(h, c) for h, c, _ in _loaded(db, "Note")}
+    assert timestamps["Person"] == set()
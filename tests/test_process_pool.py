@@ -0,0 +1,77 @@
+#
+# Gramps Web API - A RESTful API for the Gramps genealogy program
+#
+# Copyright (C) 2026      Gramps Web contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Tests for the `gramps_webapi.process_pool` module."""
+
+import multiprocessing
+import os
+import tempfile
+import unittest
+
+from gramps_webapi.process_pool import ProcessPool
+
+
+def _square(x):
+    return x * x
+
+
+def _fail(x):
+    raise KeyError(x)
+
+
+def _record_exit(path):
+    def on_exit(pid, exitcode):
+        with open(os.path.join(path, str(pid)), "w", encoding="utf-8") as f:
+            f.write(str(exitcode))
+
+    return on_exit
+
+
+def _square_in_pool(queue):
+    with ProcessPool(2) as pool:
+        results = [pool.submit(_square, x) for x in range(5)]
+        queue.put([result.get() for result in results])
+
+
+class TestProcessPool(unittest.TestCase):
+    def test_submit(self):
+        with ProcessPool(2) as pool:
+            results = [pool.submit(_square, x) for x in range(5)]
+            self.assertEqual([result.get() for result in results], [0, 1, 4, 9, 16])
+
+    def test_exception(self):
+        with self.assertRaises(KeyError):
+            with ProcessPool(2) as pool:
+                pool.submit(_fail, 1).get()
+
+    def test_on_exit(self):
+        with tempfile.TemporaryDirectory() as path:
+            with ProcessPool(2, on_exit=_record_exit(path)) as pool:
+                pool.submit(_square, 2).get()
+            self.assertEqual(len(os.listdir(path)), 2)
+
+    def test_daemonic_process(self):
+        """A daemonic process, like a Celery prefork worker, can use the pool."""
+        ctx = multiprocessing.get_context("fork")
+        queue = ctx.Queue()
+        process = ctx.Process(target=_square_in_pool, args=(queue,), daemon=True)
+        process.start()
+        self.assertEqual(queue.get(timeout=60), [0, 1, 4, 9, 16])
+        process.join()
+        self.assertEqual(process.exitcode, 0)
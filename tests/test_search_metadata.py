@@ -2,12 +2,17 @@
 
 import os
 import tempfile
+from unittest.mock import patch
 
 import pytest
 
 from gramps_webapi.api.search.metadata import (
+    delete_stored_sync_mark,
+    ensure_sync_mark_table,
     get_stored_model_name,
+    get_stored_sync_mark,
     set_stored_model_name,
+    set_stored_sync_mark,
 )
 
 
@@ -68,6 +73,36 @@ class TestSetStoredModelName:
         assert get_stored_model_name(db_url, "mytree") == "model-v1"
 
 
+class TestStoredSyncMark:
+    def test_returns_none_when_no_row(self, db_url):
+        assert get_stored_sync_mark(db_url, "mytree") is None
+
+    def test_write_and_read_back(self, db_url):
+        mark = {"change": 1700000000, "counts": {"Person": 3, "Family": 1}}
+        set_stored_sync_mark(db_url, "mytree", mark)
+        assert get_stored_sync_mark(db_url, "mytree") == mark
+
+    def test_update_overwrites_previous_mark(self, db_url):
+        set_stored_sync_mark(db_url, "mytree", {"change": 1, "counts": {}})
+        set_stored_sync_mark(db_url, "mytree", {"change": 2, "counts": {}})
+        assert get_stored_sync_mark(db_url, "mytree") == {"change": 2, "counts": {}}
+
+    def test_collections_are_independent(self, db_url):
+        set_stored_sync_mark(db_url, "mytree", {"change": 1, "counts": {}})
+        assert get_stored_sync_mark(db_url, "mytree__s") is None
+
+    def test_delete(self, db_url):
+        set_stored_sync_mark(db_url, "mytree", {"change": 1, "counts": {}})
+        delete_stored_sync_mark(db_url, "mytree")
+        assert get_stored_sync_mark(db_url, "mytree") is None
+
+    def test_table_created_once(self, db_url):
+        ensure_sync_mark_table(db_url)
+        with patch("gramps_webapi.api.search.metadata._get_engine") as get_engine:
+            ensure_sync_mark_table(db_url)
+        get_engine.assert_not_called()
+
+
 class TestSemanticIndexerModelCheck:
     """Test that SemanticSearchIndexer raises on model mismatch."""
 
@@ -172,6 +207,37 @@ class TestSemanticIndexerModelCheck:
             indexer.reindex_full(mock_db)
 
         assert get_stored_model_name(db_url, "mytree") == "new-model"
+        # the indexer does not need to check the model again
+        assert indexer.model_checked
+        indexer.check_model()
+
+    def test_check_model_after_skipped_check(self, db_url):
+        """check_model() must catch a mismatch skipped at construction."""
+        from gramps_webapi.api.search.indexer import SemanticSearchIndexer
+
+        set_stored_model_name(db_url, "mytree", "old-model")
+        indexer = SemanticSearchIndexer(
+            tree="mytree",
+            db_url=db_url,
+            model_name="new-model",
+            skip_model_check=True,
+        )
+        assert not indexer.model_checked
+        with pytest.raises(ValueError, match="old-model"):
+            indexer.check_model()
+
+    def test_check_model_only_once(self, db_url):
+        from gramps_webapi.api.search.indexer import SemanticSearchIndexer
+
+        set_stored_model_name(db_url, "mytree", "same-model")
+        indexer = SemanticSearchIndexer(
+            tree="mytree",
+            db_url=db_url,
+            model_name="same-model",
+        )
+        assert indexer.model_checked
+        set_stored_model_name(db_url, "mytree", "other-model")
+        indexer.check_model()
 
 
 class TestEngineUrlHandling:
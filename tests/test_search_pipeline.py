@@ -0,0 +1,91 @@
+"""Tests for the search indexing pipeline."""
+
+import pytest
+
+from gramps_webapi.api.search.pipeline import (
+    Pipeline,
+    PipelineStage,
+    estimate_tokens,
+    iter_token_batches,
+)
+
+
+def _obj_dict(string_all, string_public=None):
+    return {
+        "string_all": string_all,
+        "string_public": string_all if string_public is None else string_public,
+    }
+
+
+class TestIterTokenBatches:
+    def test_respects_budget(self):
+        obj_dicts = [_obj_dict("x" * 36) for _ in range(10)]
+        assert estimate_tokens("x" * 36) == 10
+        batches = list(iter_token_batches(obj_dicts, token_budget=30))
+        assert [len(batch) for batch in batches] == [3, 3, 3, 1]
+        assert sum(batches, []) == obj_dicts
+
+    def test_counts_distinct_public_text(self):
+        obj_dicts = [_obj_dict("x" * 36, "y" * 36) for _ in range(4)]
+        batches = list(iter_token_batches(obj_dicts, token_budget=40))
+        assert [len(batch) for batch in batches] == [2, 2]
+
+    def test_oversized_object(self):
+        obj_dicts = [_obj_dict("x" * 400), _obj_dict("x")]
+        batches = list(iter_token_batches(obj_dicts, token_budget=10))
+        assert [len(batch) for batch in batches] == [1, 1]
+
+    def test_empty(self):
+        assert list(iter_token_batches([], token_budget=10)) == []
+
+
+class TestPipeline:
+    def test_runs_all_stages_in_order(self):
+        results = []
+
+        def double(items):
+            for item in items:
+                yield 2 * item
+
+        def collect(items):
+            for item in items:
+                results.append(item)
+                yield item
+
+        pipeline = Pipeline(
+            [PipelineStage("double", double), PipelineStage("collect", collect)],
+            maxsize=1,
+        )
+        stats = pipeline.run(range(100), name="range")
+        assert results == [2 * i for i in range(100)]
+        assert [stat.name for stat in stats] == ["range", "double", "collect"]
+        assert [stat.items for stat in stats] == [100, 100, 100]
+
+    def test_stage_size(self):
+        def batch(items):
+            items = list(items)
+            yield items[:3]
+            yield items[3:]
+
+        stats = Pipeline([PipelineStage("batch", batch, size=len)]).run(range(5))
+        assert stats[1].items == 5
+
+    def test_stage_error_is_raised(self):
+        def fail(items):
+            for item in items:
+                if item == 10:
+                    raise ValueError("stage failed")
+                yield item
+
+        pipeline = Pipeline([PipelineStage("fail", fail)], maxsize=1)
+        with pytest.raises(ValueError, match="stage failed"):
+            pipeline.run(range(1000))
+
+    def test_source_error_stops_stages(self):
+        def source():
+            yield 1
+            raise ValueError("source failed")
+
+        pipeline = Pipeline([PipelineStage("noop", lambda items: items)])
+        with pytest.raises(ValueError, match="source failed"):
+            pipeline.run(source())
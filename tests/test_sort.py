@@ -0,0 +1,52 @@
+#
+# Gramps Web API - A RESTful API for the Gramps genealogy program
+#
+# Copyright (C) 2026      Gramps Web contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Tests for the composite sort order."""
+
+import random
+import unittest
+
+from gramps_webapi.api.resources.sort import get_sort_order
+
+
+class TestSortOrder(unittest.TestCase):
+    """Test cases for get_sort_order."""
+
+    def test_matches_consecutive_sorts(self):
+        """Test that the order equals consecutive stable sorts by each column."""
+        rng = random.Random(42)
+        for _ in range(200):
+            size = rng.randint(0, 20)
+            columns = [
+                [rng.randint(0, 3) for _ in range(size)],
+                [rng.choice("abc") for _ in range(size)],
+                [rng.randint(0, 1) for _ in range(size)],
+            ][: rng.randint(1, 3)]
+            reverse = [rng.random() < 0.5 for _ in columns]
+            expected = list(range(size))
+            for column, column_reverse in zip(columns, reverse):
+                expected.sort(key=column.__getitem__, reverse=column_reverse)
+            self.assertEqual(get_sort_order(columns, reverse), expected)
+
+    def test_last_column_takes_precedence(self):
+        """Test ties of the last column are broken by the previous ones."""
+        columns = [["b", "a", "c", "a"], [1, 0, 1, 0]]
+        self.assertEqual(get_sort_order(columns, [False, False]), [1, 3, 0, 2])
+        self.assertEqual(get_sort_order(columns, [True, False]), [1, 3, 2, 0])
+        self.assertEqual(get_sort_order(columns, [False, True]), [0, 2, 1, 3])
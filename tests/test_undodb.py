@@ -292,6 +292,15 @@ class TestGetTransactions(unittest.TestCase):
             self.db.add_person(Person(), trans)
         assert undodb.get_transactions_state() == (4, 4)
 
+    def test_changed_handles(self):
+        undodb = self.db.get_undodb()
+        person_handle = self.db.get_person_handles()[0]
+        handles = undodb.get_changed_handles()
+        assert set(handles) == {"Person", "Note", "Place"}
+        assert handles["Person"] == {person_handle}
+        assert set(undodb.get_changed_handles(after_id=1)) == {"Note", "Place"}
+        assert undodb.get_changed_handles(after_id=3) == {}
+
     def test_data_only_included_on_demand(self):
         undodb = self.db.get_undodb()
         transactions, _ = undodb.get_transactions(old_data=False, new_data=False)
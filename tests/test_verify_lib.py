@@ -62,7 +62,10 @@ from gramps_webapi.verify_lib import (
     UnknownGender,
     VerifyFamily,
     VerifyPerson,
+    VerifyRunner,
     YoungParent,
+    get_affected_handles,
+    iter_verify,
     run_verify,
 )
 
@@ -575,6 +578,49 @@ class TestRunVerify(unittest.TestCase):
         results_dict = run_verify(self.db, {"oldage": 50})
         self.assertEqual(len(results_obj), len(results_dict))
 
+    def test_bounded_caches_same_results(self):
+        """Tiny summary caches do not change the findings."""
+        runner = VerifyRunner(self.db)
+        runner._person_cache.limit = 3
+        runner._family_cache.limit = 3
+        results_bounded = runner.run()
+        self.assertLessEqual(len(runner._person_cache), 3)
+        self.assertLessEqual(len(runner._family_cache), 3)
+        self.assertEqual(results_bounded, run_verify(self.db))
+
+    def test_iter_verify_progress_and_translation(self):
+        """iter_verify reports progress and translates every message."""
+        progress = []
+        results = list(
+            iter_verify(
+                self.db,
+                translate=lambda msg: msg.upper(),
+                progress_cb=lambda current, total, prev: progress.append(
+                    (current, total)
+                ),
+            )
+        )
+        self.assertEqual(len(results), len(run_verify(self.db)))
+        for item in results:
+            self.assertEqual(item["message"], item["message"].upper())
+        total = self.db.get_number_of_people() + self.db.get_number_of_families()
+        self.assertEqual(progress[-1], (total, total))
+
+    def test_affected_handles_include_relatives(self):
+        """A changed child affects its parents' family and its members."""
+        family = next(
+            family
+            for family in self.db.iter_families()
+            if family.get_father_handle() and family.get_child_ref_list()
+        )
+        child_handle = family.get_child_ref_list()[0].ref
+        people, families = get_affected_handles(self.db, person_handles=[child_handle])
+        self.assertIn(family.handle, families)
+        self.assertIn(family.get_father_handle(), people)
+        self.assertIn(child_handle, people)
+        people, families = get_affected_handles(self.db, person_handles=["deleted"])
+        self.assertEqual((people, families), ({"deleted"}, set()))
+
 
 if __name__ == "__main__":
     unittest.main()